@@ -0,0 +1,257 @@
+"""Client-side admission control: token buckets per provider and priority queues."""
+
+import heapq
+import itertools
+import logging
+import re
+import threading
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Deque, Dict, List, Mapping, Optional, Tuple
+
+from .flight_recorder import flight
+from .tracing import tracer
+from .utils.exceptions import OverloadError
+
+logger = logging.getLogger(__name__)
+
+# Recent queue waits kept for percentile reporting
+WAIT_SAMPLES = 1024
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class Priority(IntEnum):
+    """Lower values are admitted first."""
+
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a rate-limit reset header into seconds.
+
+    Accepts OpenAI-style durations ("20ms", "1s", "6m0s", "1h2m3.5s") and
+    plain numbers of seconds (Retry-After).
+    """
+    if not isinstance(value, str) or not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """
+    Continuous-refill token bucket.
+
+    Not thread-safe on its own; AdmissionController serializes access. The
+    level may go negative after `penalize`, which delays the next grant.
+    """
+
+    def __init__(self, capacity: float, per_seconds: float = 60.0) -> None:
+        self.capacity = float(capacity)
+        self.per_seconds = per_seconds
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.per_seconds
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, cost: float) -> float:
+        """Seconds until `cost` tokens are available (0 if available now)."""
+        self._refill()
+        cost = min(cost, self.capacity)
+        missing = cost - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def consume(self, cost: float) -> None:
+        self._refill()
+        self.tokens -= min(cost, self.capacity)
+
+    def sync(
+        self, limit: Optional[float], remaining: Optional[float], reset: Optional[float]
+    ) -> None:
+        """Align the bucket with the provider's view from response headers."""
+        self._refill()
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+            if remaining <= 0 and reset:
+                self.penalize(reset)
+
+    def penalize(self, seconds: float) -> None:
+        """Grant nothing for the next `seconds` (e.g. after a 429 Retry-After)."""
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class AdmissionController:
+    """
+    Gates requests to one provider on request and (optionally) token budgets.
+
+    Waiters queue by priority, then arrival; only the head of the queue may
+    take budget, so interactive work overtakes queued batch work. When the
+    queue is already `max_queue_depth` deep, new work is rejected immediately
+    with OverloadError instead of piling on.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: float,
+        tokens_per_minute: Optional[float] = None,
+        max_queue_depth: int = 64,
+        timeout: Optional[float] = None,
+    ) -> None:
+        self.name = name
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_queue_depth = max_queue_depth
+        self.timeout = timeout
+
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int]] = []
+        self._seq = itertools.count()
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.admitted = 0
+        self.rejected = 0
+
+    def acquire(self, cost: int = 0, priority: Priority = Priority.INTERACTIVE) -> float:
+        """
+        Block until one request (and `cost` tokens) may be sent.
+
+        Args:
+            cost: Estimated tokens the request will consume
+            priority: Queue priority
+
+        Returns:
+            Seconds spent waiting in the queue
+
+        Raises:
+            OverloadError: The queue is full or the wait exceeded the timeout
+        """
+        with tracer.span("admission.wait", provider=self.name, priority=priority.name):
+            waited = self._acquire(cost, priority)
+        flight.note(f"{self.name}.queue_wait_ms", round(waited * 1000, 1))
+        return waited
+
+    def _acquire(self, cost: int, priority: Priority) -> float:
+        start = time.monotonic()
+        with self._cond:
+            if len(self._queue) >= self.max_queue_depth:
+                self.rejected += 1
+                raise OverloadError(
+                    f"{self.name} admission queue full ({len(self._queue)} waiting); "
+                    f"shedding {priority.name.lower()} request"
+                )
+
+            entry = (int(priority), next(self._seq))
+            heapq.heappush(self._queue, entry)
+            flight.note(f"{self.name}.queue_depth", len(self._queue))
+            try:
+                while True:
+                    wait: Optional[float] = None
+                    if self._queue[0] == entry:
+                        wait = self.requests.time_until(1)
+                        if self.tokens is not None and cost:
+                            wait = max(wait, self.tokens.time_until(cost))
+                        if wait <= 0:
+                            break
+
+                    if self.timeout is not None:
+                        remaining = self.timeout - (time.monotonic() - start)
+                        if remaining <= 0:
+                            self.rejected += 1
+                            raise OverloadError(
+                                f"{self.name} admission wait exceeded {self.timeout:.1f}s"
+                            )
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+
+                self.requests.consume(1)
+                if self.tokens is not None and cost:
+                    self.tokens.consume(cost)
+                heapq.heappop(self._queue)
+                self.admitted += 1
+            except BaseException:
+                if entry in self._queue:
+                    self._queue.remove(entry)
+                    heapq.heapify(self._queue)
+                raise
+            finally:
+                self._cond.notify_all()
+
+        waited = time.monotonic() - start
+        self._waits.append(waited)
+        if waited > 0.1:
+            logger.debug(f"{self.name} request queued for {waited * 1000:.0f} ms")
+        return waited
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Feed rate-limit response headers back into the buckets.
+
+        Understands OpenAI's x-ratelimit-{limit,remaining,reset}-{requests,tokens}
+        and a generic Retry-After.
+        """
+        def number(key: str) -> Optional[float]:
+            value = headers.get(key)
+            try:
+                return float(value) if value is not None else None
+            except ValueError:
+                return None
+
+        with self._cond:
+            if "x-ratelimit-remaining-requests" in headers:
+                self.requests.sync(
+                    number("x-ratelimit-limit-requests"),
+                    number("x-ratelimit-remaining-requests"),
+                    parse_reset(headers.get("x-ratelimit-reset-requests")),
+                )
+            if self.tokens is not None and "x-ratelimit-remaining-tokens" in headers:
+                self.tokens.sync(
+                    number("x-ratelimit-limit-tokens"),
+                    number("x-ratelimit-remaining-tokens"),
+                    parse_reset(headers.get("x-ratelimit-reset-tokens")),
+                )
+            retry_after = parse_reset(headers.get("retry-after"))
+            if retry_after:
+                self.requests.penalize(retry_after)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        """Return queue depth, admit/reject counts and queue wait percentiles (ms)."""
+        with self._cond:
+            waits = sorted(self._waits)
+            depth = len(self._queue)
+
+        def pct(p: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(len(waits) * p))] * 1000
+
+        return {
+            "queue_depth": depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_ms_p50": pct(0.50),
+            "wait_ms_p95": pct(0.95),
+            "wait_ms_max": pct(1.0),
+        }
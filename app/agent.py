@@ -1,7 +1,10 @@
 import logging
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
 from .llm_openai import LLMClient
+from .session_store import SessionStore
+from .tracing import traced
+from .turn_store import Role, TurnStore
 
 logger = logging.getLogger(__name__)
 
@@ -19,13 +22,37 @@ MAX_HISTORY_LENGTH = 50
 class VoiceAgent:
     """High-level agent that turns transcripts into reply text with conversation memory."""
 
-    def __init__(self) -> None:
-        self.llm = LLMClient()
-        self.history: List[Dict[str, str]] = [
-            {"role": "system", "content": SYSTEM_PROMPT},
-        ]
+    def __init__(
+        self,
+        compress_after: Optional[int] = None,
+        store: Optional[SessionStore] = None,
+        session_id: str = "default",
+        llm: Optional[LLMClient] = None,
+    ) -> None:
+        """
+        Args:
+            compress_after: Compress turns older than the most recent N (None disables)
+            store: Optional durable store; turns are persisted as they happen
+                and the session is resumed from it on construction
+            session_id: Key of this conversation in the store
+            llm: Client to share between agents (default: a new LLMClient)
+        """
+        self.llm = llm or LLMClient()
+        self.turns = TurnStore(SYSTEM_PROMPT, compress_after=compress_after)
+        self.store = store
+        self.session_id = session_id
+        if store is not None:
+            for role, content in store.load(session_id, limit=MAX_HISTORY_LENGTH - 10):
+                self.turns.append(role, content)
+            logger.info(f"Resumed session {session_id} with {len(self.turns) - 1} turns")
         logger.info("VoiceAgent initialized")
 
+    @property
+    def history(self) -> List[Dict[str, str]]:
+        """Conversation as OpenAI-style messages, built on demand from the turn store."""
+        return self.turns.messages()
+
+    @traced("agent.reply")
     def reply(self, user_text: str) -> Optional[str]:
         """
         Process user input and generate agent reply.
@@ -43,37 +70,50 @@ class VoiceAgent:
         user_text = user_text.strip()
         
         # Prevent history from growing unbounded
-        if len(self.history) > MAX_HISTORY_LENGTH:
-            logger.debug(f"Trimming conversation history from {len(self.history)} to 20 messages")
+        if len(self.turns) > MAX_HISTORY_LENGTH:
+            logger.debug(f"Trimming conversation history from {len(self.turns)} messages")
             # Keep system prompt + recent history
-            system_msg = self.history[0]
-            recent = self.history[-(MAX_HISTORY_LENGTH - 10) :]
-            self.history = [system_msg] + recent
+            self.turns.trim(MAX_HISTORY_LENGTH - 10)
         
         try:
-            self.history.append({"role": "user", "content": user_text})
+            self.turns.append(Role.USER, user_text)
             logger.debug(f"User: {user_text[:100]}...")
             
-            answer = self.llm.chat(self.history)
+            answer = self.llm.chat(self.turns.messages())
             
             if not answer:
                 logger.error("LLM failed to generate response")
                 # Remove the user message we just added since we got no response
-                self.history.pop()
+                self.turns.pop()
                 return None
             
-            self.history.append({"role": "assistant", "content": answer})
+            self.turns.append(Role.ASSISTANT, answer)
             logger.debug(f"Agent: {answer[:100]}...")
+            self._persist([(Role.USER, user_text), (Role.ASSISTANT, answer)])
             return answer
             
         except Exception as e:
             logger.error(f"Error in reply generation: {e}")
             # Clean up failed message
-            if self.history and self.history[-1].get("role") == "user":
-                self.history.pop()
+            if self.turns.last_role() == Role.USER:
+                self.turns.pop()
             return None
 
     def reset_conversation(self) -> None:
         """Clear conversation history and start fresh."""
         logger.info("Resetting conversation history")
-        self.history = [{"role": "system", "content": SYSTEM_PROMPT}]
+        self.turns.clear()
+        if self.store is not None:
+            try:
+                self.store.delete(self.session_id)
+            except Exception as e:
+                logger.error(f"Failed to delete persisted session {self.session_id}: {e}")
+
+    def _persist(self, turns: List[Tuple[Role, str]]) -> None:
+        """Write completed turns to the session store; failures never break the reply."""
+        if self.store is None:
+            return
+        try:
+            self.store.append(self.session_id, turns)
+        except Exception as e:
+            logger.error(f"Failed to persist session {self.session_id}: {e}")
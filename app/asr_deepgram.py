@@ -5,20 +5,59 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
-from .config import DEEPGRAM_API_KEY, REQUEST_TIMEOUT, MAX_RETRIES, RETRY_DELAY
+from .admission import AdmissionController, Priority
+from .config import (
+    ADMISSION_MAX_QUEUE,
+    ASR_MIN_SPEECH_MS,
+    ASR_SPEECH_THRESHOLD,
+    ASR_TRIM_PAD_MS,
+    ASR_TRIM_SILENCE,
+    DEEPGRAM_API_KEY,
+    DEEPGRAM_RPM_LIMIT,
+    DSP_INLINE_BELOW_BYTES,
+    DSP_WORKERS,
+    REQUEST_TIMEOUT,
+    MAX_RETRIES,
+    RETRY_DELAY,
+)
+from .dsp import create_executor
+from .flight_recorder import flight
+from .speech_gate import SpeechGate
+from .tracing import traced
+from .utils.exceptions import OverloadError
 
 logger = logging.getLogger(__name__)
 
+DEEPGRAM_BASE_URL = "https://api.deepgram.com/v1"
+
 
 class DeepgramASRClient:
     """Robust Deepgram STT client for WAV audio with retry logic."""
 
-    def __init__(self) -> None:
+    def __init__(self, base_url: Optional[str] = None) -> None:
+        """
+        Args:
+            base_url: Deepgram-compatible API root (default: DEEPGRAM_BASE_URL)
+        """
         if not DEEPGRAM_API_KEY:
             raise RuntimeError("DEEPGRAM_API_KEY is not set")
         
-        self.base_url = "https://api.deepgram.com/v1/listen"
+        self.base_url = f"{(base_url or DEEPGRAM_BASE_URL).rstrip('/')}/listen"
         self.session = self._create_session()
+        self.admission = AdmissionController(
+            "deepgram",
+            requests_per_minute=DEEPGRAM_RPM_LIMIT,
+            max_queue_depth=ADMISSION_MAX_QUEUE,
+            timeout=REQUEST_TIMEOUT,
+        )
+        self.gate: Optional[SpeechGate] = None
+        if ASR_TRIM_SILENCE:
+            self.gate = SpeechGate(
+                ASR_SPEECH_THRESHOLD,
+                ASR_TRIM_PAD_MS,
+                ASR_MIN_SPEECH_MS,
+                executor=create_executor(DSP_WORKERS, DSP_INLINE_BELOW_BYTES),
+            )
         logger.info("DeepgramASRClient initialized")
 
     def _create_session(self) -> requests.Session:
@@ -27,7 +66,8 @@ class DeepgramASRClient:
         retry_strategy = Retry(
             total=MAX_RETRIES,
             backoff_factor=RETRY_DELAY,
-            status_forcelist=[429, 500, 502, 503, 504],
+            # 429 is left to admission control: a retry here would skip the token bucket
+            status_forcelist=[500, 502, 503, 504],
             allowed_methods=["POST"],
         )
         adapter = HTTPAdapter(max_retries=retry_strategy)
@@ -35,23 +75,37 @@ class DeepgramASRClient:
         session.mount("https://", adapter)
         return session
 
+    @traced("asr.transcribe_wav")
     def transcribe_wav(
-        self, wav_bytes: bytes, model: str = "nova-3"
+        self,
+        wav_bytes: bytes,
+        model: str = "nova-3",
+        priority: Priority = Priority.INTERACTIVE,
     ) -> Optional[str]:
         """
         Send WAV audio bytes to Deepgram and return transcript text.
+
+        With the speech gate enabled, silence is trimmed first and recordings
+        without speech return None without a request.
         
         Args:
             wav_bytes: Raw WAV audio data
             model: Deepgram model to use (default: nova-3)
+            priority: Admission queue priority (interactive turns go first)
             
         Returns:
-            Transcript text or None if transcription failed
+            Transcript text or None if transcription failed; also None when
+            admission sheds the request
         """
         if not wav_bytes:
             logger.warning("Empty audio bytes provided to transcribe_wav")
             return None
 
+        if self.gate:
+            wav_bytes = self.gate.prepare(wav_bytes)
+            if wav_bytes is None:
+                return None
+
         headers = {
             "Authorization": f"Token {DEEPGRAM_API_KEY}",
             "Content-Type": "audio/wav",
@@ -64,6 +118,7 @@ class DeepgramASRClient:
         }
 
         try:
+            self.admission.acquire(priority=priority)
             logger.debug(f"Sending audio to Deepgram (model={model})")
             resp = self.session.post(
                 self.base_url,
@@ -72,6 +127,13 @@ class DeepgramASRClient:
                 data=wav_bytes,
                 timeout=REQUEST_TIMEOUT,
             )
+            self.admission.update_from_headers(resp.headers)
+            if flight.current() is not None:
+                flight.note("deepgram.status", resp.status_code)
+                flight.note("deepgram.request_bytes", len(wav_bytes))
+                # Retries made by the session's urllib3 Retry policy before this response
+                retries = getattr(resp.raw, "retries", None)
+                flight.note("deepgram.retries", len(getattr(retries, "history", ()) or ()))
             resp.raise_for_status()
             data = resp.json()
             
@@ -86,6 +148,9 @@ class DeepgramASRClient:
             logger.debug(f"Transcript: {transcript[:100]}...")
             return transcript
             
+        except OverloadError as e:
+            logger.error(f"Deepgram request shed: {e}")
+            return None
         except requests.exceptions.Timeout:
             logger.error(f"Deepgram request timeout after {REQUEST_TIMEOUT}s")
             return None
@@ -0,0 +1,497 @@
+"""Pluggable audio sources and sinks: sound card, device process, WAV files, pipes and null."""
+
+import logging
+import os
+import sys
+import wave
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional, Tuple, Union
+
+from .utils.g711 import ulaw_encode
+from .utils.pcm import ENCODINGS, read_wav, to_wav
+
+logger = logging.getLogger(__name__)
+
+Chunk = Union[bytes, bytearray, memoryview]
+
+SOURCE_KINDS = ("device", "process", "listen", "wav", "pipe", "null")
+SINK_KINDS = ("device", "process", "wav", "pipe", "null")
+
+
+class AudioSource:
+    """
+    Produces one utterance per `record()` call as WAV bytes.
+
+    Interactive sources (a microphone) wait for the user to press Enter,
+    unless they are `hands_free` and detect the start of speech themselves;
+    non-interactive ones (files, pipes) are read back to back until
+    `exhausted` is set.
+    """
+
+    interactive = False
+    hands_free = False
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1) -> None:
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.exhausted = False
+
+    def record(self) -> Optional[bytes]:
+        """Return the next utterance as WAV bytes, or None if there is none."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "AudioSource":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class AudioSink:
+    """
+    Consumes reply audio (16-bit mono PCM chunks).
+
+    Chunks may be bytes or memoryviews; sinks write them as they are
+    without joining or copying where the destination allows it.
+    """
+
+    def __init__(self, sample_rate: int = 24000) -> None:
+        self.sample_rate = sample_rate
+        self.chunks = 0
+        self.bytes_played = 0
+
+    def play(self, chunks: Iterable[Chunk]) -> bool:
+        """Play every chunk; return True on success."""
+        try:
+            for chunk in chunks:
+                if len(chunk):
+                    self.write(chunk)
+                    self.chunks += 1
+                    self.bytes_played += len(chunk)
+            self.flush()
+            return True
+        except Exception as e:
+            logger.error(f"Playback failed: {e}")
+            return False
+
+    def write(self, chunk: Chunk) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "AudioSink":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def stats(self) -> Dict[str, float]:
+        """Return chunks and bytes played, and the seconds of audio they hold."""
+        return {
+            "chunks": self.chunks,
+            "bytes_played": self.bytes_played,
+            "audio_seconds": self.bytes_played / (2 * self.sample_rate),
+        }
+
+
+class DeviceSource(AudioSource):
+    """Microphone capture in PortAudio callback mode, one fixed-length window per call."""
+
+    interactive = True
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        record_seconds: float = 5,
+        frames_per_buffer: int = 1024,
+    ) -> None:
+        super().__init__(sample_rate, channels)
+        self.record_seconds = record_seconds
+        self.frames_per_buffer = frames_per_buffer
+
+    def _capture(self) -> Any:
+        from .utils.audio import CallbackCapture
+
+        return CallbackCapture(
+            self.sample_rate, self.channels, frames_per_buffer=self.frames_per_buffer
+        )
+
+    def record(self) -> Optional[bytes]:
+        capture = self._capture()
+        reader = capture.reader()
+        try:
+            capture.start()
+            frames = read_window(
+                reader, self.sample_rate, self.frames_per_buffer, self.record_seconds
+            )
+            log_capture_stats({**capture.stats(), **reader.stats()})
+            return to_wav(b"".join(frames), self.sample_rate, self.channels) if frames else None
+        except OSError as e:
+            logger.error(f"Audio device error: {e}. Check microphone connection.")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error during recording: {e}")
+            return None
+        finally:
+            capture.stop()
+
+
+class DeviceSink(AudioSink):
+    """Speaker playback through PyAudio; a stream is opened per reply."""
+
+    def play(self, chunks: Iterable[Chunk]) -> bool:
+        import pyaudio  # type: ignore
+
+        audio = stream = None
+        try:
+            audio = pyaudio.PyAudio()
+            stream = audio.open(
+                format=pyaudio.paInt16, channels=1, rate=self.sample_rate, output=True
+            )
+            for chunk in chunks:
+                if not len(chunk):
+                    continue
+                try:
+                    # PortAudio needs a read-only buffer; only writable views are copied
+                    stream.write(chunk if isinstance(chunk, bytes) else bytes(chunk))
+                    self.chunks += 1
+                    self.bytes_played += len(chunk)
+                except Exception as e:
+                    logger.error(f"Error playing audio chunk {self.chunks}: {e}")
+            return True
+        except OSError as e:
+            logger.error(f"Audio playback device error: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Unexpected error during playback: {e}")
+            return False
+        finally:
+            if stream:
+                try:
+                    stream.stop_stream()
+                    stream.close()
+                except Exception as e:
+                    logger.warning(f"Error closing playback stream: {e}")
+            if audio:
+                try:
+                    audio.terminate()
+                except Exception as e:
+                    logger.warning(f"Error terminating PyAudio: {e}")
+
+
+class ProcessSource(AudioSource):
+    """Microphone capture served by an AudioProcess child over shared memory."""
+
+    interactive = True
+
+    def __init__(
+        self,
+        process: Any,
+        record_seconds: float = 5,
+        owner: bool = True,
+    ) -> None:
+        super().__init__(process.sample_rate, process.channels)
+        self.process = process
+        self.record_seconds = record_seconds
+        self.owner = owner
+
+    def record(self) -> Optional[bytes]:
+        process = self.process
+        reader = process.reader()
+        frames = read_window(
+            reader, self.sample_rate, process.frames_per_buffer, self.record_seconds
+        )
+        log_capture_stats({**process.stats(), **reader.stats()})
+        return to_wav(b"".join(frames), self.sample_rate, self.channels) if frames else None
+
+    def close(self) -> None:
+        if self.owner:
+            self.process.stop()
+
+
+class ProcessSink(AudioSink):
+    """Speaker playback served by an AudioProcess child over shared memory."""
+
+    def __init__(self, process: Any, owner: bool = True) -> None:
+        super().__init__(process.playback_rate)
+        self.process = process
+        self.owner = owner
+
+    def play(self, chunks: Iterable[Chunk]) -> bool:
+        def counted() -> Iterable[Chunk]:
+            for chunk in chunks:
+                self.chunks += 1
+                self.bytes_played += len(chunk)
+                yield chunk
+
+        try:
+            return self.process.play(counted())
+        except Exception as e:
+            logger.error(f"Playback failed: {e}")
+            return False
+
+    def stats(self) -> Dict[str, float]:
+        return {**super().stats(), **self.process.stats()}
+
+    def close(self) -> None:
+        if self.owner:
+            self.process.stop()
+
+
+class WavFileSource(AudioSource):
+    """Replays WAV files as utterances, one file per turn, as fast as they are requested."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        if os.path.isdir(path):
+            self.paths = sorted(
+                os.path.join(path, name) for name in os.listdir(path) if name.endswith(".wav")
+            )
+        else:
+            self.paths = [path]
+        self._next = 0
+        self.exhausted = not self.paths
+
+    def record(self) -> Optional[bytes]:
+        if self._next >= len(self.paths):
+            self.exhausted = True
+            return None
+        path = self.paths[self._next]
+        self._next += 1
+        self.exhausted = self._next >= len(self.paths)
+        with open(path, "rb") as f:
+            data = f.read()
+        _, self.sample_rate, self.channels, _ = read_wav(data)
+        logger.debug(f"Replaying {path}")
+        return data
+
+
+class WavFileSink(AudioSink):
+    """Appends every reply to one WAV file."""
+
+    def __init__(self, path: str, sample_rate: int = 24000) -> None:
+        super().__init__(sample_rate)
+        self.path = path
+        self._wav = wave.open(path, "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)
+        self._wav.setframerate(sample_rate)
+
+    def write(self, chunk: Chunk) -> None:
+        self._wav.writeframesraw(chunk)
+
+    def close(self) -> None:
+        self._wav.close()
+
+
+class PipeSource(AudioSource):
+    """
+    Reads raw audio from a byte stream (stdin by default) in fixed-length windows.
+
+    The stream carries 16-bit PCM, or μ-law bytes with encoding="mulaw"
+    (telephony), which is passed on as a μ-law WAV without decoding.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[BinaryIO] = None,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        record_seconds: float = 5,
+        encoding: str = "linear16",
+    ) -> None:
+        super().__init__(sample_rate, channels)
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding {encoding!r}; expected one of {ENCODINGS}")
+        self.stream = stream if stream is not None else sys.stdin.buffer
+        self.encoding = encoding
+        sample_bytes = 1 if encoding == "mulaw" else 2
+        self.window = int(sample_rate * record_seconds) * channels * sample_bytes
+
+    def record(self) -> Optional[bytes]:
+        data = self.stream.read(self.window)
+        if len(data) < self.window:
+            self.exhausted = True
+        if not data:
+            return None
+        return to_wav(data, self.sample_rate, self.channels, self.encoding)
+
+
+class PipeSink(AudioSink):
+    """Writes raw 16-bit PCM (or μ-law for encoding="mulaw") to a byte stream, stdout by default."""
+
+    def __init__(
+        self,
+        stream: Optional[BinaryIO] = None,
+        sample_rate: int = 24000,
+        encoding: str = "linear16",
+    ) -> None:
+        super().__init__(sample_rate)
+        if encoding not in ENCODINGS:
+            raise ValueError(f"Unknown encoding {encoding!r}; expected one of {ENCODINGS}")
+        # The original stdout, even if sys.stdout is redirected for messages
+        self.stream = stream if stream is not None else sys.__stdout__.buffer
+        self.encoding = encoding
+        self._carry = b""
+
+    def write(self, chunk: Chunk) -> None:
+        if self.encoding == "linear16":
+            self.stream.write(chunk)
+            return
+        # A sample split across chunks is completed by the next one
+        data = self._carry + bytes(chunk) if self._carry else chunk
+        cut = len(data) - len(data) % 2
+        self._carry = bytes(data[cut:])
+        self.stream.write(ulaw_encode(memoryview(data)[:cut]))
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+class NullSource(AudioSource):
+    """Returns the same clip (default: a second of silence) `count` times."""
+
+    def __init__(self, clip: Optional[bytes] = None, count: int = 1, sample_rate: int = 16000):
+        super().__init__(sample_rate)
+        self.clip = clip if clip is not None else to_wav(bytes(2 * sample_rate), sample_rate)
+        self.remaining = count
+        self.exhausted = count <= 0
+
+    def record(self) -> Optional[bytes]:
+        if self.remaining <= 0:
+            self.exhausted = True
+            return None
+        self.remaining -= 1
+        self.exhausted = self.remaining <= 0
+        return self.clip
+
+
+class NullSink(AudioSink):
+    """Discards audio, counting it."""
+
+    def write(self, chunk: Chunk) -> None:
+        pass
+
+
+def read_window(
+    reader: Any, sample_rate: int, frames_per_buffer: int, seconds: float
+) -> List[bytes]:
+    """Read `seconds` of frames from a capture ring reader, stopping early if capture stalls."""
+    frames: List[bytes] = []
+    num_chunks = int(sample_rate / frames_per_buffer * seconds)
+    frame_timeout = 4 * frames_per_buffer / sample_rate + 0.5
+    for i in range(num_chunks):
+        data = reader.read(timeout=frame_timeout)
+        if data is None:
+            logger.error(f"Audio capture stalled at chunk {i}")
+            break
+        frames.append(data)
+    return frames
+
+
+def log_capture_stats(stats: Dict[str, Any]) -> None:
+    if stats.get("input_overflows") or stats.get("dropped_frames"):
+        logger.warning(f"Audio capture lost data: {stats}")
+    else:
+        logger.debug(f"Audio capture stats: {stats}")
+
+
+def _split(spec: str) -> Tuple[str, str]:
+    kind, _, arg = spec.partition(":")
+    return kind.lower(), arg
+
+
+def _create_source(
+    spec: str, sample_rate: int, channels: int, seconds: float, encoding: str
+) -> AudioSource:
+    kind, arg = _split(spec)
+    if kind == "device":
+        return DeviceSource(sample_rate, channels, seconds)
+    if kind == "wav":
+        if not arg:
+            raise ValueError("wav source needs a path: wav:PATH")
+        return WavFileSource(arg)
+    if kind == "pipe":
+        return PipeSource(
+            sample_rate=sample_rate,
+            channels=channels,
+            record_seconds=seconds,
+            encoding=arg or encoding,
+        )
+    if kind == "null":
+        return NullSource(count=int(arg or 1), sample_rate=sample_rate)
+    raise ValueError(f"Unknown audio source {spec!r}; expected one of {SOURCE_KINDS}")
+
+
+def _create_sink(spec: str, sample_rate: int, encoding: str) -> AudioSink:
+    kind, arg = _split(spec)
+    if kind == "device":
+        return DeviceSink(sample_rate)
+    if kind == "wav":
+        if not arg:
+            raise ValueError("wav sink needs a path: wav:PATH")
+        return WavFileSink(arg, sample_rate)
+    if kind == "pipe":
+        return PipeSink(sample_rate=sample_rate, encoding=arg or encoding)
+    if kind == "null":
+        return NullSink(sample_rate)
+    raise ValueError(f"Unknown audio sink {spec!r}; expected one of {SINK_KINDS}")
+
+
+def create_audio(
+    source_spec: str,
+    sink_spec: str,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    record_seconds: float = 5,
+    playback_rate: int = 24000,
+    encoding: str = "linear16",
+) -> Tuple[AudioSource, AudioSink]:
+    """
+    Build the source and sink named by specs.
+
+    Specs are device, process, wav:PATH (a file, or a directory of .wav
+    files for sources), pipe[:ENCODING] (stdin/stdout; `encoding` unless
+    given) and null[:N] (N silent utterances for sources). The "listen"
+    source keeps the microphone open and starts a turn when speech begins
+    ("listen:process" captures through the device process). A "process"
+    source and sink share one device process.
+
+    Returns:
+        (source, sink)
+    """
+    (source_kind, source_arg), sink_kind = _split(source_spec), _split(sink_spec)[0]
+    listen_process = source_kind == "listen" and source_arg == "process"
+    process = None
+    if "process" in (source_kind, sink_kind) or listen_process:
+        from .audio_process import AudioProcess
+
+        # Listening wants short capture frames so onsets are caught promptly
+        frames = sample_rate // 50 if source_kind == "listen" else 1024
+        process = AudioProcess(
+            sample_rate, channels, frames_per_buffer=frames, playback_rate=playback_rate
+        )
+        process.start()
+
+    if source_kind == "process":
+        source: AudioSource = ProcessSource(process, record_seconds)
+    elif source_kind == "listen":
+        from .listener import create_listener
+
+        source = create_listener(sample_rate, channels, process if listen_process else None)
+    else:
+        source = _create_source(source_spec, sample_rate, channels, record_seconds, encoding)
+    if sink_kind == "process":
+        # The source stops the shared process when it owns it
+        source_owns = source_kind == "process" or listen_process
+        sink: AudioSink = ProcessSink(process, owner=not source_owns)
+    else:
+        sink = _create_sink(sink_spec, playback_rate, encoding)
+    return source, sink
@@ -0,0 +1,272 @@
+"""Microphone capture and speaker playback in a dedicated child process."""
+
+import logging
+import multiprocessing
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from .utils.shared_ring import SharedFrameRing, SharedRingReader
+
+logger = logging.getLogger(__name__)
+
+# Playback frames of 100 ms at 24 kHz, 16-bit mono
+PLAYBACK_FRAME_BYTES = 4800
+PLAYBACK_BUFFER_SECONDS = 2
+START_TIMEOUT = 10.0
+
+SOURCES = ("device", "synthetic")
+
+
+def run_synthetic_device(
+    capture: SharedFrameRing, playback: SharedFrameRing, period: float, stop: Any
+) -> None:
+    """
+    Stand-in for the sound card: emit a silent capture frame every `period`.
+
+    A tick that fires more than one period late is counted as an overflow,
+    which is when a real device would have overrun its buffer. Playback
+    frames are consumed as they arrive. Used by tests and benchmarks, in
+    the child process or (for comparison) on a thread of the caller.
+    """
+    frame = bytes(capture.frame_bytes)
+    reader = playback.reader()
+    next_tick = time.monotonic()
+    while not stop.is_set():
+        next_tick += period
+        delay = next_tick - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        elif -delay > period:
+            capture.count_overflow()
+            next_tick = time.monotonic()
+        capture.write(frame)
+        while reader.read(timeout=0) is not None:
+            pass
+        reader.commit()
+
+
+def _run_device(
+    capture: SharedFrameRing,
+    playback: SharedFrameRing,
+    sample_rate: int,
+    channels: int,
+    frames_per_buffer: int,
+    playback_rate: int,
+    stop: Any,
+) -> None:
+    # Only the child process touches PortAudio
+    import pyaudio  # type: ignore
+
+    def on_input(in_data: bytes, frame_count: int, time_info: Dict, status: int):
+        if status & pyaudio.paInputOverflow:
+            capture.count_overflow()
+        capture.write(in_data)
+        return None, pyaudio.paContinue
+
+    audio = pyaudio.PyAudio()
+    input_stream = audio.open(
+        format=pyaudio.paInt16,
+        channels=channels,
+        rate=sample_rate,
+        input=True,
+        frames_per_buffer=frames_per_buffer,
+        stream_callback=on_input,
+    )
+    output_stream = audio.open(format=pyaudio.paInt16, channels=1, rate=playback_rate, output=True)
+    reader = playback.reader()
+    last_write = 0.0
+    try:
+        input_stream.start_stream()
+        while not stop.is_set():
+            frame = reader.read(timeout=0.05)
+            if frame is None:
+                continue
+            # Underflow between replies is expected; only count it mid-reply
+            playing = time.monotonic() - last_write < 0.2
+            try:
+                output_stream.write(frame, exception_on_underflow=True)
+            except IOError:
+                if playing:
+                    playback.count_underflow()
+            last_write = time.monotonic()
+            reader.commit()
+    finally:
+        for stream in (input_stream, output_stream):
+            stream.stop_stream()
+            stream.close()
+        audio.terminate()
+
+
+def _device_main(
+    capture_name: str,
+    playback_name: str,
+    sample_rate: int,
+    channels: int,
+    frames_per_buffer: int,
+    playback_rate: int,
+    source: str,
+    ready: Any,
+    stop: Any,
+) -> None:
+    """Child process entry point."""
+    capture = SharedFrameRing.attach(capture_name)
+    playback = SharedFrameRing.attach(playback_name)
+    try:
+        ready.set()
+        if source == "synthetic":
+            run_synthetic_device(capture, playback, frames_per_buffer / sample_rate, stop)
+        else:
+            _run_device(
+                capture, playback, sample_rate, channels, frames_per_buffer, playback_rate, stop
+            )
+    finally:
+        capture.close()
+        playback.close()
+
+
+class AudioProcess:
+    """
+    Runs the sound card in a child process so audio I/O never waits on this GIL.
+
+    Capture and playback PCM cross the process boundary through two
+    SharedFrameRing blocks, so nothing is pickled or piped. The capture ring
+    overwrites when a reader falls behind (readers count their drops); the
+    playback ring is lossless and `play()` blocks when it is full.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        frames_per_buffer: int = 1024,
+        playback_rate: int = 24000,
+        buffer_seconds: float = 10,
+        source: str = "device",
+    ) -> None:
+        if source not in SOURCES:
+            raise ValueError(f"Unknown audio source {source!r}; expected one of {SOURCES}")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self.playback_rate = playback_rate
+        self.buffer_seconds = buffer_seconds
+        self.source = source
+        self.capture: Optional[SharedFrameRing] = None
+        self.playback: Optional[SharedFrameRing] = None
+        self._process: Any = None
+        self._stop: Any = None
+
+    @property
+    def alive(self) -> bool:
+        return bool(self._process and self._process.is_alive())
+
+    def start(self) -> None:
+        """Allocate the shared rings and spawn the device process."""
+        frame_bytes = self.frames_per_buffer * self.channels * 2  # 16-bit
+        capacity = max(2, int(self.buffer_seconds * self.sample_rate / self.frames_per_buffer))
+        playback_capacity = max(
+            2, int(PLAYBACK_BUFFER_SECONDS * self.playback_rate * 2 / PLAYBACK_FRAME_BYTES)
+        )
+        self.capture = SharedFrameRing.create(frame_bytes, capacity)
+        self.playback = SharedFrameRing.create(PLAYBACK_FRAME_BYTES, playback_capacity)
+
+        ctx = multiprocessing.get_context("spawn")
+        ready = ctx.Event()
+        self._stop = ctx.Event()
+        self._process = ctx.Process(
+            target=_device_main,
+            args=(
+                self.capture.name,
+                self.playback.name,
+                self.sample_rate,
+                self.channels,
+                self.frames_per_buffer,
+                self.playback_rate,
+                self.source,
+                ready,
+                self._stop,
+            ),
+            name="voiceflow-audio",
+            daemon=True,
+        )
+        self._process.start()
+        if not ready.wait(START_TIMEOUT):
+            self.stop()
+            raise RuntimeError("Audio process did not start")
+        logger.info(f"Audio process started (pid {self._process.pid}, source={self.source})")
+
+    def reader(self, from_start: bool = False) -> SharedRingReader:
+        if self.capture is None:
+            raise RuntimeError("Audio process is not running")
+        return self.capture.reader(from_start=from_start)
+
+    def play(self, audio_chunks: Iterable[bytes]) -> bool:
+        """
+        Queue PCM chunks for the device process and wait until they are consumed.
+
+        Returns:
+            True if every chunk was handed to the device
+        """
+        if self.playback is None:
+            raise RuntimeError("Audio process is not running")
+        ring = self.playback
+        carry = b""
+        for chunk in audio_chunks:
+            if not chunk:
+                continue
+            if carry:
+                chunk, carry = carry + chunk, b""
+            view = memoryview(chunk)
+            # Keep frames sample-aligned; an odd trailing byte waits for the next chunk
+            end = len(view) - len(view) % 2
+            if end < len(view):
+                carry = bytes(view[end:])
+            for offset in range(0, end, ring.frame_bytes):
+                while not ring.write(view[offset : min(offset + ring.frame_bytes, end)], True, 0.5):
+                    if not self.alive:
+                        logger.error("Audio process exited during playback")
+                        return False
+
+        while ring.read_seq < ring.write_seq:
+            if not self.alive:
+                logger.error("Audio process exited during playback")
+                return False
+            time.sleep(0.005)
+        return True
+
+    def stop(self) -> None:
+        """Stop the device process and free the shared rings."""
+        for ring in (self.capture, self.playback):
+            if ring is not None:
+                ring.mark_closed()
+        if self._stop is not None:
+            self._stop.set()
+        if self._process is not None:
+            self._process.join(timeout=2)
+            if self._process.is_alive():
+                logger.warning("Audio process did not exit; terminating it")
+                self._process.terminate()
+                self._process.join(timeout=1)
+            self._process = None
+        for ring in (self.capture, self.playback):
+            if ring is not None:
+                ring.close()
+        self.capture = self.playback = None
+
+    def __enter__(self) -> "AudioProcess":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """Return device overflows/underflows counted by the child process."""
+        capture = self.capture.stats() if self.capture else {}
+        playback = self.playback.stats() if self.playback else {}
+        return {
+            "input_overflows": capture.get("overflows", 0),
+            "frames_captured": capture.get("write_seq", 0),
+            "output_underflows": playback.get("underflows", 0),
+            "frames_played": playback.get("read_seq", 0),
+        }
@@ -1,16 +1,44 @@
-import io
+import argparse
+import functools
 import logging
 import sys
-import wave
-from typing import Optional
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
 
-import pyaudio  # type: ignore
 from colorama import Fore, Style, init as colorama_init  # type: ignore
 
-from .config import SAMPLE_RATE, CHANNELS, RECORD_SECONDS, LOG_LEVEL
+from .config import (
+    AUDIO_ENCODING,
+    AUDIO_PROFILE,
+    SAMPLE_RATE,
+    CHANNELS,
+    RECORD_SECONDS,
+    LOG_LEVEL,
+    AUDIO_SINK,
+    AUDIO_SOURCE,
+    FAST_PATH_ENABLED,
+    FILLER_CACHE_DIR,
+    FILLER_ENABLED,
+    FILLER_THRESHOLD_MS,
+    MURF_VOICE_ID,
+    OPENAI_MODEL,
+    SESSION_DB_PATH,
+    SESSION_ID,
+)
 from .asr_deepgram import DeepgramASRClient
 from .tts_murf import MurfTTSClient
 from .agent import VoiceAgent
+from .audio_io import AudioSink, AudioSource, DeviceSink, DeviceSource, create_audio
+from .filler import FillerCache, LatencyMasker
+from .flight_recorder import enable_flight_recorder, flight
+from .intents import FastPath
+from .listener import ListeningSource
+from .llm_openai import LLMClient
+from .profiler import PROFILE_MODES, TurnProfiler
+from .replay import ArchiveSource, ReplayServer, SessionArchive, SessionRecorder
+from .session_store import SQLiteSessionStore
+from .tracing import traced, tracer
 
 logger = logging.getLogger(__name__)
 
@@ -29,92 +57,50 @@ def setup_logging(level: str = LOG_LEVEL) -> None:
     logger.debug(f"Logging configured at level {level}")
 
 
-def record_audio() -> Optional[bytes]:
+@traced("audio.record")
+def record_audio(source: Optional[AudioSource] = None) -> Optional[bytes]:
     """
-    Record audio from default microphone and return WAV bytes.
+    Record one utterance and return WAV bytes.
+
+    The default source is the microphone in PortAudio callback mode, which
+    captures into a ring buffer so frames are not lost while this thread is
+    busy; overflow and drop counts are logged.
+
+    Args:
+        source: Where to take the utterance from (default: the microphone)
     
     Returns:
         WAV bytes or None if recording failed
     """
-    audio = None
-    stream = None
-    
-    try:
-        audio = pyaudio.PyAudio()
-        
-        # List available devices (helpful for debugging)
-        device_count = audio.get_device_count()
-        logger.debug(f"Found {device_count} audio devices")
-        
-        stream = audio.open(
-            format=pyaudio.paInt16,
-            channels=CHANNELS,
-            rate=SAMPLE_RATE,
-            input=True,
-            frames_per_buffer=CHUNK_SIZE,
-        )
-
+    source = source or DeviceSource(SAMPLE_RATE, CHANNELS, RECORD_SECONDS, CHUNK_SIZE)
+    if source.hands_free:
+        print(Fore.YELLOW + "🎤 Listening... start speaking." + Style.RESET_ALL)
+    elif source.interactive:
         print(
             Fore.YELLOW
             + f"🎤 Recording for {RECORD_SECONDS} seconds... Speak now."
             + Style.RESET_ALL
         )
-        
-        frames = []
-        num_chunks = int(SAMPLE_RATE / CHUNK_SIZE * RECORD_SECONDS)
-        
-        for i in range(num_chunks):
-            try:
-                data = stream.read(CHUNK_SIZE, exception_on_overflow=False)
-                frames.append(data)
-            except Exception as e:
-                logger.error(f"Error reading audio chunk {i}: {e}")
-                continue
-
-        print(Fore.YELLOW + "✓ Recording finished." + Style.RESET_ALL)
 
-        if not frames:
-            logger.warning("No audio frames recorded")
-            return None
+    wav_data = source.record()
 
-        # Save to WAV in memory
-        buffer = io.BytesIO()
-        with wave.open(buffer, "wb") as wf:
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(2)  # 16-bit
-            wf.setframerate(SAMPLE_RATE)
-            wf.writeframes(b"".join(frames))
+    if source.interactive:
+        print(Fore.YELLOW + "✓ Recording finished." + Style.RESET_ALL)
+    if not wav_data:
+        logger.warning("No audio frames recorded")
+        return None
+    logger.debug(f"Recorded {len(wav_data)} bytes of audio")
+    return wav_data
 
-        wav_data = buffer.getvalue()
-        logger.debug(f"Recorded {len(wav_data)} bytes of audio")
-        return wav_data
 
-    except OSError as e:
-        logger.error(f"Audio device error: {e}. Check microphone connection.")
-        return None
-    except Exception as e:
-        logger.error(f"Unexpected error during recording: {e}")
-        return None
-    finally:
-        if stream:
-            try:
-                stream.stop_stream()
-                stream.close()
-            except Exception as e:
-                logger.warning(f"Error closing audio stream: {e}")
-        if audio:
-            try:
-                audio.terminate()
-            except Exception as e:
-                logger.warning(f"Error terminating PyAudio: {e}")
-
-
-def play_audio_stream(audio_chunks) -> bool:
+@traced("audio.playback")
+def play_audio_stream(audio_chunks, sink: Optional[AudioSink] = None) -> bool:
     """
     Play PCM16 audio chunks from Murf streaming API.
     
     Args:
         audio_chunks: Iterator of audio chunk bytes
+        sink: Where to send the audio (default: the speaker)
         
     Returns:
         True if playback successful, False otherwise
@@ -123,66 +109,262 @@ def play_audio_stream(audio_chunks) -> bool:
         logger.warning("No audio chunks to play")
         return False
 
-    audio = None
-    stream = None
+    sink = sink or DeviceSink(TTS_SAMPLE_RATE)
+    ok = sink.play(audio_chunks)
+    logger.debug(f"Playback {'complete' if ok else 'failed'}: {sink.stats()}")
+    return ok
 
-    try:
-        audio = pyaudio.PyAudio()
-        stream = audio.open(
-            format=pyaudio.paInt16,
-            channels=1,
-            rate=TTS_SAMPLE_RATE,
-            output=True,
-        )
 
-        bytes_played = 0
-        chunk_count = 0
+@contextmanager
+def _turn_scope(profiler: TurnProfiler, index: int) -> Iterator[None]:
+    """Trace, profile and flight-record one turn."""
+    with tracer.span("turn", turn=index), profiler.turn(index), flight.turn(index):
+        yield
+
 
-        for chunk in audio_chunks:
-            if chunk:
-                try:
-                    stream.write(chunk)
-                    bytes_played += len(chunk)
-                    chunk_count += 1
-                except Exception as e:
-                    logger.error(f"Error playing audio chunk {chunk_count}: {e}")
-                    continue
+def run_turn(
+    asr: DeepgramASRClient,
+    tts: MurfTTSClient,
+    agent: VoiceAgent,
+    masker: Optional[LatencyMasker] = None,
+    fast_path: Optional[FastPath] = None,
+    source: Optional[AudioSource] = None,
+    sink: Optional[AudioSink] = None,
+) -> bool:
+    """
+    Run one record → transcribe → reply → speak turn.
 
-        logger.debug(f"Playback complete: {chunk_count} chunks, {bytes_played} bytes")
-        return True
+    With a masker, a cached filler clip plays if the reply is slow to arrive.
+    With a fast path, local intents are answered without calling the LLM.
+    Audio comes from `source` and goes to `sink` (default: microphone and speaker).
 
-    except OSError as e:
-        logger.error(f"Audio playback device error: {e}")
+    Returns:
+        True if a reply was spoken, False if the turn stopped early
+    """
+    # Record audio
+    print()
+    wav_bytes = record_audio(source)
+    flight.mark("record")
+    if not wav_bytes:
+        print(
+            Fore.RED
+            + "❌ Recording failed. Please check your microphone and try again."
+            + Style.RESET_ALL
+        )
         return False
-    except Exception as e:
-        logger.error(f"Unexpected error during playback: {e}")
+
+    # Transcribe
+    print(Fore.YELLOW + "🔄 Transcribing..." + Style.RESET_ALL)
+    transcript: Optional[str] = asr.transcribe_wav(wav_bytes)
+    flight.mark("asr")
+    flight.note("audio_in_bytes", len(wav_bytes))
+
+    if not transcript:
+        print(
+            Fore.RED
+            + "❌ ASR could not understand audio. Please speak clearly and try again."
+            + Style.RESET_ALL
+        )
         return False
-    finally:
-        if stream:
-            try:
-                stream.stop_stream()
-                stream.close()
-            except Exception as e:
-                logger.warning(f"Error closing playback stream: {e}")
-        if audio:
-            try:
-                audio.terminate()
-            except Exception as e:
-                logger.warning(f"Error terminating PyAudio: {e}")
-
-
-def main() -> None:
+
+    print(Fore.MAGENTA + f"📝 You said: {transcript}" + Style.RESET_ALL)
+
+    if fast_path:
+        intent = fast_path.try_handle(transcript)
+        if intent:
+            print(Fore.CYAN + f"⚡ Handled locally ({intent})" + Style.RESET_ALL)
+            print()
+            return True
+
+    # Generate response
+    print(Fore.YELLOW + "🤖 Generating response..." + Style.RESET_ALL)
+    if masker:
+        reply_text = masker.run(agent.reply, transcript)
+    else:
+        reply_text = agent.reply(transcript)
+    flight.mark("llm")
+
+    if not reply_text:
+        print(
+            Fore.RED
+            + "❌ Failed to generate response. Please try again."
+            + Style.RESET_ALL
+        )
+        return False
+
+    print(Fore.BLUE + f"🗣️  Agent: {reply_text}" + Style.RESET_ALL)
+
+    # Synthesize and play
+    print(Fore.YELLOW + "🔊 Speaking..." + Style.RESET_ALL)
+    audio_chunks = tts.stream_tts(reply_text)
+
+    spoken = False
+    if audio_chunks:
+        if fast_path:
+            fast_path.play(audio_chunks)
+        else:
+            play_audio_stream(audio_chunks, sink)
+        flight.mark("playback")
+        spoken = True
+    else:
+        print(Fore.RED + "❌ TTS failed. Could not generate speech." + Style.RESET_ALL)
+
+    print()
+    return spoken
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse CLI flags."""
+    parser = argparse.ArgumentParser(prog="voiceflow", description="VoiceFlow voice agent CLI")
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        help="record per-turn trace spans and write them to PATH on exit",
+    )
+    parser.add_argument(
+        "--trace-format",
+        choices=("chrome", "otlp"),
+        default="chrome",
+        help="trace file format: Chrome trace events or OTLP/JSON (default: chrome)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="DIR",
+        help="write a CPU profile of every turn into DIR",
+    )
+    parser.add_argument(
+        "--profile-mode",
+        choices=PROFILE_MODES,
+        default="sample",
+        help="'sample' writes folded stacks for flamegraphs, 'cprofile' writes .prof files",
+    )
+    parser.add_argument(
+        "--source",
+        default=AUDIO_SOURCE,
+        help="audio input: device, process, listen[:process] (hands-free, starts a turn when "
+        "speech begins), wav:PATH, pipe[:linear16|mulaw] (raw audio on stdin) or null[:N] "
+        f"(default: {AUDIO_SOURCE})",
+    )
+    parser.add_argument(
+        "--sink",
+        default=AUDIO_SINK,
+        help="audio output: device, process, wav:PATH, pipe[:linear16|mulaw] (raw audio on "
+        f"stdout) or null (default: {AUDIO_SINK})",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="record every turn's input and provider responses into an archive at PATH",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="run the turns of a recorded archive, serving providers from the recording",
+    )
+    parser.add_argument(
+        "--replay-speed",
+        type=float,
+        default=1.0,
+        help="pace replayed provider responses this many times faster (0: no waiting)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
     """Main CLI loop for VoiceFlow agent."""
+    args = parse_args(argv)
+    if args.sink.split(":")[0] == "pipe":
+        # stdout carries the audio; messages and logs go to stderr
+        sys.stdout = sys.stderr
     setup_logging()
+    tracer.enabled = bool(args.trace)
+    enable_flight_recorder()
+    profiler = TurnProfiler(args.profile, mode=args.profile_mode)
+    masker: Optional[LatencyMasker] = None
+    fast_path: Optional[FastPath] = None
+    source: Optional[AudioSource] = None
+    sink: Optional[AudioSink] = None
+    asr: Optional[DeepgramASRClient] = None
+    tts: Optional[MurfTTSClient] = None
+    agent: Optional[VoiceAgent] = None
+    recorder: Optional[SessionRecorder] = None
+    replay: Optional[ReplayServer] = None
+    listener: Optional[ListeningSource] = None
     
     try:
         colorama_init(autoreset=True)
         
         # Initialize clients
         logger.info("Initializing VoiceFlow components...")
-        asr = DeepgramASRClient()
-        tts = MurfTTSClient()
-        agent = VoiceAgent()
+        if args.replay:
+            # Providers are served from the recording; history starts empty as it did then
+            archive = SessionArchive.load(args.replay)
+            replay = ReplayServer(archive, speed=args.replay_speed).start()
+            urls = replay.urls()
+            asr = DeepgramASRClient(base_url=urls["deepgram"])
+            tts = MurfTTSClient(base_url=urls["murf"])
+            llm = LLMClient(state_mode=archive.settings.get("state_mode"), base_url=urls["openai"])
+            agent = VoiceAgent(session_id=SESSION_ID, llm=llm)
+            logger.info(f"Replaying {args.replay}: {archive.summary()}")
+        else:
+            asr = DeepgramASRClient()
+            tts = MurfTTSClient()
+            store = SQLiteSessionStore(SESSION_DB_PATH) if SESSION_DB_PATH else None
+            agent = VoiceAgent(store=store, session_id=SESSION_ID)
+        if args.record:
+            recorder = SessionRecorder(
+                args.record,
+                {
+                    "sample_rate": SAMPLE_RATE,
+                    "audio_profile": AUDIO_PROFILE,
+                    "voice": MURF_VOICE_ID,
+                    "model": OPENAI_MODEL,
+                },
+            )
+            recorder.attach(asr, agent.llm, tts)
+        # Telephony asks Murf for SAMPLE_RATE audio and plays it at that rate
+        playback_rate = SAMPLE_RATE if AUDIO_PROFILE == "telephony" else TTS_SAMPLE_RATE
+        source, sink = create_audio(
+            "null:0" if replay else args.source,
+            args.sink,
+            SAMPLE_RATE,
+            CHANNELS,
+            RECORD_SECONDS,
+            playback_rate,
+            AUDIO_ENCODING,
+        )
+        if replay:
+            source = ArchiveSource(replay.archive)
+        if isinstance(source, ListeningSource):
+            listener = source
+        if recorder:
+            source = recorder.wrap_source(source)
+        play = functools.partial(play_audio_stream, sink=sink)
+        if FILLER_ENABLED:
+            voice_key = f"{MURF_VOICE_ID}:{SAMPLE_RATE}"
+            fillers = FillerCache(tts, FILLER_CACHE_DIR, voice_key=voice_key)
+            if fillers.warm():
+                masker = LatencyMasker(fillers, play, FILLER_THRESHOLD_MS / 1000)
+        if FAST_PATH_ENABLED:
+            fast_path = FastPath(agent, tts, play)
+
+        conversation_count = 0
+        turn_index = 0
+
+        if not source.interactive:
+            # Files, pipes and null sources run back to back, as fast as the pipeline allows
+            start = time.perf_counter()
+            while not source.exhausted:
+                turn_index += 1
+                with _turn_scope(profiler, turn_index):
+                    if run_turn(asr, tts, agent, masker, fast_path, source, sink):
+                        conversation_count += 1
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"Processed {turn_index} utterances ({conversation_count} replies) "
+                f"in {elapsed:.2f}s"
+            )
+            return
 
         print(
             Fore.CYAN
@@ -193,12 +375,21 @@ def main() -> None:
             + Style.RESET_ALL
         )
         print(Fore.YELLOW + "Commands:" + Style.RESET_ALL)
+        if source.hands_free:
+            # The listener starts each turn when speech begins; replies play before it listens again
+            print(f"  {Fore.GREEN}Just speak{Style.RESET_ALL} – each pause ends your query")
+            print(f"  {Fore.GREEN}Ctrl+C{Style.RESET_ALL} to quit\n")
+            while not source.exhausted:
+                turn_index += 1
+                with _turn_scope(profiler, turn_index):
+                    if run_turn(asr, tts, agent, masker, fast_path, source, sink):
+                        conversation_count += 1
+            return
+
         print(f"  {Fore.GREEN}[Enter]{Style.RESET_ALL} to start recording your query")
         print(f"  {Fore.GREEN}'r'{Style.RESET_ALL} to reset conversation")
         print(f"  {Fore.GREEN}'q'{Style.RESET_ALL} to quit\n")
 
-        conversation_count = 0
-        
         while True:
             user_input = input(
                 Fore.GREEN + "[Enter] to record, 'r' to reset, 'q' to quit: " + Style.RESET_ALL
@@ -216,56 +407,10 @@ def main() -> None:
             if user_input != "":
                 continue
 
-            # Record audio
-            print()
-            wav_bytes = record_audio()
-            if not wav_bytes:
-                print(
-                    Fore.RED
-                    + "❌ Recording failed. Please check your microphone and try again."
-                    + Style.RESET_ALL
-                )
-                continue
-
-            # Transcribe
-            print(Fore.YELLOW + "🔄 Transcribing..." + Style.RESET_ALL)
-            transcript: Optional[str] = asr.transcribe_wav(wav_bytes)
-
-            if not transcript:
-                print(
-                    Fore.RED
-                    + "❌ ASR could not understand audio. Please speak clearly and try again."
-                    + Style.RESET_ALL
-                )
-                continue
-
-            print(Fore.MAGENTA + f"📝 You said: {transcript}" + Style.RESET_ALL)
-
-            # Generate response
-            print(Fore.YELLOW + "🤖 Generating response..." + Style.RESET_ALL)
-            reply_text = agent.reply(transcript)
-            
-            if not reply_text:
-                print(
-                    Fore.RED
-                    + "❌ Failed to generate response. Please try again."
-                    + Style.RESET_ALL
-                )
-                continue
-
-            print(Fore.BLUE + f"🗣️  Agent: {reply_text}" + Style.RESET_ALL)
-
-            # Synthesize and play
-            print(Fore.YELLOW + "🔊 Speaking..." + Style.RESET_ALL)
-            audio_chunks = tts.stream_tts(reply_text)
-            
-            if audio_chunks:
-                play_audio_stream(audio_chunks)
-                conversation_count += 1
-            else:
-                print(Fore.RED + "❌ TTS failed. Could not generate speech." + Style.RESET_ALL)
-            
-            print()
+            turn_index += 1
+            with _turn_scope(profiler, turn_index):
+                if run_turn(asr, tts, agent, masker, fast_path, source, sink):
+                    conversation_count += 1
 
     except KeyboardInterrupt:
         print(Fore.YELLOW + "\n⚠️  Interrupted by user." + Style.RESET_ALL)
@@ -278,6 +423,40 @@ def main() -> None:
             + Style.RESET_ALL
         )
         sys.exit(1)
+    finally:
+        if asr:
+            logger.info(f"Deepgram admission: {asr.admission.stats()}")
+        if agent:
+            logger.info(f"LLM usage ({agent.llm.state_mode}): {agent.llm.usage_stats()}")
+            logger.info(f"OpenAI admission: {agent.llm.admission.stats()}")
+            if agent.llm.router:
+                logger.info(f"LLM routing: {agent.llm.routing_stats()}")
+        if asr and asr.gate:
+            logger.info(f"Speech gate stats: {asr.gate.stats()}")
+            asr.gate.close()
+        if sink:
+            logger.info(f"Audio sink stats: {sink.stats()}")
+            sink.close()
+        if listener:
+            logger.info(f"Listener stats: {listener.stats()}")
+        if source:
+            source.close()
+        if masker:
+            logger.info(f"Filler stats: {masker.stats()}")
+        if fast_path:
+            logger.info(f"Fast path stats: {fast_path.stats()}")
+        if args.trace:
+            tracer.write(args.trace, fmt=args.trace_format)
+        if flight.enabled:
+            flight.flush()
+            logger.info(f"Flight recorder stats: {flight.stats()}")
+        if recorder:
+            recorder.close()
+        if replay:
+            logger.info(f"Replay stats: {replay.stats()}")
+            replay.stop()
+        if tts:
+            tts.close()
 
 
 if __name__ == "__main__":
@@ -34,6 +34,18 @@ def _validate_positive_int(key: str, default: int) -> int:
         return default
 
 
+def _validate_non_negative_int(key: str, default: int) -> int:
+    """Validate environment variable is a non-negative integer (0 usually means "auto" or "off")."""
+    try:
+        value = int(os.getenv(key, default))
+        if value < 0:
+            raise ValueError(f"{key} must not be negative")
+        return value
+    except ValueError as e:
+        logger.warning(f"Invalid {key} value: {e}. Using default {default}")
+        return default
+
+
 # API Keys (required)
 MURF_API_KEY = _validate_env_var("MURF_API_KEY", required=True)
 DEEPGRAM_API_KEY = _validate_env_var("DEEPGRAM_API_KEY", required=True)
@@ -42,22 +54,65 @@ OPENAI_API_KEY = _validate_env_var("OPENAI_API_KEY", required=True)
 # Murf Falcon TTS Configuration
 MURF_REGION = _validate_env_var("MURF_REGION", required=False, default="GLOBAL")
 MURF_VOICE_ID = _validate_env_var("MURF_VOICE_ID", required=False, default="Matthew")
-VALID_REGIONS = {"GLOBAL", "IN", "US", "EU", "AP"}
+VALID_REGIONS = {"GLOBAL", "IN", "US", "EU", "AP", "AUTO"}
 if MURF_REGION not in VALID_REGIONS:
     logger.warning(
         f"Invalid MURF_REGION: {MURF_REGION}. Using GLOBAL. Valid: {VALID_REGIONS}"
     )
     MURF_REGION = "GLOBAL"
 
+# AUTO region mode: candidate MurfRegion names and probe cadence (seconds)
+MURF_AUTO_REGIONS = [
+    r.strip().upper()
+    for r in os.getenv("MURF_AUTO_REGIONS", "GLOBAL,US_EAST,EU_CENTRAL,IN").split(",")
+    if r.strip()
+]
+MURF_PROBE_INTERVAL = _validate_positive_int("MURF_PROBE_INTERVAL", 300)
+# Concurrent synthesis requests for long replies split into segments
+TTS_MAX_INFLIGHT = _validate_positive_int("TTS_MAX_INFLIGHT", 3)
+# Keep one Murf streaming WebSocket open and push each utterance over it as a context
+MURF_TTS_SESSION = os.getenv("MURF_TTS_SESSION", "false").lower() in {"1", "true", "yes"}
+
 # OpenAI Configuration
 OPENAI_MODEL = _validate_env_var("OPENAI_MODEL", required=False, default="gpt-4o-mini")
 OPENAI_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
 if not 0 <= OPENAI_TEMPERATURE <= 2:
     logger.warning(f"Invalid temperature {OPENAI_TEMPERATURE}. Using 0.7")
     OPENAI_TEMPERATURE = 0.7
+# Optional OpenAI-compatible endpoint (local stand-ins, proxies)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+# How conversation history reaches the model: "full" resends it every turn, "prefix"
+# keeps the prompt prefix byte-stable for provider prompt caching, "stateful" chains
+# Responses API calls with previous_response_id and falls back to full resend
+LLM_STATE_MODE = os.getenv("LLM_STATE_MODE", "full").lower()
+VALID_STATE_MODES = {"full", "prefix", "stateful"}
+if LLM_STATE_MODE not in VALID_STATE_MODES:
+    logger.warning(
+        f"Invalid LLM_STATE_MODE: {LLM_STATE_MODE}. Using full. Valid: {VALID_STATE_MODES}"
+    )
+    LLM_STATE_MODE = "full"
+# Model routing: simple turns (small talk, short plain questions) go to a faster model with a
+# lower token cap; other turns use OPENAI_MODEL
+LLM_ROUTING = os.getenv("LLM_ROUTING", "false").lower() in {"1", "true", "yes"}
+LLM_FAST_MODEL = os.getenv("LLM_FAST_MODEL", "gpt-4.1-nano")
+LLM_FAST_MAX_TOKENS = _validate_positive_int("LLM_FAST_MAX_TOKENS", 128)
+
+# Audio profile: "wideband" (16-bit PCM at SAMPLE_RATE) or "telephony" (8 kHz, μ-law on pipes,
+# 8 kHz synthesis requested from Murf)
+AUDIO_PROFILE = os.getenv("AUDIO_PROFILE", "wideband").lower()
+VALID_AUDIO_PROFILES = {"wideband", "telephony"}
+if AUDIO_PROFILE not in VALID_AUDIO_PROFILES:
+    logger.warning(
+        f"Invalid AUDIO_PROFILE: {AUDIO_PROFILE}. Using wideband. Valid: {VALID_AUDIO_PROFILES}"
+    )
+    AUDIO_PROFILE = "wideband"
+TELEPHONY_SAMPLE_RATE = 8000
+AUDIO_ENCODING = "mulaw" if AUDIO_PROFILE == "telephony" else "linear16"
 
 # Audio settings
 SAMPLE_RATE = _validate_positive_int("SAMPLE_RATE", 16000)
+if AUDIO_PROFILE == "telephony":
+    SAMPLE_RATE = TELEPHONY_SAMPLE_RATE
 CHANNELS = 1
 RECORD_SECONDS = _validate_positive_int("RECORD_SECONDS", 5)
 MAX_RECORD_SECONDS = 60  # safety limit
@@ -67,11 +122,71 @@ if RECORD_SECONDS > MAX_RECORD_SECONDS:
     )
     RECORD_SECONDS = MAX_RECORD_SECONDS
 
+# Run microphone capture and speaker playback in a separate process (shared-memory rings)
+AUDIO_PROCESS_ENABLED = os.getenv("AUDIO_PROCESS_ENABLED", "false").lower() in {"1", "true", "yes"}
+# Audio endpoints: device, process, wav:PATH, pipe or null[:N] (see app/audio_io.py)
+AUDIO_SOURCE = os.getenv("AUDIO_SOURCE", "process" if AUDIO_PROCESS_ENABLED else "device")
+AUDIO_SINK = os.getenv("AUDIO_SINK", "process" if AUDIO_PROCESS_ENABLED else "device")
+
+# Hands-free listening (--source listen): pre-roll kept before speech onset, speech needed
+# to start a turn, silence that ends it, longest turn, and idle CPU budget (% of one core)
+LISTEN_PREROLL_MS = _validate_positive_int("LISTEN_PREROLL_MS", 300)
+LISTEN_ONSET_MS = _validate_positive_int("LISTEN_ONSET_MS", 60)
+LISTEN_HANGOVER_MS = _validate_positive_int("LISTEN_HANGOVER_MS", 700)
+LISTEN_MAX_SECONDS = _validate_positive_int("LISTEN_MAX_SECONDS", 15)
+LISTEN_IDLE_CPU_BUDGET = _validate_positive_int("LISTEN_IDLE_CPU_BUDGET", 2)
+
+# Pre-ASR silence trimming; recordings with no speech never reach Deepgram
+ASR_TRIM_SILENCE = os.getenv("ASR_TRIM_SILENCE", "true").lower() in {"1", "true", "yes"}
+ASR_SPEECH_THRESHOLD = float(os.getenv("ASR_SPEECH_THRESHOLD", "0.01"))
+ASR_TRIM_PAD_MS = _validate_positive_int("ASR_TRIM_PAD_MS", 200)
+ASR_MIN_SPEECH_MS = _validate_positive_int("ASR_MIN_SPEECH_MS", 100)
+
+# Process-pool offload for CPU-bound audio work (0 runs it inline on the caller)
+DSP_WORKERS = _validate_non_negative_int("DSP_WORKERS", 0)
+DSP_INLINE_BELOW_BYTES = _validate_positive_int("DSP_INLINE_BELOW_BYTES", 16384)
+
+# Prefork server (python -m app.server); 0 workers means one per CPU
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = _validate_positive_int("SERVER_PORT", 8080)
+SERVER_WORKERS = _validate_non_negative_int("SERVER_WORKERS", 0)
+
 # Request/Retry Configuration
 REQUEST_TIMEOUT = _validate_positive_int("REQUEST_TIMEOUT", 60)
 MAX_RETRIES = _validate_positive_int("MAX_RETRIES", 3)
 RETRY_DELAY = _validate_positive_int("RETRY_DELAY", 1)
 
+# Client-side admission control (per-minute budgets, max queued requests per provider)
+OPENAI_RPM_LIMIT = _validate_positive_int("OPENAI_RPM_LIMIT", 500)
+OPENAI_TPM_LIMIT = _validate_positive_int("OPENAI_TPM_LIMIT", 200000)
+DEEPGRAM_RPM_LIMIT = _validate_positive_int("DEEPGRAM_RPM_LIMIT", 600)
+ADMISSION_MAX_QUEUE = _validate_positive_int("ADMISSION_MAX_QUEUE", 64)
+
+# Share one upstream call between concurrent identical TTS/LLM requests (opt-in)
+COALESCE_REQUESTS = os.getenv("COALESCE_REQUESTS", "false").lower() in {"1", "true", "yes"}
+
+# Latency masking: play a cached "Let me think…" when the LLM is slower than the threshold
+FILLER_ENABLED = os.getenv("FILLER_ENABLED", "false").lower() in {"1", "true", "yes"}
+FILLER_THRESHOLD_MS = _validate_positive_int("FILLER_THRESHOLD_MS", 800)
+FILLER_CACHE_DIR = os.getenv("FILLER_CACHE_DIR", os.path.join(".voiceflow_cache", "fillers"))
+
+# Local fast path for commands like "repeat that", "start over", "what time is it"
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() in {"1", "true", "yes"}
+
+# Slow-turn flight recorder: keep detailed records of recent turns in memory and write
+# the neighborhood of any turn slower than the threshold to FLIGHT_RECORDER_DIR
+FLIGHT_RECORDER_ENABLED = (
+    os.getenv("FLIGHT_RECORDER_ENABLED", "false").lower() in {"1", "true", "yes"}
+)
+FLIGHT_RECORDER_THRESHOLD_MS = _validate_positive_int("FLIGHT_RECORDER_THRESHOLD_MS", 3000)
+FLIGHT_RECORDER_TURNS = _validate_positive_int("FLIGHT_RECORDER_TURNS", 64)
+FLIGHT_RECORDER_NEIGHBORS = _validate_positive_int("FLIGHT_RECORDER_NEIGHBORS", 2)
+FLIGHT_RECORDER_DIR = os.getenv("FLIGHT_RECORDER_DIR", os.path.join(".voiceflow_cache", "flight"))
+
+# Session persistence (empty path keeps conversations in memory only)
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "")
+SESSION_ID = os.getenv("SESSION_ID", "cli")
+
 # Logging Configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 if LOG_LEVEL not in {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}:
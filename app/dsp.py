@@ -0,0 +1,179 @@
+"""Pluggable executor for CPU-bound audio work (WAV assembly, resampling, trimming, metering)."""
+
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .utils import g711, pcm
+
+logger = logging.getLogger(__name__)
+
+# Jobs on less PCM than this run inline: a pool round trip costs more than the work
+INLINE_BELOW_BYTES = 16384
+
+# name -> (function(data, **params), output size bound or None when the result is small)
+JOBS: Dict[str, Tuple[Callable[..., Any], Optional[Callable[..., int]]]] = {
+    # μ-law WAVs carry a longer fmt chunk and a fact chunk: 58 header bytes, not 44
+    "wav": (pcm.to_wav, lambda n, **p: n + 64),
+    "resample": (
+        pcm.resample,
+        lambda n, src_rate, dst_rate: (n // pcm.SAMPLE_WIDTH * dst_rate // src_rate + 1)
+        * pcm.SAMPLE_WIDTH,
+    ),
+    "trim": (pcm.trim_silence, lambda n, **p: n),
+    "peak": (pcm.peak, None),
+    "rms": (pcm.rms, None),
+    "levels": (pcm.frame_rms, None),
+    "ulaw_encode": (g711.ulaw_encode, lambda n, **p: n // 2),
+    "ulaw_decode": (g711.ulaw_decode, lambda n, **p: 2 * n),
+}
+
+
+def _run_job(job: str, data: Any, params: Dict[str, Any]) -> Any:
+    try:
+        fn, _ = JOBS[job]
+    except KeyError:
+        raise ValueError(f"Unknown DSP job {job!r}") from None
+    return fn(data, **params)
+
+
+def _pool_job(
+    job: str, in_name: str, length: int, out_name: Optional[str], params: Dict[str, Any]
+) -> Any:
+    """Worker side: read input from shared memory, write large results back to it."""
+    src = shared_memory.SharedMemory(name=in_name)
+    error = None
+    try:
+        result = _run_job(job, src.buf[:length], params)
+    except Exception as e:
+        # The traceback pins views of the block, which would stop it closing
+        error = e.with_traceback(None)
+    src.close()
+    if error is not None:
+        raise error
+    if out_name is None:
+        return result
+    dst = shared_memory.SharedMemory(name=out_name)
+    try:
+        dst.buf[: len(result)] = result
+    finally:
+        dst.close()
+    return len(result)
+
+
+class DSPExecutor:
+    """Runs DSP jobs inline on the calling thread; the default when no pool is configured."""
+
+    def run(self, job: str, data: bytes, **params: Any) -> Any:
+        """
+        Run a registered job on PCM data.
+
+        Args:
+            job: Name from JOBS ("wav", "resample", "trim", "peak", "rms", "levels",
+                "ulaw_encode", "ulaw_decode")
+            data: 16-bit PCM bytes
+            **params: Job arguments, e.g. sample_rate for "wav"
+
+        Returns:
+            The job's result (bytes for transforms, numbers for meters)
+        """
+        return _run_job(job, data, params)
+
+    async def run_async(self, job: str, data: bytes, **params: Any) -> Any:
+        """Awaitable form of run()."""
+        return self.run(job, data, **params)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "DSPExecutor":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class ProcessPoolDSPExecutor(DSPExecutor):
+    """
+    Sends DSP jobs to a process pool so they neither hold this GIL nor block an event loop.
+
+    PCM travels through shared-memory blocks rather than the pool's pickled
+    call arguments: the input is copied once into a block the worker maps,
+    and transforms write their output into a second block sized up front.
+    Only the job name, block names and small results cross the pipe. Jobs
+    smaller than `inline_below` bytes run inline.
+    """
+
+    def __init__(self, workers: Optional[int] = None, inline_below: int = INLINE_BELOW_BYTES):
+        self.inline_below = inline_below
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self.inline_jobs = 0
+        self.offloaded_jobs = 0
+
+    def submit(self, job: str, data: bytes, **params: Any) -> "Future[Any]":
+        """Start a job in the pool and return a future for its result."""
+        if job not in JOBS:
+            raise ValueError(f"Unknown DSP job {job!r}")
+        bound = JOBS[job][1]
+        length = len(data)
+        out_size = bound(length, **params) if bound is not None else None
+        src = shared_memory.SharedMemory(create=True, size=max(1, length))
+        src.buf[:length] = data
+        dst = None
+        if out_size is not None:
+            dst = shared_memory.SharedMemory(create=True, size=max(1, out_size))
+        self.offloaded_jobs += 1
+
+        future: "Future[Any]" = Future()
+        inner = self._pool.submit(
+            _pool_job, job, src.name, length, dst.name if dst else None, params
+        )
+
+        def finish(done: "Future[Any]") -> None:
+            try:
+                result = done.result()
+                if dst is not None:
+                    result = bytes(dst.buf[:result])
+                future.set_result(result)
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                for block in (src, dst):
+                    if block is not None:
+                        block.close()
+                        block.unlink()
+
+        inner.add_done_callback(finish)
+        return future
+
+    def run(self, job: str, data: bytes, **params: Any) -> Any:
+        if len(data) < self.inline_below:
+            self.inline_jobs += 1
+            return _run_job(job, data, params)
+        return self.submit(job, data, **params).result()
+
+    async def run_async(self, job: str, data: bytes, **params: Any) -> Any:
+        if len(data) < self.inline_below:
+            self.inline_jobs += 1
+            return _run_job(job, data, params)
+        return await asyncio.wrap_future(self.submit(job, data, **params))
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Return how many jobs ran inline versus in the pool."""
+        return {"inline_jobs": self.inline_jobs, "offloaded_jobs": self.offloaded_jobs}
+
+
+def create_executor(workers: int = 0, inline_below: int = INLINE_BELOW_BYTES) -> DSPExecutor:
+    """Return a pool executor with `workers` processes, or the inline executor for 0."""
+    if workers <= 0:
+        return DSPExecutor()
+    logger.info(f"DSP offload enabled with {workers} worker processes")
+    return ProcessPoolDSPExecutor(workers, inline_below)
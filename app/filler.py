@@ -0,0 +1,159 @@
+"""Latency masking: play a cached acknowledgement when the LLM is slow to answer."""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_PHRASES = ("Let me think…", "One moment.", "Hmm, let me see.")
+
+
+class FillerCache:
+    """
+    Pre-rendered filler clips stored as raw PCM files.
+
+    Clips are synthesized once with the regular TTS client and kept on disk,
+    so playing a filler during a turn costs no network round trip.
+    """
+
+    def __init__(
+        self,
+        tts: Any,
+        cache_dir: str,
+        phrases: Sequence[str] = DEFAULT_PHRASES,
+        voice_key: str = "",
+    ) -> None:
+        """
+        Args:
+            tts: Client with stream_tts(text) -> chunk iterator
+            cache_dir: Directory holding <hash>.pcm clips
+            phrases: Filler phrases to keep rendered
+            voice_key: Voice/format identifier mixed into file names
+        """
+        self.tts = tts
+        self.cache_dir = cache_dir
+        self.phrases = list(phrases)
+        self.voice_key = voice_key
+        self.clips: List[bytes] = []
+        self._next = 0
+
+    def _path(self, phrase: str) -> str:
+        digest = hashlib.sha1(f"{self.voice_key}|{phrase}".encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{digest}.pcm")
+
+    def warm(self) -> int:
+        """
+        Load every clip, synthesizing and saving any that are missing.
+
+        Returns:
+            Number of clips available
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.clips = []
+        for phrase in self.phrases:
+            path = self._path(phrase)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    pcm = f.read()
+            else:
+                chunks = self.tts.stream_tts(phrase)
+                if not chunks:
+                    logger.warning(f"Could not render filler clip {phrase!r}")
+                    continue
+                pcm = b"".join(chunks)
+                tmp = path + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(pcm)
+                os.replace(tmp, path)
+                logger.debug(f"Rendered filler clip {phrase!r} ({len(pcm)} bytes)")
+            if pcm:
+                self.clips.append(pcm)
+        logger.info(f"Filler cache ready with {len(self.clips)} clips")
+        return len(self.clips)
+
+    def next_clip(self) -> Optional[bytes]:
+        """Return the next clip in rotation, or None if the cache is empty."""
+        if not self.clips:
+            return None
+        clip = self.clips[self._next % len(self.clips)]
+        self._next += 1
+        return clip
+
+
+class LatencyMasker:
+    """
+    Runs a slow call and plays a filler clip if it has not finished in time.
+
+    The filler plays on a background thread; once the call returns, the
+    masker waits for the filler to finish so the real reply never overlaps it.
+    """
+
+    def __init__(
+        self,
+        cache: FillerCache,
+        play_fn: Callable[[Iterable[bytes]], Any],
+        threshold: float,
+    ) -> None:
+        self.cache = cache
+        self.play_fn = play_fn
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.fillers_played = 0
+        self._saved: List[float] = []
+
+    def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call fn(*args, **kwargs), masking its latency past the threshold."""
+        start = time.perf_counter()
+        filler_started: List[float] = []
+
+        def play_filler() -> None:
+            clip = self.cache.next_clip()
+            if clip is None:
+                return
+            filler_started.append(time.perf_counter())
+            try:
+                self.play_fn([clip])
+            except Exception as e:
+                logger.warning(f"Filler playback failed: {e}")
+
+        timer = threading.Timer(self.threshold, play_filler)
+        timer.daemon = True
+        timer.start()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            done = time.perf_counter()
+            timer.cancel()
+            if timer.is_alive():
+                # The filler is already playing: let it finish before the reply
+                timer.join()
+            with self._lock:
+                self.turns += 1
+                if filler_started:
+                    self.fillers_played += 1
+                    self._saved.append(done - filler_started[0])
+                    logger.debug(f"Filler masked {(done - filler_started[0]) * 1000:.0f} ms")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return filler rate and perceived-latency improvement.
+
+        `avg_masked_ms` is, over turns that played a filler, how much earlier
+        the user heard audio than they would have waiting for the reply.
+        """
+        with self._lock:
+            saved = list(self._saved)
+            turns, played = self.turns, self.fillers_played
+        return {
+            "turns": turns,
+            "fillers_played": played,
+            "filler_rate": played / turns if turns else 0.0,
+            "avg_masked_ms": sum(saved) / len(saved) * 1000 if saved else 0.0,
+        }
@@ -0,0 +1,288 @@
+"""
+Slow-turn flight recorder: detailed per-turn records kept in memory, written to disk for slow turns.
+
+While a turn runs, the pipeline notes stage timings, payload sizes, LLM
+attempts, Deepgram's HTTP status, Murf chunk arrival times and admission
+queue depths into the turn's record. Records of recent turns stay in a
+bounded ring. When a turn takes longer than the threshold, its record and
+its neighbors' (`neighbors` turns either side) are written as one JSON
+file, so a tail-latency turn can be examined after the fact with debug
+logging off. Noting a value is a thread-local lookup and a dict store; a
+turn that stays under the threshold never touches the disk.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Events kept per turn; further events are only counted
+MAX_EVENTS = 256
+
+
+class TurnRecord:
+    """Everything noted during one turn; stage and event times are ms from its start."""
+
+    __slots__ = (
+        "turn",
+        "attrs",
+        "start",
+        "started_at",
+        "total_ms",
+        "stages",
+        "values",
+        "counts",
+        "events",
+        "dropped_events",
+    )
+
+    def __init__(self, turn: int, attrs: Dict[str, Any]) -> None:
+        self.turn = turn
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.started_at = time.time()
+        self.total_ms = 0.0
+        self.stages: Dict[str, float] = {}
+        self.values: Dict[str, Any] = {}
+        self.counts: Dict[str, int] = {}
+        self.events: List[Any] = []
+        self.dropped_events = 0
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.start) * 1000, 1)
+
+    def add_event(self, name: str, fields: Dict[str, Any]) -> None:
+        if len(self.events) < MAX_EVENTS:
+            self.events.append((self.elapsed_ms(), name, fields))
+        else:
+            self.dropped_events += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "turn": self.turn,
+            **self.attrs,
+            "started_at": self.started_at,
+            "total_ms": self.total_ms,
+            "stages_ms": self.stages,
+            "values": self.values,
+            "counts": self.counts,
+            "events": [{"ms": ms, "name": name, **fields} for ms, name, fields in self.events],
+            "dropped_events": self.dropped_events,
+        }
+
+
+class FlightRecorder:
+    """
+    Keeps the last `capacity` turn records and dumps the neighborhood of slow turns.
+
+    Disabled until configured; while disabled, `turn()` records nothing and
+    every note is a no-op. A slow turn's dump is written once its
+    `neighbors` following turns have finished (or on flush()).
+
+    Args:
+        threshold_ms: Turns longer than this are dumped
+        capacity: Turn records kept in memory
+        neighbors: Turns either side of a slow one included in its dump
+        dump_dir: Directory dumps are written to
+        enabled: Record turns
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 3000,
+        capacity: int = 64,
+        neighbors: int = 2,
+        dump_dir: str = "flight",
+        enabled: bool = False,
+    ) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.configure(threshold_ms, capacity, neighbors, dump_dir, enabled)
+
+    def configure(
+        self,
+        threshold_ms: float,
+        capacity: int = 64,
+        neighbors: int = 2,
+        dump_dir: str = "flight",
+        enabled: bool = True,
+    ) -> None:
+        """Set the threshold and ring size, dropping records kept so far."""
+        self.threshold_ms = threshold_ms
+        self.neighbors = neighbors
+        self.dump_dir = dump_dir
+        self.enabled = enabled
+        # The ring must hold a slow turn and both sides of its neighborhood
+        self.turns: Deque[TurnRecord] = deque(maxlen=max(capacity, 2 * neighbors + 1))
+        self._pending: List[List[Any]] = []
+        self.recorded = 0
+        self.slow_turns = 0
+        self.dumps = 0
+        self.last_dump: Optional[str] = None
+
+    def current(self) -> Optional[TurnRecord]:
+        """The record of the turn running on this thread, if any."""
+        return getattr(self._local, "record", None)
+
+    @contextmanager
+    def turn(self, index: int, **attrs: Any) -> Iterator[Optional[TurnRecord]]:
+        """Record the enclosed block as turn `index`; a no-op when disabled."""
+        if not self.enabled:
+            yield None
+            return
+
+        record = TurnRecord(index, attrs)
+        outer = self.current()
+        self._local.record = record
+        try:
+            yield record
+        except BaseException as e:
+            record.values["error"] = type(e).__name__
+            raise
+        finally:
+            self._local.record = outer
+            record.total_ms = record.elapsed_ms()
+            self._finish(record)
+
+    def mark(self, stage: str) -> None:
+        """Note that `stage` ended now."""
+        record = self.current()
+        if record is not None:
+            record.stages[stage] = record.elapsed_ms()
+
+    def note(self, key: str, value: Any) -> None:
+        """Set a value on the current turn's record (payload size, status, queue depth...)."""
+        record = self.current()
+        if record is not None:
+            record.values[key] = value
+
+    def count(self, key: str, n: int = 1) -> None:
+        """Add `n` to a counter on the current turn's record."""
+        record = self.current()
+        if record is not None:
+            record.counts[key] = record.counts.get(key, 0) + n
+
+    def event(self, name: str, **fields: Any) -> None:
+        """Append a timestamped event to the current turn's record."""
+        record = self.current()
+        if record is not None:
+            record.add_event(name, fields)
+
+    def watch(self, chunks: Optional[Iterable[T]], name: str) -> Optional[Iterable[T]]:
+        """
+        Note when each chunk of a stream arrives, and its size.
+
+        Returns `chunks` itself when no turn is being recorded.
+        """
+        record = self.current()
+        if record is None or chunks is None:
+            return chunks
+        return self._watch(record, chunks, name)
+
+    @staticmethod
+    def _watch(record: TurnRecord, chunks: Iterable[T], name: str) -> Iterator[T]:
+        # The stream may be read after the call that opened it returns; note into its turn
+        count = size = 0
+        try:
+            for chunk in chunks:
+                count += 1
+                size += len(chunk)  # type: ignore[arg-type]
+                if count == 1:
+                    record.stages[f"{name}_first_chunk"] = record.elapsed_ms()
+                record.add_event(f"{name}.chunk", {"bytes": len(chunk)})  # type: ignore[arg-type]
+                yield chunk
+        finally:
+            record.values[f"{name}.chunks"] = count
+            record.values[f"{name}.bytes"] = size
+
+    def _finish(self, record: TurnRecord) -> None:
+        ready = []
+        with self._lock:
+            self.turns.append(record)
+            self.recorded += 1
+            for pending in self._pending:
+                pending[1] -= 1
+            if record.total_ms > self.threshold_ms:
+                self.slow_turns += 1
+                self._pending.append([record, self.neighbors])
+            ready = [self._window(p[0]) for p in self._pending if p[1] <= 0]
+            self._pending = [p for p in self._pending if p[1] > 0]
+        for slow, window in ready:
+            self._dump(slow, window)
+
+    def _window(self, slow: TurnRecord) -> Any:
+        turns = list(self.turns)
+        i = next((i for i, r in enumerate(turns) if r is slow), len(turns) - 1)
+        return slow, turns[max(0, i - self.neighbors) : i + self.neighbors + 1]
+
+    def flush(self) -> None:
+        """Write dumps still waiting for their following turns."""
+        with self._lock:
+            ready = [self._window(p[0]) for p in self._pending]
+            self._pending = []
+        for slow, window in ready:
+            self._dump(slow, window)
+
+    def _dump(self, slow: TurnRecord, window: List[TurnRecord]) -> None:
+        name = f"slow-turn-{int(slow.started_at)}-{os.getpid()}-{slow.turn}.json"
+        path = os.path.join(self.dump_dir, name)
+        payload = {
+            "slow_turn": slow.turn,
+            "threshold_ms": self.threshold_ms,
+            "pid": os.getpid(),
+            "turns": [r.to_dict() for r in window],
+        }
+        try:
+            os.makedirs(self.dump_dir, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, indent=1, default=str)
+        except OSError as e:
+            logger.error(f"Could not write flight record {path}: {e}")
+            return
+        self.dumps += 1
+        self.last_dump = path
+        logger.warning(
+            f"Turn {slow.turn} took {slow.total_ms:.0f} ms (threshold {self.threshold_ms:.0f} ms); "
+            f"wrote {len(window)} turn records to {path}"
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Return turns recorded, slow turns, dumps written and the last dump's path."""
+        return {
+            "recorded": self.recorded,
+            "buffered": len(self.turns),
+            "slow_turns": self.slow_turns,
+            "dumps": self.dumps,
+            "last_dump": self.last_dump,
+        }
+
+
+def enable_flight_recorder() -> None:
+    """Configure the process-wide recorder from FLIGHT_RECORDER_* settings, if enabled."""
+    from .config import (
+        FLIGHT_RECORDER_DIR,
+        FLIGHT_RECORDER_ENABLED,
+        FLIGHT_RECORDER_NEIGHBORS,
+        FLIGHT_RECORDER_THRESHOLD_MS,
+        FLIGHT_RECORDER_TURNS,
+    )
+
+    if FLIGHT_RECORDER_ENABLED:
+        flight.configure(
+            FLIGHT_RECORDER_THRESHOLD_MS,
+            FLIGHT_RECORDER_TURNS,
+            FLIGHT_RECORDER_NEIGHBORS,
+            FLIGHT_RECORDER_DIR,
+        )
+
+
+# Process-wide recorder, disabled until configured
+flight = FlightRecorder()
@@ -0,0 +1,215 @@
+"""Local fast path: handle commands and trivial queries without the LLM round trip."""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .utils.pcm import apply_gain
+
+logger = logging.getLogger(__name__)
+
+STOP = "stop"
+RESET = "reset"
+REPEAT = "repeat"
+LOUDER = "louder"
+SOFTER = "softer"
+TIME = "time"
+DATE = "date"
+
+# Normalized utterance -> intent. Matching is a dict lookup, so it stays in
+# the low microseconds regardless of how many phrases are listed.
+PHRASES: Dict[str, str] = {
+    **dict.fromkeys(
+        ("stop", "stop it", "stop talking", "cancel", "never mind", "nevermind", "be quiet"),
+        STOP,
+    ),
+    **dict.fromkeys(
+        (
+            "start over",
+            "reset",
+            "new conversation",
+            "let's start over",
+            "forget everything",
+            "clear history",
+        ),
+        RESET,
+    ),
+    **dict.fromkeys(
+        (
+            "repeat",
+            "repeat that",
+            "say that again",
+            "say it again",
+            "again",
+            "come again",
+            "pardon",
+            "what did you say",
+        ),
+        REPEAT,
+    ),
+    **dict.fromkeys(("louder", "speak up", "volume up", "turn it up"), LOUDER),
+    **dict.fromkeys(("quieter", "softer", "volume down", "turn it down"), SOFTER),
+    **dict.fromkeys(
+        ("what time is it", "what's the time", "whats the time", "tell me the time", "time"),
+        TIME,
+    ),
+    **dict.fromkeys(
+        (
+            "what's the date",
+            "whats the date",
+            "what is the date",
+            "what day is it",
+            "what's today's date",
+            "today's date",
+        ),
+        DATE,
+    ),
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s']+")
+_POLITE = ("please ", "hey voiceflow ", "voiceflow ", "can you ", "could you ")
+
+# Playback volume steps
+GAIN_STEP = 1.25
+MIN_GAIN = 0.25
+MAX_GAIN = 4.0
+# Rendered template phrases kept in memory
+AUDIO_CACHE_SIZE = 64
+
+CONFIRMATIONS = {
+    RESET: "Okay, let's start over.",
+    LOUDER: "Okay, louder.",
+    SOFTER: "Okay, quieter.",
+}
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation and polite prefixes/suffixes."""
+    text = _PUNCTUATION.sub(" ", text.lower().replace("’", "'"))
+    text = " ".join(text.split())
+    for prefix in _POLITE:
+        if text.startswith(prefix):
+            text = text[len(prefix) :]
+    if text.endswith(" please"):
+        text = text[: -len(" please")]
+    return text
+
+
+def match_intent(transcript: str) -> Optional[str]:
+    """Return the local intent for a transcript, or None if the LLM should handle it."""
+    return PHRASES.get(normalize(transcript))
+
+
+class FastPath:
+    """
+    Handles local intents and owns reply playback so replies can be replayed.
+
+    Reply audio is retained as PCM while it plays; "repeat that" plays it
+    again without re-synthesizing. Template answers (time, date) and
+    confirmations are synthesized once per distinct text and cached.
+    """
+
+    def __init__(
+        self,
+        agent: Any,
+        tts: Any,
+        play_fn: Callable[[Iterable[bytes]], Any],
+        clock: Callable[[], time.struct_time] = time.localtime,
+    ) -> None:
+        self.agent = agent
+        self.tts = tts
+        self.play_fn = play_fn
+        self.clock = clock
+        self.gain = 1.0
+        self.last_reply_pcm: Optional[bytes] = None
+        self._audio: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.handled: Dict[str, int] = {}
+
+    def play(self, chunks: Iterable[bytes]) -> Any:
+        """Play reply chunks at the current volume, retaining them for replay."""
+        retained: List[bytes] = []
+
+        def tee() -> Iterator[bytes]:
+            for chunk in chunks:
+                retained.append(chunk)
+                yield chunk
+
+        result = self.play_fn(apply_gain(tee(), self.gain))
+        if retained:
+            self.last_reply_pcm = b"".join(retained)
+        return result
+
+    def _say(self, text: str) -> None:
+        """Speak a template phrase from the audio cache, rendering it on a miss."""
+        pcm = self._audio.get(text)
+        if pcm is None:
+            chunks = self.tts.stream_tts(text)
+            if not chunks:
+                logger.warning(f"Fast path could not render {text!r}")
+                return
+            pcm = b"".join(chunks)
+            self._audio[text] = pcm
+            if len(self._audio) > AUDIO_CACHE_SIZE:
+                self._audio.popitem(last=False)
+        else:
+            self._audio.move_to_end(text)
+        self.play_fn(apply_gain([pcm], self.gain))
+
+    def answer_text(self, intent: str) -> Optional[str]:
+        """Render the spoken answer for an intent, if it has one."""
+        now = self.clock()
+        if intent == TIME:
+            return "It's " + time.strftime("%I:%M %p", now).lstrip("0") + "."
+        if intent == DATE:
+            day = str(now.tm_mday)
+            return "Today is " + time.strftime("%A, %B ", now) + day + "."
+        return CONFIRMATIONS.get(intent)
+
+    def try_handle(self, transcript: str) -> Optional[str]:
+        """
+        Handle the transcript locally if it matches an intent.
+
+        Returns:
+            The handled intent, or None if the turn should go to the LLM
+        """
+        intent = match_intent(transcript)
+        with self._lock:
+            self.turns += 1
+            if intent is not None:
+                self.handled[intent] = self.handled.get(intent, 0) + 1
+        if intent is None:
+            return None
+
+        logger.debug(f"Fast path intent: {intent}")
+        if intent == REPEAT:
+            if self.last_reply_pcm:
+                self.play_fn(apply_gain([self.last_reply_pcm], self.gain))
+            return intent
+        if intent == RESET:
+            self.agent.reset_conversation()
+            self.last_reply_pcm = None
+        elif intent == LOUDER:
+            self.gain = min(MAX_GAIN, self.gain * GAIN_STEP)
+        elif intent == SOFTER:
+            self.gain = max(MIN_GAIN, self.gain / GAIN_STEP)
+
+        text = self.answer_text(intent)
+        if text:
+            self._say(text)
+        return intent
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the share of turns that skipped the LLM, with per-intent counts."""
+        with self._lock:
+            handled = sum(self.handled.values())
+            return {
+                "turns": self.turns,
+                "fast_path": handled,
+                "fast_path_rate": handled / self.turns if self.turns else 0.0,
+                "intents": dict(self.handled),
+            }
@@ -0,0 +1,254 @@
+"""Hands-free listening: an always-open microphone that starts a turn when speech begins."""
+
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from .audio_io import AudioSource
+from .config import (
+    ASR_SPEECH_THRESHOLD,
+    LISTEN_HANGOVER_MS,
+    LISTEN_IDLE_CPU_BUDGET,
+    LISTEN_MAX_SECONDS,
+    LISTEN_ONSET_MS,
+    LISTEN_PREROLL_MS,
+)
+from .utils.pcm import rms, to_wav
+
+logger = logging.getLogger(__name__)
+
+# Decimation strides the idle detector may fall back to when over its CPU budget
+MAX_STRIDE = 8
+# Idle seconds per CPU budget check
+BUDGET_WINDOW = 1.0
+# Capture frame length; short frames keep onset detection within a frame of the speech
+FRAME_MS = 20
+
+
+def _closed(reader: Any) -> bool:
+    return bool(getattr(reader.ring, "closed", False))
+
+
+class ListeningSource(AudioSource):
+    """
+    Returns one utterance per `record()` from a capture that stays open between turns.
+
+    Capture runs continuously into the capture's frame ring. While idle, the
+    listener wakes once per frame period, measures the level of whatever
+    arrived, and keeps the last `preroll_ms` of audio in a small deque.
+    Speech louder than `threshold` for `onset_ms` starts the utterance, which
+    begins with that pre-roll so the first syllable is not lost, and ends
+    after `hangover_ms` of silence (or `max_seconds`).
+
+    Idle detection is held to `idle_cpu_budget` (fraction of one core): if a
+    window goes over, the level is computed on every 2nd, 4th... sample.
+
+    Args:
+        capture: Object with start(), stop() and reader() over 16-bit PCM
+            frames (CallbackCapture, or a started AudioProcess)
+        sample_rate: Capture rate
+        channels: Interleaved channels per frame
+        threshold: Frame RMS counted as speech, as a fraction of full scale
+        preroll_ms: Audio kept from before the onset
+        onset_ms: Continuous speech needed to start a turn
+        hangover_ms: Silence that ends a turn
+        max_seconds: Longest utterance
+        idle_cpu_budget: Allowed idle CPU use of the listening thread, 0-1
+        owner: Stop the capture on close()
+    """
+
+    interactive = True
+    hands_free = True
+
+    def __init__(
+        self,
+        capture: Any,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        threshold: float = 0.01,
+        preroll_ms: int = 300,
+        onset_ms: int = 60,
+        hangover_ms: int = 700,
+        max_seconds: float = 15,
+        idle_cpu_budget: float = 0.02,
+        owner: bool = True,
+    ) -> None:
+        super().__init__(sample_rate, channels)
+        self.capture = capture
+        self.floor = threshold * 32768
+        self.preroll_ms = preroll_ms
+        self.onset_ms = onset_ms
+        self.hangover_ms = hangover_ms
+        self.max_seconds = max_seconds
+        self.idle_cpu_budget = idle_cpu_budget
+        self.owner = owner
+        self.stride = 1
+        self._reader: Any = None
+        self._recent: Deque[bytes] = deque()
+        self._recent_ms = 0.0
+        self._window_cpu = 0.0
+        self._window_wall = 0.0
+        self.idle_cpu = 0.0
+        self.idle_wall = 0.0
+        self.utterances = 0
+        self.discarded_frames = 0
+        self.onset_latencies: List[float] = []
+
+    def _frame_ms(self, frame: bytes) -> float:
+        return 1000 * len(frame) / (2 * self.channels * self.sample_rate)
+
+    def _open(self) -> Any:
+        if self._reader is None:
+            # An AudioProcess shared with the sink is already running
+            if not getattr(self.capture, "alive", False):
+                self.capture.start()
+            self._reader = self.capture.reader()
+            logger.info("Listening continuously; speak to start a turn")
+        return self._reader
+
+    def _drain(self, reader: Any) -> None:
+        """Drop audio captured while the last turn ran (including the agent's own reply)."""
+        while reader.read(timeout=0) is not None:
+            self.discarded_frames += 1
+        self._recent.clear()
+        self._recent_ms = 0.0
+
+    def _remember(self, frame: bytes, ms: float) -> None:
+        """Keep the newest frames covering pre-roll plus the onset run."""
+        self._recent.append(frame)
+        self._recent_ms += ms
+        keep = self.preroll_ms + self.onset_ms
+        while self._recent and self._recent_ms - self._frame_ms(self._recent[0]) >= keep:
+            self._recent_ms -= self._frame_ms(self._recent.popleft())
+
+    def _account(self, cpu: float, wall: float) -> None:
+        """Track idle CPU and coarsen the detector if a window exceeds the budget."""
+        self.idle_cpu += cpu
+        self.idle_wall += wall
+        self._window_cpu += cpu
+        self._window_wall += wall
+        if self._window_wall < BUDGET_WINDOW:
+            return
+        used = self._window_cpu / self._window_wall
+        if used > self.idle_cpu_budget and self.stride < MAX_STRIDE:
+            self.stride *= 2
+            logger.warning(
+                f"Idle listening used {used:.1%} CPU (budget {self.idle_cpu_budget:.1%}); "
+                f"checking every {self.stride} samples"
+            )
+        self._window_cpu = self._window_wall = 0.0
+
+    def _wait_for_onset(self, reader: Any) -> Optional[float]:
+        """
+        Block until speech starts.
+
+        Returns:
+            Capture time (time.monotonic) of the first voiced frame, or None if capture ended
+        """
+        voiced_ms = 0.0
+        onset = 0.0
+        wall, cpu = time.monotonic(), time.thread_time()
+        period = 0.02
+        try:
+            while True:
+                frame = reader.read(timeout=0)
+                if frame is None:
+                    if _closed(reader):
+                        return None
+                    # Nothing new: sleep a frame period rather than spin
+                    time.sleep(period)
+                    now_wall, now_cpu = time.monotonic(), time.thread_time()
+                    self._account(now_cpu - cpu, now_wall - wall)
+                    wall, cpu = now_wall, now_cpu
+                    continue
+                ms = self._frame_ms(frame)
+                period = ms / 1000
+                self._remember(frame, ms)
+                if rms(frame, self.stride) >= self.floor:
+                    if voiced_ms == 0.0:
+                        onset = reader.last_stamp - period
+                    voiced_ms += ms
+                    if voiced_ms >= self.onset_ms:
+                        return onset
+                else:
+                    voiced_ms = 0.0
+        finally:
+            self._account(time.thread_time() - cpu, time.monotonic() - wall)
+
+    def record(self) -> Optional[bytes]:
+        reader = self._open()
+        self._drain(reader)
+        onset = self._wait_for_onset(reader)
+        if onset is None:
+            self.exhausted = True
+            return None
+        self.onset_latencies.append(time.monotonic() - onset)
+        frames = list(self._recent)
+        spoken_ms = sum(self._frame_ms(f) for f in frames)
+        silence_ms = 0.0
+        frame_timeout = 0.5
+        while spoken_ms < 1000 * self.max_seconds and silence_ms < self.hangover_ms:
+            frame = reader.read(timeout=frame_timeout)
+            if frame is None:
+                if not _closed(reader):
+                    logger.error("Audio capture stalled while listening")
+                break
+            ms = self._frame_ms(frame)
+            frames.append(frame)
+            spoken_ms += ms
+            silence_ms = 0.0 if rms(frame) >= self.floor else silence_ms + ms
+        self.utterances += 1
+        logger.debug(f"Utterance of {spoken_ms:.0f} ms after onset")
+        return to_wav(b"".join(frames), self.sample_rate, self.channels)
+
+    def close(self) -> None:
+        if self.owner:
+            self.capture.stop()
+
+    def stats(self) -> Dict[str, float]:
+        """Return utterances, idle CPU use against the budget, and onset-to-turn-start latency."""
+        latencies = sorted(self.onset_latencies)
+        return {
+            "utterances": self.utterances,
+            "idle_seconds": round(self.idle_wall, 2),
+            "idle_cpu_percent": 100 * self.idle_cpu / self.idle_wall if self.idle_wall else 0.0,
+            "idle_cpu_budget_percent": 100 * self.idle_cpu_budget,
+            "detector_stride": self.stride,
+            "onset_latency_ms_avg": (
+                1000 * sum(latencies) / len(latencies) if latencies else 0.0
+            ),
+            "onset_latency_ms_max": 1000 * latencies[-1] if latencies else 0.0,
+            "discarded_frames": self.discarded_frames,
+        }
+
+
+def create_listener(
+    sample_rate: int, channels: int, process: Any = None
+) -> ListeningSource:
+    """
+    Build a listener configured from the LISTEN_* settings.
+
+    Args:
+        process: Started AudioProcess to listen through (default: the
+            microphone in this process, in PortAudio callback mode)
+    """
+    if process is None:
+        from .utils.audio import CallbackCapture
+
+        capture: Any = CallbackCapture(
+            sample_rate, channels, frames_per_buffer=sample_rate * FRAME_MS // 1000
+        )
+    else:
+        capture = process
+    return ListeningSource(
+        capture,
+        sample_rate,
+        channels,
+        threshold=ASR_SPEECH_THRESHOLD,
+        preroll_ms=LISTEN_PREROLL_MS,
+        onset_ms=LISTEN_ONSET_MS,
+        hangover_ms=LISTEN_HANGOVER_MS,
+        max_seconds=LISTEN_MAX_SECONDS,
+        idle_cpu_budget=LISTEN_IDLE_CPU_BUDGET / 100,
+    )
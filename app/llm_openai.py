@@ -1,40 +1,182 @@
+import hashlib
+import json
 import logging
-from typing import List, Dict, Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
 
-from openai import OpenAI, APIError, APIConnectionError, RateLimitError  # type: ignore
+from openai import (  # type: ignore
+    OpenAI,
+    APIError,
+    APIConnectionError,
+    BadRequestError,
+    DefaultHttpxClient,
+    NotFoundError,
+    RateLimitError,
+)
 
+from .admission import AdmissionController, Priority
+from .model_router import FAST, STANDARD, ModelRouter, Tier
 from .config import (
+    ADMISSION_MAX_QUEUE,
+    COALESCE_REQUESTS,
+    LLM_FAST_MAX_TOKENS,
+    LLM_FAST_MODEL,
+    LLM_ROUTING,
+    LLM_STATE_MODE,
     OPENAI_API_KEY,
+    OPENAI_BASE_URL,
     OPENAI_MODEL,
     OPENAI_TEMPERATURE,
     REQUEST_TIMEOUT,
     MAX_RETRIES,
+    OPENAI_RPM_LIMIT,
+    OPENAI_TPM_LIMIT,
 )
+from .flight_recorder import flight
+from .singleflight import SingleFlight
+from .tracing import traced
+from .utils.exceptions import OverloadError
 
 logger = logging.getLogger(__name__)
 
 # Safety limits
 MAX_TOKENS = 512
 MAX_CONVERSATION_HISTORY = 20
+# Rough characters-per-token ratio used to estimate request token cost
+CHARS_PER_TOKEN = 4
+# Prefix/stateful modes drop old messages in blocks of this size, so the start
+# of the prompt only changes once every few turns instead of every turn
+WINDOW_STEP = 10
+# Conversation chains remembered for previous_response_id lookups
+MAX_CHAINS = 256
+# Consecutive 404s from the Responses API before stateful mode is given up
+RESPONSES_MISSING_LIMIT = 3
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int = MAX_TOKENS) -> int:
+    """Estimate prompt plus completion tokens for admission control."""
+    chars = sum(len(m.get("content") or "") for m in messages)
+    return chars // CHARS_PER_TOKEN + max_tokens
+
+
+def _digest(messages: List[Dict[str, str]]) -> str:
+    data = json.dumps(messages, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+
+def _count(value: object) -> int:
+    return value if isinstance(value, int) else 0
+
+
+class _Usage:
+    """Request bytes and billed input tokens, for comparing state modes."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.bytes_sent = 0
+        self.input_tokens = 0
+        self.cached_tokens = 0
+        self.chained_calls = 0
+        self.fallbacks = 0
+
+    def add_bytes(self, n: int) -> None:
+        with self._lock:
+            self.bytes_sent += n
+
+    def add_call(self, input_tokens: int, cached_tokens: int, chained: bool = False) -> None:
+        with self._lock:
+            self.calls += 1
+            self.input_tokens += input_tokens
+            self.cached_tokens += cached_tokens
+            self.chained_calls += chained
+
+    def add_fallback(self) -> None:
+        with self._lock:
+            self.fallbacks += 1
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            calls = self.calls
+            return {
+                "calls": calls,
+                "bytes_sent": self.bytes_sent,
+                "input_tokens": self.input_tokens,
+                "cached_tokens": self.cached_tokens,
+                "chained_calls": self.chained_calls,
+                "fallbacks": self.fallbacks,
+                "bytes_per_call": self.bytes_sent / calls if calls else 0.0,
+                "input_tokens_per_call": self.input_tokens / calls if calls else 0.0,
+            }
 
 
 class LLMClient:
     """Robust OpenAI Chat Completions API client with retry and timeout logic."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        state_mode: Optional[str] = None,
+        base_url: Optional[str] = None,
+        routing: Optional[bool] = None,
+    ) -> None:
+        """
+        Args:
+            state_mode: "full", "prefix" or "stateful" (default: LLM_STATE_MODE)
+            base_url: OpenAI-compatible endpoint (default: OPENAI_BASE_URL)
+            routing: Route simple turns to LLM_FAST_MODEL (default: LLM_ROUTING)
+        """
         if not OPENAI_API_KEY:
             raise RuntimeError("OPENAI_API_KEY is not set")
+
+        self.state_mode = state_mode or LLM_STATE_MODE
+        self.usage = _Usage()
+        # Digest of the messages a stored response covers -> its response id
+        self._chains: "OrderedDict[str, str]" = OrderedDict()
+        self._chains_lock = threading.Lock()
+        self._responses_missing = 0
         
+        self.admission = AdmissionController(
+            "openai",
+            requests_per_minute=OPENAI_RPM_LIMIT,
+            tokens_per_minute=OPENAI_TPM_LIMIT,
+            max_queue_depth=ADMISSION_MAX_QUEUE,
+            timeout=REQUEST_TIMEOUT,
+        )
         try:
-            self.client = OpenAI(api_key=OPENAI_API_KEY, timeout=REQUEST_TIMEOUT)
+            # Rate-limit headers on every response refill the admission buckets
+            self.http_client = DefaultHttpxClient(
+                event_hooks={
+                    "request": [lambda r: self.usage.add_bytes(len(r.content))],
+                    "response": [lambda r: self.admission.update_from_headers(r.headers)],
+                }
+            )
+            self.client = OpenAI(
+                api_key=OPENAI_API_KEY,
+                base_url=base_url or OPENAI_BASE_URL,
+                timeout=REQUEST_TIMEOUT,
+                http_client=self.http_client,
+            )
             self.model = OPENAI_MODEL
-            logger.info(f"LLMClient initialized with model={self.model}")
+            self.flights = SingleFlight() if COALESCE_REQUESTS else None
+            self.router: Optional[ModelRouter] = None
+            if LLM_ROUTING if routing is None else routing:
+                self.router = ModelRouter(
+                    Tier(FAST, LLM_FAST_MODEL, LLM_FAST_MAX_TOKENS),
+                    Tier(STANDARD, self.model, MAX_TOKENS),
+                )
+            logger.info(f"LLMClient initialized with model={self.model}, state={self.state_mode}")
         except Exception as e:
             logger.error(f"Failed to initialize OpenAI client: {e}")
             raise RuntimeError(f"OpenAI initialization failed: {e}")
 
+    @traced("llm.chat")
     def chat(
-        self, messages: List[Dict[str, str]], max_retries: int = MAX_RETRIES
+        self,
+        messages: List[Dict[str, str]],
+        max_retries: int = MAX_RETRIES,
+        priority: Priority = Priority.INTERACTIVE,
     ) -> Optional[str]:
         """
         Send conversation and return assistant reply text.
@@ -43,9 +185,13 @@ class LLMClient:
         Args:
             messages: Conversation history with role/content
             max_retries: Number of retries on failure
+            priority: Admission queue priority (interactive turns go first)
             
         Returns:
             Assistant response or None if all retries failed
+
+        Raises:
+            OverloadError: The OpenAI admission queue is full
         """
         if not messages:
             logger.warning("Empty message list provided to chat")
@@ -53,26 +199,92 @@ class LLMClient:
         
         # Validate messages
         if len(messages) > MAX_CONVERSATION_HISTORY:
-            logger.warning(
-                f"Conversation history too long ({len(messages)} msgs). "
-                f"Keeping last {MAX_CONVERSATION_HISTORY//2} exchanges."
-            )
-            # Keep system message + last N exchanges
-            system_msg = [m for m in messages if m.get("role") == "system"]
-            other_msgs = [m for m in messages if m.get("role") != "system"]
-            messages = system_msg + other_msgs[-(MAX_CONVERSATION_HISTORY - 2) :]
-        
+            messages = self._window(messages)
+
+        if self.router is None:
+            return self._send(messages, None, max_retries, priority)
+
+        tier: Optional[Tier] = self.router.choose(messages)
+        reply = None
+        while tier is not None:
+            reply = self._send(messages, tier, max_retries, priority)
+            if reply is not None:
+                break
+            self.router.record(tier, None)
+            tier = self.router.fallback(tier)
+            if tier is not None:
+                logger.warning(f"No reply from the fast tier; retrying on {tier.model}")
+        return reply
+
+    def _send(
+        self,
+        messages: List[Dict[str, str]],
+        tier: Optional[Tier],
+        max_retries: int,
+        priority: Priority,
+    ) -> Optional[str]:
+        """Complete on one tier (None: the configured model), coalescing identical calls."""
+        if self.flights is None:
+            return self._complete(messages, max_retries, priority, tier)
+
+        # Identical concurrent conversations share one completion
+        model, max_tokens = (tier.model, tier.max_tokens) if tier else (self.model, MAX_TOKENS)
+        key = json.dumps([model, max_tokens, messages], sort_keys=True, ensure_ascii=False)
+        return self.flights.do(key, lambda: self._complete(messages, max_retries, priority, tier))
+
+    def _window(self, messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Keep the system message and the most recent exchanges."""
+        logger.warning(
+            f"Conversation history too long ({len(messages)} msgs). "
+            f"Keeping last {MAX_CONVERSATION_HISTORY//2} exchanges."
+        )
+        system_msg = [m for m in messages if m.get("role") == "system"]
+        other_msgs = [m for m in messages if m.get("role") != "system"]
+        keep = MAX_CONVERSATION_HISTORY - 2
+        if self.state_mode == "full":
+            return system_msg + other_msgs[-keep:]
+        # Drop whole blocks so the kept prefix stays byte-identical between drops
+        excess = len(other_msgs) - keep
+        drop = -(-excess // WINDOW_STEP) * WINDOW_STEP
+        return system_msg + other_msgs[drop:]
+
+    def usage_stats(self) -> Dict[str, float]:
+        """Return bytes uploaded and input tokens billed (total and per call)."""
+        return self.usage.stats()
+
+    def coalescing_stats(self) -> Dict[str, int]:
+        """Return request/upstream/deduplicated counts (empty if coalescing is off)."""
+        return self.flights.stats() if self.flights else {}
+
+    def routing_stats(self) -> Dict[str, Dict[str, object]]:
+        """Return per-tier turns, share and latency (empty if routing is off)."""
+        return self.router.stats() if self.router else {}
+
+    def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_retries: int,
+        priority: Priority,
+        tier: Optional[Tier] = None,
+    ) -> Optional[str]:
+        """Call the model with retries, each attempt admitted separately."""
+        model, max_tokens = (tier.model, tier.max_tokens) if tier else (self.model, MAX_TOKENS)
+        cost = estimate_tokens(messages, max_tokens)
+        flight.note("llm.model", model)
+        flight.note("llm.messages", len(messages))
+        flight.note("llm.estimated_tokens", cost)
         for attempt in range(max_retries + 1):
+            flight.count("llm.attempts")
             try:
+                self.admission.acquire(cost, priority)
                 logger.debug(f"Chat API call (attempt {attempt + 1}/{max_retries + 1})")
-                completion = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=OPENAI_TEMPERATURE,
-                    max_tokens=MAX_TOKENS,
-                )
-                
-                response = completion.choices[0].message.content.strip()
+                start = time.perf_counter()
+                if self.state_mode == "stateful":
+                    response = self._respond(messages, model, max_tokens)
+                else:
+                    response = self._chat_completion(messages, model, max_tokens)
+                if tier is not None and self.router is not None:
+                    self.router.record(tier, time.perf_counter() - start)
                 
                 if not response:
                     logger.warning("Empty response from OpenAI")
@@ -81,19 +293,26 @@ class LLMClient:
                 logger.debug(f"LLM response: {response[:100]}...")
                 return response
                 
+            except OverloadError:
+                raise
+
             except RateLimitError as e:
+                flight.count("llm.rate_limited")
                 logger.warning(f"Rate limited. Attempt {attempt + 1}/{max_retries + 1}")
+                self.admission.update_from_headers(e.response.headers)
                 if attempt == max_retries:
                     logger.error("Max retries exceeded for rate limit")
                     return None
                 
             except APIConnectionError as e:
+                flight.count("llm.connection_errors")
                 logger.warning(f"Connection error. Attempt {attempt + 1}/{max_retries + 1}: {e}")
                 if attempt == max_retries:
                     logger.error("Max retries exceeded for connection error")
                     return None
                     
             except APIError as e:
+                flight.count("llm.api_errors")
                 logger.error(f"OpenAI API error: {e}")
                 if attempt == max_retries:
                     return None
@@ -103,3 +322,114 @@ class LLMClient:
                 return None
         
         return None
+
+    def _chat_completion(
+        self, messages: List[Dict[str, str]], model: str, max_tokens: int
+    ) -> str:
+        """Send the whole conversation to Chat Completions."""
+        completion = self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=OPENAI_TEMPERATURE,
+            max_tokens=max_tokens,
+        )
+        usage = getattr(completion, "usage", None)
+        details = getattr(usage, "prompt_tokens_details", None)
+        self.usage.add_call(
+            _count(getattr(usage, "prompt_tokens", 0)), _count(getattr(details, "cached_tokens", 0))
+        )
+        return completion.choices[0].message.content.strip()
+
+    def _find_chain(self, messages: List[Dict[str, str]]) -> Tuple[Optional[str], int]:
+        """Return the stored response covering all but the newest message, if any."""
+        key = _digest(messages[:-1])
+        with self._chains_lock:
+            response_id = self._chains.get(key)
+            if response_id is not None:
+                self._chains.move_to_end(key)
+        return response_id, len(messages) - 1
+
+    def _remember(self, messages: List[Dict[str, str]], reply: str, response_id: str) -> None:
+        key = _digest(messages + [{"role": "assistant", "content": reply}])
+        with self._chains_lock:
+            self._chains[key] = response_id
+            if len(self._chains) > MAX_CHAINS:
+                self._chains.popitem(last=False)
+
+    def _respond(self, messages: List[Dict[str, str]], model: str, max_tokens: int) -> str:
+        """
+        Continue the conversation server-side via the Responses API.
+
+        When the conversation so far is a stored response, only the new
+        message is sent with previous_response_id. An unknown or expired
+        chain is resent in full. A 404 from the Responses API resends that
+        call over Chat Completions; after RESPONSES_MISSING_LIMIT in a row
+        the client switches to full resend for good.
+        """
+        instructions = "\n\n".join(m["content"] for m in messages if m.get("role") == "system")
+        turns = [m for m in messages if m.get("role") != "system"]
+        previous_id, covered = self._find_chain(messages)
+        new_items = messages[covered:] if previous_id else turns
+        try:
+            try:
+                response = self._create_response(
+                    instructions, new_items, previous_id, model, max_tokens
+                )
+            except BadRequestError as e:
+                if previous_id is None:
+                    raise
+                logger.info(f"Stored conversation unavailable ({e}); resending in full")
+                self.usage.add_fallback()
+                previous_id = None
+                response = self._create_response(instructions, turns, None, model, max_tokens)
+        except NotFoundError as e:
+            logger.info(f"Responses API returned 404 ({e}); resending this turn in full")
+            self.usage.add_fallback()
+            with self._chains_lock:
+                self._responses_missing += 1
+                downgrade = (
+                    self._responses_missing >= RESPONSES_MISSING_LIMIT
+                    and self.state_mode == "stateful"
+                )
+                if downgrade:
+                    self.state_mode = "full"
+            if downgrade:
+                logger.warning(
+                    f"Responses API unavailable for {RESPONSES_MISSING_LIMIT} calls in a row; "
+                    "switching to full resend over Chat Completions"
+                )
+            return self._chat_completion(messages, model, max_tokens)
+
+        with self._chains_lock:
+            self._responses_missing = 0
+
+        reply = (response.output_text or "").strip()
+        usage = getattr(response, "usage", None)
+        details = getattr(usage, "input_tokens_details", None)
+        self.usage.add_call(
+            _count(getattr(usage, "input_tokens", 0)),
+            _count(getattr(details, "cached_tokens", 0)),
+            chained=previous_id is not None,
+        )
+        if reply:
+            self._remember(messages, reply, response.id)
+        return reply
+
+    def _create_response(
+        self,
+        instructions: str,
+        items: List[Dict[str, str]],
+        previous_id: Optional[str],
+        model: str,
+        max_tokens: int,
+    ):
+        kwargs = {"previous_response_id": previous_id} if previous_id else {}
+        return self.client.responses.create(
+            model=model,
+            instructions=instructions or None,
+            input=[{"role": m["role"], "content": m["content"]} for m in items],
+            temperature=OPENAI_TEMPERATURE,
+            max_output_tokens=max_tokens,
+            store=True,
+            **kwargs,
+        )
@@ -0,0 +1,154 @@
+"""
+Latency-aware model routing: simple turns go to a faster, cheaper LLM tier.
+
+Each turn is classified locally from the newest user message (length,
+question type) and the conversation depth, in microseconds and without a
+model call. The class names the tier it should use; the router then learns
+each tier's call latency with an EWMA and sends a simple turn to the
+standard tier instead whenever the fast tier has become the slower one.
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FAST = "fast"
+STANDARD = "standard"
+
+EWMA_ALPHA = 0.3
+# Words at or under which a plain question counts as simple
+SIMPLE_MAX_WORDS = 12
+# Non-system messages after which short follow-ups need the full model's context handling
+DEEP_HISTORY = 16
+# Every Nth simple turn goes to the fast tier even while it is demoted, so its EWMA can recover
+EXPLORE_EVERY = 20
+
+ACKNOWLEDGEMENTS = frozenset(
+    (
+        "thanks", "thank you", "thanks a lot", "thank you so much", "ok", "okay", "great",
+        "cool", "nice", "got it", "sure", "yes", "yeah", "no", "nope", "perfect", "awesome",
+        "bye", "goodbye", "good night", "hello", "hi", "hey", "sounds good", "all right",
+    )
+)
+_COMPLEX = re.compile(
+    r"^(why|how|explain|describe|compare|summari[sz]e|write|plan|walk me through|tell me about"
+    r"|help me|what are the differences?|what's the difference|what is the difference)\b"
+    r"|\b(step by step|in detail|pros and cons|versus|vs\.?)\b"
+)
+_PUNCTUATION = re.compile(r"[^\w\s']+")
+
+
+class Tier:
+    """A model and the completion token cap used with it."""
+
+    def __init__(self, name: str, model: str, max_tokens: int) -> None:
+        self.name = name
+        self.model = model
+        self.max_tokens = max_tokens
+
+    def __repr__(self) -> str:
+        return f"Tier({self.name!r}, {self.model!r}, {self.max_tokens})"
+
+
+def classify(messages: List[Dict[str, str]]) -> str:
+    """
+    Return the tier a turn calls for: FAST for small talk and short plain questions.
+
+    Args:
+        messages: Conversation ending with the user's newest message
+
+    Returns:
+        FAST or STANDARD
+    """
+    user = next((m for m in reversed(messages) if m.get("role") == "user"), None)
+    if user is None:
+        return STANDARD
+    text = _PUNCTUATION.sub(" ", (user.get("content") or "").lower()).strip()
+    text = " ".join(text.split())
+    if text in ACKNOWLEDGEMENTS:
+        return FAST
+    words = len(text.split())
+    depth = sum(1 for m in messages if m.get("role") != "system")
+    if words > SIMPLE_MAX_WORDS or _COMPLEX.search(text) or depth > DEEP_HISTORY:
+        return STANDARD
+    return FAST
+
+
+class ModelRouter:
+    """
+    Picks a tier per turn and keeps per-tier latency and traffic statistics.
+
+    Args:
+        fast: Tier for simple turns
+        standard: Tier for everything else, and the fallback when fast fails
+        alpha: EWMA smoothing factor for call latency
+    """
+
+    def __init__(self, fast: Tier, standard: Tier, alpha: float = EWMA_ALPHA) -> None:
+        self.tiers = {FAST: fast, STANDARD: standard}
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._simple_turns = 0
+        self._stats: Dict[str, Dict[str, Any]] = {
+            name: {"turns": 0, "ewma": None, "last": None, "failures": 0, "rerouted": 0}
+            for name in self.tiers
+        }
+
+    def choose(self, messages: List[Dict[str, str]]) -> Tier:
+        """Return the tier for this turn and count it."""
+        wanted = classify(messages)
+        with self._lock:
+            name = wanted
+            if wanted == FAST:
+                self._simple_turns += 1
+                if self._fast_is_slower() and self._simple_turns % EXPLORE_EVERY:
+                    name = STANDARD
+                    self._stats[FAST]["rerouted"] += 1
+            self._stats[name]["turns"] += 1
+        logger.debug(f"Routed turn to {name} tier (classified {wanted})")
+        return self.tiers[name]
+
+    def _fast_is_slower(self) -> bool:
+        fast, standard = self._stats[FAST]["ewma"], self._stats[STANDARD]["ewma"]
+        return fast is not None and standard is not None and fast > standard
+
+    def record(self, tier: Tier, seconds: Optional[float]) -> None:
+        """Fold a call's latency into the tier's EWMA; None counts a failed call."""
+        with self._lock:
+            stats = self._stats[tier.name]
+            if seconds is None:
+                stats["failures"] += 1
+                return
+            prev, a = stats["ewma"], self.alpha
+            stats["ewma"] = seconds if prev is None else a * seconds + (1 - a) * prev
+            stats["last"] = seconds
+
+    def fallback(self, tier: Tier) -> Optional[Tier]:
+        """Tier to retry a failed turn on, or None if it already ran on the standard tier."""
+        return None if tier.name == STANDARD else self.tiers[STANDARD]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per tier: model, token cap, turns routed and their share, call latency
+        EWMA and last value (ms), failed calls, and (fast tier) simple turns
+        rerouted to the standard tier while fast was the slower one.
+        """
+        with self._lock:
+            total = sum(s["turns"] for s in self._stats.values())
+            result = {}
+            for name, stats in self._stats.items():
+                tier = self.tiers[name]
+                result[name] = {
+                    "model": tier.model,
+                    "max_tokens": tier.max_tokens,
+                    "turns": stats["turns"],
+                    "share": stats["turns"] / total if total else 0.0,
+                    "ewma_ms": None if stats["ewma"] is None else round(stats["ewma"] * 1000, 1),
+                    "last_ms": None if stats["last"] is None else round(stats["last"] * 1000, 1),
+                    "failures": stats["failures"],
+                    "rerouted": stats["rerouted"],
+                }
+            return result
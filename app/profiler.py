@@ -0,0 +1,112 @@
+"""Per-turn CPU profiling with flamegraph-ready output."""
+
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Counter as CounterType, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sampling interval for the stack sampler (seconds)
+SAMPLE_INTERVAL = 0.005
+PROFILE_MODES = ("sample", "cprofile")
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack on a background thread.
+
+    Stacks are aggregated in Brendan Gregg's folded format
+    ("outer;inner;leaf count"), which flamegraph.pl and speedscope read directly.
+    """
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL) -> None:
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: CounterType[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.thread_id)
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        if names:
+            self.stacks[";".join(reversed(names))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def write_folded(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class TurnProfiler:
+    """
+    Profiles each pipeline turn into its own file under `output_dir`.
+
+    Modes:
+        sample: stack sampling of the calling thread -> turn-NNNN.folded
+        cprofile: deterministic cProfile -> turn-NNNN.prof (pstats, snakeviz, flameprof)
+    """
+
+    def __init__(self, output_dir: Optional[str] = None, mode: str = "sample") -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}; expected one of {PROFILE_MODES}")
+        self.output_dir = output_dir
+        self.mode = mode
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.output_dir)
+
+    @contextmanager
+    def turn(self, index: int) -> Iterator[None]:
+        """Profile the enclosed block as turn `index`; a no-op when disabled."""
+        if not self.output_dir:
+            yield
+            return
+
+        base = os.path.join(self.output_dir, f"turn-{index:04d}")
+        start = time.perf_counter()
+        if self.mode == "cprofile":
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                profile.dump_stats(base + ".prof")
+                path = base + ".prof"
+        else:
+            sampler = StackSampler(threading.get_ident())
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                sampler.write_folded(base + ".folded")
+                path = base + ".folded"
+        logger.info(f"Turn {index} profile ({time.perf_counter() - start:.2f}s) written to {path}")
@@ -0,0 +1,203 @@
+"""Latency probing and EWMA-based routing across Murf regional endpoints."""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Any
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Probe / routing defaults
+PROBE_TIMEOUT = 5.0
+# Longest startup waits for the first probe round before using what has answered
+STARTUP_PROBE_WAIT = 1.0
+EWMA_ALPHA = 0.3
+FAILURE_THRESHOLD = 2
+
+
+def measure_ttfb(url: str, timeout: float = PROBE_TIMEOUT) -> Optional[float]:
+    """
+    Measure time-to-first-byte for a GET against the given URL.
+
+    Any HTTP status counts as a response: the probe only cares how quickly
+    the endpoint answers, not whether the path exists.
+
+    Args:
+        url: Endpoint base URL
+        timeout: Connect/read timeout in seconds
+
+    Returns:
+        Seconds until the first body byte (or headers) arrived, or None on failure
+    """
+    start = time.perf_counter()
+    try:
+        with requests.get(url, stream=True, timeout=timeout) as resp:
+            resp.raw.read(1)
+            return time.perf_counter() - start
+    except requests.exceptions.RequestException as e:
+        logger.debug(f"Probe to {url} failed: {e}")
+        return None
+
+
+class RegionProber:
+    """Tracks an EWMA of time-to-first-byte per region and ranks healthy regions."""
+
+    def __init__(
+        self,
+        endpoints: Dict[str, str],
+        alpha: float = EWMA_ALPHA,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        probe_fn: Callable[[str], Optional[float]] = measure_ttfb,
+    ) -> None:
+        if not endpoints:
+            raise ValueError("RegionProber needs at least one endpoint")
+
+        self.endpoints = dict(endpoints)
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.probe_fn = probe_fn
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats: Dict[str, Dict[str, Any]] = {
+            name: {
+                "ewma": None,
+                "last": None,
+                "samples": 0,
+                "request_ewma": None,
+                "requests": 0,
+                "failures": 0,
+                "consecutive_failures": 0,
+                "healthy": True,
+                "updated_at": None,
+            }
+            for name in self.endpoints
+        }
+
+    def _ewma(self, prev: Optional[float], value: float) -> float:
+        return value if prev is None else self.alpha * value + (1 - self.alpha) * prev
+
+    def record(self, region: str, ttfb: float) -> None:
+        """Fold a successful probe TTFB into the EWMA regions are ranked by."""
+        with self._lock:
+            stats = self._stats[region]
+            stats["ewma"] = self._ewma(stats["ewma"], ttfb)
+            stats["last"] = ttfb
+            stats["samples"] += 1
+            stats["consecutive_failures"] = 0
+            stats["healthy"] = True
+            stats["updated_at"] = time.time()
+
+    def record_request(self, region: str, seconds: float) -> None:
+        """
+        Record a successful real request's first-chunk time.
+
+        It includes synthesis, so it is kept apart from the probe EWMA used
+        for ranking; it only clears the region's failure streak.
+        """
+        with self._lock:
+            stats = self._stats[region]
+            stats["request_ewma"] = self._ewma(stats["request_ewma"], seconds)
+            stats["requests"] += 1
+            stats["consecutive_failures"] = 0
+            stats["healthy"] = True
+            stats["updated_at"] = time.time()
+
+    def record_failure(self, region: str) -> None:
+        """Count a failed probe or request; mark the region unhealthy past the threshold."""
+        with self._lock:
+            stats = self._stats[region]
+            stats["failures"] += 1
+            stats["consecutive_failures"] += 1
+            stats["updated_at"] = time.time()
+            if stats["healthy"] and stats["consecutive_failures"] >= self.failure_threshold:
+                stats["healthy"] = False
+                logger.warning(f"Murf region {region} marked unhealthy")
+
+    def probe_region(self, region: str) -> Optional[float]:
+        """Probe a single region and record the outcome."""
+        ttfb = self.probe_fn(self.endpoints[region])
+        if ttfb is None:
+            self.record_failure(region)
+        else:
+            self.record(region, ttfb)
+        return ttfb
+
+    def probe_all(self, wait: Optional[float] = None) -> None:
+        """
+        Probe every configured region once, in parallel.
+
+        Args:
+            wait: Return after this many seconds even if some probes are still
+                running; they record their outcome when they finish
+        """
+        threads = [
+            threading.Thread(target=self.probe_region, args=(region,), daemon=True)
+            for region in self.endpoints
+        ]
+        for thread in threads:
+            thread.start()
+        deadline = None if wait is None else time.monotonic() + wait
+        for thread in threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        logger.debug(f"Region probe complete, ranking: {self.ranked()}")
+
+    def ranked(self) -> List[str]:
+        """
+        Return regions ordered by preference.
+
+        Healthy regions come first, fastest EWMA first; regions with no samples
+        follow them, and unhealthy regions are kept last as a final fallback.
+        """
+        with self._lock:
+            order = list(self.endpoints)
+
+            def key(name: str) -> tuple:
+                stats = self._stats[name]
+                ewma = stats["ewma"]
+                return (
+                    not stats["healthy"],
+                    ewma is None,
+                    ewma if ewma is not None else 0.0,
+                    order.index(name),
+                )
+
+            return sorted(order, key=key)
+
+    def best(self) -> str:
+        """Return the currently preferred region."""
+        return self.ranked()[0]
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return a copy of per-region probe statistics for monitoring."""
+        with self._lock:
+            return {
+                name: dict(stats, endpoint=self.endpoints[name])
+                for name, stats in self._stats.items()
+            }
+
+    def start(self, interval: float) -> None:
+        """Re-probe all regions every `interval` seconds on a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.probe_all()
+                except Exception as e:
+                    logger.warning(f"Periodic region probe failed: {e}")
+
+        self._thread = threading.Thread(target=run, name="murf-region-probe", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop periodic probing."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
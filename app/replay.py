@@ -0,0 +1,445 @@
+"""
+Session record/replay: capture every provider exchange of a run and serve it back.
+
+SessionRecorder hooks the real clients and stores, per turn, the input
+WAV, the Deepgram response, each OpenAI request and response, and every
+Murf stream with the arrival time of each chunk. SessionArchive keeps all
+of it in one deflated zip (a JSON manifest plus the audio blobs).
+
+ReplayServer answers the same API paths from an archive, waiting the
+recorded latencies and pacing Murf chunks as they originally arrived
+(optionally sped up), so a recorded session can be run again through the
+unmodified cli_runner pipeline with no network, and two builds can be
+compared on identical provider behaviour.
+"""
+
+import io
+import json
+import logging
+import os
+import threading
+import time
+import zipfile
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .audio_io import AudioSource
+from .utils.pcm import read_wav
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_VERSION = 1
+MANIFEST = "manifest.json"
+# Provider endpoints by the last part of their request path
+ENDPOINTS = ("listen", "chat/completions", "responses", "speech/stream")
+
+
+def endpoint(path: str) -> Optional[str]:
+    """Return which provider endpoint a request path is for, or None."""
+    path = path.split("?")[0].rstrip("/")
+    return next((name for name in ENDPOINTS if path.endswith("/" + name)), None)
+
+
+class SessionArchive:
+    """
+    Inputs and provider exchanges of one recorded session.
+
+    Attributes:
+        settings: Configuration the session was recorded with
+        inputs: Input WAV of every turn, in order
+        deepgram: Deepgram responses ({turn, status, latency, request_bytes, body})
+        openai: OpenAI exchanges ({turn, endpoint, status, latency, request, response})
+        murf: Murf streams ({turn, text, chunks: [[offset, length], ...], audio})
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None) -> None:
+        self.settings: Dict[str, Any] = dict(settings or {})
+        self.inputs: List[bytes] = []
+        self.deepgram: List[Dict[str, Any]] = []
+        self.openai: List[Dict[str, Any]] = []
+        self.murf: List[Dict[str, Any]] = []
+
+    def save(self, path: str) -> int:
+        """
+        Write the archive as a zip file.
+
+        Returns:
+            Size of the file in bytes
+        """
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+            turns = []
+            for index, wav in enumerate(self.inputs, 1):
+                name = f"inputs/{index:04d}.wav"
+                zf.writestr(name, wav)
+                turns.append({"turn": index, "input": name})
+            murf = []
+            for index, entry in enumerate(self.murf, 1):
+                name = f"murf/{index:04d}.pcm"
+                zf.writestr(name, entry["audio"])
+                murf.append({**entry, "audio": name})
+            manifest = {
+                "version": ARCHIVE_VERSION,
+                "settings": self.settings,
+                "turns": turns,
+                "deepgram": self.deepgram,
+                "openai": self.openai,
+                "murf": murf,
+            }
+            zf.writestr(MANIFEST, json.dumps(manifest, ensure_ascii=False))
+        data = buf.getvalue()
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return len(data)
+
+    @classmethod
+    def load(cls, path: str) -> "SessionArchive":
+        """
+        Read an archive written by save().
+
+        Raises:
+            ValueError: The file is not a session archive of a known version
+        """
+        try:
+            with zipfile.ZipFile(path) as zf:
+                manifest = json.loads(zf.read(MANIFEST))
+                if manifest.get("version") != ARCHIVE_VERSION:
+                    raise ValueError(f"Unsupported archive version {manifest.get('version')}")
+                archive = cls(manifest.get("settings"))
+                archive.inputs = [zf.read(t["input"]) for t in manifest["turns"]]
+                archive.deepgram = manifest["deepgram"]
+                archive.openai = manifest["openai"]
+                archive.murf = [{**m, "audio": zf.read(m["audio"])} for m in manifest["murf"]]
+        except (zipfile.BadZipFile, KeyError) as e:
+            raise ValueError(f"Not a session archive: {path}: {e}")
+        return archive
+
+    def summary(self) -> Dict[str, int]:
+        """Return the number of turns and of recorded calls per provider."""
+        return {
+            "turns": len(self.inputs),
+            "deepgram": len(self.deepgram),
+            "openai": len(self.openai),
+            "murf": len(self.murf),
+            "murf_chunks": sum(len(m["chunks"]) for m in self.murf),
+        }
+
+
+class SessionRecorder:
+    """
+    Records a live session into a SessionArchive.
+
+    Deepgram responses are captured with a requests response hook, OpenAI
+    exchanges with httpx event hooks, and Murf streams by wrapping the TTS
+    client's stream opener so each chunk is timestamped as it arrives.
+    Calls are attributed to the turn whose input was recorded last (turn
+    0 is anything before the first input, such as filler warm-up).
+
+    Args:
+        path: Archive file written by close()
+        settings: Extra configuration to store with the session
+    """
+
+    def __init__(self, path: str, settings: Optional[Dict[str, Any]] = None) -> None:
+        self.path = path
+        self.archive = SessionArchive(settings)
+        self.turn = 0
+        self._lock = threading.Lock()
+
+    def attach(self, asr: Any = None, llm: Any = None, tts: Any = None) -> None:
+        """Start recording the calls of the given clients."""
+        if asr is not None:
+            asr.session.hooks["response"].append(self._on_deepgram)
+        if llm is not None:
+            llm.http_client.event_hooks["response"].append(self._on_openai)
+            self.archive.settings.update(state_mode=llm.state_mode, model=llm.model)
+        if tts is not None:
+            open_stream = tts._open_stream
+
+            def recorded(client: Any, text: str) -> Iterator[bytes]:
+                return self._record_stream(text, time.perf_counter(), open_stream(client, text))
+
+            tts._open_stream = recorded
+
+    def wrap_source(self, source: AudioSource) -> AudioSource:
+        """Return a source that records every utterance before passing it on."""
+        return RecordingSource(source, self)
+
+    def add_input(self, wav: bytes) -> None:
+        """Store a turn's input and attribute the calls that follow to it."""
+        with self._lock:
+            self.archive.inputs.append(bytes(wav))
+            self.turn = len(self.archive.inputs)
+
+    def _on_deepgram(self, resp: Any, *args: Any, **kwargs: Any) -> None:
+        if endpoint(resp.request.url) != "listen":
+            return
+        entry = {
+            "turn": self.turn,
+            "status": resp.status_code,
+            "latency": resp.elapsed.total_seconds(),
+            "request_bytes": len(resp.request.body or b""),
+            "body": resp.text,
+        }
+        with self._lock:
+            self.archive.deepgram.append(entry)
+
+    def _on_openai(self, response: Any) -> None:
+        name = endpoint(response.request.url.path)
+        if name is None:
+            return
+        response.read()
+        entry = {
+            "turn": self.turn,
+            "endpoint": name,
+            "status": response.status_code,
+            "latency": response.elapsed.total_seconds(),
+            "request": response.request.content.decode("utf-8"),
+            "response": response.text,
+        }
+        with self._lock:
+            self.archive.openai.append(entry)
+
+    def _record_stream(self, text: str, start: float, stream: Iterable[bytes]) -> Iterator[bytes]:
+        turn = self.turn
+        chunks: List[List[float]] = []
+        audio = bytearray()
+        try:
+            for chunk in stream:
+                chunks.append([round(time.perf_counter() - start, 6), len(chunk)])
+                audio += chunk
+                yield chunk
+        finally:
+            entry = {"turn": turn, "text": text, "chunks": chunks, "audio": bytes(audio)}
+            with self._lock:
+                self.archive.murf.append(entry)
+
+    def close(self) -> int:
+        """Write the archive; returns its size in bytes."""
+        with self._lock:
+            size = self.archive.save(self.path)
+        logger.info(f"Recorded session to {self.path} ({size} bytes): {self.archive.summary()}")
+        return size
+
+
+class RecordingSource(AudioSource):
+    """Passes utterances through from another source, adding each to a recorder."""
+
+    def __init__(self, source: AudioSource, recorder: SessionRecorder) -> None:
+        super().__init__(source.sample_rate, source.channels)
+        self.source = source
+        self.recorder = recorder
+        self.interactive = source.interactive
+        self.hands_free = source.hands_free
+
+    @property  # type: ignore[override]
+    def exhausted(self) -> bool:
+        return self.source.exhausted
+
+    @exhausted.setter
+    def exhausted(self, value: bool) -> None:
+        pass
+
+    def record(self) -> Optional[bytes]:
+        wav = self.source.record()
+        if wav:
+            self.recorder.add_input(wav)
+        return wav
+
+    def close(self) -> None:
+        self.source.close()
+
+
+class ArchiveSource(AudioSource):
+    """Replays the recorded inputs of an archive, one per turn."""
+
+    def __init__(self, archive: SessionArchive) -> None:
+        super().__init__(archive.settings.get("sample_rate", 16000))
+        self.inputs = list(archive.inputs)
+        self._next = 0
+        self.exhausted = not self.inputs
+
+    def record(self) -> Optional[bytes]:
+        if self._next >= len(self.inputs):
+            self.exhausted = True
+            return None
+        data = self.inputs[self._next]
+        self._next += 1
+        self.exhausted = self._next >= len(self.inputs)
+        _, self.sample_rate, self.channels, _ = read_wav(data)
+        return data
+
+
+class ReplayServer:
+    """
+    Serves an archive's recorded provider responses on 127.0.0.1.
+
+    Deepgram and OpenAI calls are answered in recorded order (per endpoint)
+    after their recorded latency. Murf streams are matched by text, falling
+    back to the next unused stream, and sent chunk by chunk at their
+    recorded offsets. Requests that differ from the recording are still
+    answered and counted as mismatches.
+
+    Args:
+        archive: Recorded session
+        speed: Playback speed for latencies and chunk pacing (0 serves without waiting)
+    """
+
+    def __init__(self, archive: SessionArchive, speed: float = 1.0) -> None:
+        self.archive = archive
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[Dict[str, Any]]] = {"listen": deque(archive.deepgram)}
+        for name in ("chat/completions", "responses"):
+            self._queues[name] = deque(e for e in archive.openai if e["endpoint"] == name)
+        self._murf_unused = list(range(len(archive.murf)))
+        self.served = {name: 0 for name in ENDPOINTS}
+        self.mismatches = 0
+        self.missing = 0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def urls(self) -> Dict[str, str]:
+        """Return the base_url to give each client."""
+        return {
+            "deepgram": f"{self.base_url}/v1",
+            "openai": f"{self.base_url}/v1",
+            "murf": self.base_url,
+        }
+
+    def start(self) -> "ReplayServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return calls served per endpoint, mismatched requests and unanswerable ones."""
+        with self._lock:
+            return {
+                "served": dict(self.served),
+                "mismatches": self.mismatches,
+                "missing": self.missing,
+            }
+
+    def _wait(self, seconds: float) -> None:
+        if self.speed > 0 and seconds > 0:
+            time.sleep(seconds / self.speed)
+
+    def _next(self, name: str, body: bytes) -> Optional[Dict[str, Any]]:
+        """Take the next recorded exchange for an endpoint, checking the request against it."""
+        with self._lock:
+            queue = self._queues[name]
+            if not queue:
+                self.missing += 1
+                return None
+            entry = queue.popleft()
+            self.served[name] += 1
+            if name == "listen":
+                matched = entry.get("request_bytes") == len(body)
+            else:
+                try:
+                    matched = json.loads(body or b"null") == json.loads(entry["request"])
+                except ValueError:
+                    matched = False
+            self.mismatches += not matched
+        return entry
+
+    def _next_stream(self, text: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if not self._murf_unused:
+                self.missing += 1
+                return None
+            index = next(
+                (i for i in self._murf_unused if self.archive.murf[i]["text"] == text), None
+            )
+            if index is None:
+                self.mismatches += 1
+                index = self._murf_unused[0]
+            self._murf_unused.remove(index)
+            self.served["speech/stream"] += 1
+        return self.archive.murf[index]
+
+    def _chunks(self, entry: Dict[str, Any]) -> Iterator[Tuple[float, bytes]]:
+        """Yield (offset, chunk) pairs of a recorded stream."""
+        audio = entry["audio"]
+        pos = 0
+        for offset, length in entry["chunks"]:
+            yield offset, audio[pos : pos + length]
+            pos += length
+
+    def _handler(self) -> type:
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                start = time.perf_counter()
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                name = endpoint(self.path)
+                if name == "speech/stream":
+                    self._stream(start, body)
+                elif name is not None:
+                    entry = replay._next(name, body)
+                    if entry is None:
+                        self._missing()
+                        return
+                    replay._wait(entry["latency"])
+                    data = entry["body" if name == "listen" else "response"].encode("utf-8")
+                    self._send(entry["status"], "application/json", data)
+                else:
+                    self._send(404, "application/json", b'{"error": {"message": "Not found"}}')
+
+            def _stream(self, start: float, body: bytes) -> None:
+                try:
+                    text = json.loads(body or b"{}").get("text", "")
+                except ValueError:
+                    text = ""
+                entry = replay._next_stream(text)
+                if entry is None:
+                    self._missing()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/pcm")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for offset, chunk in replay._chunks(entry):
+                    if replay.speed > 0:
+                        delay = start + offset / replay.speed - time.perf_counter()
+                        if delay > 0:
+                            time.sleep(delay)
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    self.wfile.flush()
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _missing(self) -> None:
+                logger.warning(f"Replay has no recorded response left for {self.path}")
+                self._send(404, "application/json", b'{"error": {"message": "Not recorded"}}')
+
+            def _send(self, status: int, content_type: str, data: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
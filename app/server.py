@@ -0,0 +1,611 @@
+"""
+Prefork HTTP server: N worker processes on one port with per-session affinity.
+
+The dispatcher process owns the listening socket. For each connection it
+peeks at the request line (MSG_PEEK, nothing is consumed), routes the
+session ID through a consistent-hash ring and passes the socket itself to
+that worker over a Unix socket (SCM_RIGHTS). The worker reads the request
+and answers on the same connection, so audio never passes through the
+dispatcher. Each worker builds its Deepgram, OpenAI and Murf clients once at
+startup and keeps the conversation of every session routed to it.
+
+SO_REUSEPORT would also put N processes on one port, but the kernel picks
+the process from the connection's addresses and cannot see session IDs.
+
+API:
+    POST   /sessions/<id>/turn    WAV utterance -> WAV reply (X-Transcript, X-Reply headers);
+                                  μ-law WAVs both ways with AUDIO_PROFILE=telephony
+    POST   /sessions/<id>/reply   {"text": ...} -> {"reply": ...}
+    DELETE /sessions/<id>         forget the conversation
+    GET    /sessions/<id>/ws      WebSocket voice stream (protocol in app/voice_stream.py)
+    GET    /web/<file>            the browser voice client (web/voice.html)
+    GET    /health                worker index, pid, session counts and admission queues
+
+Run: python -m app.server [--host H] [--port P] [--workers N]
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote
+
+from .agent import VoiceAgent
+from .asr_deepgram import DeepgramASRClient
+from .config import (
+    AUDIO_ENCODING,
+    CHANNELS,
+    LOG_LEVEL,
+    SAMPLE_RATE,
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_WORKERS,
+    SESSION_DB_PATH,
+)
+from .flight_recorder import enable_flight_recorder, flight
+from .llm_openai import LLMClient
+from .session_router import ConsistentHashRouter
+from .session_store import SQLiteSessionStore
+from .tts_murf import MurfTTSClient
+from .utils import g711, pcm
+from .voice_stream import VoiceStream
+from .websocket import upgrade
+
+logger = logging.getLogger(__name__)
+
+# Conversations each worker keeps in memory; older ones are resumed from the store
+MAX_RESIDENT_SESSIONS = 1024
+# Largest request line the dispatcher will peek at
+MAX_REQUEST_LINE = 8192
+# Seconds a client has to send its request line before the dispatcher drops it
+PEEK_TIMEOUT = 5.0
+# Threads peeking at new connections, so a slow client never blocks accept()
+ROUTER_THREADS = 8
+WORKER_START_TIMEOUT = 60.0
+MAX_BODY_BYTES = 16 * 1024 * 1024
+# Static files of the browser client, served under /web/
+WEB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web")
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "text/javascript",
+    ".mjs": "text/javascript",
+    ".css": "text/css",
+}
+
+
+def session_id_from_path(path: str) -> Optional[str]:
+    """Return the session ID of a /sessions/<id>[/...] path, or None."""
+    parts = path.split("?", 1)[0].split("/")
+    if len(parts) >= 3 and parts[1] == "sessions" and parts[2]:
+        return unquote(parts[2])
+    return None
+
+
+class SessionWorker:
+    """Pre-initialized provider clients and the conversations pinned to one worker."""
+
+    def __init__(
+        self,
+        index: int,
+        asr: Any,
+        tts: Any,
+        llm: Any,
+        store: Any = None,
+        max_sessions: int = MAX_RESIDENT_SESSIONS,
+    ) -> None:
+        """
+        Args:
+            index: Worker number, as routed to by the dispatcher
+            asr: DeepgramASRClient shared by all sessions of this worker
+            tts: MurfTTSClient shared by all sessions of this worker
+            llm: LLMClient shared by all sessions of this worker
+            store: Optional SessionStore; evicted sessions resume from it
+            max_sessions: Conversations kept in memory
+        """
+        self.index = index
+        self.asr = asr
+        self.tts = tts
+        self.llm = llm
+        self.store = store
+        self.max_sessions = max_sessions
+        self._agents: "OrderedDict[str, Any]" = OrderedDict()
+        self._session_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.evictions = 0
+        # Flight-recorder turn numbers, unique across concurrent turns
+        self._turn_ids = itertools.count(1)
+
+    def agent(self, session_id: str) -> Any:
+        """Return the session's VoiceAgent, creating (or resuming) it on first use."""
+        with self._lock:
+            agent = self._agents.get(session_id)
+            if agent is not None:
+                self._agents.move_to_end(session_id)
+                return agent
+        agent = VoiceAgent(store=self.store, session_id=session_id, llm=self.llm)
+        with self._lock:
+            agent = self._agents.setdefault(session_id, agent)
+            if len(self._agents) > self.max_sessions:
+                evicted, _ = self._agents.popitem(last=False)
+                self._session_locks.pop(evicted, None)
+                self.evictions += 1
+        return agent
+
+    def _session_lock(self, session_id: str) -> threading.Lock:
+        with self._lock:
+            return self._session_locks.setdefault(session_id, threading.Lock())
+
+    def reply(self, session_id: str, text: str) -> Optional[str]:
+        """Run one text turn; turns of the same session are serialized."""
+        with self._session_lock(session_id):
+            answer = self.agent(session_id).reply(text)
+        with self._lock:
+            self.turns += 1
+        return answer
+
+    def next_turn_id(self) -> int:
+        """Allocate a flight-recorder turn number, unique within this worker process."""
+        with self._lock:
+            return next(self._turn_ids)
+
+    def turn(self, session_id: str, wav: bytes) -> Tuple[Optional[str], Optional[str], bytes]:
+        """
+        Run one spoken turn.
+
+        Returns:
+            (transcript, reply, reply PCM); later items are None/empty when a step fails
+        """
+        with flight.turn(self.next_turn_id(), session=session_id, worker=self.index):
+            transcript = self.asr.transcribe_wav(wav)
+            flight.mark("asr")
+            if not transcript:
+                return None, None, b""
+            answer = self.reply(session_id, transcript)
+            flight.mark("llm")
+            if not answer:
+                return transcript, None, b""
+            chunks = self.tts.stream_tts(answer)
+            audio = b"".join(chunks or ())
+            flight.mark("tts")
+            return transcript, answer, audio
+
+    def reset(self, session_id: str) -> None:
+        """Forget a session in memory and in the store."""
+        with self._session_lock(session_id):
+            self.agent(session_id).reset_conversation()
+        with self._lock:
+            self._agents.pop(session_id, None)
+            self._session_locks.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return session and turn counts, and admission queue stats per provider."""
+        admission = {
+            client.admission.name: client.admission.stats()
+            for client in (self.asr, self.llm)
+            if getattr(client, "admission", None) is not None
+        }
+        with self._lock:
+            return {
+                "worker": self.index,
+                "pid": os.getpid(),
+                "sessions": len(self._agents),
+                "turns": self.turns,
+                "evictions": self.evictions,
+                "admission": admission,
+            }
+
+
+def build_worker(index: int) -> SessionWorker:
+    """Default worker factory: real provider clients configured from the environment."""
+    enable_flight_recorder()
+    store = SQLiteSessionStore(SESSION_DB_PATH) if SESSION_DB_PATH else None
+    return SessionWorker(index, DeepgramASRClient(), MurfTTSClient(), LLMClient(), store)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_WorkerServer"
+
+    def do_GET(self) -> None:
+        path = self.path.split("?", 1)[0]
+        if path == "/health":
+            self._send_json(200, self.server.worker.stats())
+        elif path.startswith("/web/"):
+            self._send_static(path[len("/web/") :])
+        elif path.rstrip("/").endswith("/ws") and session_id_from_path(path):
+            session_id = self._owned_session()
+            if session_id is None:
+                return
+            ws = upgrade(self)
+            if ws is not None:
+                VoiceStream(self.server.worker, session_id, ws).run()
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def _send_static(self, name: str) -> None:
+        content_type = CONTENT_TYPES.get(os.path.splitext(name)[1])
+        path = os.path.join(WEB_DIR, name)
+        # Only plain files directly inside web/ are served
+        if content_type is None or os.path.basename(name) != name or not os.path.isfile(path):
+            self._send_json(404, {"error": "not found"})
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self) -> None:
+        session_id = self._owned_session()
+        if session_id is None:
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, {"error": "request body too large"})
+            return
+        body = self.rfile.read(length)
+        action = self.path.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1]
+        worker = self.server.worker
+        try:
+            if action == "reply":
+                text = json.loads(body or b"{}").get("text", "")
+                answer = worker.reply(session_id, text)
+                if answer is None:
+                    self._send_json(502, {"error": "no reply"})
+                else:
+                    self._send_json(200, {"reply": answer})
+            elif action == "turn":
+                transcript, answer, audio = worker.turn(session_id, body)
+                if not audio:
+                    self._send_json(
+                        422 if transcript is None else 502,
+                        {"transcript": transcript, "reply": answer},
+                    )
+                    return
+                if AUDIO_ENCODING == "mulaw":
+                    audio = g711.ulaw_encode(audio)
+                data = pcm.to_wav(audio, SAMPLE_RATE, CHANNELS, AUDIO_ENCODING)
+                self.send_response(200)
+                self.send_header("Content-Type", "audio/wav")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("X-Transcript", quote(transcript or ""))
+                self.send_header("X-Reply", quote(answer or ""))
+                self.end_headers()
+                self.wfile.write(data)
+            else:
+                self._send_json(404, {"error": "not found"})
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+        except Exception as e:
+            logger.error(f"Worker {worker.index} failed on {self.path}: {e}", exc_info=True)
+            self._send_json(500, {"error": "internal error"})
+
+    def do_DELETE(self) -> None:
+        session_id = self._owned_session()
+        if session_id is not None:
+            self.server.worker.reset(session_id)
+            self._send_json(200, {"reset": session_id})
+
+    def _owned_session(self) -> Optional[str]:
+        """
+        Return the request's session ID if this worker owns it.
+
+        A keep-alive connection stays with the worker of its first request;
+        a later request for a session owned elsewhere gets 421 and the
+        connection is closed so the client's retry is routed afresh.
+        """
+        session_id = session_id_from_path(self.path)
+        if session_id is None:
+            self.close_connection = True
+            self._send_json(404, {"error": "not found"})
+            return None
+        if self.server.router.route(session_id) != self.server.worker.index:
+            self.close_connection = True
+            self._send_json(421, {"error": "session belongs to another worker"})
+            return None
+        return session_id
+
+    def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"worker {self.server.worker.index}: {format % args}")
+
+
+class _WorkerServer(socketserver.ThreadingMixIn, socketserver.BaseServer):
+    """Serves connections handed over by the dispatcher; it never listens itself."""
+
+    daemon_threads = True
+
+    def __init__(self, worker: SessionWorker, router: ConsistentHashRouter) -> None:
+        super().__init__(("", 0), _Handler)
+        self.worker = worker
+        self.router = router
+
+    def shutdown_request(self, request: socket.socket) -> None:
+        try:
+            request.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+        request.close()
+
+
+def _worker_main(
+    index: int,
+    count: int,
+    channel: socket.socket,
+    factory: Callable[[int], SessionWorker],
+    log_level: str,
+) -> None:
+    # Ctrl-C reaches the whole process group; the dispatcher decides when workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(
+        level=log_level,
+        format=f"%(asctime)s - worker{index} - %(name)s - %(levelname)s - %(message)s",
+    )
+    server = _WorkerServer(factory(index), ConsistentHashRouter(range(count)))
+    channel.sendall(b"R")
+    logger.debug(f"Worker {index} ready (pid {os.getpid()})")
+    while True:
+        try:
+            _, fds, _, _ = socket.recv_fds(channel, 1, 1)
+        except OSError:
+            break
+        if not fds:
+            break
+        conn = socket.socket(fileno=fds[0])
+        try:
+            address = conn.getpeername()
+        except OSError:
+            conn.close()
+            continue
+        server.process_request(conn, address)
+    # Slow turns still waiting for their following turns
+    flight.flush()
+
+
+class PreforkServer:
+    """Dispatcher that spreads connections over worker processes by session ID."""
+
+    def __init__(
+        self,
+        host: str = SERVER_HOST,
+        port: int = SERVER_PORT,
+        workers: int = 0,
+        factory: Callable[[int], SessionWorker] = build_worker,
+    ) -> None:
+        """
+        Args:
+            host: Address to listen on
+            port: Port to listen on (0 picks a free one)
+            workers: Worker processes (0 for one per CPU)
+            factory: Picklable callable building a worker's SessionWorker from its index
+        """
+        self.host = host
+        self.port = port
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.factory = factory
+        self.router = ConsistentHashRouter(range(self.workers))
+        self._ctx = multiprocessing.get_context("spawn")
+        self._procs: List[Any] = [None] * self.workers
+        self._channels: List[Optional[socket.socket]] = [None] * self.workers
+        self._channel_locks = [threading.Lock() for _ in range(self.workers)]
+        self._listener: Optional[socket.socket] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._stop = threading.Event()
+        self._round_robin = itertools.count()
+        self.routed = [0] * self.workers
+        self.restarts = 0
+        self.dropped = 0
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._listener.getsockname()[:2] if self._listener else (self.host, self.port)
+
+    def start(self) -> "PreforkServer":
+        """Bind the port and start every worker, returning once all are ready."""
+        self._listener = socket.create_server((self.host, self.port), backlog=1024)
+        self._listener.settimeout(0.5)
+        for index in range(self.workers):
+            self._spawn(index)
+        for index in range(self.workers):
+            self._wait_ready(index)
+        self._pool = ThreadPoolExecutor(ROUTER_THREADS, thread_name_prefix="dispatch")
+        host, port = self.address
+        logger.info(f"Serving on http://{host}:{port} with {self.workers} workers")
+        return self
+
+    def _spawn(self, index: int) -> None:
+        parent, child = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        level = logging.getLevelName(logging.getLogger().getEffectiveLevel())
+        proc = self._ctx.Process(
+            target=_worker_main,
+            args=(index, self.workers, child, self.factory, level),
+            name=f"voiceflow-worker-{index}",
+            daemon=True,
+        )
+        proc.start()
+        child.close()
+        old = self._channels[index]
+        self._channels[index] = parent
+        self._procs[index] = proc
+        if old is not None:
+            old.close()
+
+    def _wait_ready(self, index: int) -> None:
+        channel = self._channels[index]
+        channel.settimeout(WORKER_START_TIMEOUT)
+        try:
+            ready = channel.recv(1)
+        except socket.timeout:
+            ready = b""
+        channel.settimeout(None)
+        if ready != b"R":
+            self.shutdown()
+            raise RuntimeError(f"Worker {index} failed to start")
+
+    def serve_forever(self) -> None:
+        """Accept and dispatch connections until shutdown() is called."""
+        if self._listener is None:
+            self.start()
+        last_check = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._listener.accept()
+            except socket.timeout:
+                conn = None
+            except OSError:
+                if self._stop.is_set():
+                    break
+                raise
+            if conn is not None:
+                try:
+                    self._pool.submit(self._dispatch, conn)
+                except RuntimeError:  # shutdown() raced the accept
+                    conn.close()
+                    break
+            if time.monotonic() - last_check >= 1.0:
+                self._restart_dead()
+                last_check = time.monotonic()
+
+    def _restart_dead(self) -> None:
+        for index, proc in enumerate(self._procs):
+            if proc is not None and not proc.is_alive() and not self._stop.is_set():
+                logger.warning(f"Worker {index} exited ({proc.exitcode}); restarting")
+                with self._channel_locks[index]:
+                    self._spawn(index)
+                    self._wait_ready(index)
+                self.restarts += 1
+
+    def _peek_request_line(self, conn: socket.socket) -> Optional[bytes]:
+        deadline = time.monotonic() + PEEK_TIMEOUT
+        conn.settimeout(PEEK_TIMEOUT)
+        while True:
+            data = conn.recv(MAX_REQUEST_LINE, socket.MSG_PEEK)
+            if not data:
+                return None
+            if b"\n" in data or len(data) >= MAX_REQUEST_LINE:
+                return data.split(b"\n", 1)[0]
+            if time.monotonic() > deadline:
+                return None
+            time.sleep(0.001)
+
+    def route(self, line: bytes) -> int:
+        """Return the worker for a request line; session-less requests go round robin."""
+        parts = line.split()
+        path = parts[1].decode("latin-1") if len(parts) >= 2 else ""
+        session_id = session_id_from_path(path)
+        if session_id is None:
+            return next(self._round_robin) % self.workers
+        return self.router.route(session_id)
+
+    def _dispatch(self, conn: socket.socket) -> None:
+        try:
+            line = self._peek_request_line(conn)
+            if line is None:
+                self.dropped += 1
+                return
+            index = self.route(line)
+            conn.setblocking(True)
+            with self._channel_locks[index]:
+                socket.send_fds(self._channels[index], [b"C"], [conn.fileno()])
+                self.routed[index] += 1
+        except OSError as e:
+            logger.warning(f"Dropped connection before dispatch: {e}")
+            self.dropped += 1
+        finally:
+            # The worker holds its own descriptor; closing ours does not end the connection
+            conn.close()
+
+    def shutdown(self) -> None:
+        """Stop accepting, close the port and stop every worker."""
+        self._stop.set()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+        if self._listener is not None:
+            self._listener.close()
+        for channel in self._channels:
+            if channel is not None:
+                channel.close()
+        for proc in self._procs:
+            if proc is not None:
+                proc.join(timeout=5)
+                if proc.is_alive():
+                    proc.terminate()
+                    proc.join()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return connections routed per worker, drops and worker restarts."""
+        return {
+            "workers": self.workers,
+            "routed": list(self.routed),
+            "dropped": self.dropped,
+            "restarts": self.restarts,
+        }
+
+    def __enter__(self) -> "PreforkServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.shutdown()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse server flags."""
+    parser = argparse.ArgumentParser(prog="voiceflow-server", description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default=SERVER_HOST, help=f"(default: {SERVER_HOST})")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help=f"(default: {SERVER_PORT})")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=SERVER_WORKERS,
+        help="worker processes, 0 for one per CPU (default: SERVER_WORKERS)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the prefork server until interrupted."""
+    args = parse_args(argv)
+    logging.basicConfig(
+        level=LOG_LEVEL,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+    server = PreforkServer(args.host, args.port, args.workers)
+    try:
+        server.start()
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Server interrupted")
+    finally:
+        logger.info(f"Dispatcher stats: {server.stats()}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
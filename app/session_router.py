@@ -0,0 +1,62 @@
+"""Consistent-hash routing of session IDs to worker processes."""
+
+import bisect
+import hashlib
+import threading
+from typing import Dict, Iterable, List
+
+# Points each worker gets on the ring; more points even out the share per worker
+DEFAULT_REPLICAS = 128
+
+
+def _hash(key: str) -> int:
+    # Stable across processes and runs, unlike the built-in hash()
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRouter:
+    """
+    Pins keys to nodes on a hash ring.
+
+    Adding or removing a node only moves the keys that land on its points,
+    roughly 1/N of them, so the other workers keep their sessions.
+    """
+
+    def __init__(self, nodes: Iterable[int] = (), replicas: int = DEFAULT_REPLICAS) -> None:
+        """
+        Args:
+            nodes: Initial node IDs (worker indexes)
+            replicas: Ring points per node
+        """
+        self.replicas = replicas
+        self._lock = threading.Lock()
+        self._points: List[int] = []
+        self._owners: Dict[int, int] = {}
+        for node in nodes:
+            self.add(node)
+
+    @property
+    def nodes(self) -> List[int]:
+        with self._lock:
+            return sorted(set(self._owners.values()))
+
+    def add(self, node: int) -> None:
+        with self._lock:
+            for i in range(self.replicas):
+                point = _hash(f"{node}#{i}")
+                if point not in self._owners:
+                    bisect.insort(self._points, point)
+                    self._owners[point] = node
+
+    def remove(self, node: int) -> None:
+        with self._lock:
+            self._points = [p for p in self._points if self._owners[p] != node]
+            self._owners = {p: n for p, n in self._owners.items() if n != node}
+
+    def route(self, key: str) -> int:
+        """Return the node owning `key`."""
+        with self._lock:
+            if not self._points:
+                raise LookupError("No nodes on the ring")
+            index = bisect.bisect(self._points, _hash(key)) % len(self._points)
+            return self._owners[self._points[index]]
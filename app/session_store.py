@@ -0,0 +1,204 @@
+"""Persistent conversation storage with idle spill and fast resume."""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .turn_store import Role, TurnStore
+
+logger = logging.getLogger(__name__)
+
+TurnRecord = Tuple[Role, str]
+
+
+class SessionStore:
+    """Interface for durable per-session turn logs."""
+
+    def append(self, session_id: str, turns: Sequence[TurnRecord]) -> None:
+        """Durably append turns to a session, in order."""
+        raise NotImplementedError
+
+    def load(self, session_id: str, limit: Optional[int] = None) -> List[TurnRecord]:
+        """Return a session's turns oldest first, optionally only the last `limit`."""
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        """Forget a session entirely."""
+        raise NotImplementedError
+
+    def size_bytes(self) -> int:
+        """On-disk size of the store."""
+        return 0
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Append-only turn log in SQLite.
+
+    Turns are keyed by (session_id, seq) so loading the recent tail of one
+    session is a single index range scan regardless of how many sessions the
+    file holds. WAL mode keeps per-turn commits cheap.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS turns ("
+            " session_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " role INTEGER NOT NULL,"
+            " content TEXT NOT NULL,"
+            " PRIMARY KEY (session_id, seq)"
+            ") WITHOUT ROWID"
+        )
+        logger.debug(f"SQLiteSessionStore opened at {path}")
+
+    def append(self, session_id: str, turns: Sequence[TurnRecord]) -> None:
+        if not turns:
+            return
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute("BEGIN")
+            try:
+                row = cur.execute(
+                    "SELECT MAX(seq) FROM turns WHERE session_id = ?", (session_id,)
+                ).fetchone()
+                seq = (row[0] or 0) + 1
+                cur.executemany(
+                    "INSERT INTO turns (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                    [
+                        (session_id, seq + i, int(role), content)
+                        for i, (role, content) in enumerate(turns)
+                    ],
+                )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    def load(self, session_id: str, limit: Optional[int] = None) -> List[TurnRecord]:
+        with self._lock:
+            if limit is None:
+                rows = self._conn.execute(
+                    "SELECT role, content FROM turns WHERE session_id = ? ORDER BY seq",
+                    (session_id,),
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT role, content FROM turns WHERE session_id = ?"
+                    " ORDER BY seq DESC LIMIT ?",
+                    (session_id, limit),
+                ).fetchall()
+                rows.reverse()
+        return [(Role(role), content) for role, content in rows]
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+
+    def size_bytes(self) -> int:
+        if self.path == ":memory:":
+            return 0
+        return sum(
+            os.path.getsize(p) for p in (self.path, self.path + "-wal") if os.path.exists(p)
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SessionCache:
+    """
+    Resident TurnStores backed by a SessionStore.
+
+    Writes go through to the store as they happen, so a resident session can be
+    dropped from memory at any time; `spill_idle` does that for sessions not
+    touched recently and `get` transparently reloads them.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        system_prompt: str,
+        max_turns: Optional[int] = None,
+        compress_after: Optional[int] = None,
+    ) -> None:
+        self.store = store
+        self.system_prompt = system_prompt
+        self.max_turns = max_turns
+        self.compress_after = compress_after
+        self._lock = threading.Lock()
+        self._resident: Dict[str, TurnStore] = {}
+        self._last_used: Dict[str, float] = {}
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._resident
+
+    def __len__(self) -> int:
+        return len(self._resident)
+
+    def get(self, session_id: str) -> TurnStore:
+        """Return the session's turns, loading them from the store if spilled."""
+        with self._lock:
+            turns = self._resident.get(session_id)
+            if turns is not None:
+                self._last_used[session_id] = time.monotonic()
+                return turns
+
+        # Store I/O runs unlocked so lookups of resident sessions are not held up
+        loaded = TurnStore(self.system_prompt, compress_after=self.compress_after)
+        for role, content in self.store.load(session_id, limit=self.max_turns):
+            loaded.append(role, content)
+
+        with self._lock:
+            turns = self._resident.get(session_id)
+            if turns is None:
+                turns = self._resident[session_id] = loaded
+                logger.debug(f"Session {session_id} resumed with {len(turns) - 1} turns")
+            self._last_used[session_id] = time.monotonic()
+            return turns
+
+    def append(self, session_id: str, turns: Sequence[TurnRecord]) -> None:
+        """Persist turns and apply them to the resident copy, keeping at most max_turns."""
+        # Load a spilled session before writing, or the reload would already hold these turns
+        resident = self.get(session_id)
+        self.store.append(session_id, turns)
+        for role, content in turns:
+            resident.append(role, content)
+        if self.max_turns is not None:
+            resident.trim(self.max_turns)
+
+    def reset(self, session_id: str) -> None:
+        """Delete a session from memory and from the store."""
+        self.store.delete(session_id)
+        with self._lock:
+            self._resident.pop(session_id, None)
+            self._last_used.pop(session_id, None)
+
+    def spill_idle(self, max_idle: float) -> int:
+        """
+        Drop sessions idle for more than `max_idle` seconds from memory.
+
+        Returns:
+            Number of sessions spilled
+        """
+        cutoff = time.monotonic() - max_idle
+        with self._lock:
+            idle = [sid for sid, used in self._last_used.items() if used < cutoff]
+            for sid in idle:
+                self._resident.pop(sid, None)
+                del self._last_used[sid]
+        if idle:
+            logger.debug(f"Spilled {len(idle)} idle sessions")
+        return len(idle)
@@ -0,0 +1,267 @@
+"""In-flight request coalescing: concurrent identical requests share one upstream call."""
+
+import logging
+import threading
+import weakref
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _Counters:
+    """Request/upstream counters shared by both coalescers."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.upstream_calls = 0
+        self.deduplicated = 0
+
+    def _count(self, leader: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            if leader:
+                self.upstream_calls += 1
+            else:
+                self.deduplicated += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Return request counts; `deduplicated` is the number of upstream calls saved."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "upstream_calls": self.upstream_calls,
+                "deduplicated": self.deduplicated,
+            }
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(_Counters):
+    """Coalesces concurrent calls with the same key into one execution of the function."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Run `fn` unless a call with the same key is already in flight.
+
+        Waiters receive the leader's result, or re-raise its exception.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        self._count(leader)
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+
+class _StreamFlight:
+    """
+    One upstream chunk stream shared by several subscribers.
+
+    Subscribers pull: whoever needs a chunk nobody has fetched yet reads it
+    from upstream while the others wait. Chunks every subscriber has consumed
+    are dropped, so memory is bounded by the slowest subscriber's lag. Once
+    the first chunk has been dropped, new subscribers can no longer join.
+    """
+
+    def __init__(self) -> None:
+        self.cond = threading.Condition()
+        self.opened = threading.Event()
+        self.upstream: Optional[Iterator[bytes]] = None
+        self.chunks: List[bytes] = []
+        self.base = 0
+        self.cursors: Dict[int, int] = {}
+        self.next_id = 0
+        self.fetching = False
+        self.finished = False
+        self.error: Optional[BaseException] = None
+
+    def try_subscribe(self) -> Optional[int]:
+        """Register a subscriber at chunk 0, or return None if that chunk is gone."""
+        with self.cond:
+            if self.base != 0 or self.error is not None:
+                return None
+            sub = self.next_id
+            self.next_id += 1
+            self.cursors[sub] = 0
+            return sub
+
+    def _trim(self) -> None:
+        if not self.cursors:
+            return
+        low = min(self.cursors.values())
+        if low > self.base:
+            del self.chunks[: low - self.base]
+            self.base = low
+
+    def release(self, sub: int, on_exhausted: Callable[[], None]) -> None:
+        """Drop a subscriber's cursor; close upstream if nobody is left to read it."""
+        with self.cond:
+            if self.cursors.pop(sub, None) is None:
+                return
+            self._trim()
+            abandoned = not self.cursors and not self.finished and self.error is None
+        if abandoned:
+            on_exhausted()
+            close = getattr(self.upstream, "close", None)
+            if close:
+                close()
+
+    def iterate(self, sub: int, on_exhausted: Callable[[], None]) -> Iterator[bytes]:
+        try:
+            while True:
+                with self.cond:
+                    while True:
+                        pos = self.cursors[sub]
+                        if pos < self.base + len(self.chunks):
+                            chunk = self.chunks[pos - self.base]
+                            self.cursors[sub] = pos + 1
+                            self._trim()
+                            break
+                        if self.error is not None:
+                            raise self.error
+                        if self.finished:
+                            return
+                        if not self.fetching:
+                            self.fetching = True
+                            chunk = None
+                            break
+                        self.cond.wait()
+
+                if chunk is not None:
+                    yield chunk
+                    continue
+
+                # This subscriber fetches the next chunk for everyone
+                try:
+                    fetched = next(self.upstream, None)  # type: ignore[arg-type]
+                    error = None
+                except Exception as e:
+                    fetched, error = None, e
+                with self.cond:
+                    self.fetching = False
+                    if error is not None:
+                        self.error = error
+                    elif fetched is None:
+                        self.finished = True
+                    else:
+                        self.chunks.append(fetched)
+                    self.cond.notify_all()
+                if fetched is None:
+                    on_exhausted()
+        finally:
+            self.release(sub, on_exhausted)
+
+
+class _Subscription:
+    """
+    A subscriber's chunk iterator.
+
+    Its cursor is registered before the first next(), so a subscription that
+    is dropped without being iterated (or closed) releases the cursor when it
+    is garbage collected; otherwise it would pin every chunk from then on.
+    """
+
+    __slots__ = ("_chunks", "_release", "__weakref__")
+
+    def __init__(self, flight: _StreamFlight, sub: int, on_exhausted: Callable[[], None]) -> None:
+        self._chunks = flight.iterate(sub, on_exhausted)
+        self._release = weakref.finalize(self, flight.release, sub, on_exhausted)
+
+    def __iter__(self) -> "_Subscription":
+        return self
+
+    def __next__(self) -> bytes:
+        return next(self._chunks)
+
+    def close(self) -> None:
+        self._chunks.close()
+        self._release()
+
+
+class StreamCoalescer(_Counters):
+    """
+    Coalesces concurrent identical streaming requests.
+
+    Every caller gets its own iterator over the same upstream chunks as they
+    arrive; only one upstream stream is opened per key while it is joinable.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._flights: Dict[Hashable, _StreamFlight] = {}
+
+    def _retire(self, key: Hashable, flight: _StreamFlight) -> None:
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def stream(
+        self, key: Hashable, open_fn: Callable[[], Optional[Iterable[bytes]]]
+    ) -> Optional[Iterator[bytes]]:
+        """
+        Return an iterator of chunks for `key`, opening upstream only if needed.
+
+        Returns:
+            A per-caller chunk iterator, or None if opening the upstream failed
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            sub = flight.try_subscribe() if flight is not None else None
+            leader = sub is None
+            if leader:
+                flight = self._flights[key] = _StreamFlight()
+                sub = flight.try_subscribe()
+        self._count(leader)
+
+        if leader:
+            try:
+                upstream = open_fn()
+            except Exception as e:
+                logger.error(f"Coalesced stream open failed: {e}")
+                upstream = None
+            if upstream is None:
+                flight.error = RuntimeError("upstream stream could not be opened")
+                self._retire(key, flight)
+            else:
+                flight.upstream = iter(upstream)
+            flight.opened.set()
+        else:
+            flight.opened.wait()
+
+        if flight.upstream is None:
+            with flight.cond:
+                flight.cursors.pop(sub, None)
+            return None
+        return _Subscription(
+            flight, sub, lambda: self._retire(key, flight)  # type: ignore[arg-type]
+        )
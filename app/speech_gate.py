@@ -0,0 +1,105 @@
+"""Pre-ASR stage: trim silence from recordings and skip uploads with no speech."""
+
+import logging
+import threading
+from typing import Dict, Optional
+
+from .dsp import DSPExecutor
+from .utils.pcm import read_wav
+
+logger = logging.getLogger(__name__)
+
+
+class SpeechGate:
+    """
+    Trims leading/trailing silence from WAV recordings before they are uploaded.
+
+    Recordings with no speech are rejected outright, saving the round trip
+    and the billed request. μ-law WAVs are trimmed on their decoded samples
+    and stay μ-law. Input that is not a readable 16-bit PCM or μ-law WAV is
+    passed through untouched. The decoding, trimming and WAV assembly run on
+    `executor`, so a process pool can take them off the calling thread.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.01,
+        pad_ms: int = 200,
+        min_speech_ms: int = 100,
+        executor: Optional[DSPExecutor] = None,
+    ):
+        """
+        Args:
+            threshold: Frame RMS counted as speech, as a fraction of full scale
+            pad_ms: Margin kept around the speech
+            min_speech_ms: Less speech than this counts as silence
+            executor: Where the DSP work runs (default: inline)
+        """
+        self.threshold = threshold
+        self.pad_ms = pad_ms
+        self.min_speech_ms = min_speech_ms
+        self.executor = executor or DSPExecutor()
+        self._lock = threading.Lock()
+        self.recordings = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def prepare(self, wav_bytes: bytes) -> Optional[bytes]:
+        """
+        Return the WAV to upload, or None if it contains no speech.
+        """
+        try:
+            encoding, sample_rate, channels, data = read_wav(wav_bytes)
+        except ValueError as e:
+            logger.debug(f"Speech gate passing audio through unchanged: {e}")
+            return wav_bytes
+        run = self.executor.run
+        if encoding == "mulaw":
+            data = run("ulaw_decode", data)
+
+        speech = run(
+            "trim",
+            data,
+            sample_rate=sample_rate,
+            threshold=self.threshold,
+            pad_ms=self.pad_ms,
+            min_speech_ms=self.min_speech_ms,
+            channels=channels,
+        )
+        if encoding == "mulaw":
+            speech = run("ulaw_encode", speech)
+        result = None
+        if speech:
+            result = run(
+                "wav", speech, sample_rate=sample_rate, channels=channels, encoding=encoding
+            )
+        with self._lock:
+            self.recordings += 1
+            self.bytes_in += len(wav_bytes)
+            if result is None:
+                self.skipped += 1
+            else:
+                self.bytes_out += len(result)
+        if result is None:
+            logger.info("No speech detected; skipping ASR request")
+        else:
+            logger.debug(f"Trimmed recording from {len(wav_bytes)} to {len(result)} bytes")
+        return result
+
+    def close(self) -> None:
+        """Shut down the executor's worker processes, if any."""
+        self.executor.close()
+
+    def stats(self) -> Dict[str, float]:
+        """Return upload bytes and round trips saved by trimming and gating."""
+        with self._lock:
+            saved = self.bytes_in - self.bytes_out
+            return {
+                "recordings": self.recordings,
+                "round_trips_saved": self.skipped,
+                "bytes_in": self.bytes_in,
+                "bytes_uploaded": self.bytes_out,
+                "bytes_saved": saved,
+                "bytes_saved_rate": saved / self.bytes_in if self.bytes_in else 0.0,
+            }
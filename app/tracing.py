@@ -0,0 +1,287 @@
+"""Lightweight trace spans for the turn pipeline, exportable as Chrome trace or OTLP JSON."""
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Keep at most this many finished spans in memory
+MAX_SPANS = 100_000
+SERVICE_NAME = "voiceflow"
+
+
+class Span:
+    """One finished or in-progress span; times are nanoseconds."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start_ns",
+        "end_ns",
+        "cpu_ns",
+        "thread_id",
+        "attrs",
+    )
+
+    def __init__(
+        self, name: str, trace_id: int, span_id: int, parent_id: Optional[int], attrs: Dict
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.start_ns = 0
+        self.end_ns = 0
+        self.cpu_ns = 0
+        self.thread_id = threading.get_ident()
+        self.attrs = attrs
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+
+class _NoopSpan:
+    """Shared context manager returned when tracing is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *exc: Any) -> bool:
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _ActiveSpan:
+    __slots__ = ("tracer", "span", "_cpu_start")
+
+    def __init__(self, tracer: "Tracer", span: Span) -> None:
+        self.tracer = tracer
+        self.span = span
+        self._cpu_start = 0
+
+    def __enter__(self) -> Span:
+        self.tracer._stack().append(self.span)
+        self._cpu_start = time.thread_time_ns()
+        self.span.start_ns = time.time_ns()
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        self.span.end_ns = time.time_ns()
+        self.span.cpu_ns = time.thread_time_ns() - self._cpu_start
+        if exc_type is not None:
+            self.span.attrs["error"] = exc_type.__name__
+        stack = self.tracer._stack()
+        if stack and stack[-1] is self.span:
+            stack.pop()
+        self.tracer._finish(self.span)
+        return False
+
+
+class Tracer:
+    """
+    Records nested wall/CPU-time spans per thread.
+
+    A span opened with no active parent starts a new trace, so each pipeline
+    turn wrapped in a top-level span becomes one trace. When disabled,
+    `span()` returns a shared no-op context manager.
+    """
+
+    def __init__(self, enabled: bool = False, max_spans: int = MAX_SPANS) -> None:
+        self.enabled = enabled
+        self.spans: Deque[Span] = deque(maxlen=max_spans)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def _stack(self) -> List[Span]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _new_id(self) -> int:
+        with self._lock:
+            value = self._next_id
+            self._next_id += 1
+            return value
+
+    def _finish(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def _new_span(self, name: str, attrs: Dict) -> Span:
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        span_id = self._new_id()
+        if parent is None:
+            return Span(name, span_id, span_id, None, attrs)
+        return Span(name, parent.trace_id, span_id, parent.span_id, attrs)
+
+    def span(self, name: str, **attrs: Any) -> Any:
+        """Context manager timing a named span; nested spans become children."""
+        if not self.enabled:
+            return _NOOP
+        return _ActiveSpan(self, self._new_span(name, attrs))
+
+    def _watch(self, span: Span, chunks: Iterable[T]) -> Iterator[T]:
+        # Read after the call that opened the span has returned, possibly on another thread
+        first = True
+        try:
+            for chunk in chunks:
+                if first:
+                    first = False
+                    span.attrs["first_chunk_ms"] = round((time.time_ns() - span.start_ns) / 1e6, 1)
+                yield chunk
+        except Exception as e:
+            span.attrs["error"] = type(e).__name__
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            self._finish(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Export finished spans in Chrome trace-event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = []
+        for span in list(self.spans):
+            args = dict(span.attrs)
+            args["cpu_ms"] = round(span.cpu_ns / 1e6, 3)
+            args["trace_id"] = span.trace_id
+            events.append(
+                {
+                    "name": span.name,
+                    "ph": "X",
+                    "ts": span.start_ns / 1000,
+                    "dur": (span.end_ns - span.start_ns) / 1000,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Export finished spans as OTLP/JSON (ExportTraceServiceRequest shape)."""
+        spans = []
+        for span in list(self.spans):
+            attrs = dict(span.attrs, **{"cpu.time_ms": round(span.cpu_ns / 1e6, 3)})
+            record = {
+                "traceId": f"{span.trace_id:032x}",
+                "spanId": f"{span.span_id:016x}",
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [_otlp_attribute(k, v) for k, v in attrs.items()],
+            }
+            if span.parent_id is not None:
+                record["parentSpanId"] = f"{span.parent_id:016x}"
+            spans.append(record)
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+                }
+            ]
+        }
+
+    def write(self, path: str, fmt: str = "chrome") -> None:
+        """Write finished spans to `path` as 'chrome' or 'otlp' JSON."""
+        payload = self.to_otlp() if fmt == "otlp" else self.to_chrome_trace()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        logger.info(f"Wrote {len(self.spans)} trace spans to {path} ({fmt})")
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+# Process-wide tracer, disabled until the CLI enables it
+tracer = Tracer()
+
+
+def traced(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator wrapping each call of the function in a span on the global tracer."""
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def traced_stream(
+    name: str,
+) -> Callable[[Callable[..., Optional[Iterable[T]]]], Callable[..., Optional[Iterable[T]]]]:
+    """
+    Decorator for functions returning a lazy chunk iterator.
+
+    The span starts with the call and ends when the returned iterator is
+    exhausted, fails or is closed, so it covers the streaming itself; its
+    `first_chunk_ms` attribute is the time to the first chunk. CPU time
+    covers the call only. A None result ends the span on return.
+    """
+
+    def decorator(
+        func: Callable[..., Optional[Iterable[T]]]
+    ) -> Callable[..., Optional[Iterable[T]]]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Optional[Iterable[T]]:
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            span = tracer._new_span(name, {})
+            stack = tracer._stack()
+            stack.append(span)
+            cpu_start = time.thread_time_ns()
+            span.start_ns = time.time_ns()
+            try:
+                chunks = func(*args, **kwargs)
+            except Exception as e:
+                span.attrs["error"] = type(e).__name__
+                chunks = None
+                raise
+            finally:
+                span.cpu_ns = time.thread_time_ns() - cpu_start
+                if stack and stack[-1] is span:
+                    stack.pop()
+                if chunks is None:
+                    span.end_ns = time.time_ns()
+                    tracer._finish(span)
+            return None if chunks is None else tracer._watch(span, chunks)
+
+        return wrapper
+
+    return decorator
@@ -1,9 +1,30 @@
+import itertools
 import logging
-from typing import Iterable, Optional
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
-from murf import Murf, MurfRegion  # type: ignore
+from murf import Murf, MurfEnvironment, MurfRegion  # type: ignore
 
-from .config import MURF_API_KEY, MURF_REGION, MURF_VOICE_ID, SAMPLE_RATE
+from .config import (
+    COALESCE_REQUESTS,
+    MURF_API_KEY,
+    MURF_REGION,
+    MURF_VOICE_ID,
+    MURF_AUTO_REGIONS,
+    MURF_PROBE_INTERVAL,
+    MURF_TTS_SESSION,
+    SAMPLE_RATE,
+    TTS_MAX_INFLIGHT,
+)
+from .flight_recorder import flight
+from .region_probe import STARTUP_PROBE_WAIT, RegionProber
+from .singleflight import StreamCoalescer
+from .tracing import traced_stream
+from .tts_session import TTSSession, session_url
 
 logger = logging.getLogger(__name__)
 
@@ -11,27 +32,295 @@ logger = logging.getLogger(__name__)
 MIN_TEXT_LENGTH = 1
 MAX_TEXT_LENGTH = 1000
 
+# Long text is synthesized as sentence-aligned segments of at most this length
+SEGMENT_LENGTH = 400
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+_SEGMENT_DONE = object()
+_SEGMENT_FAILED = object()
+
+
+def split_text(text: str, max_length: int = SEGMENT_LENGTH) -> List[str]:
+    """
+    Split text into segments on sentence boundaries.
+
+    Sentences are packed greedily up to `max_length`; a single sentence longer
+    than that is split on whitespace (and a single overlong word hard-cut).
+
+    Args:
+        text: Text to split
+        max_length: Maximum characters per segment
+
+    Returns:
+        Non-empty segments that together contain all of the text
+    """
+    pieces: List[str] = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        if len(sentence) <= max_length:
+            pieces.append(sentence)
+            continue
+        line = ""
+        for word in sentence.split():
+            while len(word) > max_length:
+                if line:
+                    pieces.append(line)
+                    line = ""
+                pieces.append(word[:max_length])
+                word = word[max_length:]
+            if line and len(line) + 1 + len(word) > max_length:
+                pieces.append(line)
+                line = word
+            else:
+                line = f"{line} {word}" if line else word
+        if line:
+            pieces.append(line)
+
+    segments: List[str] = []
+    for piece in pieces:
+        if segments and len(segments[-1]) + 1 + len(piece) <= max_length:
+            segments[-1] = f"{segments[-1]} {piece}"
+        elif piece:
+            segments.append(piece)
+    return segments
+
+
+def region_endpoint(name: str) -> str:
+    """Return the HTTPS base URL Murf serves a named region from."""
+    return f"https://{getattr(MurfRegion, name).value}.api.murf.ai"
+
+
+def _environment(base_url: str) -> MurfEnvironment:
+    """Point every Murf endpoint at one base URL."""
+    names = (
+        "base global_router us_east us_west india canada south_korea uae japan australia"
+        " eu_central uk south_america production"
+    ).split()
+    return MurfEnvironment(**{name: base_url for name in names})
+
 
 class MurfTTSClient:
     """Robust Murf Falcon streaming TTS client with error handling."""
 
-    def __init__(self) -> None:
+    def __init__(self, base_url: Optional[str] = None, session: Optional[bool] = None) -> None:
+        """
+        Args:
+            base_url: Murf-compatible endpoint used for every region (local stand-ins)
+            session: Stream over one persistent WebSocket (default: MURF_TTS_SESSION)
+        """
         if not MURF_API_KEY:
             raise RuntimeError("MURF_API_KEY is not set")
-        
-        # Map string region like "GLOBAL", "IN" to MurfRegion enum
+
+        self.base_url = base_url
+        self.prober: Optional[RegionProber] = None
+        self.clients: Dict[str, Any] = {}
+        self.flights = StreamCoalescer() if COALESCE_REQUESTS else None
+        self.session: Optional[TTSSession] = None
+        # Segment synthesis for long replies; threads are started on first use
+        self._segment_pool = ThreadPoolExecutor(thread_name_prefix="murf-tts")
+        if MURF_TTS_SESSION if session is None else session:
+            voice = {"voiceId": MURF_VOICE_ID, "multiNativeLocale": "en-US"}
+            self.session = TTSSession(self._session_endpoint, voice)
+
         try:
-            region = getattr(MurfRegion, MURF_REGION, MurfRegion.GLOBAL)
-            self.client = Murf(api_key=MURF_API_KEY, region=region)
+            if base_url:
+                self.client = Murf(api_key=MURF_API_KEY, environment=_environment(base_url))
+            elif MURF_REGION == "AUTO":
+                self._init_auto_region()
+            else:
+                # Map string region like "GLOBAL", "IN" to MurfRegion enum
+                region = getattr(MurfRegion, MURF_REGION, MurfRegion.GLOBAL)
+                self.client = Murf(api_key=MURF_API_KEY, region=region)
             logger.info(f"MurfTTSClient initialized (region={MURF_REGION}, voice={MURF_VOICE_ID})")
         except Exception as e:
             logger.error(f"Failed to initialize Murf client: {e}")
             raise RuntimeError(f"Murf initialization failed: {e}")
 
+    def _init_auto_region(self) -> None:
+        """Create one client per candidate region and start latency probing."""
+        names = [n for n in MURF_AUTO_REGIONS if hasattr(MurfRegion, n)]
+        if not names:
+            logger.warning(f"No valid MURF_AUTO_REGIONS in {MURF_AUTO_REGIONS}. Using GLOBAL")
+            names = ["GLOBAL"]
+
+        self.clients = {
+            name: Murf(api_key=MURF_API_KEY, region=getattr(MurfRegion, name)) for name in names
+        }
+        self.prober = RegionProber({name: region_endpoint(name) for name in names})
+        # Unreachable regions must not hold up startup; late probes still update the ranking
+        self.prober.probe_all(wait=STARTUP_PROBE_WAIT)
+        self.prober.start(MURF_PROBE_INTERVAL)
+        self.client = self.clients[self.prober.best()]
+        logger.info(f"AUTO region selected {self.prober.best()} from {names}")
+
+    def close(self) -> None:
+        """Stop region probing and segment threads, and close the persistent session."""
+        self._segment_pool.shutdown(wait=False)
+        if self.prober:
+            self.prober.stop()
+        if self.session:
+            self.session.close()
+
+    def region_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-region probe statistics (empty unless MURF_REGION=AUTO)."""
+        return self.prober.snapshot() if self.prober else {}
+
+    def coalescing_stats(self) -> Dict[str, int]:
+        """Return request/upstream/deduplicated counts (empty if coalescing is off)."""
+        return self.flights.stats() if self.flights else {}
+
+    def session_stats(self) -> Dict[str, Any]:
+        """Return persistent-session counts and first-byte latencies (empty if off)."""
+        return self.session.stats() if self.session else {}
+
+    def _session_endpoint(self) -> str:
+        """WebSocket URL for the session, following the AUTO prober's current best region."""
+        if self.base_url:
+            base = self.base_url
+        elif self.prober:
+            base = region_endpoint(self.prober.best())
+        else:
+            base = region_endpoint(MURF_REGION if hasattr(MurfRegion, MURF_REGION) else "GLOBAL")
+        return session_url(base, MURF_API_KEY, SAMPLE_RATE)
+
+    def _session_chunks(self, stream: Iterator[bytes], text: str) -> Iterator[bytes]:
+        """
+        Yield a session context's audio, retrying over HTTP if it fails before any audio.
+
+        A failure after audio has been yielded ends the utterance early instead,
+        since replaying it from the start would repeat what was already heard.
+        """
+        started = False
+        try:
+            for chunk in stream:
+                started = True
+                yield chunk
+            return
+        except (ConnectionError, RuntimeError) as e:
+            if started:
+                logger.error(f"TTS session failed mid-utterance: {e}")
+                return
+            logger.warning(f"TTS session failed, retrying over HTTP: {e}")
+        yield from self._open_request(text) or ()
+
+    def _open_stream(self, client: Any, text: str) -> Iterator[bytes]:
+        """Start a Falcon streaming request on the given client."""
+        return client.text_to_speech.stream(
+            text=text,
+            voice_id=MURF_VOICE_ID,
+            model="FALCON",
+            multi_native_locale="en-US",
+            sample_rate=SAMPLE_RATE,
+            format="PCM",
+        )
+
+    def _stream_with_failover(self, text: str) -> Optional[Iterable[bytes]]:
+        """
+        Stream from the fastest healthy region, failing over on error.
+
+        The first chunk is pulled eagerly so connection errors surface here
+        (the SDK stream is lazy) and its arrival time feeds the region EWMA.
+        """
+        for region in self.prober.ranked():
+            start = time.perf_counter()
+            try:
+                stream = iter(self._open_stream(self.clients[region], text))
+                first = next(stream, b"")
+            except Exception as e:
+                logger.warning(f"Murf region {region} failed, failing over: {e}")
+                self.prober.record_failure(region)
+                continue
+
+            self.prober.record_request(region, time.perf_counter() - start)
+            self.client = self.clients[region]
+            logger.debug(f"TTS stream initiated in region {region}")
+            return itertools.chain([first], stream)
+
+        logger.error("All Murf regions failed")
+        return None
+
+    def _open_segment(self, text: str) -> Optional[Iterable[bytes]]:
+        """
+        Open a stream for one piece of text, honouring AUTO region failover.
+
+        With coalescing on, concurrent requests for the same text share one
+        upstream stream and each gets its own iterator over its chunks.
+        """
+        if self.flights is not None:
+            key = (MURF_VOICE_ID, SAMPLE_RATE, text)
+            return self.flights.stream(key, lambda: self._open_uncoalesced(text))
+        return self._open_uncoalesced(text)
+
+    def _open_uncoalesced(self, text: str) -> Optional[Iterable[bytes]]:
+        if self.session is not None:
+            try:
+                return self._session_chunks(self.session.stream(text), text)
+            except ConnectionError as e:
+                logger.warning(f"TTS session unavailable, using HTTP: {e}")
+        return self._open_request(text)
+
+    def _open_request(self, text: str) -> Optional[Iterable[bytes]]:
+        """Start a per-request HTTP stream (the mode without a session)."""
+        if self.prober:
+            return self._stream_with_failover(text)
+        return self._open_stream(self.client, text)
+
+    def _stream_segments(self, segments: List[str]) -> Iterator[bytes]:
+        """
+        Synthesize segments concurrently and yield their audio in order.
+
+        At most TTS_MAX_INFLIGHT segments are synthesizing at once. Chunks of the
+        segment currently being played are yielded as they arrive; later
+        segments buffer in their own queues until their turn. A segment that
+        fails stops the stream with ConnectionError rather than leaving a gap
+        in the reply.
+        """
+        window = max(1, TTS_MAX_INFLIGHT)
+        stop = threading.Event()
+        pool = self._segment_pool
+        outputs: List["queue.Queue[Any]"] = [queue.Queue() for _ in segments]
+
+        def synthesize(index: int) -> None:
+            out = outputs[index]
+            if stop.is_set():
+                return
+            try:
+                stream = self._open_segment(segments[index])
+                if stream is None:
+                    logger.error(f"TTS segment {index} could not be started")
+                    out.put(_SEGMENT_FAILED)
+                    return
+                for chunk in stream:
+                    if stop.is_set():
+                        break
+                    out.put(chunk)
+                out.put(_SEGMENT_DONE)
+            except Exception as e:
+                logger.error(f"TTS segment {index} failed: {e}")
+                out.put(_SEGMENT_FAILED)
+
+        try:
+            for index in range(min(window, len(segments))):
+                pool.submit(synthesize, index)
+            for index, out in enumerate(outputs):
+                while True:
+                    chunk = out.get()
+                    if chunk is _SEGMENT_DONE:
+                        break
+                    if chunk is _SEGMENT_FAILED:
+                        raise ConnectionError(
+                            f"TTS segment {index + 1} of {len(segments)} failed; reply cut short"
+                        )
+                    yield chunk
+                if index + window < len(segments):
+                    pool.submit(synthesize, index + window)
+        finally:
+            stop.set()
+
+    @traced_stream("tts.stream_tts")
     def stream_tts(self, text: str) -> Optional[Iterable[bytes]]:
         """
         Return an iterator of audio chunks (PCM 16-bit) for the given text.
-        Uses Murf Falcon with real-time streaming.
+        Uses Murf Falcon with real-time streaming. Text longer than
+        MAX_TEXT_LENGTH is synthesized as concurrent sentence segments.
         
         Args:
             text: Text to convert to speech
@@ -48,23 +337,19 @@ class MurfTTSClient:
         if len(text) < MIN_TEXT_LENGTH:
             logger.warning(f"Text too short: {len(text)} chars")
             return None
+        flight.note("tts.text_chars", len(text))
         
         if len(text) > MAX_TEXT_LENGTH:
-            logger.warning(f"Text too long: {len(text)} chars. Truncating to {MAX_TEXT_LENGTH}")
-            text = text[:MAX_TEXT_LENGTH]
+            segments = split_text(text)
+            logger.debug(f"Streaming TTS for {len(text)} chars in {len(segments)} segments")
+            return flight.watch(self._stream_segments(segments), "tts")
         
         try:
             logger.debug(f"Streaming TTS for {len(text)} chars of text")
-            audio_stream = self.client.text_to_speech.stream(
-                text=text,
-                voice_id=MURF_VOICE_ID,
-                model="FALCON",
-                multi_native_locale="en-US",
-                sample_rate=SAMPLE_RATE,
-                format="PCM",
-            )
-            logger.debug("TTS stream initiated successfully")
-            return audio_stream
+            audio_stream = self._open_segment(text)
+            if audio_stream is not None:
+                logger.debug("TTS stream initiated successfully")
+            return flight.watch(audio_stream, "tts")
             
         except ValueError as e:
             logger.error(f"Invalid TTS parameters: {e}")
@@ -0,0 +1,218 @@
+"""
+Persistent streaming TTS session over one Murf WebSocket connection.
+
+Per-request synthesis opens a fresh `text_to_speech.stream` call for every
+utterance, paying request setup and voice warm-up each time. A TTSSession
+opens one connection to Murf's stream-input endpoint, sends the voice
+configuration once, and pushes each piece of text as its own context.
+Audio for several contexts can be in flight at once; a reader thread routes
+frames back to the right iterator by context ID.
+"""
+
+import base64
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple
+
+from .config import REQUEST_TIMEOUT
+from .utils.exceptions import WebSocketClosed
+from .websocket import WebSocket, connect
+
+logger = logging.getLogger(__name__)
+
+# First-byte latencies kept for stats()
+LATENCY_WINDOW = 256
+_DONE = object()
+
+
+def session_url(base_url: str, api_key: str, sample_rate: int, model: str = "FALCON") -> str:
+    """
+    Build the stream-input WebSocket URL for a Murf HTTP base URL.
+
+    Args:
+        base_url: e.g. https://global.api.murf.ai (http:// maps to ws://)
+        api_key: Murf API key, passed as a query parameter
+        sample_rate: Output sample rate of the PCM audio
+
+    Returns:
+        ws:// or wss:// URL of /v1/speech/stream-input
+    """
+    scheme, _, rest = base_url.rstrip("/").partition("://")
+    ws_scheme = "wss" if scheme == "https" else "ws"
+    return (
+        f"{ws_scheme}://{rest}/v1/speech/stream-input?api-key={api_key}&model={model}"
+        f"&sample_rate={sample_rate}&channel_type=MONO&format=PCM"
+    )
+
+
+def _percentile(values: Any, q: float) -> Optional[float]:
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class TTSSession:
+    """
+    One long-lived streaming synthesis connection shared by successive utterances.
+
+    The connection is opened on first use and reopened on the next call after
+    it drops; contexts in flight when it drops, or that receive nothing for
+    `read_timeout` seconds, fail with ConnectionError.
+
+    Args:
+        endpoint: Returns the WebSocket URL, called on every (re)connect
+        voice_config: Voice settings sent once per connection
+        connect_timeout: Seconds allowed for connecting and the handshake
+        read_timeout: Seconds to wait for each frame of a context's audio
+    """
+
+    def __init__(
+        self,
+        endpoint: Callable[[], str],
+        voice_config: Dict[str, Any],
+        connect_timeout: float = 10.0,
+        read_timeout: float = REQUEST_TIMEOUT,
+    ) -> None:
+        self.endpoint = endpoint
+        self.voice_config = voice_config
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self._ws: Optional[WebSocket] = None
+        self._lock = threading.Lock()
+        # context ID -> (connection it was sent on, queue its audio goes to)
+        self._contexts: Dict[str, Tuple[WebSocket, "queue.Queue[Any]"]] = {}
+        self._first_byte: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._stats = {"connections": 0, "segments": 0, "failures": 0}
+
+    def _ensure(self) -> WebSocket:
+        """Return the open connection, connecting first if needed (caller holds the lock)."""
+        if self._ws is not None and not self._ws.closed:
+            return self._ws
+        url = self.endpoint()
+        ws = connect(url, timeout=self.connect_timeout)
+        ws.send(json.dumps({"voice_config": self.voice_config}))
+        self._ws = ws
+        self._stats["connections"] += 1
+        threading.Thread(target=self._read, args=(ws,), daemon=True, name="tts-session").start()
+        logger.info(f"TTS session connected to {url.split('?')[0]}")
+        return ws
+
+    def _read(self, ws: WebSocket) -> None:
+        """Route audio and end-of-context frames to the waiting iterators."""
+        error: Exception = ConnectionError("TTS session closed")
+        try:
+            while True:
+                message = ws.recv()
+                if isinstance(message, bytes):
+                    continue
+                data = json.loads(message)
+                with self._lock:
+                    entry = self._contexts.get(data.get("context_id", ""))
+                if entry is None:
+                    if "error" in data:
+                        logger.error(f"TTS session error: {data['error']}")
+                    continue
+                out = entry[1]
+                if data.get("audio"):
+                    out.put(base64.b64decode(data["audio"]))
+                if "error" in data:
+                    out.put(RuntimeError(f"Murf stream error: {data['error']}"))
+                if data.get("final") or "error" in data:
+                    out.put(_DONE)
+        except (WebSocketClosed, OSError, ValueError) as e:
+            error = ConnectionError(f"TTS session lost: {e}")
+            logger.warning(f"{error}")
+        finally:
+            with self._lock:
+                if self._ws is ws:
+                    self._ws = None
+                pending = [out for owner, out in self._contexts.values() if owner is ws]
+            for out in pending:
+                out.put(error)
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        """
+        Send text as a new context and return an iterator over its audio.
+
+        Synthesis starts as soon as this returns, so the next segment can be
+        queued while the current one is still being played.
+
+        Raises:
+            ConnectionError: The session could not connect or send
+        """
+        context_id = uuid.uuid4().hex
+        out: "queue.Queue[Any]" = queue.Queue()
+        with self._lock:
+            try:
+                ws = self._ensure()
+                self._contexts[context_id] = (ws, out)
+                sent_at = time.perf_counter()
+                ws.send(json.dumps({"context_id": context_id, "text": text, "end": True}))
+            except (WebSocketClosed, OSError) as e:
+                self._contexts.pop(context_id, None)
+                self._stats["failures"] += 1
+                self._ws = None
+                raise ConnectionError(f"TTS session unavailable: {e}") from e
+            self._stats["segments"] += 1
+        return self._chunks(ws, context_id, out, sent_at)
+
+    def _chunks(
+        self, ws: WebSocket, context_id: str, out: "queue.Queue[Any]", sent_at: float
+    ) -> Iterator[bytes]:
+        finished = False
+        first = True
+        try:
+            while True:
+                try:
+                    item = out.get(timeout=self.read_timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self._stats["failures"] += 1
+                    raise ConnectionError(
+                        f"TTS session sent no audio for {self.read_timeout}s"
+                    ) from None
+                if item is _DONE:
+                    finished = True
+                    return
+                if isinstance(item, Exception):
+                    finished = True
+                    with self._lock:
+                        self._stats["failures"] += 1
+                    raise item
+                if first:
+                    first = False
+                    with self._lock:
+                        self._first_byte.append(time.perf_counter() - sent_at)
+                yield item
+        finally:
+            with self._lock:
+                self._contexts.pop(context_id, None)
+            if not finished and not ws.closed:
+                # Abandoned mid-stream (e.g. barge-in): stop synthesizing it
+                try:
+                    ws.send(json.dumps({"context_id": context_id, "clear": True}))
+                except (WebSocketClosed, OSError):
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return connection/segment/failure counts and first-byte latency percentiles (ms)."""
+        with self._lock:
+            latencies = list(self._first_byte)
+            stats: Dict[str, Any] = dict(self._stats)
+        for name, q in (("first_byte_p50_ms", 0.5), ("first_byte_p95_ms", 0.95)):
+            value = _percentile(latencies, q)
+            stats[name] = None if value is None else round(value * 1000, 1)
+        return stats
+
+    def close(self) -> None:
+        """Close the connection; the next stream() reconnects."""
+        with self._lock:
+            ws, self._ws = self._ws, None
+        if ws is not None and not ws.closed:
+            ws.close()
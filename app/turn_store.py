@@ -0,0 +1,112 @@
+"""Compact in-memory conversation storage for VoiceAgent sessions."""
+
+import zlib
+from enum import IntEnum
+from typing import Dict, Iterator, List, Optional
+
+# Turns shorter than this are never compressed: zlib overhead would exceed the savings
+MIN_COMPRESS_LENGTH = 64
+
+
+class Role(IntEnum):
+    """Chat message roles, stored as small ints instead of per-message strings."""
+
+    SYSTEM = 0
+    USER = 1
+    ASSISTANT = 2
+
+    @property
+    def api_name(self) -> str:
+        return _ROLE_NAMES[self]
+
+    @classmethod
+    def from_name(cls, name: str) -> "Role":
+        return cls[name.upper()]
+
+
+_ROLE_NAMES = {Role.SYSTEM: "system", Role.USER: "user", Role.ASSISTANT: "assistant"}
+
+
+class Turn:
+    """One conversation turn; content is either text or zlib-compressed UTF-8."""
+
+    __slots__ = ("role", "data")
+
+    def __init__(self, role: Role, content: str) -> None:
+        self.role = role
+        self.data = content
+
+    @property
+    def compressed(self) -> bool:
+        return isinstance(self.data, bytes)
+
+    @property
+    def content(self) -> str:
+        if isinstance(self.data, bytes):
+            return zlib.decompress(self.data).decode("utf-8")
+        return self.data
+
+    def compress(self) -> None:
+        """Compress content in place if it is long enough to benefit."""
+        if isinstance(self.data, str) and len(self.data) >= MIN_COMPRESS_LENGTH:
+            raw = self.data.encode("utf-8")
+            packed = zlib.compress(raw)
+            if len(packed) < len(raw):
+                self.data = packed
+
+    def to_message(self) -> Dict[str, str]:
+        return {"role": self.role.api_name, "content": self.content}
+
+
+class TurnStore:
+    """
+    Conversation turns for one session behind a shared system prompt.
+
+    The system prompt is held by reference (every session built from the same
+    prompt shares one string) and OpenAI-style message dicts are only built
+    when `messages()` is called.
+    """
+
+    __slots__ = ("system_prompt", "turns", "compress_after")
+
+    def __init__(self, system_prompt: str, compress_after: Optional[int] = None) -> None:
+        """
+        Args:
+            system_prompt: Prompt sent as the first message
+            compress_after: Compress turns older than the most recent N (None disables)
+        """
+        self.system_prompt = system_prompt
+        self.turns: List[Turn] = []
+        self.compress_after = compress_after
+
+    def __len__(self) -> int:
+        """Number of messages, counting the system prompt."""
+        return len(self.turns) + 1
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        yield {"role": Role.SYSTEM.api_name, "content": self.system_prompt}
+        for turn in self.turns:
+            yield turn.to_message()
+
+    def messages(self) -> List[Dict[str, str]]:
+        """Build the OpenAI message list on demand."""
+        return list(self)
+
+    def append(self, role: Role, content: str) -> None:
+        self.turns.append(Turn(role, content))
+        if self.compress_after is not None and len(self.turns) > self.compress_after:
+            self.turns[-self.compress_after - 1].compress()
+
+    def pop(self) -> Optional[Turn]:
+        return self.turns.pop() if self.turns else None
+
+    def last_role(self) -> Optional[Role]:
+        return self.turns[-1].role if self.turns else None
+
+    def trim(self, keep: int) -> None:
+        """Keep only the most recent `keep` turns (system prompt is always kept)."""
+        if len(self.turns) > keep:
+            del self.turns[: len(self.turns) - keep]
+
+    def clear(self) -> None:
+        self.turns = []
@@ -1,14 +1,102 @@
 """Audio utilities for recording and playback."""
 
-import io
-import wave
 import logging
-from typing import Optional
+from typing import Any, Dict, Optional
 
 import pyaudio  # type: ignore
 
+from .pcm import peak, to_wav
+from .ring_buffer import FrameRingBuffer, RingReader
+
 logger = logging.getLogger(__name__)
 
+# Seconds of audio the capture ring holds before the oldest frames are overwritten
+CAPTURE_BUFFER_SECONDS = 10
+
+
+class CallbackCapture:
+    """
+    Microphone capture in PortAudio callback mode.
+
+    PortAudio calls `_callback` on its own thread for every buffer; the
+    callback only copies the buffer into a preallocated FrameRingBuffer, so
+    a busy interpreter delays consumers instead of overflowing the device.
+    Consumers attach with `reader()` and read frames at their own pace.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        frames_per_buffer: int = 1024,
+        buffer_seconds: float = CAPTURE_BUFFER_SECONDS,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        frame_bytes = frames_per_buffer * channels * 2  # 16-bit
+        capacity = max(2, int(buffer_seconds * sample_rate / frames_per_buffer))
+        self.ring = FrameRingBuffer(frame_bytes, capacity)
+        self.input_overflows = 0
+        self.callbacks = 0
+        self._audio: Any = None
+        self._stream: Any = None
+
+    def _callback(self, in_data: bytes, frame_count: int, time_info: Dict, status: int):
+        self.callbacks += 1
+        if status & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        self.ring.write(in_data)
+        return None, pyaudio.paContinue
+
+    def start(self) -> None:
+        """Open the default input device and start capturing."""
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=self.channels,
+            rate=self.sample_rate,
+            input=True,
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self._callback,
+        )
+        self._stream.start_stream()
+
+    def reader(self, from_start: bool = False) -> RingReader:
+        return self.ring.reader(from_start=from_start)
+
+    def stop(self) -> None:
+        """Stop capturing and release the device."""
+        if self._stream:
+            try:
+                self._stream.stop_stream()
+                self._stream.close()
+            except Exception as e:
+                logger.warning(f"Error closing capture stream: {e}")
+            self._stream = None
+        if self._audio:
+            try:
+                self._audio.terminate()
+            except Exception as e:
+                logger.warning(f"Error terminating PyAudio: {e}")
+            self._audio = None
+
+    def __enter__(self) -> "CallbackCapture":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def stats(self) -> Dict[str, int]:
+        """Return callback count and PortAudio input overflows."""
+        return {"callbacks": self.callbacks, "input_overflows": self.input_overflows}
+
+
+def frames_to_wav(frames, sample_rate: int, channels: int = 1) -> bytes:
+    """Assemble 16-bit PCM frames into in-memory WAV bytes."""
+    return to_wav(b"".join(frames), sample_rate, channels)
+
 
 def record_audio(
     sample_rate: int = 16000,
@@ -31,56 +119,43 @@ def record_audio(
         WAV audio bytes or None if recording failed
     """
     try:
-        audio = pyaudio.PyAudio()
-        stream = audio.open(
-            format=pyaudio.paInt16,
-            channels=channels,
-            rate=sample_rate,
-            input=True,
-            frames_per_buffer=1024,
-        )
+        capture = CallbackCapture(sample_rate, channels, frames_per_buffer=1024)
+        reader = capture.reader()
 
         logger.info(f"Recording for up to {record_seconds} seconds...")
         frames = []
         total_frames = int(sample_rate / 1024 * record_seconds)
         silence_frames = int(sample_rate / 1024 * silence_duration)
         silent_count = 0
-
-        for i in range(total_frames):
-            try:
-                data = stream.read(1024, exception_on_overflow=False)
-                frames.append(data)
-
-                # Simple silence detection
-                audio_level = max(abs(int.from_bytes(data[j : j + 2], "little", signed=True))
-                                   for j in range(0, len(data), 2))
-
-                if audio_level < silence_threshold * 32768:
-                    silent_count += 1
-                    if silent_count > silence_frames:
-                        logger.info("Silence detected, stopping recording.")
+        frame_timeout = 4 * 1024 / sample_rate + 0.5
+
+        with capture:
+            for i in range(total_frames):
+                try:
+                    data = reader.read(timeout=frame_timeout)
+                    if data is None:
+                        logger.warning("Audio capture stalled")
                         break
-                else:
-                    silent_count = 0
+                    frames.append(data)
 
-            except Exception as e:
-                logger.warning(f"Error reading audio frame: {e}")
-                continue
+                    # Simple silence detection
+                    audio_level = peak(data)
 
-        stream.stop_stream()
-        stream.close()
-        audio.terminate()
+                    if audio_level < silence_threshold * 32768:
+                        silent_count += 1
+                        if silent_count > silence_frames:
+                            logger.info("Silence detected, stopping recording.")
+                            break
+                    else:
+                        silent_count = 0
 
-        # Save to WAV in memory
-        buffer = io.BytesIO()
-        with wave.open(buffer, "wb") as wf:
-            wf.setnchannels(channels)
-            wf.setsampwidth(2)  # 16-bit
-            wf.setframerate(sample_rate)
-            wf.writeframes(b"".join(frames))
+                except Exception as e:
+                    logger.warning(f"Error reading audio frame: {e}")
+                    continue
 
+        logger.debug(f"Capture stats: {capture.stats()} {reader.stats()}")
         logger.info(f"Recording complete ({len(frames)} frames)")
-        return buffer.getvalue()
+        return frames_to_wav(frames, sample_rate, channels)
 
     except Exception as e:
         logger.error(f"Recording failed: {e}")
@@ -41,3 +41,18 @@ class APIError(VoiceFlowException):
     """Raised when API call fails after retries."""
 
     pass
+
+
+class OverloadError(VoiceFlowException):
+    """Raised when a request is shed because a provider's admission queue is full."""
+
+    pass
+
+
+class WebSocketClosed(VoiceFlowException):
+    """Raised when a WebSocket is closed by the peer or the connection drops."""
+
+    def __init__(self, code: int = 1006, reason: str = "") -> None:
+        super().__init__(f"WebSocket closed ({code}) {reason}".strip())
+        self.code = code
+        self.reason = reason
@@ -0,0 +1,77 @@
+"""
+Table-driven G.711 μ-law codec for 8 kHz telephony audio.
+
+Both directions work on whole chunks with lookup tables built once at
+import. Decoding is two `bytes.translate` passes (low and high byte of
+each sample) interleaved by slice assignment, so the per-sample loop runs
+in C. Encoding maps every 16-bit sample through a 64 KiB table. Output is
+bit-exact with the ITU-T reference (and with the stdlib audioop module).
+"""
+
+import sys
+from typing import Iterable, Iterator
+
+BIAS = 0x84
+CLIP = 8159  # 14-bit magnitude limit of the reference encoder
+
+
+def _encode_sample(sample: int) -> int:
+    value = sample >> 2
+    if value < 0:
+        value, mask = -value, 0x7F
+    else:
+        mask = 0xFF
+    value = min(value, CLIP) + (BIAS >> 2)
+    # Segments end at 0x3F, 0x7F, ... 0x1FFF: one per extra bit of magnitude
+    segment = max(0, value.bit_length() - 6)
+    if segment >= 8:
+        return 0x7F ^ mask
+    return ((segment << 4) | ((value >> (segment + 1)) & 0x0F)) ^ mask
+
+
+def _decode_sample(code: int) -> int:
+    code = ~code & 0xFF
+    t = (((code & 0x0F) << 3) + BIAS) << ((code & 0x70) >> 4)
+    return BIAS - t if code & 0x80 else t - BIAS
+
+
+# Indexed by the sample as an unsigned 16-bit value
+_ENCODE = bytes(_encode_sample(i - 65536 if i >= 32768 else i) for i in range(65536))
+_DECODED = [_decode_sample(code) & 0xFFFF for code in range(256)]
+_DECODE_LO = bytes(v & 0xFF for v in _DECODED)
+_DECODE_HI = bytes(v >> 8 for v in _DECODED)
+if sys.byteorder != "little":
+    # Samples are read in native order; reindex so byte-swapped values find their code
+    _ENCODE = bytes(_ENCODE[((i & 0xFF) << 8) | (i >> 8)] for i in range(65536))
+
+
+def ulaw_encode(data: bytes) -> bytes:
+    """Encode 16-bit little-endian PCM as μ-law, one byte per sample (an odd byte is dropped)."""
+    view = memoryview(data).cast("B")
+    view = view[: len(view) - len(view) % 2].cast("H")
+    return bytes(map(_ENCODE.__getitem__, view))
+
+
+def ulaw_decode(data: bytes) -> bytes:
+    """Decode μ-law bytes to 16-bit little-endian PCM."""
+    data = bytes(data)
+    out = bytearray(2 * len(data))
+    out[0::2] = data.translate(_DECODE_LO)
+    out[1::2] = data.translate(_DECODE_HI)
+    return bytes(out)
+
+
+def encode_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    μ-law encode a PCM chunk stream, carrying odd bytes across chunk boundaries.
+
+    A trailing byte left at the end of the stream is not a whole sample and
+    is dropped.
+    """
+    carry = b""
+    for chunk in chunks:
+        data = carry + bytes(chunk) if carry else chunk
+        cut = len(data) - len(data) % 2
+        carry = bytes(data[cut:])
+        if cut:
+            yield ulaw_encode(memoryview(data)[:cut])
@@ -0,0 +1,231 @@
+"""Pure-Python helpers for 16-bit little-endian PCM (no audio device required)."""
+
+import io
+import math
+import struct
+import sys
+import wave
+from array import array
+from operator import mul
+from typing import Iterable, Iterator, List, Tuple
+
+SAMPLE_WIDTH = 2
+INT16_MAX = 32767
+INT16_MIN = -32768
+
+# WAV format tags
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_MULAW = 7
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+ENCODINGS = ("linear16", "mulaw")
+
+
+def _samples(data: bytes) -> array:
+    samples = array("h")
+    samples.frombytes(data[: len(data) - len(data) % SAMPLE_WIDTH])
+    if sys.byteorder != "little":
+        samples.byteswap()
+    return samples
+
+
+def _to_bytes(samples: array) -> bytes:
+    if sys.byteorder != "little":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def scale(data: bytes, gain: float) -> bytes:
+    """Multiply every sample by `gain`, clipping to the int16 range."""
+    if gain == 1.0:
+        return data
+    samples = _samples(data)
+    scaled = array("h", (max(INT16_MIN, min(INT16_MAX, int(s * gain))) for s in samples))
+    return _to_bytes(scaled)
+
+
+def apply_gain(chunks: Iterable[bytes], gain: float) -> Iterator[bytes]:
+    """
+    Scale a chunk stream, carrying odd bytes across chunk boundaries.
+
+    Streaming APIs do not promise sample-aligned chunks, so a trailing odd
+    byte is held back and prepended to the next chunk.
+    """
+    if gain == 1.0:
+        yield from chunks
+        return
+    carry = b""
+    for chunk in chunks:
+        data = carry + chunk
+        cut = len(data) - len(data) % SAMPLE_WIDTH
+        carry = data[cut:]
+        if cut:
+            yield scale(data[:cut], gain)
+    if carry:
+        yield carry
+
+
+def to_wav(data: bytes, sample_rate: int, channels: int = 1, encoding: str = "linear16") -> bytes:
+    """
+    Wrap audio bytes in an in-memory WAV container.
+
+    Args:
+        data: 16-bit PCM, or μ-law bytes for encoding="mulaw"
+        sample_rate: Sample rate in Hz
+        channels: Interleaved channels in `data`
+        encoding: "linear16" or "mulaw"
+    """
+    if encoding == "mulaw":
+        # The wave module only writes PCM; μ-law needs an 18-byte fmt chunk and a fact chunk
+        frames = len(data) // channels
+        fmt = struct.pack(
+            "<HHIIHHH",
+            WAVE_FORMAT_MULAW,
+            channels,
+            sample_rate,
+            sample_rate * channels,  # bytes per second
+            channels,  # block align
+            8,  # bits per sample
+            0,  # no extra format bytes
+        )
+        chunks = [
+            b"fmt " + struct.pack("<I", len(fmt)) + fmt,
+            b"fact" + struct.pack("<II", 4, frames),
+            b"data" + struct.pack("<I", len(data)) + bytes(data) + b"\0" * (len(data) & 1),
+        ]
+        body = b"WAVE" + b"".join(chunks)
+        return b"RIFF" + struct.pack("<I", len(body)) + body
+    if encoding != "linear16":
+        raise ValueError(f"Unknown encoding {encoding!r}; expected one of {ENCODINGS}")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(SAMPLE_WIDTH)
+        wf.setframerate(sample_rate)
+        wf.writeframes(data)
+    return buffer.getvalue()
+
+
+def read_wav(data: bytes) -> Tuple[str, int, int, bytes]:
+    """
+    Parse a 16-bit PCM or μ-law WAV.
+
+    Returns:
+        (encoding, sample_rate, channels, audio bytes)
+
+    Raises:
+        ValueError: Not a WAV, or an encoding other than 16-bit PCM and μ-law
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("not a RIFF/WAVE file")
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos : pos + 4]
+        (size,) = struct.unpack_from("<I", data, pos + 4)
+        body = data[pos + 8 : pos + 8 + size]
+        if chunk_id == b"fmt ":
+            if len(body) < 16:
+                raise ValueError("truncated fmt chunk")
+            fmt = struct.unpack_from("<HHIIHH", body)
+            if fmt[0] == WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                # The real format tag leads the subformat GUID
+                (tag,) = struct.unpack_from("<H", body, 24)
+                fmt = (tag,) + fmt[1:]
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            tag, channels, sample_rate, _, _, bits = fmt
+            if tag == WAVE_FORMAT_PCM and bits == 16:
+                encoding = "linear16"
+            elif tag == WAVE_FORMAT_MULAW and bits == 8:
+                encoding = "mulaw"
+            else:
+                raise ValueError(f"unsupported WAV format {tag} with {bits}-bit samples")
+            return encoding, sample_rate, channels, bytes(body)
+        pos += 8 + size + (size & 1)
+    raise ValueError("no data chunk")
+
+
+def peak(data: bytes) -> int:
+    """Return the largest absolute sample value."""
+    samples = _samples(data)
+    if not samples:
+        return 0
+    return max(max(samples), -min(samples))
+
+
+def rms(data: bytes, stride: int = 1) -> float:
+    """Return the root-mean-square sample value, of every `stride`-th sample if above 1."""
+    samples = _samples(data)
+    if stride > 1:
+        samples = samples[::stride]
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(map(mul, samples, samples)) / len(samples))
+
+
+def frame_rms(data: bytes, frame_samples: int) -> List[float]:
+    """Return the RMS level of each consecutive `frame_samples` window."""
+    step = frame_samples * SAMPLE_WIDTH
+    view = memoryview(data)
+    return [rms(view[i : i + step]) for i in range(0, len(data), step)]
+
+
+def resample(data: bytes, src_rate: int, dst_rate: int) -> bytes:
+    """Resample mono PCM with linear interpolation."""
+    if src_rate == dst_rate:
+        return bytes(data)
+    samples = _samples(data)
+    n = len(samples)
+    if n < 2:
+        return _to_bytes(samples)
+    out_len = int(n * dst_rate / src_rate)
+    ratio = src_rate / dst_rate
+    out = array("h", bytes(out_len * SAMPLE_WIDTH))
+    last = n - 1
+    for i in range(out_len):
+        pos = i * ratio
+        j = int(pos)
+        if j >= last:
+            out[i] = samples[last]
+        else:
+            frac = pos - j
+            out[i] = int(samples[j] + (samples[j + 1] - samples[j]) * frac)
+    return _to_bytes(out)
+
+
+def trim_silence(
+    data: bytes,
+    sample_rate: int,
+    threshold: float,
+    pad_ms: int = 200,
+    frame_ms: int = 20,
+    min_speech_ms: int = 0,
+    channels: int = 1,
+) -> bytes:
+    """
+    Cut leading and trailing silence, keeping a margin around the speech.
+
+    Args:
+        data: 16-bit PCM
+        sample_rate: Sample rate in Hz
+        threshold: Frame RMS counted as speech, as a fraction of full scale
+        pad_ms: Audio kept before the first and after the last speech frame
+        frame_ms: Analysis frame length
+        min_speech_ms: Less speech than this in total counts as none
+        channels: Interleaved channels in `data`
+
+    Returns:
+        The trimmed PCM, or b"" if there is no speech
+    """
+    frame_samples = max(1, sample_rate * frame_ms // 1000) * channels
+    levels = frame_rms(data, frame_samples)
+    floor = threshold * 32768
+    voiced = [i for i, level in enumerate(levels) if level >= floor]
+    if not voiced or len(voiced) * frame_ms < min_speech_ms:
+        return b""
+    pad = -(-pad_ms // frame_ms)  # whole frames, rounded up
+    frame_bytes = frame_samples * SAMPLE_WIDTH
+    start = max(0, voiced[0] - pad) * frame_bytes
+    end = min(len(levels), voiced[-1] + 1 + pad) * frame_bytes
+    return bytes(data[start:end])
@@ -0,0 +1,133 @@
+"""Preallocated single-producer, multi-reader frame ring buffer for audio capture."""
+
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+
+class FrameRingBuffer:
+    """
+    Fixed-size ring of equally sized audio frames.
+
+    The producer (a PortAudio callback) never blocks and never takes a lock:
+    it copies the frame into its slot, stamps it, then publishes it by
+    advancing `write_seq`. When the ring is full the oldest frame is
+    overwritten; each reader notices it was lapped and counts the frames it
+    lost. Readers are independent, so VAD, streaming ASR and WAV assembly can
+    each consume at their own pace.
+    """
+
+    def __init__(self, frame_bytes: int, capacity: int) -> None:
+        if frame_bytes <= 0 or capacity <= 0:
+            raise ValueError("frame_bytes and capacity must be positive")
+        self.frame_bytes = frame_bytes
+        self.capacity = capacity
+        self._data = bytearray(frame_bytes * capacity)
+        self._view = memoryview(self._data)
+        self._stamps = array("d", bytes(8 * capacity))
+        self._lengths = array("l", [0] * capacity)
+        self.write_seq = 0
+        self._readers: List["RingReader"] = []
+
+    def write(self, frame: bytes, stamp: Optional[float] = None) -> None:
+        """Publish one frame (at most frame_bytes; shorter frames are kept as-is)."""
+        seq = self.write_seq
+        slot = seq % self.capacity
+        offset = slot * self.frame_bytes
+        length = min(len(frame), self.frame_bytes)
+        self._view[offset : offset + length] = frame[:length]
+        self._lengths[slot] = length
+        self._stamps[slot] = time.monotonic() if stamp is None else stamp
+        self.write_seq = seq + 1
+        for reader in self._readers:
+            reader._ready.set()
+
+    def reader(self, from_start: bool = False) -> "RingReader":
+        """
+        Attach a new reader.
+
+        Args:
+            from_start: Begin at the oldest retained frame instead of the next new one
+        """
+        start = max(0, self.write_seq - self.capacity) if from_start else self.write_seq
+        reader = RingReader(self, start)
+        self._readers = self._readers + [reader]
+        return reader
+
+    def detach(self, reader: "RingReader") -> None:
+        self._readers = [r for r in self._readers if r is not reader]
+
+
+class RingReader:
+    """One consumer's cursor into a FrameRingBuffer."""
+
+    def __init__(self, ring: FrameRingBuffer, start: int) -> None:
+        self.ring = ring
+        self.seq = start
+        self.dropped = 0
+        self.frames_read = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        # Capture time (time.monotonic) of the frame read last
+        self.last_stamp = 0.0
+        self._ready = threading.Event()
+
+    @property
+    def pending(self) -> int:
+        """Frames published but not yet read (capped at the ring capacity)."""
+        return min(self.ring.write_seq - self.seq, self.ring.capacity)
+
+    def _catch_up(self) -> None:
+        # The oldest slot may be mid-overwrite once we are a full ring behind
+        behind = self.ring.write_seq - self.seq
+        if behind >= self.ring.capacity:
+            lost = behind - self.ring.capacity + 1
+            self.dropped += lost
+            self.seq += lost
+
+    def read(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Return the next frame, waiting up to `timeout` seconds (None waits forever).
+
+        Returns:
+            Frame bytes, or None on timeout
+        """
+        ring = self.ring
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._catch_up()
+            if self.seq < ring.write_seq:
+                slot = self.seq % ring.capacity
+                offset = slot * ring.frame_bytes
+                frame = bytes(ring._view[offset : offset + ring._lengths[slot]])
+                stamp = ring._stamps[slot]
+                # The producer may have lapped us while copying; discard torn frames
+                if ring.write_seq - self.seq >= ring.capacity:
+                    continue
+                self.seq += 1
+                self.frames_read += 1
+                self.last_stamp = stamp
+                latency = time.monotonic() - stamp
+                self.latency_total += latency
+                self.latency_max = max(self.latency_max, latency)
+                return frame
+
+            self._ready.clear()
+            if self.seq < ring.write_seq:
+                continue
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            self._ready.wait(remaining)
+
+    def stats(self) -> Dict[str, float]:
+        """Return frames read, frames dropped by overrun and capture-to-read latency."""
+        avg = self.latency_total / self.frames_read if self.frames_read else 0.0
+        return {
+            "frames_read": self.frames_read,
+            "dropped_frames": self.dropped,
+            "pending": self.pending,
+            "latency_ms_avg": avg * 1000,
+            "latency_ms_max": self.latency_max * 1000,
+        }
@@ -0,0 +1,219 @@
+"""Cross-process PCM frame ring in multiprocessing.shared_memory with per-slot sequence counters."""
+
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Dict, Optional
+
+MAGIC = 0x56465247  # "VFRG"
+
+# Header: magic, capacity, frame_bytes, pad | write_seq | read_seq | overflows | underflows | closed
+_HEADER = struct.Struct("<IIIIQQQQQ")
+_HEADER_SIZE = 64
+_WRITE_SEQ = 16
+_READ_SEQ = 24
+_OVERFLOWS = 32
+_UNDERFLOWS = 40
+_CLOSED = 48
+
+# Slot: sequence stamp, payload length, pad, capture time
+_SLOT = struct.Struct("<QIId")
+_U64 = struct.Struct("<Q")
+
+# Poll interval for readers and blocked writers (there is no cross-process condition variable)
+POLL_INTERVAL = 0.001
+
+
+class SharedFrameRing:
+    """
+    Fixed-size ring of PCM frames in a named shared-memory block.
+
+    Frames move between processes without pickling or pipes: the producer
+    copies a frame straight into its slot and readers copy it straight out.
+    Each slot carries a sequence stamp written before (odd) and after (even)
+    the payload, so a reader can detect a slot that was being overwritten
+    while it copied and discard it (a per-slot seqlock).
+
+    One process writes. Readers keep private cursors; the reader that drives
+    a lossless stream (playback) publishes its position with `commit()` so a
+    blocking writer knows when slots are free.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool) -> None:
+        self.shm = shm
+        self.owner = owner
+        self.buf = shm.buf
+        magic, capacity, frame_bytes, _, *_ = _HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{shm.name} is not a VoiceFlow frame ring")
+        self.capacity = capacity
+        self.frame_bytes = frame_bytes
+        self.stride = _SLOT.size + (frame_bytes + 7) // 8 * 8
+
+    @classmethod
+    def create(cls, frame_bytes: int, capacity: int) -> "SharedFrameRing":
+        if frame_bytes <= 0 or capacity <= 0:
+            raise ValueError("frame_bytes and capacity must be positive")
+        stride = _SLOT.size + (frame_bytes + 7) // 8 * 8
+        shm = shared_memory.SharedMemory(create=True, size=_HEADER_SIZE + stride * capacity)
+        shm.buf[: _HEADER_SIZE + stride * capacity] = bytes(_HEADER_SIZE + stride * capacity)
+        _HEADER.pack_into(shm.buf, 0, MAGIC, capacity, frame_bytes, 0, 0, 0, 0, 0, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedFrameRing":
+        return cls(shared_memory.SharedMemory(name=name), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _get(self, offset: int) -> int:
+        return _U64.unpack_from(self.buf, offset)[0]
+
+    def _set(self, offset: int, value: int) -> None:
+        _U64.pack_into(self.buf, offset, value)
+
+    @property
+    def write_seq(self) -> int:
+        return self._get(_WRITE_SEQ)
+
+    @property
+    def read_seq(self) -> int:
+        return self._get(_READ_SEQ)
+
+    @property
+    def closed(self) -> bool:
+        return bool(self._get(_CLOSED))
+
+    def mark_closed(self) -> None:
+        self._set(_CLOSED, 1)
+
+    def count_overflow(self) -> None:
+        self._set(_OVERFLOWS, self._get(_OVERFLOWS) + 1)
+
+    def count_underflow(self) -> None:
+        self._set(_UNDERFLOWS, self._get(_UNDERFLOWS) + 1)
+
+    def write(self, frame: bytes, block: bool = False, timeout: Optional[float] = None) -> bool:
+        """
+        Publish one frame (truncated to frame_bytes).
+
+        Args:
+            frame: PCM bytes
+            block: Wait for the committed reader instead of overwriting unread frames
+            timeout: Maximum wait when blocking
+
+        Returns:
+            False if a blocking write timed out or the ring was closed
+        """
+        seq = self.write_seq
+        if block:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while seq - self.read_seq >= self.capacity:
+                if self.closed or (deadline is not None and time.monotonic() > deadline):
+                    return False
+                time.sleep(POLL_INTERVAL)
+
+        offset = _HEADER_SIZE + (seq % self.capacity) * self.stride
+        length = min(len(frame), self.frame_bytes)
+        _U64.pack_into(self.buf, offset, 2 * seq + 1)
+        start = offset + _SLOT.size
+        self.buf[start : start + length] = frame[:length]
+        _SLOT.pack_into(self.buf, offset, 2 * seq + 2, length, 0, time.monotonic())
+        self._set(_WRITE_SEQ, seq + 1)
+        return True
+
+    def reader(self, from_start: bool = False) -> "SharedRingReader":
+        write_seq = self.write_seq
+        start = max(0, write_seq - self.capacity) if from_start else write_seq
+        return SharedRingReader(self, start)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "write_seq": self.write_seq,
+            "read_seq": self.read_seq,
+            "overflows": self._get(_OVERFLOWS),
+            "underflows": self._get(_UNDERFLOWS),
+        }
+
+    def close(self) -> None:
+        """Detach from the block; the creating process also unlinks it."""
+        self.buf = None  # type: ignore[assignment]
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class SharedRingReader:
+    """A private cursor into a SharedFrameRing."""
+
+    def __init__(self, ring: SharedFrameRing, start: int) -> None:
+        self.ring = ring
+        self.seq = start
+        self.dropped = 0
+        self.frames_read = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        # Capture time (time.monotonic) of the frame read last
+        self.last_stamp = 0.0
+
+    def _skip_lapped(self) -> None:
+        # A frame exactly one ring behind is still intact unless the seqlock says otherwise
+        behind = self.ring.write_seq - self.seq
+        if behind > self.ring.capacity:
+            lost = behind - self.ring.capacity
+            self.dropped += lost
+            self.seq += lost
+
+    def read(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Return the next frame, polling up to `timeout` seconds (None waits forever).
+
+        Returns:
+            Frame bytes, or None on timeout or when the ring is closed and drained
+        """
+        ring = self.ring
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            self._skip_lapped()
+            if self.seq < ring.write_seq:
+                offset = _HEADER_SIZE + (self.seq % ring.capacity) * ring.stride
+                stamp_seq, length, _, stamp = _SLOT.unpack_from(ring.buf, offset)
+                if stamp_seq == 2 * self.seq + 2:
+                    start = offset + _SLOT.size
+                    frame = bytes(ring.buf[start : start + length])
+                    if _U64.unpack_from(ring.buf, offset)[0] == stamp_seq:
+                        self.seq += 1
+                        self.frames_read += 1
+                        self.last_stamp = stamp
+                        latency = time.monotonic() - stamp
+                        self.latency_total += latency
+                        self.latency_max = max(self.latency_max, latency)
+                        return frame
+                # Overwritten under us: count it and move on
+                self.dropped += 1
+                self.seq += 1
+                continue
+
+            if ring.closed:
+                return None
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(POLL_INTERVAL)
+
+    def commit(self) -> None:
+        """Publish this reader's position so blocking writers can reuse slots."""
+        self.ring._set(_READ_SEQ, self.seq)
+
+    def stats(self) -> Dict[str, float]:
+        avg = self.latency_total / self.frames_read if self.frames_read else 0.0
+        return {
+            "frames_read": self.frames_read,
+            "dropped_frames": self.dropped,
+            "latency_ms_avg": avg * 1000,
+            "latency_ms_max": self.latency_max * 1000,
+        }
@@ -0,0 +1,182 @@
+"""
+Streaming voice sessions over WebSocket, for the browser client in web/.
+
+One connection is one conversation (its session ID comes from the URL,
+so the prefork dispatcher pins it to a worker like the HTTP routes). The
+client streams microphone audio as small binary frames while the user
+speaks and sends "end"; the reply's TTS chunks are sent back as binary
+frames the moment Murf produces them.
+
+Protocol (text messages are JSON objects with a "type"):
+    server -> {"type": "ready", "input_rate", "output_rate", "encoding": "pcm16"}
+    client -> {"type": "start", "sample_rate": N}   optional; rate of the frames that follow
+    client -> binary                               16-bit little-endian mono PCM
+    client -> {"type": "end"}                      utterance complete: run the turn
+    server -> {"type": "transcript", "text"}
+    server -> {"type": "reply", "text"}
+    server -> {"type": "audio_start", "sample_rate"}
+    server -> binary ...                           reply audio, 16-bit PCM
+    server -> {"type": "audio_end", "timings": {...}}  per-stage milliseconds
+    client -> {"type": "cancel"}                   drop audio buffered so far
+    client -> {"type": "reset"}                    forget the conversation
+    server -> {"type": "error", "message"}         the turn failed; the socket stays open
+                                                   (after audio_start: the reply audio broke off)
+"""
+
+import json
+import logging
+import time
+from typing import Any, Dict
+
+from .config import SAMPLE_RATE
+from .flight_recorder import flight
+from .utils import pcm
+from .utils.exceptions import WebSocketClosed
+from .websocket import WebSocket
+
+logger = logging.getLogger(__name__)
+
+# Longest utterance buffered before the turn is refused (at 16 kHz, about 4 minutes)
+MAX_UTTERANCE_BYTES = 8 * 1024 * 1024
+MIN_INPUT_RATE = 8000
+MAX_INPUT_RATE = 48000
+
+
+class VoiceStream:
+    """
+    Runs the protocol above for one connection on a SessionWorker.
+
+    Args:
+        worker: SessionWorker whose clients and conversations are used
+        session_id: Conversation this connection speaks for
+        ws: Upgraded connection
+    """
+
+    def __init__(self, worker: Any, session_id: str, ws: WebSocket) -> None:
+        self.worker = worker
+        self.session_id = session_id
+        self.ws = ws
+        self.input_rate = SAMPLE_RATE
+        self.buffer = bytearray()
+        self.turns = 0
+
+    def run(self) -> None:
+        """Serve messages until the client disconnects."""
+        self._send_event(
+            "ready", input_rate=self.input_rate, output_rate=SAMPLE_RATE, encoding="pcm16"
+        )
+        try:
+            while True:
+                message = self.ws.recv()
+                if isinstance(message, bytes):
+                    self._audio(message)
+                else:
+                    self._command(message)
+        except WebSocketClosed as e:
+            logger.debug(f"Voice stream {self.session_id} closed ({e.code}), {self.turns} turns")
+        except OSError as e:
+            logger.debug(f"Voice stream {self.session_id} dropped: {e}")
+        finally:
+            self.ws.close()
+
+    def _audio(self, data: bytes) -> None:
+        if len(self.buffer) + len(data) > MAX_UTTERANCE_BYTES:
+            self.buffer.clear()
+            self._send_event("error", message="utterance too long")
+            return
+        self.buffer += data
+
+    def _command(self, text: str) -> None:
+        try:
+            message = json.loads(text)
+            kind = message.get("type")
+        except (ValueError, AttributeError):
+            self._send_event("error", message="messages must be JSON objects")
+            return
+        if kind == "start":
+            try:
+                rate = int(message.get("sample_rate") or SAMPLE_RATE)
+            except (TypeError, ValueError):
+                rate = 0
+            if not MIN_INPUT_RATE <= rate <= MAX_INPUT_RATE:
+                self._send_event("error", message=f"unsupported sample_rate {rate}")
+                return
+            self.input_rate = rate
+            self.buffer.clear()
+        elif kind == "end":
+            audio, self.buffer = bytes(self.buffer), bytearray()
+            # Numbered by the worker, so dumps from concurrent connections never collide
+            with flight.turn(self.worker.next_turn_id(), session=self.session_id):
+                self._turn(audio)
+        elif kind == "cancel":
+            self.buffer.clear()
+        elif kind == "reset":
+            self.buffer.clear()
+            self.worker.reset(self.session_id)
+        else:
+            self._send_event("error", message=f"unknown message type {kind!r}")
+
+    def _turn(self, audio: bytes) -> None:
+        """Transcribe, reply and stream the reply audio, reporting stage timings."""
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+
+        def mark(name: str) -> None:
+            timings[name] = round((time.perf_counter() - start) * 1000, 1)
+            flight.mark(name[:-3])
+
+        if len(audio) < 2:
+            self._send_event("error", message="no audio")
+            return
+        wav = pcm.to_wav(audio[: len(audio) - len(audio) % 2], self.input_rate)
+        flight.note("audio_in_bytes", len(wav))
+        transcript = self.worker.asr.transcribe_wav(wav)
+        mark("asr_ms")
+        if not transcript:
+            self._send_event("error", message="no speech recognized", timings=timings)
+            return
+        self._send_event("transcript", text=transcript)
+
+        answer = self.worker.reply(self.session_id, transcript)
+        mark("llm_ms")
+        if not answer:
+            self._send_event("error", message="no reply", timings=timings)
+            return
+        self._send_event("reply", text=answer)
+
+        chunks = self.worker.tts.stream_tts(answer)
+        if not chunks:
+            self._send_event("error", message="speech synthesis failed", timings=timings)
+            return
+        self._send_event("audio_start", sample_rate=SAMPLE_RATE)
+        audio_bytes = 0
+        carry = b""
+        stream = iter(chunks)
+        while True:
+            # Synthesis can fail mid-reply (e.g. a failed segment); send errors stay fatal
+            try:
+                chunk = next(stream, None)
+            except Exception as e:
+                logger.error(f"Voice stream {self.session_id}: speech synthesis failed: {e}")
+                flight.note("error", type(e).__name__)
+                mark("total_ms")
+                self._send_event("error", message="speech synthesis failed", timings=timings)
+                return
+            if chunk is None:
+                break
+            # Frames hold whole samples; an odd byte waits for the next chunk
+            data = carry + bytes(chunk) if carry else chunk
+            cut = len(data) - len(data) % 2
+            carry = bytes(data[cut:])
+            if not cut:
+                continue
+            if not audio_bytes:
+                mark("tts_first_chunk_ms")
+            self.ws.send(data[:cut])
+            audio_bytes += cut
+        mark("total_ms")
+        self.turns += 1
+        self._send_event("audio_end", bytes=audio_bytes, timings=timings)
+
+    def _send_event(self, kind: str, **fields: Any) -> None:
+        self.ws.send(json.dumps({"type": kind, **fields}))
@@ -0,0 +1,273 @@
+"""
+Minimal RFC 6455 WebSocket endpoints on the standard library.
+
+The server side upgrades a BaseHTTPRequestHandler connection in place, so
+WebSocket routes live next to the plain HTTP ones (and reach the right
+prefork worker like any other session request). The client side is used
+by tests and benchmarks. Messages are whole text or binary payloads;
+fragmented messages are reassembled and pings are answered as they are
+read.
+"""
+
+import base64
+import hashlib
+import os
+import socket
+import ssl
+import struct
+import threading
+from typing import Any, BinaryIO, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from .utils.exceptions import WebSocketClosed
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONTINUATION = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+# Largest message accepted from a peer
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+Message = Union[str, bytes]
+
+
+def accept_key(key: str) -> str:
+    """Return the Sec-WebSocket-Accept value for a client's Sec-WebSocket-Key."""
+    digest = hashlib.sha1((key + GUID).encode("ascii")).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+def _mask(payload: bytes, key: bytes) -> bytes:
+    # XOR with the repeating 4-byte key, done as one big-integer operation
+    n = len(payload)
+    if not n:
+        return payload
+    repeated = (key * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, "little") ^ int.from_bytes(repeated, "little")).to_bytes(
+        n, "little"
+    )
+
+
+class _SocketWriter:
+    """File-like writer that never writes partially (socket.makefile may)."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+
+    def write(self, data: bytes) -> int:
+        self.sock.sendall(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+
+class WebSocket:
+    """
+    One open WebSocket connection.
+
+    Args:
+        rfile: Buffered reader positioned after the handshake
+        wfile: Writer for the same connection
+        client: Mask outgoing frames (required of clients by RFC 6455)
+        sock: Socket to close with the connection, if this object owns it
+    """
+
+    def __init__(
+        self,
+        rfile: BinaryIO,
+        wfile: Any,
+        client: bool = False,
+        sock: Optional[socket.socket] = None,
+    ) -> None:
+        self.rfile = rfile
+        self.wfile = wfile
+        self.client = client
+        self.sock = sock
+        self.closed = False
+        self._send_lock = threading.Lock()
+
+    def send(self, data: Message) -> None:
+        """Send one text (str) or binary (bytes-like) message."""
+        if isinstance(data, str):
+            self._send_frame(OP_TEXT, data.encode("utf-8"))
+        else:
+            self._send_frame(OP_BINARY, bytes(data))
+
+    def recv(self) -> Message:
+        """
+        Return the next text or binary message.
+
+        Raises:
+            WebSocketClosed: The peer closed the connection (the close is echoed)
+        """
+        opcode = None
+        parts = []
+        size = 0
+        while True:
+            fin, op, payload = self._read_frame()
+            if op == OP_PING:
+                self._send_frame(OP_PONG, payload)
+                continue
+            if op == OP_PONG:
+                continue
+            if op == OP_CLOSE:
+                code = struct.unpack("!H", payload[:2])[0] if len(payload) >= 2 else 1005
+                reason = payload[2:].decode("utf-8", "replace")
+                if not self.closed:
+                    self.close(code if code != 1005 else 1000)
+                raise WebSocketClosed(code, reason)
+            if op != OP_CONTINUATION:
+                opcode, parts, size = op, [], 0
+            size += len(payload)
+            if size > MAX_MESSAGE_BYTES:
+                self.close(1009, "message too big")
+                raise WebSocketClosed(1009, "message too big")
+            parts.append(payload)
+            if fin:
+                data = b"".join(parts)
+                return data.decode("utf-8") if opcode == OP_TEXT else data
+
+    def close(self, code: int = 1000, reason: str = "") -> None:
+        """Send a close frame (once) and release the socket if owned."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._send_frame(OP_CLOSE, struct.pack("!H", code) + reason.encode("utf-8"))
+        except OSError:
+            pass
+        if self.sock is not None:
+            try:
+                # Shutdown first so a thread blocked in recv() sees the connection end
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+
+    def __enter__(self) -> "WebSocket":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _send_frame(self, opcode: int, payload: bytes) -> None:
+        n = len(payload)
+        mask_bit = 0x80 if self.client else 0
+        if n < 126:
+            header = struct.pack("!BB", 0x80 | opcode, mask_bit | n)
+        elif n < 65536:
+            header = struct.pack("!BBH", 0x80 | opcode, mask_bit | 126, n)
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, mask_bit | 127, n)
+        if self.client:
+            key = os.urandom(4)
+            header += key
+            payload = _mask(payload, key)
+        with self._send_lock:
+            self.wfile.write(header + payload)
+            self.wfile.flush()
+
+    def _read_exact(self, n: int) -> bytes:
+        data = self.rfile.read(n) if n else b""
+        if len(data) < n:
+            self.closed = True
+            raise WebSocketClosed(1006, "connection lost")
+        return data
+
+    def _read_frame(self) -> Tuple[bool, int, bytes]:
+        first, second = self._read_exact(2)
+        n = second & 0x7F
+        if n == 126:
+            n = struct.unpack("!H", self._read_exact(2))[0]
+        elif n == 127:
+            n = struct.unpack("!Q", self._read_exact(8))[0]
+        if n > MAX_MESSAGE_BYTES:
+            self.close(1009, "message too big")
+            raise WebSocketClosed(1009, "message too big")
+        key = self._read_exact(4) if second & 0x80 else None
+        payload = self._read_exact(n)
+        if key:
+            payload = _mask(payload, key)
+        return bool(first & 0x80), first & 0x0F, payload
+
+
+def upgrade(handler: Any) -> Optional[WebSocket]:
+    """
+    Complete a WebSocket handshake on a BaseHTTPRequestHandler's connection.
+
+    Sends 101 and returns the socket, or sends 400 and returns None if the
+    request is not a valid upgrade. The handler's connection is not reused
+    for HTTP afterwards.
+    """
+    key = handler.headers.get("Sec-WebSocket-Key")
+    if handler.headers.get("Upgrade", "").lower() != "websocket" or not key:
+        handler.close_connection = True
+        handler.send_error(400, "Expected a WebSocket upgrade")
+        return None
+    handler.close_connection = True
+    handler.send_response(101, "Switching Protocols")
+    handler.send_header("Upgrade", "websocket")
+    handler.send_header("Connection", "Upgrade")
+    handler.send_header("Sec-WebSocket-Accept", accept_key(key))
+    handler.end_headers()
+    handler.wfile.flush()
+    return WebSocket(handler.rfile, handler.wfile)
+
+
+def connect(
+    url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = 10.0
+) -> WebSocket:
+    """
+    Open a client WebSocket to a ws:// or wss:// URL.
+
+    `timeout` covers connecting and the handshake; reads afterwards block.
+
+    Raises:
+        ConnectionError: The server did not accept the upgrade
+    """
+    parts = urlsplit(url)
+    secure = parts.scheme == "wss"
+    port = parts.port or (443 if secure else 80)
+    sock = socket.create_connection((parts.hostname, port), timeout=timeout)
+    if secure:
+        sock = ssl.create_default_context().wrap_socket(sock, server_hostname=parts.hostname)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    key = base64.b64encode(os.urandom(16)).decode("ascii")
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    lines = [
+        f"GET {path} HTTP/1.1",
+        f"Host: {parts.netloc}",
+        "Upgrade: websocket",
+        "Connection: Upgrade",
+        f"Sec-WebSocket-Key: {key}",
+        "Sec-WebSocket-Version: 13",
+    ]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    sock.sendall(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+    rfile = sock.makefile("rb")
+    status = rfile.readline().decode("latin-1").split()
+    response: Dict[str, str] = {}
+    while True:
+        line = rfile.readline().decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        response[name.strip().lower()] = value.strip()
+    accepted = response.get("sec-websocket-accept") == accept_key(key)
+    if len(status) < 2 or status[1] != "101" or not accepted:
+        sock.close()
+        raise ConnectionError(f"WebSocket upgrade to {url} refused: {' '.join(status)}")
+    sock.settimeout(None)
+    return WebSocket(rfile, _SocketWriter(sock), client=True, sock=sock)
@@ -0,0 +1,10 @@
+"""
+Performance benchmarks for VoiceFlow.
+
+Benchmarks never call real providers, so placeholder API keys are set here
+(as tests/conftest.py does) to let `app.config` import without a .env file.
+"""
+import os
+
+for _key in ("MURF_API_KEY", "DEEPGRAM_API_KEY", "OPENAI_API_KEY"):
+    os.environ.setdefault(_key, "benchmark_placeholder")
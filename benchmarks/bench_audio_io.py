@@ -0,0 +1,51 @@
+"""
+Audio sink throughput without hardware, in multiples of real time.
+
+Streams a reply as 4 KB memoryview chunks (like Murf stream chunks) into
+the null, WAV-file and pipe sinks and reports how much faster than
+playback speed each one consumes audio.
+
+Run: python -m benchmarks.bench_audio_io [--seconds S]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from app.audio_io import NullSink, PipeSink, WavFileSink
+
+CHUNK_BYTES = 4096
+SAMPLE_RATE = 24000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=600, help="Seconds of audio per sink")
+    args = parser.parse_args()
+
+    pcm = bytes(int(args.seconds * SAMPLE_RATE) * 2)
+    view = memoryview(pcm)
+    chunks = [view[i : i + CHUNK_BYTES] for i in range(0, len(pcm), CHUNK_BYTES)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        devnull = open(os.devnull, "wb")
+        sinks = {
+            "null": NullSink(SAMPLE_RATE),
+            "wav": WavFileSink(os.path.join(tmp, "out.wav"), SAMPLE_RATE),
+            "pipe": PipeSink(devnull, SAMPLE_RATE),
+        }
+        for name, sink in sinks.items():
+            start = time.perf_counter()
+            sink.play(chunks)
+            sink.close()
+            elapsed = time.perf_counter() - start
+            print(
+                f"{name:5s} {len(pcm) / elapsed / 1e6:8.1f} MB/s  "
+                f"{args.seconds / elapsed:10.0f}x real time"
+            )
+        devnull.close()
+
+
+if __name__ == "__main__":
+    main()
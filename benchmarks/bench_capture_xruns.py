@@ -0,0 +1,96 @@
+"""
+Capture xruns under synthetic CPU load: device on a thread of this process vs a child process.
+
+Both modes run the same synthetic device (a silent frame every buffer period)
+into a SharedFrameRing; only the process hosting it differs. CPU load is
+JSON encode/decode on busy threads in this process, standing in for the
+OpenAI SDK, logging and request handling competing for the GIL.
+
+Run: python -m benchmarks.bench_capture_xruns [--seconds S] [--load-threads N]
+"""
+
+import argparse
+import json
+import threading
+import time
+
+from app.audio_process import PLAYBACK_FRAME_BYTES, AudioProcess, run_synthetic_device
+from app.utils.shared_ring import SharedFrameRing
+
+PAYLOAD = {"choices": [{"message": {"role": "assistant", "content": "word " * 200}}] * 4}
+
+
+def burn(stop: threading.Event) -> None:
+    while not stop.is_set():
+        json.loads(json.dumps(PAYLOAD))
+
+
+def consume(reader, seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        reader.read(timeout=0.1)
+
+
+def run_thread(args: argparse.Namespace) -> dict:
+    capture = SharedFrameRing.create(args.frames_per_buffer * 2, 256)
+    playback = SharedFrameRing.create(PLAYBACK_FRAME_BYTES, 8)
+    stop = threading.Event()
+    device = threading.Thread(
+        target=run_synthetic_device,
+        args=(capture, playback, args.frames_per_buffer / args.sample_rate, stop),
+        daemon=True,
+    )
+    device.start()
+    reader = capture.reader()
+    consume(reader, args.seconds)
+    stop.set()
+    device.join()
+    result = {"xruns": capture.stats()["overflows"], "frames": capture.write_seq, **reader.stats()}
+    capture.close()
+    playback.close()
+    return result
+
+
+def run_process(args: argparse.Namespace) -> dict:
+    with AudioProcess(
+        args.sample_rate, frames_per_buffer=args.frames_per_buffer, source="synthetic"
+    ) as proc:
+        reader = proc.reader()
+        consume(reader, args.seconds)
+        stats = proc.stats()
+    return {"xruns": stats["input_overflows"], "frames": stats["frames_captured"], **reader.stats()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0, help="Capture duration per run")
+    parser.add_argument("--load-threads", type=int, default=4, help="Busy threads in this process")
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--frames-per-buffer", type=int, default=256, help="Device buffer size")
+    args = parser.parse_args()
+
+    period_ms = args.frames_per_buffer / args.sample_rate * 1000
+    print(f"buffer period {period_ms:.1f} ms, {args.load_threads} load threads, {args.seconds}s")
+    for name, run in (("thread", run_thread), ("process", run_process)):
+        stop = threading.Event()
+        load = [
+            threading.Thread(target=burn, args=(stop,), daemon=True)
+            for _ in range(args.load_threads)
+        ]
+        for t in load:
+            t.start()
+        try:
+            r = run(args)
+        finally:
+            stop.set()
+            for t in load:
+                t.join()
+        print(
+            f"{name:8s} xruns={r['xruns']:4d} frames={r['frames']:5d} "
+            f"dropped={r['dropped_frames']:4d} "
+            f"latency avg={r['latency_ms_avg']:.1f} ms max={r['latency_ms_max']:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
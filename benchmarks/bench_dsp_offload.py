@@ -0,0 +1,82 @@
+"""
+Event-loop lag with CPU-bound audio work run inline vs offloaded to a process pool.
+
+Simulates server-mode sessions on one asyncio loop: each session repeatedly
+resamples a second of 24 kHz TTS audio to 16 kHz and meters its levels. A
+monitor task sleeps in short ticks and records how late each wake-up is.
+
+Run: python -m benchmarks.bench_dsp_offload [--sessions N] [--seconds S] [--workers W]
+"""
+
+import argparse
+import asyncio
+import math
+import statistics
+import time
+from array import array
+
+from app.dsp import DSPExecutor, ProcessPoolDSPExecutor
+
+TICK = 0.005
+
+
+def tone(seconds: float, rate: int) -> bytes:
+    return array("h", (int(8000 * math.sin(i / 8)) for i in range(int(seconds * rate)))).tobytes()
+
+
+async def monitor(lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - start - TICK)
+
+
+async def session(executor: DSPExecutor, audio: bytes, stop: asyncio.Event, done: list) -> None:
+    while not stop.is_set():
+        pcm = await executor.run_async("resample", audio, src_rate=24000, dst_rate=16000)
+        await executor.run_async("levels", pcm, frame_samples=320)
+        done.append(1)
+        await asyncio.sleep(0)  # inline jobs never yield on their own
+
+
+async def measure(executor: DSPExecutor, sessions: int, seconds: float) -> dict:
+    audio = tone(1.0, 24000)
+    stop = asyncio.Event()
+    lags: list = []
+    done: list = []
+    tasks = [asyncio.create_task(monitor(lags, stop))]
+    tasks += [asyncio.create_task(session(executor, audio, stop, done)) for _ in range(sessions)]
+    await asyncio.sleep(seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    lags.sort()
+    return {
+        "jobs_per_s": len(done) / seconds,
+        "lag_p50_ms": statistics.median(lags) * 1000,
+        "lag_p99_ms": lags[int(len(lags) * 0.99)] * 1000,
+        "lag_max_ms": lags[-1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=4, help="Concurrent sessions")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Duration per run")
+    parser.add_argument("--workers", type=int, default=2, help="Pool processes")
+    args = parser.parse_args()
+
+    runs = (("inline", DSPExecutor), ("pool", lambda: ProcessPoolDSPExecutor(args.workers)))
+    for name, factory in runs:
+        with factory() as executor:
+            if name == "pool":
+                # Spawn the workers before measuring
+                executor.run("rms", bytes(executor.inline_below))
+            r = asyncio.run(measure(executor, args.sessions, args.seconds))
+        print(
+            f"{name:7s} {r['jobs_per_s']:6.1f} jobs/s  loop lag p50={r['lag_p50_ms']:.1f} ms "
+            f"p99={r['lag_p99_ms']:.1f} ms max={r['lag_max_ms']:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
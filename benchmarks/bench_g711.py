@@ -0,0 +1,72 @@
+"""
+G.711 μ-law codec throughput in telephone channels per core, and bandwidth per call.
+
+One channel is 8000 samples per second in each direction that is coded.
+Encoding runs on 20 ms chunks (the usual RTP packet) and on whole
+seconds, to show the per-call overhead of small chunks. The bandwidth
+table compares the wideband profile (16 kHz PCM up, 24 kHz PCM down)
+with the telephony profile (8 kHz μ-law both ways).
+
+Run: python -m benchmarks.bench_g711 [--seconds S]
+"""
+
+import argparse
+import math
+import time
+from array import array
+
+from app.utils.g711 import ulaw_decode, ulaw_encode
+
+RATE = 8000
+
+
+def speech_like(seconds: float) -> bytes:
+    """A tone with a slow envelope, so codes spread over every segment."""
+    n = int(seconds * RATE)
+    return array(
+        "h", (int(20000 * math.sin(i / 3) * abs(math.sin(i / 4000))) for i in range(n))
+    ).tobytes()
+
+
+def channels_per_core(fn, chunks: list, audio_seconds: float, min_time: float) -> float:
+    """Run fn over every chunk until `min_time` passes; return real-time channels per CPU second."""
+    rounds = 0
+    start = time.process_time()
+    while True:
+        for chunk in chunks:
+            fn(chunk)
+        rounds += 1
+        elapsed = time.process_time() - start
+        if elapsed >= min_time:
+            return rounds * audio_seconds / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=2.0, help="CPU time per measurement")
+    args = parser.parse_args()
+
+    audio = speech_like(10.0)
+    encoded = ulaw_encode(audio)
+    print("operation           chunk   channels/core")
+    for label, chunk_ms in (("20 ms", 20), ("1 s", 1000)):
+        step = RATE * chunk_ms // 1000
+        pcm_chunks = [audio[i : i + 2 * step] for i in range(0, len(audio), 2 * step)]
+        ulaw_chunks = [encoded[i : i + step] for i in range(0, len(encoded), step)]
+        enc = channels_per_core(ulaw_encode, pcm_chunks, 10.0, args.seconds)
+        dec = channels_per_core(ulaw_decode, ulaw_chunks, 10.0, args.seconds)
+        print(f"encode              {label:>5s}   {enc:13.0f}")
+        print(f"decode              {label:>5s}   {dec:13.0f}")
+
+    print()
+    print("profile     uplink kbit/s  downlink kbit/s  total")
+    wide_up, wide_down = 16000 * 16 / 1000, 24000 * 16 / 1000
+    tel_up = tel_down = RATE * 8 / 1000
+    print(f"wideband    {wide_up:13.0f}  {wide_down:15.0f}  {wide_up + wide_down:5.0f}")
+    print(f"telephony   {tel_up:13.0f}  {tel_down:15.0f}  {tel_up + tel_down:5.0f}")
+    total = (wide_up + wide_down) / (tel_up + tel_down)
+    print(f"reduction   {wide_up / tel_up:12.0f}x  {wide_down / tel_down:14.0f}x  {total:4.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Fast-path intent matching: per-utterance cost and share of turns skipping the LLM.
+
+Run: python -m benchmarks.bench_intents [--repeat N]
+"""
+
+import argparse
+import time
+
+from app.intents import match_intent
+
+# A representative mix of transcripts from voice sessions
+CORPUS = [
+    "What's the weather like in Mumbai tomorrow?",
+    "Repeat that.",
+    "Can you explain what a neural network is?",
+    "Stop.",
+    "What time is it?",
+    "Give me three ideas for a team offsite.",
+    "Say that again, please.",
+    "Louder.",
+    "How do I convert Celsius to Fahrenheit?",
+    "Start over.",
+    "Summarize our conversation so far.",
+    "What's today's date?",
+    "Thanks, that's helpful.",
+    "Never mind.",
+    "Write a short note reminding me to call the bank.",
+    "What did you say?",
+    "Tell me a fun fact about octopuses.",
+    "Quieter.",
+    "Why is the sky blue?",
+    "What is the capital of Australia?",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20000, help="Passes over the corpus")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for transcript in CORPUS:
+            match_intent(transcript)
+    elapsed = time.perf_counter() - start
+
+    matched = [t for t in CORPUS if match_intent(t)]
+    per_call_us = elapsed / (args.repeat * len(CORPUS)) * 1e6
+    print(f"match_intent: {per_call_us:.2f} us/utterance over {args.repeat * len(CORPUS)} calls")
+    print(
+        f"turns skipping the LLM: {len(matched)}/{len(CORPUS)} "
+        f"({len(matched) / len(CORPUS):.0%} of this corpus)"
+    )
+
+
+if __name__ == "__main__":
+    main()
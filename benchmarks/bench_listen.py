@@ -0,0 +1,90 @@
+"""
+Idle CPU and onset-to-turn-start latency of hands-free listening.
+
+A feeder thread writes 20 ms frames into a FrameRingBuffer in real time, as
+the PortAudio callback would: room noise, with a short burst of speech
+every `--gap` seconds. ListeningSource waits for each burst and returns it
+as a turn. Reports the listener's CPU use while idle (against its budget)
+and the time from the first voiced frame's capture to the turn starting.
+
+Run: python -m benchmarks.bench_listen [--seconds S] [--gap S] [--budget PERCENT]
+"""
+
+import argparse
+import logging
+import threading
+import time
+from array import array
+
+from app.listener import FRAME_MS, ListeningSource
+from app.utils.ring_buffer import FrameRingBuffer
+
+SAMPLE_RATE = 16000
+FRAME = SAMPLE_RATE * FRAME_MS // 1000
+SPEECH_FRAMES = 25
+
+
+class SyntheticCapture:
+    """Real-time capture of synthetic noise and speech bursts."""
+
+    def __init__(self, seconds: float, gap: float) -> None:
+        self.ring = FrameRingBuffer(FRAME * 2, 500)
+        self.seconds = seconds
+        self.gap = gap
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self) -> None:
+        noise = array("h", [30, -30] * (FRAME // 2)).tobytes()
+        speech = array("h", [6000, -6000] * (FRAME // 2)).tobytes()
+        period = FRAME_MS / 1000
+        gap_frames = int(self.gap / period)
+        start = time.monotonic()
+        for i in range(int(self.seconds / period)):
+            delay = start + i * period - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            voiced = i % gap_frames >= gap_frames - SPEECH_FRAMES
+            self.ring.write(speech if voiced else noise)
+        self.ring.closed = True  # type: ignore[attr-defined]
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._thread.join()
+
+    def reader(self, from_start: bool = False):
+        return self.ring.reader(from_start=from_start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10, help="Capture length")
+    parser.add_argument("--gap", type=float, default=2.0, help="Seconds between speech bursts")
+    parser.add_argument("--budget", type=float, default=2, help="Idle CPU budget, percent")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    listener = ListeningSource(
+        SyntheticCapture(args.seconds, args.gap),
+        SAMPLE_RATE,
+        hangover_ms=200,
+        idle_cpu_budget=args.budget / 100,
+    )
+    while listener.record():
+        pass
+    listener.close()
+    stats = listener.stats()
+    print(
+        f"turns {stats['utterances']}  idle {stats['idle_seconds']:.1f} s  "
+        f"idle CPU {stats['idle_cpu_percent']:.2f}% (budget {stats['idle_cpu_budget_percent']:.1f}%)"
+        f"  stride {stats['detector_stride']}"
+    )
+    print(
+        f"onset to turn start: avg {stats['onset_latency_ms_avg']:.1f} ms  "
+        f"max {stats['onset_latency_ms_max']:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
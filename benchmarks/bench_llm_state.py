@@ -0,0 +1,63 @@
+"""
+Bytes uploaded and input tokens billed per turn for each LLM state mode.
+
+Runs the same scripted conversation through LLMClient against a local
+OpenAI-compatible stand-in (benchmarks/standins.py) in "full", "prefix" and
+"stateful" mode. Cached tokens are the stand-in's simulation of provider
+prompt caching.
+
+Run: python -m benchmarks.bench_llm_state [--turns N]
+"""
+
+import argparse
+import logging
+
+from app.agent import SYSTEM_PROMPT
+from app.llm_openai import LLMClient
+from benchmarks.standins import OpenAIStandIn
+
+MODES = ("full", "prefix", "stateful")
+
+
+def run(mode: str, turns: int) -> list:
+    rows = []
+    with OpenAIStandIn() as standin:
+        client = LLMClient(state_mode=mode, base_url=standin.base_url)
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+        before = client.usage_stats()
+        for i in range(turns):
+            messages.append(
+                {"role": "user", "content": f"Turn {i}: tell me something about topic {i}."}
+            )
+            reply = client.chat(messages)
+            messages.append({"role": "assistant", "content": reply})
+            after = client.usage_stats()
+            keys = ("bytes_sent", "input_tokens", "cached_tokens")
+            rows.append({k: after[k] - before[k] for k in keys})
+            before = after
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=20, help="Conversation length")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    results = {mode: run(mode, args.turns) for mode in MODES}
+    print("turn  " + "  ".join(f"{m:>24s}" for m in MODES))
+    print("      " + "  ".join(f"{'bytes  tokens  cached':>24s}" for _ in MODES))
+    for i in range(args.turns):
+        cells = [
+            f"{r[i]['bytes_sent']:7d} {r[i]['input_tokens']:7d} {r[i]['cached_tokens']:7d}"
+            for r in results.values()
+        ]
+        print(f"{i + 1:4d}  " + "  ".join(f"{c:>24s}" for c in cells))
+    for mode, rows in results.items():
+        sent = sum(r["bytes_sent"] for r in rows)
+        billed = sum(r["input_tokens"] - r["cached_tokens"] for r in rows)
+        print(f"{mode:9s} total {sent} bytes uploaded, {billed} uncached input tokens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Concurrent-caller load test: how many simultaneous conversations a host sustains.
+
+Runs the prefork server with each worker's clients pointed at local
+stand-ins (benchmarks/standins.py) of configurable latency, then simulates
+N callers per level. Each caller holds one voice WebSocket
+(app/voice_stream.py) and loops: think for a random time, stream a WAV
+prompt, and wait for the reply audio. Per turn it records time to first
+audio (end of the prompt to the first reply frame) and end-to-end latency
+(to the end of the reply). N is ramped until the p99 of the chosen metric
+breaks the SLO or too many turns fail; the last level within the SLO is
+the host's capacity. Per-level summaries go to --json and every turn to
+--csv.
+
+Run: python -m benchmarks.bench_load [--callers 1,2,4,8] [--slo-ms MS] [--json PATH] [--csv PATH]
+"""
+
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app import websocket
+from app.server import PreforkServer
+from app.utils import pcm
+from benchmarks.bench_server_scaling import standin_worker, utterance
+from benchmarks.standins import DeepgramStandIn, MurfStandIn, OpenAIStandIn
+
+METRICS = ("ttfa_ms", "e2e_ms")
+# Frame length prompts are streamed in
+FRAME_SECONDS = 0.02
+CSV_FIELDS = ("callers", "caller", "turn", "started_s", "think_s", "ttfa_ms", "e2e_ms", "error")
+
+Prompt = Tuple[int, bytes]
+
+
+def _serve_standins(asr: float, llm: float, tts: float, urls, stop) -> None:
+    standins = [OpenAIStandIn(llm), DeepgramStandIn(asr), MurfStandIn(tts)]
+    for standin in standins:
+        standin.start()
+    urls.put([s.base_url for s in standins])
+    stop.wait()
+    for standin in standins:
+        standin.stop()
+
+
+def load_prompts(path: Optional[str]) -> List[Prompt]:
+    """
+    Read the prompts callers replay: a mono 16-bit WAV, or a directory of them.
+
+    Returns:
+        (sample rate, PCM) per prompt; a synthetic 2 s utterance if `path` is None
+
+    Raises:
+        ValueError: A file is not a mono 16-bit PCM WAV, or the directory has none
+    """
+    if path is None:
+        _, rate, _, data = pcm.read_wav(utterance())
+        return [(rate, data)]
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, f) for f in os.listdir(path) if f.endswith(".wav"))
+    else:
+        files = [path]
+    prompts = []
+    for name in files:
+        with open(name, "rb") as f:
+            encoding, rate, channels, data = pcm.read_wav(f.read())
+        if encoding != "linear16" or channels != 1:
+            raise ValueError(f"{name}: prompts must be mono 16-bit PCM")
+        prompts.append((rate, data))
+    if not prompts:
+        raise ValueError(f"no .wav prompts in {path}")
+    return prompts
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0-100), or None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
+
+
+def _turn(ws: websocket.WebSocket, prompt: Prompt, realtime: bool) -> Dict[str, Any]:
+    """Stream one prompt and wait for the reply; return its timings or error."""
+    rate, data = prompt
+    frame = 2 * int(rate * FRAME_SECONDS)
+    ws.send(json.dumps({"type": "start", "sample_rate": rate}))
+    for offset in range(0, len(data), frame):
+        ws.send(data[offset : offset + frame])
+        if realtime:
+            time.sleep(FRAME_SECONDS)
+    ws.send(json.dumps({"type": "end"}))
+    start = time.perf_counter()
+    ttfa = None
+    while True:
+        message = ws.recv()
+        if not isinstance(message, str):
+            if ttfa is None:
+                ttfa = (time.perf_counter() - start) * 1000
+            continue
+        event = json.loads(message)
+        if event["type"] == "error":
+            return {"ttfa_ms": None, "e2e_ms": None, "error": event.get("message", "error")}
+        if event["type"] == "audio_end":
+            e2e = round((time.perf_counter() - start) * 1000, 1)
+            if ttfa is None:
+                return {"ttfa_ms": None, "e2e_ms": e2e, "error": "no audio"}
+            return {"ttfa_ms": round(ttfa, 1), "e2e_ms": e2e, "error": None}
+
+
+def _row(
+    caller: int,
+    turn: int,
+    started: float,
+    think: float,
+    ttfa_ms: Optional[float],
+    e2e_ms: Optional[float],
+    error: Optional[str],
+) -> Dict[str, Any]:
+    return {
+        "caller": caller,
+        "turn": turn,
+        "started_s": round(started, 3),
+        "think_s": round(think, 3),
+        "ttfa_ms": ttfa_ms,
+        "e2e_ms": e2e_ms,
+        "error": error,
+    }
+
+
+def run_caller(
+    url: str,
+    index: int,
+    prompts: List[Prompt],
+    think: float,
+    deadline: float,
+    origin: float,
+    rows: List[Dict[str, Any]],
+    realtime: bool = False,
+    seed: int = 0,
+    timeout: float = 30.0,
+) -> None:
+    """
+    One caller's conversation: think, speak, await the reply, until `deadline`.
+
+    Think times are exponential with mean `think`, so callers drift apart
+    like independent people rather than speaking in lockstep; the first
+    turn waits a uniform fraction of `think` to stagger arrivals.
+    """
+    rng = random.Random(seed * 1000 + index)
+    pause = rng.uniform(0, think)
+    turn = 0
+    ws = None
+    try:
+        while time.monotonic() + pause < deadline:
+            time.sleep(pause)
+            if ws is None:
+                ws = websocket.connect(url, timeout=timeout)
+                ws.sock.settimeout(timeout)
+                json.loads(ws.recv())  # "ready"
+            started = time.monotonic() - origin
+            result = _turn(ws, prompts[turn % len(prompts)], realtime)
+            rows.append(_row(index, turn, started, pause, **result))
+            turn += 1
+            pause = rng.expovariate(1 / think) if think > 0 else 0.0
+    except Exception as e:
+        # A dropped or stalled connection ends this caller; it counts as one failed turn
+        error = str(e) or type(e).__name__
+        rows.append(_row(index, turn, time.monotonic() - origin, pause, None, None, error))
+    finally:
+        if ws is not None:
+            ws.close()
+
+
+def run_level(
+    address: Tuple[str, int],
+    callers: int,
+    prompts: List[Prompt],
+    seconds: float,
+    think: float,
+    realtime: bool = False,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Run `callers` concurrent conversations for `seconds`; return one row per turn."""
+    rows: List[Dict[str, Any]] = []
+    origin = time.monotonic()
+    deadline = origin + seconds
+    base = f"ws://{address[0]}:{address[1]}/sessions/load-{callers}"
+    threads = [
+        threading.Thread(
+            target=run_caller,
+            args=(f"{base}-{i}/ws", i, prompts, think, deadline, origin, rows, realtime, seed),
+            daemon=True,
+        )
+        for i in range(callers)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for row in rows:
+        row["callers"] = callers
+    return sorted(rows, key=lambda r: (r["caller"], r["turn"]))
+
+
+def summarize(
+    callers: int,
+    rows: List[Dict[str, Any]],
+    seconds: float,
+    slo_ms: float,
+    metric: str = "ttfa_ms",
+    max_error_rate: float = 0.01,
+) -> Dict[str, Any]:
+    """
+    Summarize one level: turn rate, error rate, p50/p95/p99 per metric and the SLO verdict.
+
+    A level meets the SLO when the p99 of `metric` is at most `slo_ms` and
+    no more than `max_error_rate` of its turns failed.
+    """
+    ok = [r for r in rows if not r["error"]]
+    summary: Dict[str, Any] = {
+        "callers": callers,
+        "turns": len(rows),
+        "errors": len(rows) - len(ok),
+        "error_rate": round((len(rows) - len(ok)) / len(rows), 4) if rows else 0.0,
+        "turns_per_s": round(len(ok) / seconds, 2),
+    }
+    for name in METRICS:
+        values = [r[name] for r in ok]
+        for q in (50, 95, 99):
+            value = percentile(values, q)
+            summary[f"{name[:-3]}_p{q}_ms"] = None if value is None else round(value, 1)
+    p99 = summary[f"{metric[:-3]}_p99_ms"]
+    summary["within_slo"] = (
+        p99 is not None and p99 <= slo_ms and summary["error_rate"] <= max_error_rate
+    )
+    return summary
+
+
+def find_knee(levels: List[Dict[str, Any]]) -> Dict[str, Optional[int]]:
+    """
+    Locate the knee of a ramp.
+
+    Returns:
+        "capacity": most callers at which this and every smaller level met the SLO
+        (None if the first level missed it), and "breach": the first level that missed
+    """
+    capacity = breach = None
+    for level in sorted(levels, key=lambda lv: lv["callers"]):
+        if not level["within_slo"]:
+            breach = level["callers"]
+            break
+        capacity = level["callers"]
+    return {"capacity": capacity, "breach": breach}
+
+
+def write_json(path: str, config: Dict[str, Any], levels: List[Dict[str, Any]]) -> None:
+    with open(path, "w") as f:
+        json.dump({"config": config, "levels": levels, "knee": find_knee(levels)}, f, indent=2)
+        f.write("\n")
+
+
+def write_csv(path: str, rows: List[Dict[str, Any]]) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({name: row.get(name) for name in CSV_FIELDS})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--callers", default="1,2,4,8,16,32", help="Caller counts to ramp")
+    parser.add_argument("--seconds", type=float, default=20.0, help="Load duration per level")
+    parser.add_argument("--think", type=float, default=3.0, help="Mean think time, seconds")
+    parser.add_argument("--prompts", help="WAV prompt, or directory of them (default: synthetic)")
+    parser.add_argument("--realtime", action="store_true", help="Stream prompts at speaking pace")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Server workers")
+    parser.add_argument("--asr-latency", type=float, default=0.15, help="Stand-in seconds")
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="Stand-in seconds")
+    parser.add_argument("--tts-latency", type=float, default=0.2, help="Stand-in seconds")
+    parser.add_argument("--slo-ms", type=float, default=1500, help="p99 latency objective")
+    parser.add_argument("--metric", choices=METRICS, default="ttfa_ms", help="SLO metric")
+    parser.add_argument("--max-error-rate", type=float, default=0.01, help="Failed turn share")
+    parser.add_argument("--full", action="store_true", help="Keep ramping past the knee")
+    parser.add_argument(
+        "--coalesce",
+        action="store_true",
+        help="Let workers share identical upstream calls (callers replay the same prompts, "
+        "so this overstates capacity)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Think-time random seed")
+    parser.add_argument("--json", help="Write level summaries and the knee here")
+    parser.add_argument("--csv", help="Write every turn here")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    prompts = load_prompts(args.prompts)
+    ctx = multiprocessing.get_context("spawn")
+    urls, stop = ctx.Queue(), ctx.Event()
+    standins = ctx.Process(
+        target=_serve_standins,
+        args=(args.asr_latency, args.llm_latency, args.tts_latency, urls, stop),
+        daemon=True,
+    )
+    standins.start()
+    openai_url, deepgram_url, murf_url = urls.get(timeout=30)
+    os.environ.update(
+        BENCH_OPENAI_URL=openai_url, BENCH_DEEPGRAM_URL=deepgram_url, BENCH_MURF_URL=murf_url
+    )
+    # Workers are spawned, so they read this when they import the config
+    os.environ["COALESCE_REQUESTS"] = "true" if args.coalesce else "false"
+
+    print(
+        f"{args.workers} workers; stand-ins asr {args.asr_latency}s llm {args.llm_latency}s "
+        f"tts {args.tts_latency}s; SLO p99 {args.metric} <= {args.slo_ms:.0f} ms"
+    )
+    print("callers  turns/s  errors  ttfa p50   p99    e2e p50   p99   SLO")
+    levels: List[Dict[str, Any]] = []
+    rows: List[Dict[str, Any]] = []
+    try:
+        with PreforkServer("127.0.0.1", 0, args.workers, factory=standin_worker) as server:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            run_level(server.address, 1, prompts, 0.5, 0.0)  # warm up workers and clients
+            for callers in (int(n) for n in args.callers.split(",")):
+                level_rows = run_level(
+                    server.address, callers, prompts, args.seconds, args.think, args.realtime,
+                    args.seed,
+                )
+                level = summarize(
+                    callers, level_rows, args.seconds, args.slo_ms, args.metric, args.max_error_rate
+                )
+                levels.append(level)
+                rows.extend(level_rows)
+                print(
+                    f"{callers:7d}  {level['turns_per_s']:7.2f}  {level['errors']:6d}  "
+                    f"{level['ttfa_p50_ms'] or 0:8.0f}  {level['ttfa_p99_ms'] or 0:5.0f}  "
+                    f"{level['e2e_p50_ms'] or 0:8.0f}  {level['e2e_p99_ms'] or 0:5.0f}  "
+                    f"{'ok' if level['within_slo'] else 'MISS'}"
+                )
+                if not level["within_slo"] and not args.full:
+                    break
+    finally:
+        stop.set()
+        standins.join(timeout=5)
+
+    knee = find_knee(levels)
+    print(f"capacity: {knee['capacity']} callers within SLO; first breach at {knee['breach']}")
+    config = {k: v for k, v in vars(args).items() if k not in ("json", "csv")}
+    if args.json:
+        write_json(args.json, config, levels)
+    if args.csv:
+        write_csv(args.csv, rows)
+
+
+if __name__ == "__main__":
+    main()
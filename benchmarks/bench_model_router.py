@@ -0,0 +1,83 @@
+"""
+Turn latency with and without model routing, and how turns split across tiers.
+
+Plays a scripted conversation of small talk, short questions and requests
+for explanations through LLMClient against the local OpenAI stand-in
+(benchmarks/standins.py), whose answer time depends on the model asked.
+With routing on, simple turns go to LLM_FAST_MODEL. Pass a --fast-latency
+above --standard-latency to watch the router stop using a fast tier that
+has become the slower one.
+
+Run: python -m benchmarks.bench_model_router [--turns N] [--fast-latency S]
+"""
+
+import argparse
+import logging
+import statistics
+import time
+from typing import Any, Dict, List, Tuple
+
+from app.agent import SYSTEM_PROMPT
+from app.config import LLM_FAST_MODEL, OPENAI_MODEL
+from app.llm_openai import LLMClient
+from benchmarks.standins import OpenAIStandIn
+
+SCRIPT = (
+    "Hi there!",
+    "What is the capital of Japan?",
+    "Explain how a rainbow forms.",
+    "Thanks!",
+    "How tall is Mount Fuji?",
+    "Compare trains and planes for a trip from Tokyo to Osaka, pros and cons please.",
+    "Okay, got it.",
+    "What time zone is Tokyo in?",
+    "Tell me about the history of the Shinkansen in a few sentences.",
+    "Great, thank you.",
+)
+
+
+def run(routing: bool, turns: int, latencies: Dict[str, float]) -> Tuple[List[float], Any]:
+    """Return per-turn latencies (ms) and the router's stats."""
+    times: List[float] = []
+    with OpenAIStandIn(model_latency=latencies) as standin:
+        client = LLMClient(base_url=standin.base_url, routing=routing)
+        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+        for i in range(turns):
+            messages.append({"role": "user", "content": SCRIPT[i % len(SCRIPT)]})
+            start = time.perf_counter()
+            reply = client.chat(messages)
+            times.append((time.perf_counter() - start) * 1000)
+            messages.append({"role": "assistant", "content": reply})
+            # Keep the conversation shallow, as a series of short sessions would be
+            if len(messages) > 9:
+                messages = messages[:1] + messages[-4:]
+    return times, client.routing_stats()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=40, help="Turns to play")
+    parser.add_argument("--standard-latency", type=float, default=0.25, help="Seconds per call")
+    parser.add_argument("--fast-latency", type=float, default=0.08, help="Seconds per call")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    latencies = {OPENAI_MODEL: args.standard_latency, LLM_FAST_MODEL: args.fast_latency}
+    for routing in (False, True):
+        times, stats = run(routing, args.turns, latencies)
+        p95 = sorted(times)[min(len(times) - 1, int(0.95 * len(times)))]
+        label = "routed" if routing else "single"
+        print(
+            f"{label}: mean {statistics.mean(times):6.1f} ms  p50 {statistics.median(times):6.1f}"
+            f" ms  p95 {p95:6.1f} ms"
+        )
+        for name, tier in stats.items():
+            print(
+                f"  {name:8s} {tier['model']:14s} cap {tier['max_tokens']:4d}  "
+                f"{tier['share']:5.0%} of turns  EWMA {tier['ewma_ms']} ms  "
+                f"rerouted {tier['rerouted']}"
+            )
+
+
+if __name__ == "__main__":
+    main()
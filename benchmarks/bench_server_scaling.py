@@ -0,0 +1,135 @@
+"""
+Turn throughput of the prefork server from 1 to N worker processes.
+
+Each worker runs the real DeepgramASRClient, LLMClient and MurfTTSClient
+against local stand-ins (benchmarks/standins.py), so the work measured is
+this process's own: HTTP and JSON handling, SDK overhead, speech-gate
+trimming and WAV packing. The stand-ins run in a separate process so they
+do not share a GIL with the load generator. Scaling efficiency is
+throughput(N) / (N * throughput(1)); it cannot exceed what the machine's
+cores allow, so compare against the CPU count printed first.
+
+Run: python -m benchmarks.bench_server_scaling [--workers 1,2,4] [--seconds S] [--clients C]
+"""
+
+import argparse
+import http.client
+import logging
+import math
+import multiprocessing
+import os
+import threading
+import time
+from array import array
+
+from app.asr_deepgram import DeepgramASRClient
+from app.llm_openai import LLMClient
+from app.server import PreforkServer, SessionWorker
+from app.tts_murf import MurfTTSClient
+from app.utils import pcm
+from benchmarks.standins import DeepgramStandIn, MurfStandIn, OpenAIStandIn
+
+
+def standin_worker(index: int) -> SessionWorker:
+    """Worker factory whose clients talk to the stand-ins named in the environment."""
+    return SessionWorker(
+        index,
+        DeepgramASRClient(base_url=os.environ["BENCH_DEEPGRAM_URL"]),
+        MurfTTSClient(base_url=os.environ["BENCH_MURF_URL"].rsplit("/v1", 1)[0]),
+        LLMClient(base_url=os.environ["BENCH_OPENAI_URL"]),
+    )
+
+
+def _serve_standins(latency: float, urls, stop) -> None:
+    standins = [OpenAIStandIn(latency), DeepgramStandIn(latency), MurfStandIn(latency)]
+    for standin in standins:
+        standin.start()
+    urls.put([s.base_url for s in standins])
+    stop.wait()
+    for standin in standins:
+        standin.stop()
+
+
+def utterance(seconds: float = 2.0, rate: int = 16000) -> bytes:
+    """A WAV with silence either side of a tone, so the speech gate has work to do."""
+    n = int(seconds * rate)
+    samples = array("h", bytes(2 * n))
+    for i in range(n // 4, 3 * n // 4):
+        samples[i] = int(6000 * math.sin(i / 5))
+    return pcm.to_wav(samples.tobytes(), rate)
+
+
+def load(address, seconds: float, clients: int, wav: bytes) -> int:
+    """Run `clients` sessions back to back for `seconds`; return completed turns."""
+    done = [0] * clients
+    deadline = time.monotonic() + seconds
+
+    def session(i: int) -> None:
+        path = f"/sessions/bench-{i}/turn"
+        conn = http.client.HTTPConnection(*address, timeout=30)
+        while time.monotonic() < deadline:
+            conn.request("POST", path, body=wav, headers={"Content-Type": "audio/wav"})
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status == 200:
+                done[i] += 1
+        conn.close()
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(done)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    cpus = os.cpu_count() or 1
+    default_workers = ",".join(str(n) for n in (1, 2, 4, 8, 16) if n <= max(cpus, 2))
+    parser.add_argument("--workers", default=default_workers, help="Worker counts to test")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Load duration per count")
+    parser.add_argument(
+        "--clients", type=int, default=0, help="Concurrent sessions (default: 4 per largest count)"
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="Stand-in response delay")
+    args = parser.parse_args()
+    # Workers take the dispatcher's level, so this also quiets their history warnings
+    logging.basicConfig(level=logging.ERROR)
+
+    ctx = multiprocessing.get_context("spawn")
+    urls, stop = ctx.Queue(), ctx.Event()
+    standins = ctx.Process(target=_serve_standins, args=(args.latency, urls, stop), daemon=True)
+    standins.start()
+    openai_url, deepgram_url, murf_url = urls.get(timeout=30)
+    os.environ.update(
+        BENCH_OPENAI_URL=openai_url, BENCH_DEEPGRAM_URL=deepgram_url, BENCH_MURF_URL=murf_url
+    )
+
+    wav = utterance()
+    print(f"{cpus} CPUs; {args.seconds:.0f}s per run, {len(wav)} byte utterances")
+    print("workers  clients   turns/s  speedup  efficiency")
+    counts = [int(n) for n in args.workers.split(",")]
+    # The same offered load for every count, so only the worker count changes
+    clients = args.clients or 4 * max(counts)
+    base = None
+    try:
+        for workers in counts:
+            with PreforkServer("127.0.0.1", 0, workers, factory=standin_worker) as server:
+                thread = threading.Thread(target=server.serve_forever, daemon=True)
+                thread.start()
+                load(server.address, 0.5, clients, wav)  # warm up connections and clients
+                rate = load(server.address, args.seconds, clients, wav) / args.seconds
+            base = base or rate
+            speedup = rate / base if base else 0.0
+            print(
+                f"{workers:7d}  {clients:7d}  {rate:8.1f}  {speedup:6.2f}x  "
+                f"{speedup / workers:9.0%}"
+            )
+    finally:
+        stop.set()
+        standins.join(timeout=5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Memory footprint per idle session: plain message dicts vs TurnStore.
+
+Run: python -m benchmarks.bench_session_memory [--sessions N]
+"""
+
+import argparse
+import tracemalloc
+from typing import Callable, Dict, List
+
+from app.agent import SYSTEM_PROMPT
+from app.turn_store import Role, TurnStore
+
+TURN_COUNTS = (10, 100, 1000)
+USER_TEXT = "Can you remind me what we said about the quarterly report deadline, turn {i}?"
+ASSISTANT_TEXT = (
+    "Sure. The quarterly report is due on Friday and the draft should go to "
+    "finance by Wednesday so they have time to review it. (turn {i})"
+)
+
+
+def build_dict_session(turns: int) -> List[Dict[str, str]]:
+    history = [{"role": "system", "content": SYSTEM_PROMPT}]
+    for i in range(turns):
+        role = "user" if i % 2 == 0 else "assistant"
+        text = USER_TEXT if i % 2 == 0 else ASSISTANT_TEXT
+        history.append({"role": role, "content": text.format(i=i)})
+    return history
+
+
+def build_turn_store(turns: int, compress_after=None) -> TurnStore:
+    store = TurnStore(SYSTEM_PROMPT, compress_after=compress_after)
+    for i in range(turns):
+        role = Role.USER if i % 2 == 0 else Role.ASSISTANT
+        text = USER_TEXT if i % 2 == 0 else ASSISTANT_TEXT
+        store.append(role, text.format(i=i))
+    return store
+
+
+def bytes_per_session(factory: Callable[[], object], sessions: int) -> float:
+    """Average traced allocation for `sessions` live sessions built by factory."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    live = [factory() for _ in range(sessions)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del live
+    return (after - before) / sessions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200, help="Sessions per measurement")
+    args = parser.parse_args()
+
+    variants = [
+        ("dict list", lambda n: lambda: build_dict_session(n)),
+        ("TurnStore", lambda n: lambda: build_turn_store(n)),
+        ("TurnStore+zlib(hot=8)", lambda n: lambda: build_turn_store(n, compress_after=8)),
+    ]
+
+    print(f"{'turns':>6}  " + "  ".join(f"{name:>22}" for name, _ in variants))
+    for turns in TURN_COUNTS:
+        sessions = max(1, args.sessions * 10 // turns)
+        row = [bytes_per_session(make(turns), sessions) for _, make in variants]
+        print(f"{turns:>6}  " + "  ".join(f"{value:>20.0f} B" for value in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Session store latency and size: per-turn save, cold resume, bytes on disk.
+
+Run: python -m benchmarks.bench_session_store [--sessions N] [--turns N]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from app.agent import MAX_HISTORY_LENGTH, SYSTEM_PROMPT
+from app.session_store import SQLiteSessionStore, SessionCache
+from app.turn_store import Role
+
+USER_TEXT = "What did we decide about the launch checklist, item {i}?"
+ASSISTANT_TEXT = "We agreed item {i} is owned by the platform team and due next sprint."
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--turns", type=int, default=40, help="Exchanges per session")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        store = SQLiteSessionStore(path)
+        cache = SessionCache(store, SYSTEM_PROMPT, max_turns=MAX_HISTORY_LENGTH - 10)
+
+        save_ms = []
+        for i in range(args.turns):
+            for s in range(args.sessions):
+                start = time.perf_counter()
+                cache.append(
+                    f"session-{s}",
+                    [(Role.USER, USER_TEXT.format(i=i)), (Role.ASSISTANT, ASSISTANT_TEXT.format(i=i))],
+                )
+                save_ms.append((time.perf_counter() - start) * 1000)
+
+        spilled = cache.spill_idle(max_idle=0)
+
+        load_ms = []
+        for s in range(args.sessions):
+            start = time.perf_counter()
+            cache.get(f"session-{s}")
+            load_ms.append((time.perf_counter() - start) * 1000)
+
+        size = store.size_bytes()
+        store.close()
+
+    print(f"sessions={args.sessions} exchanges/session={args.turns} spilled={spilled}")
+    print(
+        f"save (per exchange): p50={statistics.median(save_ms):.3f} ms "
+        f"p99={percentile(save_ms, 0.99):.3f} ms"
+    )
+    print(
+        f"resume (cold load):  p50={statistics.median(load_ms):.3f} ms "
+        f"p99={percentile(load_ms, 0.99):.3f} ms"
+    )
+    print(f"store size: {size / 1024:.0f} KiB ({size / args.sessions:.0f} B/session)")
+
+
+if __name__ == "__main__":
+    main()
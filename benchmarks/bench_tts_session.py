@@ -0,0 +1,71 @@
+"""
+Per-segment TTS first-byte latency: one HTTP request per segment vs a persistent session.
+
+Synthesizes replies sentence by sentence through MurfTTSClient against the
+local Murf stand-in (benchmarks/standins.py), once with a fresh streaming
+request per sentence and once over a single TTSSession WebSocket. The
+stand-in charges `--warmup` per HTTP request and per WebSocket connection
+(request setup and voice loading) on top of `--latency` per segment.
+
+Run: python -m benchmarks.bench_tts_session [--replies N] [--warmup S] [--latency S]
+"""
+
+import argparse
+import logging
+import statistics
+import time
+from typing import Dict, List
+
+from app.tts_murf import MurfTTSClient
+from benchmarks.standins import MurfStandIn
+
+REPLY = (
+    "Paris is the capital of France. It sits on the Seine in the north of the country. "
+    "About two million people live in the city itself. The wider region is home to twelve million."
+)
+MODES = ("request", "session")
+
+
+def run(mode: str, replies: int, latency: float, warmup: float) -> Dict[str, List[float]]:
+    """Return first-byte latencies (ms) of each reply's first and later segments, and warm-ups."""
+    sentences = [s.strip() + "." for s in REPLY.split(".") if s.strip()]
+    first: List[float] = []
+    rest: List[float] = []
+    with MurfStandIn(latency=latency, warmup=warmup) as standin:
+        base_url = standin.base_url.rsplit("/v1", 1)[0]
+        client = MurfTTSClient(base_url=base_url, session=mode == "session")
+        for _ in range(replies):
+            for i, sentence in enumerate(sentences):
+                start = time.perf_counter()
+                chunks = iter(client.stream_tts(sentence))
+                next(chunks)
+                (first if i == 0 else rest).append((time.perf_counter() - start) * 1000)
+                for _ in chunks:
+                    pass
+        if client.session:
+            client.session.close()
+        warmups = standin.connections if mode == "session" else len(standin.requests)
+    return {"first": first, "rest": rest, "warmups": [warmups]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--replies", type=int, default=10, help="Replies to synthesize")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds per segment")
+    parser.add_argument("--warmup", type=float, default=0.08, help="Seconds per connection")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    print(f"{'mode':8s} {'warm-ups':>8s} {'first p50':>10s} {'next p50':>9s} {'next p95':>9s}")
+    for mode in MODES:
+        result = run(mode, args.replies, args.latency, args.warmup)
+        rest = sorted(result["rest"])
+        p95 = rest[min(len(rest) - 1, int(0.95 * len(rest)))]
+        print(
+            f"{mode:8s} {result['warmups'][0]:8d} {statistics.median(result['first']):8.1f}ms"
+            f" {statistics.median(rest):7.1f}ms {p95:7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,381 @@
+"""
+Micro-benchmark regression suite for the audio and history hot paths.
+
+Each case times one hot loop of the agent without hardware or network:
+silence detection over capture frames, WAV assembly, speech-gate
+trimming, chunk iteration in play_audio_stream, history trimming in
+VoiceAgent.reply and LLMClient.chat, turn classification, flight
+recording of a turn, and Deepgram transcript parsing.
+
+Times are divided by a fixed pure-Python reference workload measured in
+the same run, so the stored scores carry over between machines of
+different speed. Baselines live in benchmarks/baselines.json; a case
+whose score rises more than the tolerance above its baseline is measured
+once more and, if still slow, fails the run (exit status 1).
+
+Run: python -m benchmarks.micro [--update] [--tolerance T] [--cases a,b] [--round-time S]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.utils import pcm
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baselines.json")
+DEFAULT_TOLERANCE = 0.25
+CAPTURE_RATE = 16000
+FRAMES_PER_BUFFER = 1024
+PLAYBACK_RATE = 24000
+STREAM_CHUNK_BYTES = 4096
+
+# name -> setup function returning the zero-argument callable to time
+CASES: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def case(name: str) -> Callable:
+    """Register a benchmark setup function under `name`."""
+
+    def register(setup: Callable[[], Callable[[], Any]]) -> Callable[[], Callable[[], Any]]:
+        CASES[name] = setup
+        return setup
+
+    return register
+
+
+def _speech(seconds: float, rate: int = CAPTURE_RATE, silence: float = 1.0) -> bytes:
+    """16-bit PCM with `silence` seconds of quiet either side of a loud square wave."""
+    quiet = bytes(2 * int(silence * rate))
+    period = (3000).to_bytes(2, "little", signed=True) * 10
+    period += (-3000).to_bytes(2, "little", signed=True) * 10
+    loud = period * (int((seconds - 2 * silence) * rate) // 20)
+    return quiet + loud + quiet
+
+
+def _frames(data: bytes, frame_bytes: int) -> List[bytes]:
+    return [data[i : i + frame_bytes] for i in range(0, len(data), frame_bytes)]
+
+
+class _StubLLM:
+    """Answers instantly, so VoiceAgent.reply is timed without a client."""
+
+    state_mode = "full"
+
+    def chat(self, messages: List[Dict[str, str]]) -> str:
+        return "Sure, here is a short answer."
+
+
+@case("silence_detection")
+def _silence_detection() -> Callable[[], Any]:
+    # The per-frame level check of record_audio over five seconds of capture
+    frames = _frames(_speech(5.0), 2 * FRAMES_PER_BUFFER)
+    threshold = 0.05 * 32768
+
+    def run() -> int:
+        silent = 0
+        for data in frames:
+            silent = silent + 1 if pcm.peak(data) < threshold else 0
+        return silent
+
+    return run
+
+
+@case("wav_assembly")
+def _wav_assembly() -> Callable[[], Any]:
+    frames = _frames(_speech(5.0), 2 * FRAMES_PER_BUFFER)
+    return lambda: pcm.to_wav(b"".join(frames), CAPTURE_RATE)
+
+
+@case("speech_gate")
+def _speech_gate() -> Callable[[], Any]:
+    from app.speech_gate import SpeechGate
+
+    gate = SpeechGate()
+    wav = pcm.to_wav(_speech(5.0), CAPTURE_RATE)
+    return lambda: gate.prepare(wav)
+
+
+@case("playback_chunks")
+def _playback_chunks() -> Callable[[], Any]:
+    from app.audio_io import NullSink
+    from app.cli_runner import play_audio_stream
+
+    view = memoryview(bytes(2 * PLAYBACK_RATE * 10))
+    chunks = [view[i : i + STREAM_CHUNK_BYTES] for i in range(0, len(view), STREAM_CHUNK_BYTES)]
+    sink = NullSink(PLAYBACK_RATE)
+    return lambda: play_audio_stream(chunks, sink)
+
+
+@case("agent_history")
+def _agent_history() -> Callable[[], Any]:
+    from app.agent import MAX_HISTORY_LENGTH, VoiceAgent
+
+    agent = VoiceAgent(llm=_StubLLM())  # type: ignore[arg-type]
+    question = "What should I pack for a weekend trip to the mountains in October?"
+    for _ in range(MAX_HISTORY_LENGTH // 2):
+        agent.reply(question)
+    # Every reply appends two turns; a trim runs every few calls at this length
+    return lambda: agent.reply(question)
+
+
+@case("llm_history_window")
+def _llm_history_window() -> Callable[[], Any]:
+    from app.llm_openai import MAX_CONVERSATION_HISTORY, LLMClient
+
+    llm = LLMClient()
+    llm._complete = lambda messages, *args: "ok"  # type: ignore[assignment]
+    messages = [{"role": "system", "content": "You are a helpful voice assistant."}]
+    for i in range(2 * MAX_CONVERSATION_HISTORY):
+        role = "user" if i % 2 == 0 else "assistant"
+        messages.append({"role": role, "content": f"Message number {i} of a long conversation."})
+    return lambda: llm.chat(messages)
+
+
+@case("turn_classify")
+def _turn_classify() -> Callable[[], Any]:
+    from app.model_router import classify
+
+    messages = [{"role": "system", "content": "You are a helpful voice assistant."}]
+    for i in range(6):
+        messages.append({"role": "user", "content": f"Question number {i}?"})
+        messages.append({"role": "assistant", "content": f"Answer number {i}."})
+    messages.append({"role": "user", "content": "How do I get from the airport to the city?"})
+    return lambda: classify(messages)
+
+
+@case("flight_record_turn")
+def _flight_record_turn() -> Callable[[], Any]:
+    import tempfile
+
+    from app.flight_recorder import FlightRecorder
+
+    # What the recorder adds to a turn that stays under the threshold: no dump is written
+    recorder = FlightRecorder(threshold_ms=60_000, dump_dir=tempfile.gettempdir(), enabled=True)
+    chunks = [b"\x00" * STREAM_CHUNK_BYTES] * 60
+
+    def run() -> None:
+        with recorder.turn(1):
+            for stage in ("record", "asr", "llm"):
+                recorder.mark(stage)
+            for key in ("audio_in_bytes", "deepgram.status", "deepgram.retries", "llm.model"):
+                recorder.note(key, 0)
+            recorder.count("llm.attempts")
+            for _ in recorder.watch(chunks, "tts"):  # type: ignore[union-attr]
+                pass
+
+    return run
+
+
+@case("transcript_parse")
+def _transcript_parse() -> Callable[[], Any]:
+    import requests
+
+    from app.admission import AdmissionController
+    from app.asr_deepgram import DeepgramASRClient
+
+    words = "so what is the weather going to be like in paris tomorrow afternoon".split()
+    payload = {
+        "metadata": {"request_id": "bench", "duration": 4.2, "channels": 1},
+        "results": {
+            "channels": [
+                {
+                    "alternatives": [
+                        {
+                            "transcript": " ".join(words),
+                            "confidence": 0.98,
+                            "words": [
+                                {"word": w, "start": i * 0.3, "end": i * 0.3 + 0.25}
+                                for i, w in enumerate(words)
+                            ],
+                        }
+                    ]
+                }
+            ]
+        },
+    }
+    body = json.dumps(payload).encode("utf-8")
+
+    class Session:
+        def post(self, *args: Any, **kwargs: Any) -> requests.Response:
+            resp = requests.Response()
+            resp.status_code = 200
+            resp._content = body
+            return resp
+
+    asr = DeepgramASRClient()
+    asr.session = Session()  # type: ignore[assignment]
+    asr.gate = None
+    asr.admission = AdmissionController("bench", requests_per_minute=1e12)
+    wav = pcm.to_wav(bytes(3200), CAPTURE_RATE)
+    return lambda: asr.transcribe_wav(wav)
+
+
+def _reference() -> Callable[[], Any]:
+    """Fixed mix of interpreter loops, C-level byte work and JSON the scores are relative to."""
+    data = [{"role": "user", "content": f"message {i}"} for i in range(50)]
+    block = bytes(range(256)) * 64
+
+    def run() -> int:
+        total = 0
+        for i in range(2000):
+            total += i * i % 7
+        encoded = json.dumps(data)
+        joined = b"".join([block] * 16)
+        return total + len(json.loads(encoded)) + joined.count(b"\x00")
+
+    return run
+
+
+def measure(fn: Callable[[], Any], round_time: float = 0.05, rounds: int = 5) -> float:
+    """
+    Return the best seconds per call of `fn` over `rounds` timed rounds.
+
+    The number of calls per round doubles until one round takes `round_time`.
+    """
+    fn()  # warm caches and lazy imports
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= round_time:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / number
+
+
+def run_cases(names: List[str], round_time: float = 0.05) -> Dict[str, Dict[str, float]]:
+    """
+    Time the named cases.
+
+    Returns:
+        {name: {"seconds": per call, "score": seconds / reference seconds}}
+    """
+    reference = measure(_reference(), round_time)
+    results = {}
+    for name in names:
+        seconds = measure(CASES[name](), round_time)
+        results[name] = {"seconds": seconds, "score": seconds / reference}
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]], baselines: Dict[str, Dict[str, float]], tolerance: float
+) -> List[Dict[str, Any]]:
+    """
+    Compare scores against baselines.
+
+    Returns:
+        One row per case with its baseline and current score, the relative
+        change and a status of "ok", "regressed", "improved" or "new"
+    """
+    rows = []
+    for name, result in results.items():
+        base = baselines.get(name)
+        if base is None:
+            rows.append({"case": name, "baseline": None, "score": result["score"], "status": "new"})
+            continue
+        change = result["score"] / base["score"] - 1
+        if change > tolerance:
+            status = "regressed"
+        elif change < -tolerance:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append(
+            {
+                "case": name,
+                "baseline": base["score"],
+                "score": result["score"],
+                "change": change,
+                "status": status,
+            }
+        )
+    return rows
+
+
+def load_baselines(path: str = BASELINE_PATH) -> Dict[str, Any]:
+    """Return the stored baselines file, or an empty one if there is none."""
+    if not os.path.exists(path):
+        return {"tolerance": DEFAULT_TOLERANCE, "cases": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(results: Dict[str, Dict[str, float]], tolerance: float, path: str) -> None:
+    data = {
+        "tolerance": tolerance,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cases": {
+            name: {"score": round(r["score"], 4), "seconds": round(r["seconds"], 9)}
+            for name, r in sorted(results.items())
+        },
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--update", action="store_true", help="Store these results as baselines")
+    parser.add_argument(
+        "--tolerance", type=float, help="Allowed slowdown before failing (default: from baselines)"
+    )
+    parser.add_argument("--cases", help="Comma-separated cases to run (default: all)")
+    parser.add_argument("--round-time", type=float, default=0.05, help="Seconds per timed round")
+    parser.add_argument("--baselines", default=BASELINE_PATH, help="Baselines file")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.ERROR)
+
+    names = args.cases.split(",") if args.cases else list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown:
+        parser.error(f"unknown cases {unknown}; choose from {list(CASES)}")
+    stored = load_baselines(args.baselines)
+    tolerance = args.tolerance if args.tolerance is not None else stored["tolerance"]
+
+    results = run_cases(names, args.round_time)
+    rows = compare(results, stored["cases"], tolerance)
+    slow = [row["case"] for row in rows if row["status"] == "regressed"]
+    if slow and not args.update:
+        # One noisy measurement should not fail the run; re-time the slow cases
+        results.update(run_cases(slow, args.round_time))
+        rows = compare(results, stored["cases"], tolerance)
+
+    print("case                   baseline    score   change  per call     status")
+    for row in rows:
+        base = f"{row['baseline']:8.3f}" if row["baseline"] is not None else "       -"
+        change = f"{row['change']:+7.0%}" if "change" in row else "      -"
+        seconds = results[row["case"]]["seconds"]
+        print(
+            f"{row['case']:20s}  {base}  {row['score']:7.3f}  {change}  "
+            f"{seconds * 1e6:8.1f} us  {row['status']}"
+        )
+
+    if args.update:
+        save_baselines({**stored["cases"], **results}, tolerance, args.baselines)
+        print(f"Baselines written to {args.baselines}")
+        return 0
+    regressed = [row["case"] for row in rows if row["status"] == "regressed"]
+    if regressed:
+        print(f"Regressed past {tolerance:.0%}: {', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,370 @@
+"""
+Local stand-ins for provider APIs, for tests and benchmarks that must not hit the network.
+
+OpenAIStandIn speaks enough of the Chat Completions and Responses APIs for
+LLMClient. Token counts use the client's characters-per-token estimate, and
+prompt caching is simulated: input that repeats the start of an earlier
+prompt is reported as cached, as is a previous_response_id chain.
+DeepgramStandIn and MurfStandIn answer the prerecorded transcription and
+streaming synthesis calls of DeepgramASRClient and MurfTTSClient; MurfStandIn
+also serves the stream-input WebSocket used by TTSSession.
+"""
+
+import base64
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.exceptions import WebSocketClosed
+from app.websocket import WebSocket, upgrade
+
+CHARS_PER_TOKEN = 4
+# Earlier prompts remembered for prefix-cache matching
+PROMPT_CACHE_SIZE = 64
+
+
+def _common_prefix(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    for i in range(n):
+        if a[i] != b[i]:
+            return i
+    return n
+
+
+def _text(items: List[Dict[str, Any]]) -> str:
+    return json.dumps([[m.get("role"), m.get("content")] for m in items], ensure_ascii=False)
+
+
+class StandIn:
+    """
+    Threaded HTTP server on 127.0.0.1 that records every POST and answers it via handle().
+
+    Args:
+        latency: Seconds to wait before answering
+    """
+
+    def __init__(self, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.requests: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    def start(self) -> "StandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandIn":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def parse(self, raw: bytes) -> Any:
+        """Decode a request body; the result is logged in `requests` and passed to handle()."""
+        return raw
+
+    def handle(self, path: str, body: Any) -> Tuple[int, str, bytes]:
+        """Return (status, content type, response body) for a POST; subclasses override."""
+        return 404, "application/json", b'{"error": {"message": "Not found"}}'
+
+    def websocket(self, handler: BaseHTTPRequestHandler) -> None:
+        """Serve a GET (a WebSocket upgrade) on the handler's connection; subclasses override."""
+        handler.send_error(404)
+
+    def _handler(self) -> type:
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:
+                raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                body = standin.parse(raw)
+                with standin._lock:
+                    standin.requests.append({"path": self.path, "bytes": len(raw), "body": body})
+                if standin.latency:
+                    time.sleep(standin.latency)
+                status, content_type, data = standin.handle(self.path, body)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self) -> None:
+                standin.websocket(self)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+class OpenAIStandIn(StandIn):
+    """
+    Answers /v1/chat/completions and /v1/responses.
+
+    Args:
+        latency: Seconds to wait before answering
+        responses: Serve the Responses API (False answers it with 404)
+        model_latency: Extra seconds per request by model name
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        responses: bool = True,
+        model_latency: Optional[Dict[str, float]] = None,
+    ) -> None:
+        super().__init__(latency)
+        self.responses = responses
+        self.model_latency = model_latency or {}
+        self._stored: Dict[str, Tuple[str, List[Dict[str, Any]]]] = {}
+        self._prompts: List[str] = []
+        self._ids = itertools.count(1)
+
+    def parse(self, raw: bytes) -> Any:
+        return json.loads(raw or b"{}")
+
+    def handle(self, path: str, body: Any) -> Tuple[int, str, bytes]:
+        delay = self.model_latency.get(body.get("model"), 0.0)
+        if delay:
+            time.sleep(delay)
+        if path.endswith("/chat/completions"):
+            status, payload = self.chat_completion(body)
+        elif path.endswith("/responses"):
+            status, payload = self.response(body)
+        else:
+            status, payload = 404, {"error": {"message": "Not found"}}
+        return status, "application/json", json.dumps(payload).encode("utf-8")
+
+    def forget(self) -> None:
+        """Drop stored responses, as if they expired server-side."""
+        with self._lock:
+            self._stored.clear()
+
+    def _usage(self, prompt: str, chained: int = 0) -> Tuple[int, int]:
+        """Return (input tokens, cached tokens) for a prompt, updating the prefix cache."""
+        with self._lock:
+            cached = max([chained] + [_common_prefix(prompt, p) for p in self._prompts])
+            self._prompts = (self._prompts + [prompt])[-PROMPT_CACHE_SIZE:]
+        return len(prompt) // CHARS_PER_TOKEN, cached // CHARS_PER_TOKEN
+
+    def _reply(self, items: List[Dict[str, Any]]) -> str:
+        last = next((m["content"] for m in reversed(items) if m.get("role") == "user"), "")
+        return f"You said: {last[:60]}"
+
+    def chat_completion(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        messages = body["messages"]
+        text = self._reply(messages)
+        tokens, cached = self._usage(_text(messages))
+        return 200, {
+            "id": f"chatcmpl-{next(self._ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stand-in"),
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": tokens,
+                "completion_tokens": len(text) // CHARS_PER_TOKEN,
+                "total_tokens": tokens + len(text) // CHARS_PER_TOKEN,
+                "prompt_tokens_details": {"cached_tokens": cached},
+            },
+        }
+
+    def response(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        if not self.responses:
+            return 404, {"error": {"message": "Not found", "type": "invalid_request_error"}}
+        items = body["input"]
+        if isinstance(items, str):
+            items = [{"role": "user", "content": items}]
+        history: List[Dict[str, Any]] = []
+        previous = body.get("previous_response_id")
+        if previous:
+            with self._lock:
+                stored = self._stored.get(previous)
+            if stored is None:
+                return 400, {
+                    "error": {
+                        "message": f"Previous response with id '{previous}' not found.",
+                        "type": "invalid_request_error",
+                        "param": "previous_response_id",
+                    }
+                }
+            history = stored[1]
+        text = self._reply(items)
+        instructions = [{"role": "system", "content": body.get("instructions") or ""}]
+        chained = len(_text(instructions + history)) if history else 0
+        tokens, cached = self._usage(_text(instructions + history + items), chained)
+        response_id = f"resp_{next(self._ids)}"
+        with self._lock:
+            self._stored[response_id] = (
+                text,
+                history + items + [{"role": "assistant", "content": text}],
+            )
+        return 200, {
+            "id": response_id,
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": body.get("model", "stand-in"),
+            "status": "completed",
+            "output": [
+                {
+                    "id": f"msg_{response_id}",
+                    "type": "message",
+                    "role": "assistant",
+                    "status": "completed",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}],
+                }
+            ],
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "usage": {
+                "input_tokens": tokens,
+                "input_tokens_details": {"cached_tokens": cached},
+                "output_tokens": len(text) // CHARS_PER_TOKEN,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": tokens + len(text) // CHARS_PER_TOKEN,
+            },
+        }
+
+
+class DeepgramStandIn(StandIn):
+    """
+    Answers /v1/listen with a fixed transcript in Deepgram's response shape.
+
+    Args:
+        latency: Seconds to wait before answering
+        transcript: Text every request is transcribed as
+    """
+
+    def __init__(self, latency: float = 0.0, transcript: str = "Hello there.") -> None:
+        super().__init__(latency)
+        self.transcript = transcript
+
+    def handle(self, path: str, body: Any) -> Tuple[int, str, bytes]:
+        if not path.split("?")[0].endswith("/listen"):
+            return super().handle(path, body)
+        alternative = {
+            "transcript": self.transcript,
+            "confidence": 0.99,
+            "words": [
+                {"word": w.lower(), "start": i * 0.3, "end": i * 0.3 + 0.25, "confidence": 0.99}
+                for i, w in enumerate(self.transcript.split())
+            ],
+        }
+        payload = {
+            "metadata": {"request_id": f"req-{len(self.requests)}", "channels": 1},
+            "results": {"channels": [{"alternatives": [alternative]}]},
+        }
+        return 200, "application/json", json.dumps(payload).encode("utf-8")
+
+
+class MurfStandIn(StandIn):
+    """
+    Answers /v1/speech/stream with silent 16-bit PCM sized to the text.
+
+    The same audio is served over the /v1/speech/stream-input WebSocket, as
+    base64 frames per context followed by a final message.
+
+    Args:
+        latency: Seconds to wait before answering each request or context
+        sample_rate: Rate the audio length is computed at
+        seconds_per_char: Speech duration per character of text
+        warmup: Extra seconds per HTTP request and per WebSocket connection
+            (request setup and voice loading, which a persistent session pays once)
+    """
+
+    # WebSocket audio frame length
+    FRAME_SECONDS = 0.1
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        sample_rate: int = 24000,
+        seconds_per_char: float = 0.06,
+        warmup: float = 0.0,
+    ) -> None:
+        super().__init__(latency)
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+        self.warmup = warmup
+        self.connections = 0
+
+    def parse(self, raw: bytes) -> Any:
+        return json.loads(raw or b"{}")
+
+    def _audio(self, text: str) -> bytes:
+        return bytes(2 * int(len(text) * self.seconds_per_char * self.sample_rate))
+
+    def handle(self, path: str, body: Any) -> Tuple[int, str, bytes]:
+        if not path.split("?")[0].endswith("/speech/stream"):
+            return super().handle(path, body)
+        if self.warmup:
+            time.sleep(self.warmup)
+        return 200, "audio/pcm", self._audio(body.get("text", ""))
+
+    def websocket(self, handler: BaseHTTPRequestHandler) -> None:
+        if not handler.path.split("?")[0].endswith("/speech/stream-input"):
+            return super().websocket(handler)
+        ws = upgrade(handler)
+        if ws is None:
+            return
+        with self._lock:
+            self.connections += 1
+        cleared: set = set()
+        try:
+            while True:
+                message = json.loads(ws.recv())
+                if "voice_config" in message:
+                    if self.warmup:
+                        time.sleep(self.warmup)
+                    continue
+                if message.get("clear"):
+                    cleared.add(message.get("context_id"))
+                    continue
+                size = len(message.get("text", ""))
+                with self._lock:
+                    self.requests.append({"path": handler.path, "bytes": size, "body": message})
+                threading.Thread(
+                    target=self._synthesize, args=(ws, message, cleared), daemon=True
+                ).start()
+        except (WebSocketClosed, OSError, ValueError):
+            ws.close()
+
+    def _synthesize(self, ws: WebSocket, message: Dict[str, Any], cleared: set) -> None:
+        context_id = message.get("context_id")
+        if self.latency:
+            time.sleep(self.latency)
+        audio = self._audio(message.get("text", ""))
+        step = 2 * int(self.FRAME_SECONDS * self.sample_rate)
+        try:
+            for offset in range(0, len(audio), step):
+                if context_id in cleared:
+                    return
+                frame = base64.b64encode(audio[offset:offset + step]).decode("ascii")
+                ws.send(json.dumps({"audio": frame, "context_id": context_id}))
+            ws.send(json.dumps({"final": True, "context_id": context_id}))
+        except (WebSocketClosed, OSError):
+            pass
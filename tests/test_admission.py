@@ -0,0 +1,83 @@
+"""Tests for client-side admission control."""
+import threading
+import time
+
+import pytest
+
+from app.admission import AdmissionController, Priority, TokenBucket, parse_reset
+from app.utils.exceptions import OverloadError
+
+
+def test_parse_reset_formats():
+    """Test OpenAI duration and Retry-After parsing."""
+    assert parse_reset("20ms") == pytest.approx(0.02)
+    assert parse_reset("6m0s") == pytest.approx(360)
+    assert parse_reset("1h2m3.5s") == pytest.approx(3723.5)
+    assert parse_reset("2") == 2.0
+    assert parse_reset(None) is None
+    assert parse_reset("soon") is None
+
+
+def test_token_bucket_refill_and_penalty():
+    """Test bucket accounting."""
+    bucket = TokenBucket(60, per_seconds=60)
+    assert bucket.time_until(60) == 0
+    bucket.consume(60)
+    assert bucket.time_until(1) == pytest.approx(1.0, abs=0.05)
+    bucket.penalize(5)
+    assert bucket.time_until(1) == pytest.approx(6.0, abs=0.05)
+
+
+def test_headers_drain_budget():
+    """Test that provider headers reporting an empty budget block admission."""
+    ctl = AdmissionController("openai", requests_per_minute=600, timeout=0.05)
+    ctl.update_from_headers(
+        {
+            "x-ratelimit-limit-requests": "600",
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "10s",
+        }
+    )
+    with pytest.raises(OverloadError):
+        ctl.acquire()
+    assert ctl.stats()["rejected"] == 1
+
+
+def test_queue_full_sheds_load():
+    """Test that requests beyond the queue depth are rejected immediately."""
+    ctl = AdmissionController("x", requests_per_minute=60, max_queue_depth=1)
+    ctl.requests.penalize(0.3)
+
+    waiter = threading.Thread(target=ctl.acquire)
+    waiter.start()
+    time.sleep(0.05)
+    start = time.monotonic()
+    with pytest.raises(OverloadError, match="queue full"):
+        ctl.acquire()
+    assert time.monotonic() - start < 0.05
+    waiter.join()
+    assert ctl.stats()["admitted"] == 1
+    assert ctl.stats()["wait_ms_max"] > 200
+
+
+def test_interactive_overtakes_batch():
+    """Test that queued interactive work is admitted before earlier batch work."""
+    ctl = AdmissionController("x", requests_per_minute=600)
+    ctl.requests.tokens = 0
+    order = []
+
+    def run(priority, name):
+        ctl.acquire(priority=priority)
+        order.append(name)
+
+    threads = [threading.Thread(target=run, args=(Priority.BATCH, f"batch{i}")) for i in range(2)]
+    for t in threads:
+        t.start()
+    time.sleep(0.02)
+    urgent = threading.Thread(target=run, args=(Priority.INTERACTIVE, "interactive"))
+    urgent.start()
+    for t in threads + [urgent]:
+        t.join(timeout=5)
+
+    assert order[0] == "interactive"
+    assert sorted(order[1:]) == ["batch0", "batch1"]
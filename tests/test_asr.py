@@ -48,3 +48,39 @@ def test_transcribe_wav_invalid_response():
         mock_post.return_value.json.return_value = {"invalid": "response"}
         result = client.transcribe_wav(b"wav_data")
         assert result is None
+
+
+def test_transcribe_wav_skips_silence(mock_deepgram_session):
+    """Test that a silent recording never reaches Deepgram."""
+    from app.utils.pcm import to_wav
+
+    client = DeepgramASRClient()
+    result = client.transcribe_wav(to_wav(bytes(32000), 16000))
+
+    assert result is None
+    client.session.post.assert_not_called()
+    assert client.gate.stats()["round_trips_saved"] == 1
+
+
+def test_transcribe_wav_returns_none_when_shed():
+    """Test that a full admission queue is logged and reported as no transcript."""
+    from unittest.mock import patch
+
+    from app.utils.exceptions import OverloadError
+
+    client = DeepgramASRClient()
+    shed = OverloadError("deepgram admission queue full")
+    with patch.object(client.admission, "acquire", side_effect=shed) as acquire, patch.object(
+        client.session, "post"
+    ) as mock_post:
+        assert client.transcribe_wav(b"wav_data") is None
+    acquire.assert_called_once()
+    mock_post.assert_not_called()
+
+
+def test_throttling_is_not_retried_inside_the_adapter():
+    """Test that 429s reach admission control instead of the urllib3 retry loop."""
+    client = DeepgramASRClient()
+    retry = client.session.get_adapter("https://api.deepgram.com").max_retries
+    assert 429 not in retry.status_forcelist
+    assert 503 in retry.status_forcelist
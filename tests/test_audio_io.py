@@ -0,0 +1,116 @@
+"""Tests for the pluggable audio sources and sinks."""
+import io
+import wave
+
+import pytest
+
+from app.audio_io import (
+    NullSink,
+    NullSource,
+    PipeSink,
+    PipeSource,
+    ProcessSink,
+    WavFileSink,
+    WavFileSource,
+    create_audio,
+)
+from app.utils.pcm import read_wav, to_wav
+
+
+def test_wav_source_replays_directory_in_order(tmp_path):
+    """Test that each record() returns the next WAV file until exhausted."""
+    for name, level in (("b.wav", 2), ("a.wav", 1)):
+        (tmp_path / name).write_bytes(to_wav(bytes([level, 0]) * 8, 8000))
+    source = WavFileSource(str(tmp_path))
+
+    first, second = source.record(), source.record()
+
+    assert first.endswith(bytes([1, 0]) * 8) and second.endswith(bytes([2, 0]) * 8)
+    assert source.sample_rate == 8000
+    assert source.exhausted and source.record() is None
+
+
+def test_wav_sink_appends_replies(tmp_path):
+    """Test that replies, including memoryview chunks, land in one WAV file."""
+    path = tmp_path / "out.wav"
+    pcm = bytearray(b"\x01\x00\x02\x00")
+    with WavFileSink(str(path), sample_rate=24000) as sink:
+        assert sink.play([memoryview(pcm), b"\x03\x00"])
+        assert sink.play([b"\x04\x00"])
+
+    with wave.open(str(path), "rb") as wf:
+        assert wf.getframerate() == 24000
+        assert wf.readframes(10) == b"\x01\x00\x02\x00\x03\x00\x04\x00"
+    assert sink.stats()["chunks"] == 3
+
+
+def test_pipe_source_reads_fixed_windows():
+    """Test that raw PCM on a stream is cut into WAV utterances."""
+    stream = io.BytesIO(bytes(16000 * 2 * 2 + 100))
+    source = PipeSource(stream, sample_rate=16000, record_seconds=1)
+
+    sizes = []
+    while not source.exhausted:
+        sizes.append(len(source.record()) - 44)
+
+    assert sizes == [32000, 32000, 100]
+
+
+def test_pipe_sink_writes_views_unchanged():
+    """Test that chunks are written to the stream as given."""
+    out = io.BytesIO()
+    data = b"\x01\x02\x03\x04"
+    assert PipeSink(out).play([memoryview(data)[:2], memoryview(data)[2:]])
+    assert out.getvalue() == data
+
+
+def test_process_sink_reports_a_failing_stream():
+    """Test that a reply stream failing mid-way is a failed playback, not an exception."""
+    from unittest.mock import Mock
+
+    def reply():
+        yield b"\x00\x00" * 10
+        raise ConnectionError("TTS segment 2 of 3 failed")
+
+    process = Mock(playback_rate=24000)
+    process.play.side_effect = lambda chunks: all(True for _ in chunks)
+    sink = ProcessSink(process, owner=False)
+
+    assert sink.play(reply()) is False
+    assert sink.chunks == 1
+
+
+def test_null_endpoints():
+    """Test that the null source repeats its clip and the null sink counts audio."""
+    source = NullSource(count=2, sample_rate=8000)
+    assert source.record() == source.record() == to_wav(bytes(16000), 8000)
+    assert source.exhausted and source.record() is None
+
+    sink = NullSink(sample_rate=24000)
+    sink.play([bytes(48000)])
+    assert sink.stats()["audio_seconds"] == 1.0
+
+
+def test_create_audio_specs(tmp_path):
+    """Test building endpoints from spec strings."""
+    source, sink = create_audio("null:3", f"wav:{tmp_path / 'x.wav'}")
+    assert isinstance(source, NullSource) and source.remaining == 3
+    assert isinstance(sink, WavFileSink)
+    sink.close()
+
+    with pytest.raises(ValueError):
+        create_audio("speaker", "null")
+
+
+def test_mulaw_pipes_for_telephony():
+    """Test that μ-law pipes carry a byte per sample in both directions."""
+    stream = io.BytesIO(bytes([0xFF]) * 8000 * 2)
+    source = PipeSource(stream, sample_rate=8000, record_seconds=1, encoding="mulaw")
+    assert read_wav(source.record()) == ("mulaw", 8000, 1, bytes([0xFF]) * 8000)
+
+    out = io.BytesIO()
+    sink = PipeSink(out, sample_rate=8000, encoding="mulaw")
+    reply = b"\x00\x00\xe8\x03"  # samples 0 and 1000, split mid-sample below
+    assert sink.play([reply[:1], reply[1:]])
+    assert out.getvalue() == bytes([0xFF, 0xCE])
+    assert sink.stats()["audio_seconds"] == 2 / 8000
@@ -42,3 +42,12 @@ def test_request_config():
     assert config.REQUEST_TIMEOUT > 0
     assert config.MAX_RETRIES >= 0
     assert config.RETRY_DELAY >= 0
+
+
+def test_non_negative_int_validation():
+    """Test that worker counts accept 0 and fall back to the default on bad input."""
+    from unittest.mock import patch
+
+    for raw, expected in [("0", 0), ("4", 4), ("-1", 0), ("four", 0)]:
+        with patch.dict(os.environ, {"SERVER_WORKERS": raw}):
+            assert config._validate_non_negative_int("SERVER_WORKERS", 0) == expected
@@ -0,0 +1,53 @@
+"""Tests for the DSP executor."""
+import asyncio
+
+import pytest
+
+from app.dsp import DSPExecutor, ProcessPoolDSPExecutor, create_executor
+from app.utils import pcm
+
+
+AUDIO = bytes(range(256)) * 256  # 64 KB of PCM
+
+
+@pytest.fixture(scope="module")
+def pool():
+    executor = ProcessPoolDSPExecutor(workers=1, inline_below=1024)
+    yield executor
+    executor.close()
+
+
+def test_inline_executor_runs_jobs():
+    """Test that the default executor runs jobs on the caller."""
+    executor = create_executor(0)
+    assert type(executor) is DSPExecutor
+    assert executor.run("wav", AUDIO, sample_rate=16000) == pcm.to_wav(AUDIO, 16000)
+    with pytest.raises(ValueError):
+        executor.run("reverb", AUDIO)
+
+
+def test_pool_matches_inline_results(pool):
+    """Test that offloaded transforms and meters return the inline results."""
+    assert pool.run("resample", AUDIO, src_rate=24000, dst_rate=16000) == pcm.resample(
+        AUDIO, 24000, 16000
+    )
+    assert pool.run("rms", AUDIO) == pcm.rms(AUDIO)
+    assert asyncio.run(pool.run_async("levels", AUDIO, frame_samples=160)) == pcm.frame_rms(
+        AUDIO, 160
+    )
+    assert pool.stats()["offloaded_jobs"] == 3
+
+
+def test_pool_runs_tiny_jobs_inline(pool):
+    """Test that jobs under the threshold skip the pool."""
+    before = pool.stats()
+    assert pool.run("peak", AUDIO[:64]) == pcm.peak(AUDIO[:64])
+    after = pool.stats()
+    assert after["inline_jobs"] == before["inline_jobs"] + 1
+    assert after["offloaded_jobs"] == before["offloaded_jobs"]
+
+
+def test_pool_surfaces_job_errors(pool):
+    """Test that a failing job raises in the caller and frees its buffers."""
+    with pytest.raises(TypeError):
+        pool.run("levels", AUDIO)
@@ -0,0 +1,57 @@
+"""Tests for filler-audio latency masking."""
+import threading
+import time
+from unittest.mock import MagicMock
+
+from app.filler import FillerCache, LatencyMasker
+
+
+def make_cache(tmp_path, phrases=("One moment.",)):
+    tts = MagicMock()
+    tts.stream_tts.side_effect = lambda text: [text.encode(), b"-pcm"]
+    return FillerCache(tts, str(tmp_path), phrases=phrases), tts
+
+
+def test_filler_cache_renders_once(tmp_path):
+    """Test clips are synthesized on first warm and loaded from disk after."""
+    cache, tts = make_cache(tmp_path)
+    assert cache.warm() == 1
+    assert cache.next_clip() == b"One moment.-pcm"
+
+    again, tts2 = make_cache(tmp_path)
+    assert again.warm() == 1
+    tts2.stream_tts.assert_not_called()
+
+
+def test_fast_call_plays_no_filler(tmp_path):
+    """Test that replies faster than the threshold are not masked."""
+    cache, _ = make_cache(tmp_path)
+    cache.warm()
+    play = MagicMock()
+    masker = LatencyMasker(cache, play, threshold=0.2)
+
+    assert masker.run(lambda: "quick") == "quick"
+    time.sleep(0.25)
+    play.assert_not_called()
+    assert masker.stats()["filler_rate"] == 0.0
+
+
+def test_slow_call_plays_filler_without_overlap(tmp_path):
+    """Test that a slow call triggers the filler and waits for it to finish."""
+    cache, _ = make_cache(tmp_path)
+    cache.warm()
+    filler_done = threading.Event()
+
+    def play(chunks):
+        time.sleep(0.15)
+        filler_done.set()
+
+    masker = LatencyMasker(cache, play, threshold=0.05)
+    result = masker.run(lambda: time.sleep(0.1) or "slow")
+
+    assert result == "slow"
+    assert filler_done.is_set()
+    stats = masker.stats()
+    assert stats["fillers_played"] == 1
+    assert stats["filler_rate"] == 1.0
+    assert stats["avg_masked_ms"] > 0
@@ -0,0 +1,156 @@
+"""Tests for the slow-turn flight recorder."""
+
+import json
+import time
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from openai import APIConnectionError
+
+from app.flight_recorder import MAX_EVENTS, FlightRecorder, flight
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """Enable the process-wide recorder for one test."""
+    flight.configure(threshold_ms=10_000, capacity=8, neighbors=1, dump_dir=str(tmp_path))
+    yield flight
+    flight.configure(3000, enabled=False)
+
+
+def _dumps(path):
+    return sorted(path.glob("slow-turn-*.json"))
+
+
+def test_disabled_recorder_is_a_no_op():
+    """Test that nothing is kept and streams pass through untouched while disabled."""
+    recorder = FlightRecorder()
+    chunks = [b"a", b"b"]
+    with recorder.turn(1) as record:
+        recorder.note("bytes", 10)
+        recorder.count("attempts")
+        assert record is None and recorder.current() is None
+        assert recorder.watch(chunks, "tts") is chunks
+    assert recorder.stats()["recorded"] == 0
+
+
+def test_turn_record_collects_notes_counts_and_chunk_arrivals(tmp_path):
+    """Test the contents of a record and that the ring stays bounded."""
+    recorder = FlightRecorder(capacity=3, neighbors=1, dump_dir=str(tmp_path), enabled=True)
+    with recorder.turn(1, session="s") as record:
+        recorder.note("deepgram.status", 200)
+        recorder.count("llm.attempts")
+        recorder.count("llm.attempts")
+        recorder.mark("asr")
+        recorder.event("custom", depth=3)
+        assert list(recorder.watch(iter([b"xx", b"yyyy"]), "tts")) == [b"xx", b"yyyy"]
+
+    data = record.to_dict()
+    assert data["session"] == "s" and data["values"]["deepgram.status"] == 200
+    assert data["counts"] == {"llm.attempts": 2}
+    assert set(data["stages_ms"]) == {"asr", "tts_first_chunk"}
+    assert data["values"]["tts.chunks"] == 2 and data["values"]["tts.bytes"] == 6
+    assert [e["name"] for e in data["events"]] == ["custom", "tts.chunk", "tts.chunk"]
+    assert recorder.current() is None
+
+    for i in range(2, 7):
+        with recorder.turn(i):
+            for _ in range(MAX_EVENTS + 5):
+                recorder.event("tick")
+    assert len(recorder.turns) == 3 and recorder.turns[-1].dropped_events == 5
+    assert recorder.stats()["dumps"] == 0 and not _dumps(tmp_path)
+
+
+def test_slow_turn_is_dumped_with_its_neighbors(tmp_path):
+    """Test that the dump waits for the following turns and holds the slow turn's neighborhood."""
+    recorder = FlightRecorder(
+        threshold_ms=30, capacity=8, neighbors=1, dump_dir=str(tmp_path), enabled=True
+    )
+    for i in (1, 2, 3):
+        with recorder.turn(i):
+            if i == 2:
+                time.sleep(0.05)
+        if i == 2:
+            assert not _dumps(tmp_path)
+
+    (path,) = _dumps(tmp_path)
+    dump = json.loads(path.read_text())
+    assert dump["slow_turn"] == 2 and dump["threshold_ms"] == 30
+    assert [t["turn"] for t in dump["turns"]] == [1, 2, 3]
+    assert dump["turns"][1]["total_ms"] >= 30
+    assert recorder.stats()["slow_turns"] == 1 and recorder.stats()["last_dump"] == str(path)
+
+
+def test_flush_writes_pending_dump_and_failed_turn_is_marked(tmp_path):
+    """Test flush() for a slow last turn, and that an exception is noted on the record."""
+    recorder = FlightRecorder(threshold_ms=0, neighbors=2, dump_dir=str(tmp_path), enabled=True)
+    with pytest.raises(RuntimeError):
+        with recorder.turn(1):
+            time.sleep(0.002)
+            raise RuntimeError("boom")
+    assert not _dumps(tmp_path)
+    recorder.flush()
+    (path,) = _dumps(tmp_path)
+    assert json.loads(path.read_text())["turns"][0]["values"]["error"] == "RuntimeError"
+
+
+def test_clients_note_status_retries_and_queue_depth(recording):
+    """Test that the provider clients report into the turn being recorded."""
+    from app.asr_deepgram import DeepgramASRClient
+    from app.llm_openai import LLMClient
+    from benchmarks.bench_server_scaling import utterance
+    from benchmarks.standins import DeepgramStandIn
+
+    with patch("app.llm_openai.OpenAI") as mock_openai:
+        answer = MagicMock()
+        answer.choices[0].message.content = "Hi."
+        request = httpx.Request("POST", "http://127.0.0.1/v1/chat/completions")
+        create = mock_openai.return_value.chat.completions.create
+        create.side_effect = [APIConnectionError(request=request), answer]
+        llm = LLMClient(routing=False)
+
+        with DeepgramStandIn() as standin, recording.turn(1) as record:
+            asr = DeepgramASRClient(base_url=standin.base_url)
+            assert asr.transcribe_wav(utterance())
+            assert llm.chat([{"role": "user", "content": "Hello"}]) == "Hi."
+
+    assert record.values["deepgram.status"] == 200
+    assert record.values["deepgram.retries"] == 0
+    assert record.values["deepgram.request_bytes"] > 0
+    assert record.values["deepgram.queue_depth"] == 1
+    assert record.counts["llm.attempts"] == 2 and record.counts["llm.connection_errors"] == 1
+    assert record.values["llm.model"] == llm.model
+    assert "openai.queue_wait_ms" in record.values
+
+
+def test_concurrent_server_turns_get_distinct_numbers(recording):
+    """Test that concurrent HTTP and voice-stream turns on one worker never share a number."""
+    import threading
+
+    from app.voice_stream import VoiceStream
+    from tests.test_server import fake_worker
+    from tests.test_voice_stream import _events, _pair
+
+    worker = fake_worker(0)
+    clients, threads = [], []
+    for i in range(3):
+        server_ws, client_ws = _pair()
+        clients.append(client_ws)
+        stream = VoiceStream(worker, f"voice-{i}", server_ws)
+        threads.append(threading.Thread(target=stream.run, daemon=True))
+    for i in range(4):
+        threads.append(threading.Thread(target=worker.turn, args=(f"http-{i}", b"wav")))
+    for t in threads:
+        t.start()
+
+    for ws in clients:
+        ws.recv()
+        ws.send(bytes(640))
+        ws.send('{"type": "end"}')
+    for ws in clients:
+        assert _events(ws)[0][-1]["type"] == "audio_end"
+        ws.close()
+    for t in threads:
+        t.join(5)
+    assert sorted(r.turn for r in recording.turns) == list(range(1, 8))
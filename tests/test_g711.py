@@ -0,0 +1,45 @@
+"""Tests for the table-driven G.711 μ-law codec."""
+from app.utils.g711 import encode_stream, ulaw_decode, ulaw_encode
+
+
+def pcm(*samples):
+    return b"".join(s.to_bytes(2, "little", signed=True) for s in samples)
+
+
+def test_reference_values():
+    """Test codes against the ITU-T reference encoder and decoder."""
+    assert ulaw_encode(pcm(0, -8, 32767, -32768, 1000, -1000)) == bytes(
+        [0xFF, 0x7E, 0x80, 0x00, 0xCE, 0x4E]
+    )
+    assert ulaw_decode(bytes([0xFF, 0x7F, 0x80, 0x00, 0xCE, 0x4E])) == pcm(
+        0, 0, 32124, -32124, 988, -988
+    )
+
+
+def test_every_code_survives_a_round_trip():
+    """Test that decoding then re-encoding returns each code (both zeros map to 0xFF)."""
+    codes = bytes(c for c in range(256) if c != 0x7F)
+    assert ulaw_encode(ulaw_decode(codes)) == codes
+
+
+def test_quantization_error_is_bounded():
+    """Test that the logarithmic step never exceeds 1/16 of the sample magnitude."""
+    samples = list(range(-32000, 32000, 97))
+    decoded = ulaw_decode(ulaw_encode(pcm(*samples)))
+    for i, s in enumerate(samples):
+        d = int.from_bytes(decoded[2 * i : 2 * i + 2], "little", signed=True)
+        assert abs(d - s) <= max(8, abs(s) // 16)
+
+
+def test_encode_accepts_views_and_drops_odd_byte():
+    """Test that memoryviews encode without copying and a half sample is ignored."""
+    data = pcm(0, 1000)
+    assert ulaw_encode(memoryview(data + b"\x01")) == bytes([0xFF, 0xCE])
+    assert ulaw_decode(memoryview(bytes([0xFF]))) == pcm(0)
+
+
+def test_encode_stream_carries_split_samples():
+    """Test that samples split across chunk boundaries are encoded once, whole."""
+    data = pcm(0, 1000, -1000)
+    chunks = [data[:1], data[1:3], data[3:]]
+    assert b"".join(encode_stream(chunks)) == ulaw_encode(data)
@@ -38,3 +38,25 @@ def test_full_voice_flow_mock():
         assert transcript == "Hello"
         assert response == "Hi there!"
         assert audio_chunks == [b"audio_chunk"]
+
+
+def test_cli_runs_headless_from_null_source():
+    """Test that non-interactive sources drive turns without prompts or audio hardware."""
+    from app import cli_runner
+    from app.audio_io import NullSink
+
+    with patch("app.cli_runner.DeepgramASRClient") as mock_asr_class, patch(
+        "app.cli_runner.MurfTTSClient"
+    ) as mock_tts_class, patch("app.cli_runner.VoiceAgent") as mock_agent_class, patch(
+        "app.cli_runner.FAST_PATH_ENABLED", False
+    ), patch("builtins.input") as mock_input, patch.object(NullSink, "close") as mock_close:
+        mock_asr_class.return_value.transcribe_wav.return_value = "Hello"
+        mock_agent_class.return_value.reply.return_value = "Hi there!"
+        mock_tts_class.return_value.stream_tts.return_value = [b"\x00\x00" * 240]
+
+        cli_runner.main(["--source", "null:3", "--sink", "null"])
+
+        assert mock_asr_class.return_value.transcribe_wav.call_count == 3
+        assert mock_agent_class.return_value.reply.call_count == 3
+        mock_input.assert_not_called()
+        mock_close.assert_called_once()
@@ -0,0 +1,79 @@
+"""Tests for the local intent fast path."""
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.intents import DATE, LOUDER, REPEAT, RESET, TIME, FastPath, match_intent
+
+
+@pytest.mark.parametrize(
+    "transcript, intent",
+    [
+        ("Repeat that.", REPEAT),
+        ("Could you say that again, please?", REPEAT),
+        ("Start over!", RESET),
+        ("What time is it?", TIME),
+        ("What's today’s date?", DATE),
+        ("Louder", LOUDER),
+        ("What time is it in Tokyo?", None),
+        ("Explain how photosynthesis works.", None),
+    ],
+)
+def test_match_intent(transcript, intent):
+    """Test intent matching on Deepgram-style transcripts."""
+    assert match_intent(transcript) == intent
+
+
+def make_fast_path():
+    agent, tts = MagicMock(), MagicMock()
+    played = []
+    play = MagicMock(side_effect=lambda chunks: played.append(b"".join(chunks)))
+    play.played = played
+    tts.stream_tts.side_effect = lambda text: [text.encode()]
+    clock = lambda: time.strptime("2026-10-19 15:42", "%Y-%m-%d %H:%M")
+    return FastPath(agent, tts, play, clock=clock), agent, tts, play
+
+
+def test_repeat_replays_retained_pcm():
+    """Test that repeat plays the last reply without calling TTS."""
+    fast, _, tts, play = make_fast_path()
+    fast.play(iter([b"\x01\x00", b"\x02\x00"]))
+    play.reset_mock()
+
+    assert fast.try_handle("repeat that") == REPEAT
+    tts.stream_tts.assert_not_called()
+    assert play.played[-1] == b"\x01\x00\x02\x00"
+
+
+def test_reset_clears_history_and_confirms():
+    """Test that start over resets the agent."""
+    fast, agent, _, play = make_fast_path()
+    assert fast.try_handle("Start over.") == RESET
+    agent.reset_conversation.assert_called_once()
+    play.assert_called_once()
+
+
+def test_time_answer_is_cached():
+    """Test that template answers render audio once per distinct text."""
+    fast, _, tts, _ = make_fast_path()
+    assert fast.answer_text(TIME) == "It's 3:42 PM."
+    assert fast.answer_text(DATE) == "Today is Monday, October 19."
+    fast.try_handle("What time is it?")
+    fast.try_handle("What time is it?")
+    assert tts.stream_tts.call_count == 1
+
+
+def test_louder_scales_playback_and_stats():
+    """Test volume intent and fast-path accounting."""
+    fast, _, _, play = make_fast_path()
+    fast.try_handle("louder")
+    assert fast.gain > 1.0
+    assert fast.try_handle("Tell me a story") is None
+
+    fast.play([(1000).to_bytes(2, "little", signed=True)])
+    assert int.from_bytes(play.played[-1], "little", signed=True) == 1250
+
+    stats = fast.stats()
+    assert stats["turns"] == 2
+    assert stats["fast_path_rate"] == 0.5
@@ -0,0 +1,122 @@
+"""Tests for hands-free listening."""
+
+import io
+import threading
+import time
+import wave
+from array import array
+
+from app.listener import MAX_STRIDE, ListeningSource, create_listener
+from app.utils.ring_buffer import FrameRingBuffer
+
+RATE = 16000
+FRAME = RATE // 50  # 20 ms
+
+
+class FakeCapture:
+    """Capture whose frames are written by the test instead of a device."""
+
+    def __init__(self):
+        self.ring = FrameRingBuffer(FRAME * 2, 1000)
+        self.started = self.stopped = False
+
+    def start(self):
+        self.started = True
+
+    def stop(self):
+        self.stopped = True
+
+    def reader(self, from_start=False):
+        return self.ring.reader(from_start=from_start)
+
+
+def _frame(level):
+    return array("h", [level, -level] * (FRAME // 2)).tobytes()
+
+
+def _feed(capture, levels, delay=0.002):
+    """Write one frame per level from a thread, faster than real time."""
+
+    def run():
+        time.sleep(0.05)
+        for level in levels:
+            capture.ring.write(_frame(level))
+            time.sleep(delay)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def _samples(wav):
+    with wave.open(io.BytesIO(wav)) as w:
+        return array("h", w.readframes(w.getnframes()))
+
+
+def test_utterance_starts_with_preroll_and_ends_after_hangover():
+    """Test that the turn keeps pre-roll before the onset and stops after the hangover."""
+    capture = FakeCapture()
+    listener = ListeningSource(capture, RATE, preroll_ms=300, onset_ms=60, hangover_ms=700)
+    # 0.5 s of room noise, 0.4 s of speech, then 2 s of silence
+    feeder = _feed(capture, [20] * 25 + [8000] * 20 + [0] * 100)
+    wav = listener.record()
+    feeder.join()
+
+    samples = _samples(wav)
+    frames = [samples[i : i + FRAME] for i in range(0, len(samples), FRAME)]
+    levels = [f[0] for f in frames]
+    # 300 ms of pre-roll, all of the speech, then 700 ms of hangover
+    assert levels[:15] == [20] * 15
+    assert levels[15:35] == [8000] * 20
+    assert levels[35:] == [0] * 35
+    assert capture.started and listener.utterances == 1
+
+
+def test_backlog_is_discarded_and_stats_reported():
+    """Test that audio captured between turns is dropped and the turn is timed from onset."""
+    capture = FakeCapture()
+    listener = ListeningSource(capture, RATE, hangover_ms=100)
+    listener._open()
+    for _ in range(30):
+        capture.ring.write(_frame(8000))  # e.g. the agent's own reply
+    feeder = _feed(capture, [0] * 5 + [8000] * 5 + [0] * 10)
+    wav = listener.record()
+    feeder.join()
+
+    assert len(_samples(wav)) < 30 * FRAME
+    stats = listener.stats()
+    assert stats["discarded_frames"] == 30
+    assert stats["utterances"] == 1
+    assert 0 < stats["onset_latency_ms_avg"] < 1000
+    assert stats["idle_seconds"] > 0 and stats["detector_stride"] == 1
+    listener.close()
+    assert capture.stopped
+
+
+def test_closed_capture_exhausts_listener():
+    """Test that record() returns None once the capture ring is closed."""
+    capture = FakeCapture()
+    capture.ring.closed = True
+    listener = ListeningSource(capture, RATE)
+    assert listener.record() is None
+    assert listener.exhausted
+
+
+def test_detector_coarsens_when_over_cpu_budget():
+    """Test that idle windows over budget double the detector stride up to the cap."""
+    listener = ListeningSource(FakeCapture(), RATE, idle_cpu_budget=0.02)
+    listener._account(0.01, 1.0)
+    assert listener.stride == 1
+    for _ in range(5):
+        listener._account(0.05, 1.0)
+    assert listener.stride == MAX_STRIDE
+    assert listener.stats()["idle_cpu_percent"] > 2
+
+
+def test_create_listener_uses_given_process_and_config():
+    """Test that the factory listens through a shared capture with LISTEN_* settings."""
+    capture = FakeCapture()
+    listener = create_listener(RATE, 1, capture)
+    assert listener.capture is capture and listener.hands_free
+    assert listener.preroll_ms == 300 and listener.hangover_ms == 700
+    assert listener.idle_cpu_budget == 0.02
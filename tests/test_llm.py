@@ -35,3 +35,119 @@ def test_llm_chat():
             response = client.chat([{"role": "user", "content": "Hello"}])
 
             assert response == "Test response"
+
+
+def test_llm_chat_coalesces_identical_requests():
+    """Test that concurrent identical chats share one completion call."""
+    import threading
+    import time
+
+    with patch("app.llm_openai.OpenAI") as mock_openai, patch(
+        "app.llm_openai.COALESCE_REQUESTS", True
+    ):
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = "Shared"
+
+        def slow_create(**kwargs):
+            time.sleep(0.1)
+            return mock_response
+
+        mock_openai.return_value.chat.completions.create.side_effect = slow_create
+        client = LLMClient()
+        messages = [{"role": "user", "content": "What time is it?"}]
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(client.chat(messages)))
+            for _ in range(3)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == ["Shared"] * 3
+        assert mock_openai.return_value.chat.completions.create.call_count == 1
+        assert client.coalescing_stats()["deduplicated"] == 2
+
+
+def _converse(client, turns):
+    messages = [{"role": "system", "content": "Be brief."}]
+    for i in range(turns):
+        messages.append({"role": "user", "content": f"Question {i}"})
+        reply = client.chat(messages)
+        assert reply
+        messages.append({"role": "assistant", "content": reply})
+    return messages
+
+
+def test_stateful_mode_sends_only_new_messages():
+    """Test that stateful turns chain previous_response_id instead of resending history."""
+    from benchmarks.standins import OpenAIStandIn
+
+    with OpenAIStandIn() as standin:
+        client = LLMClient(state_mode="stateful", base_url=standin.base_url)
+        _converse(client, 4)
+
+        bodies = [r["body"] for r in standin.requests]
+        assert all(r["path"].endswith("/responses") for r in standin.requests)
+        assert "previous_response_id" not in bodies[0]
+        assert all(b["previous_response_id"] for b in bodies[1:])
+        assert all(len(b["input"]) == 1 for b in bodies)
+        stats = client.usage_stats()
+        assert stats["chained_calls"] == 3
+        assert stats["bytes_sent"] == sum(r["bytes"] for r in standin.requests)
+
+
+def test_stateful_mode_resends_expired_chain():
+    """Test that an unknown previous response falls back to a full resend."""
+    from benchmarks.standins import OpenAIStandIn
+
+    with OpenAIStandIn() as standin:
+        client = LLMClient(state_mode="stateful", base_url=standin.base_url)
+        messages = _converse(client, 2)
+        standin.forget()
+        messages.append({"role": "user", "content": "Still there?"})
+
+        assert client.chat(messages)
+        assert len(standin.requests[-1]["body"]["input"]) == 5
+        assert client.usage_stats()["fallbacks"] == 1
+
+
+def test_stateful_mode_falls_back_without_responses_api():
+    """Test that an endpoint without the Responses API gets full Chat Completions."""
+    from benchmarks.standins import OpenAIStandIn
+
+    with OpenAIStandIn(responses=False) as standin:
+        client = LLMClient(state_mode="stateful", base_url=standin.base_url)
+        _converse(client, 2)
+
+        # One missing Responses API call only falls back for that call
+        assert client.state_mode == "stateful"
+        assert standin.requests[-1]["path"].endswith("/chat/completions")
+        assert len(standin.requests[-1]["body"]["messages"]) == 4
+
+        standin.responses = True
+        _converse(client, 1)
+        assert standin.requests[-1]["path"].endswith("/responses")
+
+        standin.responses = False
+        _converse(client, 3)
+        assert client.state_mode == "full"
+        sent = len(standin.requests)
+        _converse(client, 1)
+        assert len(standin.requests) == sent + 1
+        assert standin.requests[-1]["path"].endswith("/chat/completions")
+
+
+def test_prefix_mode_keeps_window_start_stable():
+    """Test that prefix mode trims history in blocks rather than every turn."""
+    with patch("app.llm_openai.OpenAI"):
+        client = LLMClient(state_mode="prefix")
+    system = [{"role": "system", "content": "s"}]
+    history = [{"role": "user", "content": str(i)} for i in range(30)]
+
+    starts = {client._window(system + history[:n])[1]["content"] for n in range(20, 29)}
+
+    assert starts == {"10"}
+    assert client._window(system + history)[0] == system[0]
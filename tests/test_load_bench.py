@@ -0,0 +1,70 @@
+"""Tests for the concurrent-caller load generator."""
+
+import csv
+import json
+import threading
+
+from app.server import PreforkServer
+from benchmarks import bench_load
+from tests.test_server import fake_worker
+
+
+def _rows(ttfa, errors=0):
+    rows = [{"ttfa_ms": t, "e2e_ms": t + 50, "error": None} for t in ttfa]
+    return rows + [{"ttfa_ms": None, "e2e_ms": None, "error": "no reply"}] * errors
+
+
+def test_percentile_is_nearest_rank():
+    """Test nearest-rank percentiles on small samples."""
+    values = list(range(1, 101))
+    assert bench_load.percentile(values, 50) == 50
+    assert bench_load.percentile(values, 99) == 99
+    assert bench_load.percentile([7.0], 99) == 7.0
+    assert bench_load.percentile([], 99) is None
+
+
+def test_summarize_applies_slo_to_p99_and_error_rate():
+    """Test that a level misses the SLO on a slow tail or on failed turns."""
+    fast = bench_load.summarize(4, _rows([100] * 99 + [900]), 10, slo_ms=1000)
+    assert fast["within_slo"] and fast["turns_per_s"] == 10.0
+    assert fast["ttfa_p50_ms"] == 100 and fast["e2e_p99_ms"] == 150
+
+    slow_tail = bench_load.summarize(8, _rows([100] * 98 + [1200] * 2), 10, slo_ms=1000)
+    assert not slow_tail["within_slo"] and slow_tail["e2e_p99_ms"] == 1250
+
+    failing = bench_load.summarize(8, _rows([100] * 95, errors=5), 10, slo_ms=1000)
+    assert failing["errors"] == 5 and not failing["within_slo"]
+
+
+def test_find_knee():
+    """Test capacity is the last level before the first SLO miss."""
+    levels = [
+        {"callers": 1, "within_slo": True},
+        {"callers": 4, "within_slo": True},
+        {"callers": 8, "within_slo": False},
+        {"callers": 16, "within_slo": True},
+    ]
+    assert bench_load.find_knee(levels) == {"capacity": 4, "breach": 8}
+    assert bench_load.find_knee(levels[:2]) == {"capacity": 4, "breach": None}
+    assert bench_load.find_knee(levels[2:3]) == {"capacity": None, "breach": 8}
+
+
+def test_level_against_server_writes_json_and_csv(tmp_path):
+    """Test a short run of concurrent callers over the voice WebSocket, end to end."""
+    prompts = bench_load.load_prompts(None)
+    with PreforkServer("127.0.0.1", 0, workers=1, factory=fake_worker) as server:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        rows = bench_load.run_level(server.address, 3, prompts, seconds=1.0, think=0.2)
+
+    assert {r["caller"] for r in rows} == {0, 1, 2}
+    assert all(r["error"] is None and 0 < r["ttfa_ms"] <= r["e2e_ms"] for r in rows)
+    level = bench_load.summarize(3, rows, 1.0, slo_ms=5000)
+    assert level["turns"] == len(rows) and level["within_slo"]
+
+    bench_load.write_json(str(tmp_path / "load.json"), {"slo_ms": 5000}, [level])
+    bench_load.write_csv(str(tmp_path / "load.csv"), rows)
+    report = json.loads((tmp_path / "load.json").read_text())
+    assert report["knee"] == {"capacity": 3, "breach": None}
+    with open(tmp_path / "load.csv") as f:
+        written = list(csv.DictReader(f))
+    assert len(written) == len(rows) and written[0]["callers"] == "3"
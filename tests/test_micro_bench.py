@@ -0,0 +1,57 @@
+"""Tests for the micro-benchmark regression suite."""
+
+import json
+
+from benchmarks import micro
+
+
+def test_compare_classifies_against_tolerance():
+    """Test ok, regressed, improved and new statuses."""
+    baselines = {"a": {"score": 1.0}, "b": {"score": 1.0}, "c": {"score": 1.0}}
+    results = {
+        "a": {"score": 1.1, "seconds": 0.0},
+        "b": {"score": 1.5, "seconds": 0.0},
+        "c": {"score": 0.5, "seconds": 0.0},
+        "d": {"score": 1.0, "seconds": 0.0},
+    }
+    rows = {row["case"]: row for row in micro.compare(results, baselines, 0.25)}
+    assert rows["a"]["status"] == "ok"
+    assert rows["b"]["status"] == "regressed"
+    assert rows["c"]["status"] == "improved"
+    assert rows["d"]["status"] == "new"
+    assert abs(rows["b"]["change"] - 0.5) < 1e-9
+
+
+def test_every_case_runs():
+    """Test that each registered case sets up and runs once."""
+    for name, setup in micro.CASES.items():
+        setup()()
+
+
+def test_transcript_parse_times_the_success_path():
+    """Test that the transcript case parses a transcript rather than timing an error path."""
+    transcript = micro.CASES["transcript_parse"]()()
+    assert transcript and transcript.startswith("so what is the weather")
+
+
+def test_stored_baselines_cover_every_case():
+    """Test that the committed baselines have an entry for each case."""
+    stored = micro.load_baselines()
+    assert set(stored["cases"]) == set(micro.CASES)
+    assert 0 < stored["tolerance"] < 1
+
+
+def test_main_updates_then_fails_on_regression(tmp_path, capsys):
+    """Test --update writing baselines and a slowdown past tolerance failing the run."""
+    path = str(tmp_path / "baselines.json")
+    args = ["--baselines", path, "--cases", "wav_assembly", "--round-time", "0.005"]
+    assert micro.main(args + ["--update"]) == 0
+    with open(path) as f:
+        data = json.load(f)
+    assert set(data["cases"]) == {"wav_assembly"}
+
+    data["cases"]["wav_assembly"]["score"] /= 100
+    with open(path, "w") as f:
+        json.dump(data, f)
+    assert micro.main(args) == 1
+    assert "Regressed past 25%: wav_assembly" in capsys.readouterr().out
@@ -0,0 +1,105 @@
+"""Tests for latency-aware model routing."""
+
+from unittest.mock import MagicMock, patch
+
+from app.llm_openai import MAX_TOKENS, LLMClient
+from app.model_router import EXPLORE_EVERY, FAST, STANDARD, ModelRouter, Tier, classify
+
+
+def _turn(text, depth=0):
+    messages = [{"role": "system", "content": "Be brief."}]
+    for i in range(depth):
+        messages.append({"role": "user" if i % 2 == 0 else "assistant", "content": "x"})
+    return messages + [{"role": "user", "content": text}]
+
+
+def test_classify_small_talk_and_short_questions_as_fast():
+    """Test that acknowledgements and short plain questions go to the fast tier."""
+    for text in ("Thanks!", "OK.", "What is the capital of Japan?", "Where is Kyoto?"):
+        assert classify(_turn(text)) == FAST, text
+
+
+def test_classify_explanations_long_turns_and_deep_history_as_standard():
+    """Test that question type, length and history depth each select the standard tier."""
+    assert classify(_turn("Explain how a rainbow forms.")) == STANDARD
+    assert classify(_turn("Why is the sky blue?")) == STANDARD
+    assert classify(_turn("Paris or Rome, pros and cons?")) == STANDARD
+    assert classify(_turn(" ".join(["word"] * 20))) == STANDARD
+    assert classify(_turn("And the one after that?", depth=20)) == STANDARD
+    # Small talk stays fast however long the conversation is
+    assert classify(_turn("Thank you", depth=20)) == FAST
+    assert classify([{"role": "system", "content": "Be brief."}]) == STANDARD
+
+
+def test_router_learns_latency_and_stops_using_a_slower_fast_tier():
+    """Test the EWMA, per-tier shares, and rerouting while the fast tier is slower."""
+    fast, standard = Tier(FAST, "small", 64), Tier(STANDARD, "large", 512)
+    router = ModelRouter(fast, standard, alpha=0.5)
+
+    assert router.choose(_turn("Hi")) is fast
+    router.record(fast, 0.1)
+    router.record(fast, 0.3)
+    assert router.choose(_turn("Explain tides.")) is standard
+    router.record(standard, 0.1)
+    stats = router.stats()
+    assert stats[FAST]["ewma_ms"] == 200.0 and stats[FAST]["last_ms"] == 300.0
+    assert stats[FAST]["share"] == stats[STANDARD]["share"] == 0.5
+
+    # Fast is now the slower tier: simple turns go to standard, except exploration turns
+    tiers = [router.choose(_turn("Hi")) for _ in range(EXPLORE_EVERY)]
+    assert tiers.count(fast) == 1
+    assert router.stats()[FAST]["rerouted"] == EXPLORE_EVERY - 1
+
+    router.record(fast, None)
+    assert router.stats()[FAST]["failures"] == 1
+    assert router.fallback(fast) is standard and router.fallback(standard) is None
+
+
+def test_llm_client_sends_routed_model_and_token_cap():
+    """Test that LLMClient asks the fast model, with its token cap, for a simple turn."""
+    with patch("app.llm_openai.OpenAI") as mock_openai:
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value.choices[0].message.content = "Sure."
+        client = LLMClient(routing=True)
+
+        assert client.chat(_turn("Thanks!")) == "Sure."
+        assert client.chat(_turn("Explain how vaccines work.")) == "Sure."
+
+        first, second = create.call_args_list
+        assert first.kwargs["model"] == client.router.tiers[FAST].model
+        assert first.kwargs["max_tokens"] == client.router.tiers[FAST].max_tokens
+        assert second.kwargs["model"] == client.model
+        assert second.kwargs["max_tokens"] == MAX_TOKENS
+        stats = client.routing_stats()
+        assert stats[FAST]["turns"] == stats[STANDARD]["turns"] == 1
+        assert stats[FAST]["ewma_ms"] is not None
+
+
+def test_llm_client_retries_failed_fast_turn_on_standard_tier():
+    """Test that a turn the fast model fails is answered by the standard model."""
+    with patch("app.llm_openai.OpenAI") as mock_openai:
+        answer = MagicMock()
+        answer.choices[0].message.content = "From the big model."
+
+        def create(**kwargs):
+            if kwargs["model"] != client.model:
+                raise RuntimeError("model unavailable")
+            return answer
+
+        mock_openai.return_value.chat.completions.create.side_effect = create
+        client = LLMClient(routing=True)
+
+        assert client.chat(_turn("Hello")) == "From the big model."
+        assert client.routing_stats()[FAST]["failures"] == 1
+
+
+def test_routing_off_uses_configured_model():
+    """Test that without routing every turn uses OPENAI_MODEL and no stats are kept."""
+    with patch("app.llm_openai.OpenAI") as mock_openai:
+        create = mock_openai.return_value.chat.completions.create
+        create.return_value.choices[0].message.content = "Hi."
+        client = LLMClient(routing=False)
+
+        client.chat(_turn("Thanks!"))
+        assert create.call_args.kwargs["model"] == client.model
+        assert client.routing_stats() == {}
@@ -0,0 +1,89 @@
+"""Tests for PCM helpers."""
+import io
+import wave
+
+import pytest
+
+from app.utils.pcm import (
+    apply_gain,
+    frame_rms,
+    peak,
+    read_wav,
+    resample,
+    rms,
+    scale,
+    to_wav,
+    trim_silence,
+)
+
+
+def pcm(*samples):
+    return b"".join(s.to_bytes(2, "little", signed=True) for s in samples)
+
+
+def test_scale_clips_to_int16():
+    """Test gain with clipping."""
+    assert scale(pcm(100, -100, 30000), 2.0) == pcm(200, -200, 32767)
+    assert scale(pcm(5), 1.0) == pcm(5)
+
+
+def test_apply_gain_handles_unaligned_chunks():
+    """Test that samples split across chunks are scaled correctly."""
+    data = pcm(1000, -2000, 3000)
+    chunks = [data[:3], data[3:5], data[5:]]
+    assert b"".join(apply_gain(chunks, 0.5)) == pcm(500, -1000, 1500)
+
+
+def test_meters():
+    """Test peak and RMS levels."""
+    assert peak(pcm(3, -7, 5)) == 7
+    assert rms(pcm(3, -3, 3, -3)) == 3.0
+    assert frame_rms(pcm(1, 1, 4, 4, 2), 2) == [1.0, 4.0, 2.0]
+    assert peak(b"") == 0 and rms(b"") == 0.0
+
+
+def test_resample_linear():
+    """Test linear interpolation between neighbouring samples."""
+    assert resample(pcm(0, 100, 200, 300), 16000, 32000) == pcm(0, 50, 100, 150, 200, 250, 300, 300)
+    assert resample(pcm(0, 100, 200, 300), 16000, 8000) == pcm(0, 200)
+
+
+def test_to_wav_header():
+    """Test that PCM is wrapped in a 44-byte WAV header."""
+    wav = to_wav(pcm(1, 2), 16000)
+    assert wav[:4] == b"RIFF" and len(wav) == 44 + 4
+
+
+def test_trim_silence_keeps_padding():
+    """Test that silence is cut down to the padding around speech."""
+    silence, speech = pcm(*[0] * 100), pcm(*[5000] * 20)
+    trimmed = trim_silence(silence + speech + silence, 1000, 0.01, pad_ms=30, frame_ms=10)
+    assert trimmed == pcm(*[0] * 30) + speech + pcm(*[0] * 30)
+
+
+def test_trim_silence_rejects_short_noise():
+    """Test that too little speech counts as none."""
+    click = pcm(*[0] * 100, *[5000] * 10, *[0] * 100)
+    assert trim_silence(click, 1000, 0.01, frame_ms=10, min_speech_ms=50) == b""
+    assert trim_silence(pcm(*[0] * 100), 1000, 0.01) == b""
+
+
+def test_mulaw_wav_round_trip():
+    """Test the hand-written μ-law WAV header against the reader, padding odd data."""
+    wav = to_wav(b"\x01\x02\x03", 8000, encoding="mulaw")
+    assert len(wav) % 2 == 0
+    assert read_wav(wav) == ("mulaw", 8000, 1, b"\x01\x02\x03")
+    assert read_wav(to_wav(pcm(1, -1), 16000, 2)) == ("linear16", 16000, 2, pcm(1, -1))
+
+
+def test_read_wav_rejects_other_formats():
+    """Test that non-WAV and 8-bit PCM input are refused."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(1)
+        wf.setframerate(8000)
+        wf.writeframes(b"\x80" * 4)
+    for data in (b"not a wav", buffer.getvalue()):
+        with pytest.raises(ValueError):
+            read_wav(data)
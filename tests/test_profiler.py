@@ -0,0 +1,53 @@
+"""Tests for per-turn profiling."""
+import time
+
+import pytest
+
+from app.profiler import TurnProfiler
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_disabled_profiler_writes_nothing(tmp_path, monkeypatch):
+    """Test that no files are written without an output directory."""
+    # Any relative path a disabled profiler wrote to would land here
+    monkeypatch.chdir(tmp_path)
+    for output_dir in (None, ""):
+        profiler = TurnProfiler(output_dir)
+        with profiler.turn(1):
+            busy(0.01)
+        assert not profiler.enabled
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_sample_mode_writes_folded_stacks(tmp_path):
+    """Test that sampling mode produces flamegraph folded stacks."""
+    profiler = TurnProfiler(str(tmp_path))
+    with profiler.turn(1):
+        busy(0.1)
+
+    lines = (tmp_path / "turn-0001.folded").read_text().splitlines()
+    assert lines
+    assert any("busy" in line for line in lines)
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_cprofile_mode_writes_pstats(tmp_path):
+    """Test that cProfile mode produces a loadable pstats file."""
+    import pstats
+
+    profiler = TurnProfiler(str(tmp_path), mode="cprofile")
+    with profiler.turn(2):
+        busy(0.01)
+    stats = pstats.Stats(str(tmp_path / "turn-0002.prof"))
+    assert stats.total_calls > 0
+
+
+def test_invalid_mode():
+    """Test that unknown profile modes are rejected."""
+    with pytest.raises(ValueError):
+        TurnProfiler(None, mode="perf")
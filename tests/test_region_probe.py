@@ -0,0 +1,77 @@
+"""Tests for Murf region latency probing."""
+import pytest
+from app.region_probe import RegionProber
+
+
+def make_prober(latencies):
+    """Build a prober whose probe_fn returns canned latencies per endpoint."""
+    endpoints = {name: f"https://{name.lower()}.example" for name in latencies}
+    by_url = {endpoints[name]: value for name, value in latencies.items()}
+    return RegionProber(endpoints, probe_fn=lambda url: by_url[url])
+
+
+def test_prober_requires_endpoints():
+    """Test that an empty endpoint map is rejected."""
+    with pytest.raises(ValueError):
+        RegionProber({})
+
+
+def test_probe_all_ranks_fastest_first():
+    """Test that the fastest probed region is preferred."""
+    prober = make_prober({"GLOBAL": 0.30, "IN": 0.05, "US_EAST": 0.20})
+    prober.probe_all()
+    assert prober.ranked() == ["IN", "US_EAST", "GLOBAL"]
+    assert prober.best() == "IN"
+
+
+def test_ewma_smooths_samples():
+    """Test EWMA update of region latency."""
+    prober = make_prober({"GLOBAL": 0.1})
+    prober.record("GLOBAL", 1.0)
+    prober.record("GLOBAL", 0.0)
+    assert prober.snapshot()["GLOBAL"]["ewma"] == pytest.approx(0.7)
+    assert prober.snapshot()["GLOBAL"]["samples"] == 2
+
+
+def test_failed_region_is_ranked_last():
+    """Test failover away from a region that keeps failing."""
+    prober = make_prober({"IN": None, "GLOBAL": 0.3})
+    prober.record("IN", 0.01)
+    prober.probe_all()
+    prober.probe_all()
+
+    stats = prober.snapshot()
+    assert stats["IN"]["healthy"] is False
+    assert prober.ranked() == ["GLOBAL", "IN"]
+
+    prober.record("IN", 0.01)
+    assert prober.best() == "IN"
+
+
+def test_real_requests_do_not_skew_the_probe_ranking():
+    """Test that first-chunk times of real requests are kept apart from the probe EWMA."""
+    prober = make_prober({"IN": 0.05, "GLOBAL": 0.2})
+    prober.probe_all()
+    prober.record_request("IN", 2.5)
+
+    stats = prober.snapshot()["IN"]
+    assert stats["ewma"] == pytest.approx(0.05) and stats["samples"] == 1
+    assert stats["request_ewma"] == 2.5 and stats["requests"] == 1
+    assert prober.best() == "IN"
+
+
+def test_probe_all_does_not_wait_past_its_budget():
+    """Test that a hanging region cannot hold up the first probe round."""
+    import threading
+    import time
+
+    release = threading.Event()
+    endpoints = {"IN": "https://in.example", "GLOBAL": "https://global.example"}
+    prober = RegionProber(
+        endpoints, probe_fn=lambda url: release.wait(5) and 0.9 if "in." in url else 0.1
+    )
+    start = time.monotonic()
+    prober.probe_all(wait=0.2)
+    assert time.monotonic() - start < 1.0
+    assert prober.best() == "GLOBAL" and prober.snapshot()["IN"]["samples"] == 0
+    release.set()
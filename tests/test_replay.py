@@ -0,0 +1,175 @@
+"""Tests for session recording and replay."""
+
+import time
+
+import pytest
+
+from app.agent import VoiceAgent
+from app.asr_deepgram import DeepgramASRClient
+from app.llm_openai import LLMClient
+from app.replay import (
+    ArchiveSource,
+    ReplayServer,
+    SessionArchive,
+    SessionRecorder,
+    endpoint,
+)
+from app.tts_murf import MurfTTSClient
+from app.utils import pcm
+
+QUESTION = "What is the weather in Paris tomorrow?"
+
+
+def _wav(seconds: float = 0.5) -> bytes:
+    samples = bytearray()
+    for i in range(int(16000 * seconds)):
+        samples += (3000 if i % 20 < 10 else -3000).to_bytes(2, "little", signed=True)
+    return pcm.to_wav(bytes(samples), 16000)
+
+
+def _clients(deepgram: str, openai: str, murf: str, state_mode: str = "full"):
+    return (
+        DeepgramASRClient(base_url=deepgram),
+        LLMClient(state_mode=state_mode, base_url=openai),
+        MurfTTSClient(base_url=murf.rsplit("/v1", 1)[0]),
+    )
+
+
+def _run(asr, llm, tts, inputs, recorder=None):
+    """Run turns like the CLI does; return (transcript, reply, audio) per turn."""
+    agent = VoiceAgent(llm=llm)
+    results = []
+    for wav in inputs:
+        if recorder:
+            recorder.add_input(wav)
+        transcript = asr.transcribe_wav(wav)
+        reply = agent.reply(transcript)
+        results.append((transcript, reply, b"".join(tts.stream_tts(reply))))
+    return results
+
+
+@pytest.fixture
+def recording(tmp_path):
+    """Record two turns against the stand-ins; return (archive path, per-turn results)."""
+    from benchmarks.standins import DeepgramStandIn, MurfStandIn, OpenAIStandIn
+
+    path = str(tmp_path / "session.zip")
+    with OpenAIStandIn() as oa, DeepgramStandIn(transcript=QUESTION) as dg, MurfStandIn() as mf:
+        asr, llm, tts = _clients(dg.base_url, oa.base_url, mf.base_url)
+        recorder = SessionRecorder(path, {"sample_rate": 16000})
+        recorder.attach(asr, llm, tts)
+        results = _run(asr, llm, tts, [_wav(), _wav(0.25)], recorder)
+        recorder.close()
+    return path, results
+
+
+def test_endpoint():
+    """Test recognition of provider endpoints from request paths."""
+    assert endpoint("/v1/listen?model=nova-2") == "listen"
+    assert endpoint("/v1/chat/completions") == "chat/completions"
+    assert endpoint("https://api.openai.com/v1/responses") == "responses"
+    assert endpoint("/v1/speech/stream") == "speech/stream"
+    assert endpoint("/v1/voices") is None
+
+
+def test_recorder_captures_every_provider(recording):
+    """Test that the archive holds inputs, responses and timed Murf chunks per turn."""
+    path, results = recording
+    archive = SessionArchive.load(path)
+    assert archive.summary()["turns"] == 2
+    assert [e["turn"] for e in archive.deepgram] == [1, 2]
+    assert [e["turn"] for e in archive.openai] == [1, 2]
+    assert all(e["endpoint"] == "chat/completions" for e in archive.openai)
+    assert archive.settings["state_mode"] == "full"
+    for entry, (_, reply, audio) in zip(archive.murf, results):
+        assert entry["text"] == reply
+        assert entry["audio"] == audio
+        assert sum(length for _, length in entry["chunks"]) == len(audio)
+        offsets = [offset for offset, _ in entry["chunks"]]
+        assert offsets == sorted(offsets)
+
+
+def test_replay_reproduces_the_session(recording):
+    """Test that fresh clients against the replay server see the recorded session."""
+    path, results = recording
+    archive = SessionArchive.load(path)
+    with ReplayServer(archive, speed=0) as replay:
+        urls = replay.urls()
+        asr, llm, tts = _clients(urls["deepgram"], urls["openai"], urls["murf"] + "/v1")
+        replayed = _run(asr, llm, tts, archive.inputs)
+        stats = replay.stats()
+    assert replayed == results
+    assert stats["served"] == {
+        "listen": 2,
+        "chat/completions": 2,
+        "responses": 0,
+        "speech/stream": 2,
+    }
+    assert stats["mismatches"] == 0
+    assert stats["missing"] == 0
+
+
+def test_replay_counts_changed_requests(recording):
+    """Test that a request the recording did not make is answered and flagged."""
+    path, _ = recording
+    archive = SessionArchive.load(path)
+    with ReplayServer(archive, speed=0) as replay:
+        urls = replay.urls()
+        llm = LLMClient(base_url=urls["openai"])
+        assert llm.chat([{"role": "user", "content": "Something else"}])
+        assert llm.chat([{"role": "user", "content": "And more"}])
+        assert llm.chat([{"role": "user", "content": "Nothing left"}]) is None
+        stats = replay.stats()
+    assert stats["mismatches"] == 2
+    assert stats["missing"] >= 1
+
+
+def test_replay_paces_chunks_at_recorded_offsets():
+    """Test that stream chunks keep their recorded timing, scaled by speed."""
+    archive = SessionArchive()
+    for _ in range(2):
+        archive.murf.append(
+            {"turn": 1, "text": "hi", "chunks": [[0.0, 4], [0.3, 4]], "audio": b"\x01\x00" * 4}
+        )
+    with ReplayServer(archive, speed=1.0) as replay:
+        tts = MurfTTSClient(base_url=replay.urls()["murf"])
+        start = time.perf_counter()
+        assert b"".join(tts.stream_tts("hi")) == b"\x01\x00" * 4
+        assert time.perf_counter() - start >= 0.3
+        replay.speed = 3.0
+        start = time.perf_counter()
+        assert b"".join(tts.stream_tts("hi")) == b"\x01\x00" * 4
+        assert time.perf_counter() - start < 0.25
+
+
+def test_archive_source_replays_inputs_in_order():
+    """Test the non-interactive source over an archive's inputs."""
+    archive = SessionArchive({"sample_rate": 16000})
+    archive.inputs = [_wav(0.1), _wav(0.2)]
+    source = ArchiveSource(archive)
+    assert not source.interactive
+    assert source.record() == archive.inputs[0]
+    assert not source.exhausted
+    assert source.record() == archive.inputs[1]
+    assert source.exhausted
+    assert source.record() is None
+
+
+def test_load_rejects_other_files(tmp_path):
+    """Test that a non-archive raises ValueError."""
+    path = tmp_path / "x.zip"
+    path.write_bytes(b"not a zip")
+    with pytest.raises(ValueError):
+        SessionArchive.load(str(path))
+
+
+def test_cli_replays_and_rerecords(recording, tmp_path):
+    """Test --replay through the real CLI pipeline, re-recording what it sees."""
+    from app import cli_runner
+
+    path, results = recording
+    again = str(tmp_path / "again.zip")
+    cli_runner.main(["--replay", path, "--replay-speed", "0", "--sink", "null", "--record", again])
+    archive = SessionArchive.load(again)
+    assert archive.summary()["turns"] == 2
+    assert [m["text"] for m in archive.murf] == [reply for _, reply, _ in results]
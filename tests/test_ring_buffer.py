@@ -0,0 +1,60 @@
+"""Tests for the capture ring buffer."""
+import threading
+
+import pytest
+
+from app.utils.ring_buffer import FrameRingBuffer
+
+
+def test_readers_consume_independently():
+    """Test that each reader sees every frame at its own pace."""
+    ring = FrameRingBuffer(frame_bytes=4, capacity=8)
+    vad, wav = ring.reader(), ring.reader()
+    for i in range(3):
+        ring.write(bytes([i]) * 4)
+
+    assert vad.read(timeout=0) == b"\x00" * 4
+    assert [wav.read(timeout=0) for _ in range(3)] == [bytes([i]) * 4 for i in range(3)]
+    assert vad.pending == 2
+    assert wav.read(timeout=0) is None
+
+
+def test_overrun_counts_dropped_frames():
+    """Test that a lapped reader skips ahead and reports drops."""
+    ring = FrameRingBuffer(frame_bytes=2, capacity=4)
+    reader = ring.reader()
+    for i in range(10):
+        ring.write(bytes([i, i]))
+
+    frames = []
+    while True:
+        frame = reader.read(timeout=0)
+        if frame is None:
+            break
+        frames.append(frame[0])
+
+    assert frames == [7, 8, 9]
+    assert reader.stats()["dropped_frames"] == 7
+
+
+def test_blocking_read_and_latency():
+    """Test that read waits for the producer and measures latency."""
+    ring = FrameRingBuffer(frame_bytes=2, capacity=4)
+    reader = ring.reader()
+    threading.Timer(0.05, ring.write, args=(b"ab",)).start()
+
+    assert reader.read(timeout=1) == b"ab"
+    assert reader.stats()["latency_ms_max"] >= 0
+
+
+def test_reader_from_start_and_short_frames():
+    """Test replay of retained frames and partial frames."""
+    ring = FrameRingBuffer(frame_bytes=4, capacity=4)
+    ring.write(b"ab")
+    ring.write(b"cdef")
+    assert [ring.reader(from_start=True).read(timeout=0)] == [b"ab"]
+
+
+def test_invalid_ring():
+    with pytest.raises(ValueError):
+        FrameRingBuffer(0, 4)
@@ -0,0 +1,150 @@
+"""Tests for the prefork server and its session workers."""
+
+import http.client
+import json
+import threading
+from typing import List, Optional
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.server import PreforkServer, SessionWorker, session_id_from_path
+from app.utils import pcm
+
+
+class EchoLLM:
+    """LLM stand-in that answers with the number of messages it was sent."""
+
+    state_mode = "full"
+
+    def chat(self, messages: List[dict]) -> Optional[str]:
+        return f"{messages[-1]['content']} ({len(messages)} messages)"
+
+
+class FakeASR:
+    gate = None
+
+    def transcribe_wav(self, wav: bytes) -> Optional[str]:
+        return "hello" if wav else None
+
+
+class FakeTTS:
+    def stream_tts(self, text: str):
+        return [b"\x01\x00" * 10, b"\x02\x00" * 10]
+
+
+def fake_worker(index: int) -> SessionWorker:
+    return SessionWorker(index, FakeASR(), FakeTTS(), EchoLLM())
+
+
+def _request(address, method: str, path: str, body: bytes = b""):
+    conn = http.client.HTTPConnection(*address, timeout=10)
+    try:
+        conn.request(method, path, body=body)
+        resp = conn.getresponse()
+        return resp.status, dict(resp.getheaders()), resp.read()
+    finally:
+        conn.close()
+
+
+def test_session_id_from_path():
+    """Test session ID extraction from request paths."""
+    assert session_id_from_path("/sessions/abc/turn") == "abc"
+    assert session_id_from_path("/sessions/a%20b/reply?x=1") == "a b"
+    assert session_id_from_path("/health") is None
+    assert session_id_from_path("/sessions/") is None
+
+
+def test_worker_keeps_history_per_session():
+    """Test that sessions on one worker share clients but not conversations."""
+    llm = EchoLLM()
+    worker = SessionWorker(0, FakeASR(), FakeTTS(), llm)
+    assert worker.reply("a", "hi") == "hi (2 messages)"
+    assert worker.reply("a", "again") == "again (4 messages)"
+    assert worker.reply("b", "hi") == "hi (2 messages)"
+    assert worker.agent("a").llm is worker.agent("b").llm is llm
+    assert worker.stats()["sessions"] == 2
+
+
+def test_worker_evicts_least_recently_used_session():
+    """Test that resident sessions are bounded."""
+    worker = SessionWorker(0, FakeASR(), FakeTTS(), EchoLLM(), max_sessions=2)
+    for sid in ("a", "b", "c"):
+        worker.reply(sid, "hi")
+    assert worker.stats()["sessions"] == 2
+    assert worker.stats()["evictions"] == 1
+    assert worker.reply("a", "hi") == "hi (2 messages)"
+
+
+def test_worker_turn_runs_asr_llm_tts():
+    """Test one spoken turn through the worker."""
+    tts = MagicMock()
+    tts.stream_tts.return_value = [b"ab", b"cd"]
+    worker = SessionWorker(0, FakeASR(), tts, EchoLLM())
+    assert worker.turn("s", b"wav") == ("hello", "hello (2 messages)", b"abcd")
+    assert worker.turn("s", b"") == (None, None, b"")
+
+
+@pytest.fixture(scope="module")
+def server():
+    with PreforkServer("127.0.0.1", 0, workers=2, factory=fake_worker) as srv:
+        thread = threading.Thread(target=srv.serve_forever, daemon=True)
+        thread.start()
+        yield srv
+
+
+def test_sessions_are_pinned_to_their_worker(server):
+    """Test that every request of a session reaches the same worker process."""
+    for sid in ("alice", "bob", "carol", "dave"):
+        for turn in range(3):
+            body = json.dumps({"text": "hi"}).encode()
+            status, _, body = _request(server.address, "POST", f"/sessions/{sid}/reply", body)
+            assert status == 200
+            assert json.loads(body)["reply"] == f"hi ({2 * turn + 2} messages)"
+    assert sum(server.stats()["routed"]) == 12
+
+
+def test_turn_returns_wav_with_transcript_headers(server):
+    """Test the spoken-turn endpoint end to end through the dispatcher."""
+    status, headers, body = _request(server.address, "POST", "/sessions/wav/turn", b"RIFF")
+    assert status == 200
+    assert headers["Content-Type"] == "audio/wav"
+    assert headers["X-Transcript"] == "hello"
+    assert body[:4] == b"RIFF"
+    assert pcm.to_wav(b"\x01\x00" * 10 + b"\x02\x00" * 10, 16000) == body
+
+
+def test_misrouted_keep_alive_request_is_refused(server):
+    """Test that a connection reused for another worker's session gets 421."""
+    owner = server.router.route("x0")
+    other = next(f"x{i}" for i in range(1, 100) if server.router.route(f"x{i}") != owner)
+    conn = http.client.HTTPConnection(*server.address, timeout=10)
+    try:
+        conn.request("POST", "/sessions/x0/reply", body=b'{"text": "hi"}')
+        first = conn.getresponse()
+        first.read()
+        assert first.status == 200
+        conn.request("POST", f"/sessions/{other}/reply", body=b'{"text": "hi"}')
+        resp = conn.getresponse()
+        resp.read()
+        assert resp.status == 421
+    finally:
+        conn.close()
+
+
+def test_health_reports_worker(server):
+    """Test that session-less requests are answered by some worker."""
+    status, _, body = _request(server.address, "GET", "/health")
+    assert status == 200
+    assert json.loads(body)["worker"] in (0, 1)
+
+
+def test_worker_stats_export_admission_queues():
+    """Test that provider admission stats are reported, so shedding shows in /health."""
+    from app.admission import AdmissionController
+
+    asr = FakeASR()
+    asr.admission = AdmissionController("deepgram", requests_per_minute=60)
+    stats = SessionWorker(0, asr, FakeTTS(), EchoLLM()).stats()
+    assert set(stats["admission"]) == {"deepgram"}
+    assert stats["admission"]["deepgram"]["rejected"] == 0
@@ -0,0 +1,43 @@
+"""Tests for consistent-hash session routing."""
+
+from collections import Counter
+
+import pytest
+
+from app.session_router import ConsistentHashRouter
+
+
+def test_route_is_stable_across_router_instances():
+    """Test that separate processes building the same ring agree on every key."""
+    a = ConsistentHashRouter(range(4))
+    b = ConsistentHashRouter(range(4))
+    keys = [f"session-{i}" for i in range(500)]
+    assert [a.route(k) for k in keys] == [b.route(k) for k in keys]
+
+
+def test_keys_spread_over_all_nodes():
+    """Test that no worker is starved or overloaded."""
+    router = ConsistentHashRouter(range(4))
+    counts = Counter(router.route(f"session-{i}") for i in range(4000))
+    assert set(counts) == {0, 1, 2, 3}
+    assert min(counts.values()) > 600
+
+
+def test_removing_a_node_only_moves_its_keys():
+    """Test that sessions on surviving workers stay where they are."""
+    router = ConsistentHashRouter(range(4))
+    keys = [f"session-{i}" for i in range(1000)]
+    before = {k: router.route(k) for k in keys}
+    router.remove(2)
+    assert router.nodes == [0, 1, 3]
+    for key, node in before.items():
+        if node != 2:
+            assert router.route(key) == node
+        else:
+            assert router.route(key) != 2
+
+
+def test_empty_ring_raises():
+    """Test that routing with no nodes fails loudly."""
+    with pytest.raises(LookupError):
+        ConsistentHashRouter().route("session")
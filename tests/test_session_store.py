@@ -0,0 +1,107 @@
+"""Tests for persistent session storage."""
+from unittest.mock import patch
+
+from app.session_store import SQLiteSessionStore, SessionCache
+from app.turn_store import Role
+
+
+def test_sqlite_store_roundtrip(tmp_path):
+    """Test that turns survive reopening the store."""
+    path = str(tmp_path / "sessions.db")
+    store = SQLiteSessionStore(path)
+    store.append("a", [(Role.USER, "Hi"), (Role.ASSISTANT, "Hello!")])
+    store.append("b", [(Role.USER, "Other session")])
+    store.close()
+
+    store = SQLiteSessionStore(path)
+    assert store.load("a") == [(Role.USER, "Hi"), (Role.ASSISTANT, "Hello!")]
+    assert store.load("a", limit=1) == [(Role.ASSISTANT, "Hello!")]
+    assert store.size_bytes() > 0
+
+    store.delete("a")
+    assert store.load("a") == []
+    assert len(store.load("b")) == 1
+
+
+def test_session_cache_spill_and_resume():
+    """Test that idle sessions are spilled and reloaded on access."""
+    cache = SessionCache(SQLiteSessionStore(":memory:"), "sys")
+    cache.append("s1", [(Role.USER, "Hi"), (Role.ASSISTANT, "Hello!")])
+    assert "s1" in cache
+
+    assert cache.spill_idle(max_idle=0) == 1
+    assert "s1" not in cache
+
+    turns = cache.get("s1")
+    assert [m["content"] for m in turns.messages()] == ["sys", "Hi", "Hello!"]
+
+
+def test_append_to_spilled_session_applies_turns_once():
+    """Test appending to a session that is not resident, e.g. after a spill or restart."""
+    store = SQLiteSessionStore(":memory:")
+    cache = SessionCache(store, "sys")
+    cache.append("s1", [(Role.USER, "Hi"), (Role.ASSISTANT, "Hello!")])
+    cache.spill_idle(max_idle=0)
+
+    cache.append("s1", [(Role.USER, "Again")])
+    assert [m["content"] for m in cache.get("s1").messages()] == ["sys", "Hi", "Hello!", "Again"]
+
+    cache = SessionCache(store, "sys")
+    cache.append("s2", [(Role.USER, "Hi"), (Role.ASSISTANT, "Hello!")])
+    assert [m["content"] for m in cache.get("s2").messages()] == ["sys", "Hi", "Hello!"]
+    assert len(store.load("s1")) == 3
+
+
+def test_resident_session_bound_holds_on_append():
+    """Test that a resident session keeps at most max_turns as turns are appended."""
+    cache = SessionCache(SQLiteSessionStore(":memory:"), "sys", max_turns=3)
+    for i in range(3):
+        cache.append("s1", [(Role.USER, f"q{i}"), (Role.ASSISTANT, f"a{i}")])
+
+    assert [m["content"] for m in cache.get("s1").messages()] == ["sys", "a1", "q2", "a2"]
+    cache.spill_idle(max_idle=0)
+    assert [m["content"] for m in cache.get("s1").messages()] == ["sys", "a1", "q2", "a2"]
+
+
+def test_resume_does_not_block_resident_lookups():
+    """Test that loading a spilled session from the store runs outside the cache lock."""
+    import threading
+
+    store = SQLiteSessionStore(":memory:")
+    cache = SessionCache(store, "sys")
+    cache.append("hot", [(Role.USER, "Hi")])
+    store.append("cold", [(Role.USER, "Earlier")])
+
+    loading, release = threading.Event(), threading.Event()
+    load = store.load
+
+    def slow_load(session_id, limit=None):
+        loading.set()
+        release.wait(5)
+        return load(session_id, limit=limit)
+
+    with patch.object(store, "load", side_effect=slow_load):
+        resume = threading.Thread(target=cache.get, args=("cold",))
+        resume.start()
+        assert loading.wait(5)
+        assert len(cache.get("hot")) == 2
+        release.set()
+        resume.join()
+    assert [m["content"] for m in cache.get("cold").messages()] == ["sys", "Earlier"]
+
+
+def test_agent_persists_and_resumes():
+    """Test that VoiceAgent writes turns through and resumes them."""
+    from app.agent import VoiceAgent
+
+    store = SQLiteSessionStore(":memory:")
+    with patch("app.agent.LLMClient") as mock_llm:
+        mock_llm.return_value.chat.return_value = "Response"
+        agent = VoiceAgent(store=store, session_id="s1")
+        agent.reply("Hello")
+
+        resumed = VoiceAgent(store=store, session_id="s1")
+        assert resumed.history == agent.history
+
+        resumed.reset_conversation()
+        assert store.load("s1") == []
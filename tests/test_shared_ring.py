@@ -0,0 +1,92 @@
+"""Tests for the shared-memory frame ring and the audio device process."""
+import threading
+import time
+
+import pytest
+
+from app.audio_process import AudioProcess
+from app.utils.shared_ring import SharedFrameRing
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create(frame_bytes=4, capacity=4)
+    yield ring
+    ring.close()
+
+
+def test_attached_reader_sees_frames(ring):
+    """Test that a second mapping of the block reads what the owner wrote."""
+    other = SharedFrameRing.attach(ring.name)
+    try:
+        reader = other.reader()
+        ring.write(b"\x01\x02\x03\x04")
+        ring.write(b"\x05\x06")
+
+        assert reader.read(timeout=0) == b"\x01\x02\x03\x04"
+        assert reader.read(timeout=0) == b"\x05\x06"
+        assert reader.read(timeout=0) is None
+    finally:
+        other.close()
+
+
+def test_lapped_reader_counts_drops(ring):
+    """Test that a reader a full ring behind skips ahead and reports drops."""
+    reader = ring.reader()
+    for i in range(10):
+        ring.write(bytes([i]) * 4)
+
+    frames = []
+    while (frame := reader.read(timeout=0)) is not None:
+        frames.append(frame[0])
+
+    assert frames == [6, 7, 8, 9]
+    assert reader.stats()["dropped_frames"] == 6
+
+
+def test_blocking_write_waits_for_commit(ring):
+    """Test that a lossless writer waits until the reader commits its position."""
+    reader = ring.reader()
+    for i in range(4):
+        assert ring.write(bytes([i]) * 4, block=True, timeout=0.1)
+    assert not ring.write(b"\xff" * 4, block=True, timeout=0.05)
+
+    def drain():
+        time.sleep(0.05)
+        reader.read(timeout=0)
+        reader.commit()
+
+    threading.Thread(target=drain).start()
+    assert ring.write(b"\x04" * 4, block=True, timeout=1)
+    assert [reader.read(timeout=0)[0] for _ in range(4)] == [1, 2, 3, 4]
+
+
+def test_closed_ring_ends_readers(ring):
+    """Test that readers stop waiting once the ring is closed and drained."""
+    reader = ring.reader()
+    ring.write(b"\x01" * 4)
+    ring.mark_closed()
+
+    assert reader.read() == b"\x01" * 4
+    assert reader.read() is None
+
+
+def test_audio_process_round_trip():
+    """Test capture and playback through a child process with a synthetic device."""
+    with AudioProcess(sample_rate=16000, frames_per_buffer=160, source="synthetic") as proc:
+        reader = proc.reader()
+        frames = [reader.read(timeout=2) for _ in range(5)]
+        assert all(frame == bytes(320) for frame in frames)
+
+        assert proc.play([b"\x01" * 10001, b"\x02" * 9999])
+        stats = proc.stats()
+
+    assert stats["frames_captured"] >= 5
+    # 10000 + 10000 bytes in 4800-byte frames; the odd byte carries over
+    assert stats["frames_played"] == 6
+
+
+def test_audio_process_rejects_unknown_source():
+    """Test that an unknown source is rejected before spawning anything."""
+    with pytest.raises(ValueError):
+        AudioProcess(source="loopback")
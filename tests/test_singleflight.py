@@ -0,0 +1,116 @@
+"""Tests for in-flight request coalescing."""
+import threading
+import time
+
+import pytest
+
+from app.singleflight import SingleFlight, StreamCoalescer
+
+
+def run_concurrently(n, fn):
+    """Start n threads calling fn() behind a barrier and return their results."""
+    barrier = threading.Barrier(n)
+    results = [None] * n
+
+    def worker(i):
+        barrier.wait()
+        results[i] = fn()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    return results
+
+
+def test_singleflight_shares_one_call():
+    """Test that concurrent identical calls run the function once."""
+    flights = SingleFlight()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.1)
+        return "answer"
+
+    results = run_concurrently(5, lambda: flights.do("k", slow))
+
+    assert results == ["answer"] * 5
+    assert len(calls) == 1
+    assert flights.stats() == {"requests": 5, "upstream_calls": 1, "deduplicated": 4}
+
+
+def test_singleflight_propagates_errors_and_forgets_key():
+    """Test that waiters see the leader's exception and the key is retried later."""
+    flights = SingleFlight()
+
+    def boom():
+        raise ValueError("nope")
+
+    with pytest.raises(ValueError):
+        flights.do("k", boom)
+    assert flights.do("k", lambda: 42) == 42
+
+
+def test_stream_coalescer_fans_out_chunks():
+    """Test that concurrent streams share one upstream and all see every chunk."""
+    coalescer = StreamCoalescer()
+    opened = []
+
+    def upstream():
+        for i in range(5):
+            time.sleep(0.01)
+            yield bytes([i])
+
+    def open_fn():
+        opened.append(1)
+        time.sleep(0.05)
+        return upstream()
+
+    results = run_concurrently(4, lambda: list(coalescer.stream("text", open_fn)))
+
+    assert len(opened) == 1
+    assert all(r == [bytes([i]) for i in range(5)] for r in results)
+    assert coalescer.stats()["deduplicated"] == 3
+
+
+def test_stream_coalescer_drops_consumed_chunks():
+    """Test that chunks are released once every subscriber has read them."""
+    coalescer = StreamCoalescer()
+    stream = coalescer.stream("k", lambda: iter([b"a", b"b", b"c"]))
+    assert next(stream) == b"a"
+    flight = next(iter(coalescer._flights.values()))
+    assert next(stream) == b"b"
+    assert flight.base == 2 and flight.chunks == []
+
+    # Chunk 0 is gone, so a new identical request opens its own upstream
+    late = coalescer.stream("k", lambda: iter([b"x"]))
+    assert list(late) == [b"x"]
+    assert list(stream) == [b"c"]
+    assert coalescer.stats()["upstream_calls"] == 2
+
+
+def test_stream_coalescer_releases_unread_subscription():
+    """Test that a subscriber dropped before its first read does not pin the buffer."""
+    coalescer = StreamCoalescer()
+    stream = coalescer.stream("k", lambda: iter([b"a", b"b", b"c"]))
+    unread = coalescer.stream("k", lambda: iter([b"x"]))
+    flight = next(iter(coalescer._flights.values()))
+    assert len(flight.cursors) == 2
+
+    del unread
+    assert len(flight.cursors) == 1
+    assert next(stream) == b"a" and next(stream) == b"b"
+    assert flight.base == 2 and flight.chunks == []
+
+    closed = coalescer.stream("k2", lambda: iter([b"y"]))
+    closed.close()
+    assert "k2" not in coalescer._flights
+
+
+def test_stream_coalescer_open_failure():
+    """Test that a failed open returns None."""
+    coalescer = StreamCoalescer()
+    assert coalescer.stream("k", lambda: None) is None
+    assert coalescer._flights == {}
@@ -0,0 +1,64 @@
+"""Tests for the pre-ASR speech gate."""
+import io
+import wave
+
+from app.dsp import ProcessPoolDSPExecutor
+from app.speech_gate import SpeechGate
+from app.utils.g711 import ulaw_encode
+from app.utils.pcm import read_wav, to_wav
+
+
+def tone(ms, level, rate=16000):
+    return level.to_bytes(2, "little", signed=True) * (rate * ms // 1000)
+
+
+def test_trims_surrounding_silence():
+    """Test that long silences shrink to the padding margin."""
+    gate = SpeechGate(threshold=0.01, pad_ms=100)
+    wav = to_wav(tone(2000, 0) + tone(500, 4000) + tone(2000, 0), 16000)
+
+    trimmed = gate.prepare(wav)
+
+    with wave.open(io.BytesIO(trimmed), "rb") as wf:
+        assert wf.getnframes() == 16000 * 700 // 1000
+    stats = gate.stats()
+    assert stats["bytes_saved"] == len(wav) - len(trimmed)
+    assert stats["round_trips_saved"] == 0
+
+
+def test_rejects_silent_recording():
+    """Test that a recording without speech is not uploaded."""
+    gate = SpeechGate()
+    assert gate.prepare(to_wav(tone(5000, 20), 16000)) is None
+    assert gate.stats()["round_trips_saved"] == 1
+
+
+def test_passes_through_unreadable_audio():
+    """Test that non-WAV input is left for the ASR provider to judge."""
+    gate = SpeechGate()
+    assert gate.prepare(b"not a wav") == b"not a wav"
+    assert gate.stats()["recordings"] == 0
+
+
+def test_trims_mulaw_recording_and_keeps_it_mulaw():
+    """Test that telephony recordings are gated on their decoded samples."""
+    gate = SpeechGate(threshold=0.01, pad_ms=100)
+    audio = ulaw_encode(tone(1000, 0, 8000) + tone(500, 4000, 8000) + tone(1000, 0, 8000))
+    wav = to_wav(audio, 8000, encoding="mulaw")
+
+    encoding, rate, _, data = read_wav(gate.prepare(wav))
+
+    assert (encoding, rate, len(data)) == ("mulaw", 8000, 8000 * 700 // 1000)
+    assert gate.prepare(to_wav(ulaw_encode(tone(1000, 0, 8000)), 8000, encoding="mulaw")) is None
+
+
+def test_pool_executor_matches_inline():
+    """Test that offloading the gate's DSP work to worker processes gives the same upload."""
+    speech = tone(2000, 0) + tone(500, 4000) + tone(2000, 0)
+    recordings = [to_wav(speech, 16000), to_wav(ulaw_encode(speech), 16000, encoding="mulaw")]
+    with ProcessPoolDSPExecutor(workers=1, inline_below=0) as pool:
+        offloaded = SpeechGate(pad_ms=100, executor=pool)
+        assert [offloaded.prepare(w) for w in recordings] == [
+            SpeechGate(pad_ms=100).prepare(w) for w in recordings
+        ]
+        assert pool.stats()["offloaded_jobs"] == 6
@@ -0,0 +1,97 @@
+"""Tests for pipeline trace spans."""
+import json
+
+from app.tracing import Tracer, traced, traced_stream, tracer
+
+
+def test_disabled_tracer_records_nothing():
+    """Test that a disabled tracer hands out a no-op span."""
+    t = Tracer(enabled=False)
+    with t.span("turn") as span:
+        assert span is None
+    assert len(t.spans) == 0
+
+
+def test_nested_spans_share_trace():
+    """Test parent/child linkage within one turn."""
+    t = Tracer(enabled=True)
+    with t.span("turn", turn=1) as turn:
+        with t.span("asr.transcribe_wav") as child:
+            pass
+    with t.span("turn", turn=2) as other:
+        pass
+
+    assert child.parent_id == turn.span_id
+    assert child.trace_id == turn.trace_id
+    assert other.trace_id != turn.trace_id
+    assert turn.end_ns >= child.end_ns >= child.start_ns >= turn.start_ns
+
+
+def test_chrome_and_otlp_export(tmp_path):
+    """Test both export formats are valid JSON with the expected shape."""
+    t = Tracer(enabled=True)
+    with t.span("turn", turn=1):
+        with t.span("llm.chat"):
+            pass
+
+    chrome = t.to_chrome_trace()
+    assert [e["name"] for e in chrome["traceEvents"]] == ["llm.chat", "turn"]
+    assert all(e["ph"] == "X" and "cpu_ms" in e["args"] for e in chrome["traceEvents"])
+
+    path = tmp_path / "trace.json"
+    t.write(str(path), fmt="otlp")
+    spans = json.loads(path.read_text())["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    child, parent = spans
+    assert child["parentSpanId"] == parent["spanId"]
+    assert len(parent["traceId"]) == 32
+    assert {"key": "turn", "value": {"intValue": "1"}} in parent["attributes"]
+
+
+def test_traced_decorator_uses_global_tracer():
+    """Test the decorator only records while the global tracer is enabled."""
+    @traced("work")
+    def work(x):
+        return x * 2
+
+    tracer.clear()
+    assert work(2) == 4
+    assert len(tracer.spans) == 0
+
+    tracer.enabled = True
+    try:
+        assert work(3) == 6
+    finally:
+        tracer.enabled = False
+    assert [s.name for s in tracer.spans] == ["work"]
+    tracer.clear()
+
+
+def test_traced_stream_spans_the_iteration():
+    """Test that a streaming call's span lasts until its iterator is exhausted."""
+    import time
+
+    @traced_stream("stream")
+    def stream(n):
+        if not n:
+            return None
+
+        def chunks():
+            for i in range(n):
+                time.sleep(0.02)
+                yield i
+
+        return chunks()
+
+    tracer.clear()
+    tracer.enabled = True
+    try:
+        chunks = stream(3)
+        assert len(tracer.spans) == 0
+        assert list(chunks) == [0, 1, 2]
+        assert stream(0) is None
+    finally:
+        tracer.enabled = False
+    full, empty = tracer.spans
+    assert full.duration_ms >= 60 and full.attrs["first_chunk_ms"] >= 20
+    assert empty.name == "stream" and "first_chunk_ms" not in empty.attrs
+    tracer.clear()
@@ -2,7 +2,7 @@
 
 import pytest
 from unittest.mock import Mock, patch
-from app.tts_murf import MurfTTSClient
+from app.tts_murf import MurfTTSClient, MAX_TEXT_LENGTH, split_text
 from app.utils.exceptions import TTSError
 
 
@@ -19,3 +19,72 @@ def test_murf_client_missing_key():
     with patch.dict("os.environ", {"MURF_API_KEY": ""}, clear=True):
         with pytest.raises(RuntimeError):
             MurfTTSClient()
+
+
+def test_murf_auto_region_failover():
+    """Test AUTO region mode fails over to the next region on error."""
+    with patch("app.tts_murf.MURF_REGION", "AUTO"), patch(
+        "app.tts_murf.MURF_AUTO_REGIONS", ["IN", "GLOBAL"]
+    ), patch("app.tts_murf.Murf"), patch("app.tts_murf.RegionProber.probe_all"), patch(
+        "app.tts_murf.RegionProber.start"
+    ):
+        client = MurfTTSClient()
+        client.clients["IN"].text_to_speech.stream.side_effect = ConnectionError("down")
+        client.clients["GLOBAL"] = Mock()
+        client.clients["GLOBAL"].text_to_speech.stream.return_value = iter([b"a", b"b"])
+
+        chunks = client.stream_tts("Hello")
+
+        assert list(chunks) == [b"a", b"b"]
+        stats = client.region_stats()
+        assert stats["IN"]["failures"] == 1
+        assert stats["GLOBAL"]["requests"] == 1 and stats["GLOBAL"]["samples"] == 0
+
+
+def test_split_text_on_sentences():
+    """Test sentence-aligned splitting keeps all text within the length cap."""
+    text = "First sentence here. Second one! " + "word " * 50 + "end."
+    segments = split_text(text, max_length=40)
+
+    assert segments[0] == "First sentence here. Second one!"
+    assert all(len(seg) <= 40 for seg in segments)
+    assert " ".join(segments).split() == text.split()
+
+
+def test_stream_tts_long_text_is_chunked_in_order(mock_murf_client):
+    """Test long text is synthesized as segments and stitched back in order."""
+    def fake_stream(text, **kwargs):
+        return iter([text[:5].encode(), b"|"])
+
+    mock_murf_client.return_value.text_to_speech.stream.side_effect = fake_stream
+    client = MurfTTSClient()
+    sentences = [f"S{i:02d} " + "x" * 90 + "." for i in range(20)]
+
+    chunks = list(client.stream_tts(" ".join(sentences)))
+
+    calls = mock_murf_client.return_value.text_to_speech.stream.call_args_list
+    assert len(" ".join(sentences)) > MAX_TEXT_LENGTH
+    assert len(calls) > 1
+    assert "".join(c.kwargs["text"] for c in calls).count("S") == 20
+    heads = [c for c in chunks if c != b"|"]
+    assert heads == sorted(heads)
+
+
+def test_failed_segment_stops_the_stream(mock_murf_client):
+    """Test that a failed segment ends the reply with an error instead of a silent gap."""
+    def fake_stream(text, **kwargs):
+        if "S01" in text:
+            raise ConnectionError("reset")
+        return iter([text[:3].encode()])
+
+    mock_murf_client.return_value.text_to_speech.stream.side_effect = fake_stream
+    client = MurfTTSClient()
+    pool = client._segment_pool
+    text = " ".join(f"S{i:02d} " + "x" * 390 + "." for i in range(3))
+
+    played = []
+    with pytest.raises(ConnectionError):
+        for chunk in client.stream_tts(text):
+            played.append(chunk)
+    assert played == [b"S00"]
+    assert client._segment_pool is pool
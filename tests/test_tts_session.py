@@ -0,0 +1,122 @@
+"""Tests for the persistent streaming TTS session."""
+
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from app.tts_murf import MurfTTSClient
+from app.tts_session import TTSSession, session_url
+
+
+def _session(standin):
+    base = standin.base_url.rsplit("/v1", 1)[0]
+    return TTSSession(lambda: session_url(base, "key", 16000), {"voiceId": "Matthew"})
+
+
+def test_session_url_maps_scheme_and_query():
+    """Test that HTTPS bases become wss:// stream-input URLs carrying the audio format."""
+    url = session_url("https://global.api.murf.ai", "k", 24000)
+    assert url.startswith("wss://global.api.murf.ai/v1/speech/stream-input?api-key=k")
+    assert "sample_rate=24000" in url and "format=PCM" in url
+    assert session_url("http://127.0.0.1:9/", "k", 8000).startswith("ws://127.0.0.1:9/v1/")
+
+
+def test_utterances_share_one_connection():
+    """Test that successive utterances reuse the connection, each as its own context."""
+    from benchmarks.standins import MurfStandIn
+
+    with MurfStandIn(sample_rate=16000, seconds_per_char=0.01) as standin:
+        session = _session(standin)
+        texts = ("Hello.", "A bit longer, this one.")
+        audio = [b"".join(session.stream(text)) for text in texts]
+        session.close()
+        contexts = [r["body"]["context_id"] for r in standin.requests]
+
+    assert [len(a) for a in audio] == [2 * int(len(t) * 0.01 * 16000) for t in texts]
+    assert standin.connections == 1
+    assert len(set(contexts)) == 2
+    stats = session.stats()
+    assert stats["connections"] == 1 and stats["segments"] == 2 and stats["failures"] == 0
+    assert stats["first_byte_p50_ms"] is not None
+
+
+def test_contexts_in_flight_together_are_kept_apart():
+    """Test that a second segment queued before the first is read gets only its own audio."""
+    from benchmarks.standins import MurfStandIn
+
+    with MurfStandIn(sample_rate=16000, seconds_per_char=0.5) as standin:
+        session = _session(standin)
+        long, short = session.stream("x" * 20), session.stream("y" * 4)
+        assert len(b"".join(short)) == 2 * int(4 * 0.5 * 16000)
+        assert len(b"".join(long)) == 2 * int(20 * 0.5 * 16000)
+        session.close()
+
+
+def test_abandoned_stream_is_cleared_and_session_reconnects():
+    """Test barge-in clears the context, and a closed session reconnects on next use."""
+    from benchmarks.standins import MurfStandIn
+
+    with MurfStandIn(sample_rate=16000, seconds_per_char=0.5) as standin:
+        session = _session(standin)
+        stream = session.stream("x" * 40)
+        next(stream)
+        stream.close()
+        session.close()
+        assert b"".join(session.stream("Again."))
+        session.close()
+        deadline = time.time() + 5
+        while standin.connections < 2 and time.time() < deadline:
+            time.sleep(0.01)
+
+    assert standin.connections == 2
+    assert session.stats()["connections"] == 2
+
+
+def test_stalled_context_times_out():
+    """Test that a context that receives no audio fails instead of blocking forever."""
+    from benchmarks.standins import MurfStandIn
+
+    with MurfStandIn(sample_rate=16000, latency=2.0) as standin:
+        base = standin.base_url.rsplit("/v1", 1)[0]
+        session = TTSSession(
+            lambda: session_url(base, "key", 16000), {"voiceId": "Matthew"}, read_timeout=0.2
+        )
+        start = time.monotonic()
+        with pytest.raises(ConnectionError):
+            b"".join(session.stream("Hello."))
+        assert time.monotonic() - start < 1.5
+        assert session.stats()["failures"] == 1
+        session.close()
+
+
+def test_client_falls_back_to_http_when_session_fails(mock_murf_client):
+    """Test that MurfTTSClient retries over HTTP if the session yields no audio."""
+    client = MurfTTSClient(session=True)
+
+    def broken(text):
+        raise ConnectionError("refused")
+        yield b""
+
+    client.session.stream = broken
+    assert list(client.stream_tts("Hello")) == [b"audio_chunk_1", b"audio_chunk_2"]
+
+    # Refused before any context is sent
+    client.session.stream = Mock(side_effect=ConnectionError("refused"))
+    mock_murf_client.return_value.text_to_speech.stream.return_value = iter([b"x"])
+    assert list(client.stream_tts("Hi")) == [b"x"]
+
+
+def test_client_streams_over_session_against_standin():
+    """Test end to end: MurfTTSClient in session mode synthesizes through the stand-in."""
+    from benchmarks.standins import MurfStandIn
+
+    with MurfStandIn(sample_rate=16000, seconds_per_char=0.01) as standin:
+        client = MurfTTSClient(base_url=standin.base_url.rsplit("/v1", 1)[0], session=True)
+        for text in ("One.", "Two.", "Three."):
+            assert b"".join(client.stream_tts(text))
+        client.session.close()
+
+    assert standin.connections == 1
+    assert client.session_stats()["segments"] == 3
+    assert all("/stream-input" in r["path"] for r in standin.requests)
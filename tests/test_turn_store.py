@@ -0,0 +1,60 @@
+"""Tests for the compact conversation turn store."""
+from app.turn_store import Role, Turn, TurnStore
+
+
+def test_messages_built_on_demand():
+    """Test that the store renders OpenAI-style messages."""
+    store = TurnStore("system prompt")
+    store.append(Role.USER, "Hi")
+    store.append(Role.ASSISTANT, "Hello!")
+
+    assert len(store) == 3
+    assert store.messages() == [
+        {"role": "system", "content": "system prompt"},
+        {"role": "user", "content": "Hi"},
+        {"role": "assistant", "content": "Hello!"},
+    ]
+
+
+def test_system_prompt_is_shared():
+    """Test that sessions reference the same system prompt object."""
+    prompt = "shared " * 20
+    a, b = TurnStore(prompt), TurnStore(prompt)
+    assert a.system_prompt is b.system_prompt
+
+
+def test_turn_has_no_instance_dict():
+    """Test that turns use __slots__."""
+    assert not hasattr(Turn(Role.USER, "x"), "__dict__")
+
+
+def test_cold_turns_are_compressed():
+    """Test that turns older than the hot window are compressed transparently."""
+    long_text = "the quarterly report is due on friday " * 10
+    store = TurnStore("sys", compress_after=2)
+    for _ in range(4):
+        store.append(Role.USER, long_text)
+
+    assert [t.compressed for t in store.turns] == [True, True, False, False]
+    assert all(m["content"] == long_text for m in store.messages()[1:])
+
+
+def test_compression_is_judged_on_utf8_bytes():
+    """Test that multibyte text is compressed when it saves bytes, not characters."""
+    text = "".join(chr(0x4E00 + (i * 7919) % 256) for i in range(300))
+    turn = Turn(Role.USER, text)
+    turn.compress()
+
+    assert turn.compressed and len(turn.data) < len(text.encode("utf-8"))
+    assert turn.content == text
+
+
+def test_trim_and_pop():
+    """Test trimming keeps the most recent turns."""
+    store = TurnStore("sys")
+    for i in range(5):
+        store.append(Role.USER, str(i))
+    store.trim(2)
+    assert [m["content"] for m in store.messages()] == ["sys", "3", "4"]
+    assert store.pop().content == "4"
+    assert store.last_role() == Role.USER
@@ -0,0 +1,234 @@
+"""Tests for WebSocket framing, the voice stream endpoint and the browser client."""
+
+import http.client
+import json
+import os
+import shutil
+import socket
+import subprocess
+import threading
+
+import pytest
+
+from app.server import PreforkServer
+from app.utils.exceptions import WebSocketClosed
+from app.websocket import WebSocket, accept_key, connect
+from tests.test_server import fake_worker
+
+DRIVER = os.path.join(os.path.dirname(__file__), "web", "voice_client_driver.mjs")
+
+
+def _pair():
+    a, b = socket.socketpair()
+    server = WebSocket(a.makefile("rb"), a.makefile("wb"), sock=a)
+    client = WebSocket(b.makefile("rb"), b.makefile("wb"), client=True, sock=b)
+    return server, client
+
+
+def test_accept_key_matches_rfc_example():
+    """Test the handshake hash against the example in RFC 6455."""
+    assert accept_key("dGhlIHNhbXBsZSBub25jZQ==") == "s3pPLMBiTxaQ9kYGzzhZRbK+xOo="
+
+
+def test_messages_round_trip_both_ways():
+    """Test text, binary and large (64-bit length) messages, masked and unmasked."""
+    server, client = _pair()
+    big = os.urandom(70000)
+    received = []
+
+    def read():
+        for _ in range(3):
+            received.append(server.recv())
+        server.send("pong")
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    client.send("hello")
+    client.send(b"\x00\x01\x02")
+    client.send(big)
+    assert client.recv() == "pong"
+    thread.join()
+    assert received == ["hello", b"\x00\x01\x02", big]
+
+
+def test_close_is_echoed_and_raises():
+    """Test that a close frame ends recv() on both sides."""
+    server, client = _pair()
+    client.close(1000, "bye")
+    with pytest.raises(WebSocketClosed) as e:
+        server.recv()
+    assert e.value.code == 1000
+    assert e.value.reason == "bye"
+
+
+@pytest.fixture(scope="module")
+def server():
+    with PreforkServer("127.0.0.1", 0, workers=2, factory=fake_worker) as srv:
+        thread = threading.Thread(target=srv.serve_forever, daemon=True)
+        thread.start()
+        yield srv
+
+
+def _events(ws):
+    """Read messages up to audio_end or error; return (events, audio bytes)."""
+    events, audio = [], b""
+    while True:
+        message = ws.recv()
+        if isinstance(message, bytes):
+            audio += message
+            continue
+        event = json.loads(message)
+        events.append(event)
+        if event["type"] in ("audio_end", "error"):
+            return events, audio
+
+
+def test_voice_stream_turn(server):
+    """Test a spoken turn over the WebSocket endpoint."""
+    host, port = server.address
+    with connect(f"ws://{host}:{port}/sessions/ws-a/ws") as ws:
+        ready = json.loads(ws.recv())
+        assert ready["type"] == "ready"
+        assert ready["encoding"] == "pcm16"
+        ws.send(json.dumps({"type": "start", "sample_rate": 16000}))
+        for _ in range(5):
+            ws.send(bytes(640))
+        ws.send(json.dumps({"type": "end"}))
+        events, audio = _events(ws)
+        assert [e["type"] for e in events] == ["transcript", "reply", "audio_start", "audio_end"]
+        assert events[0]["text"] == "hello"
+        assert events[1]["text"] == "hello (2 messages)"
+        assert audio == b"\x01\x00" * 10 + b"\x02\x00" * 10
+        assert set(events[-1]["timings"]) >= {"asr_ms", "llm_ms", "tts_first_chunk_ms"}
+
+        # The same connection carries the conversation on
+        ws.send(bytes(640))
+        ws.send(json.dumps({"type": "end"}))
+        events, _ = _events(ws)
+        assert events[1]["text"] == "hello (4 messages)"
+
+
+def test_voice_stream_reports_errors_and_stays_open(server):
+    """Test an empty utterance and a bad message, then a good turn."""
+    host, port = server.address
+    with connect(f"ws://{host}:{port}/sessions/ws-b/ws") as ws:
+        ws.recv()
+        ws.send(json.dumps({"type": "end"}))
+        assert json.loads(ws.recv()) == {"type": "error", "message": "no audio"}
+        ws.send(json.dumps({"type": "start", "sample_rate": 1}))
+        assert json.loads(ws.recv())["type"] == "error"
+        ws.send(bytes(320))
+        ws.send(json.dumps({"type": "end"}))
+        events, _ = _events(ws)
+        assert events[-1]["type"] == "audio_end"
+
+
+def test_voice_stream_survives_tts_failure_mid_reply():
+    """Test a reply stream failing after audio_start: an error event, then the next turn runs."""
+    from app.server import SessionWorker
+    from app.voice_stream import VoiceStream
+    from tests.test_server import EchoLLM, FakeASR
+
+    class FlakyTTS:
+        calls = 0
+
+        def stream_tts(self, text):
+            FlakyTTS.calls += 1
+            yield b"\x01\x00" * 10
+            if FlakyTTS.calls == 1:
+                raise ConnectionError("TTS segment 2 of 2 failed")
+            yield b"\x02\x00" * 10
+
+    server_ws, ws = _pair()
+    worker = SessionWorker(0, FakeASR(), FlakyTTS(), EchoLLM())
+    thread = threading.Thread(target=VoiceStream(worker, "flaky", server_ws).run, daemon=True)
+    thread.start()
+
+    ws.recv()
+    for _ in range(2):
+        ws.send(bytes(640))
+        ws.send(json.dumps({"type": "end"}))
+    events, audio = _events(ws)
+    assert [e["type"] for e in events] == ["transcript", "reply", "audio_start", "error"]
+    assert events[-1]["message"] == "speech synthesis failed" and "asr_ms" in events[-1]["timings"]
+    assert audio == b"\x01\x00" * 10
+
+    events, audio = _events(ws)
+    assert events[-1]["type"] == "audio_end" and len(audio) == 40
+    ws.close()
+    thread.join(5)
+
+
+def test_plain_get_on_websocket_route_is_refused(server):
+    """Test that the route insists on an upgrade."""
+    conn = http.client.HTTPConnection(*server.address, timeout=10)
+    try:
+        conn.request("GET", "/sessions/x/ws")
+        assert conn.getresponse().status == 400
+    finally:
+        conn.close()
+
+
+def test_web_client_files_are_served(server):
+    """Test the static routes for the browser client, and that nothing else leaks."""
+    for name, ctype in (("voice.html", "text/html"), ("voice-worklet.mjs", "text/javascript")):
+        conn = http.client.HTTPConnection(*server.address, timeout=10)
+        conn.request("GET", f"/web/{name}")
+        resp = conn.getresponse()
+        assert resp.status == 200
+        assert resp.getheader("Content-Type").startswith(ctype)
+        resp.read()
+        conn.close()
+    for path in ("/web/../app/config.py", "/web/missing.js", "/web/"):
+        conn = http.client.HTTPConnection(*server.address, timeout=10)
+        conn.request("GET", path)
+        assert conn.getresponse().status == 404
+        conn.close()
+
+
+def _node_with_websocket():
+    node = shutil.which("node")
+    if node is None:
+        return None
+    for flags in ([], ["--experimental-websocket"]):
+        probe = subprocess.run(
+            [node, *flags, "-e", "process.exit(typeof WebSocket === 'function' ? 0 : 1)"],
+            capture_output=True,
+        )
+        if probe.returncode == 0:
+            return [node, *flags]
+    return None
+
+
+def test_headless_browser_client_against_standins(monkeypatch):
+    """Drive web/voice-core.mjs from Node against the server backed by provider stand-ins."""
+    node = _node_with_websocket()
+    if node is None:
+        pytest.skip("Node.js with WebSocket support is not installed")
+    from benchmarks.bench_server_scaling import standin_worker
+    from benchmarks.standins import DeepgramStandIn, MurfStandIn, OpenAIStandIn
+
+    question = "What is the capital of France?"
+    with OpenAIStandIn() as oa, DeepgramStandIn(transcript=question) as dg, MurfStandIn(
+        sample_rate=16000
+    ) as mf:
+        monkeypatch.setenv("BENCH_OPENAI_URL", oa.base_url)
+        monkeypatch.setenv("BENCH_DEEPGRAM_URL", dg.base_url)
+        monkeypatch.setenv("BENCH_MURF_URL", mf.base_url)
+        with PreforkServer("127.0.0.1", 0, workers=1, factory=standin_worker) as srv:
+            threading.Thread(target=srv.serve_forever, daemon=True).start()
+            host, port = srv.address
+            url = f"ws://{host}:{port}/sessions/browser/ws"
+            done = subprocess.run(
+                [*node, DRIVER, url, "2"], capture_output=True, text=True, timeout=60
+            )
+    assert done.returncode == 0, done.stderr
+    result = json.loads(done.stdout)
+    assert len(result["turns"]) == 2
+    for turn in result["turns"]:
+        assert turn["error"] is None
+        assert turn["transcript"] == question
+        assert turn["reply"] == f"You said: {question}"
+        assert turn["audio_bytes"] > 0
+        assert 0 < turn["first_byte_ms"] <= turn["ttfa_ms"] < 10000
+    assert result["ttfa_median_ms"] > 0
@@ -0,0 +1,130 @@
+// Headless driver for the browser voice client (web/voice-core.mjs).
+//
+// Stands in for the browser's audio hardware: a synthetic microphone is
+// resampled and framed exactly as the capture worklet does and streamed in
+// real time, and a playback clock pulls 128-sample render quanta from the
+// JitterBuffer at the output rate, as the playback worklet does. Prints one
+// JSON object with per-turn transcript, reply, time-to-first-audio and
+// jitter-buffer stats.
+//
+// Run (Node 20 needs the WebSocket flag):
+//   node --experimental-websocket tests/web/voice_client_driver.mjs ws://HOST/sessions/ID/ws [TURNS]
+
+import {
+  FRAME_MS,
+  Framer,
+  INPUT_RATE,
+  JitterBuffer,
+  Resampler,
+  VoiceClient,
+  floatToInt16,
+  int16ToFloat,
+  median,
+} from '../../web/voice-core.mjs';
+
+const OUTPUT_RATE = 48000; // a typical AudioContext rate
+const QUANTUM = 128; // Web Audio render quantum
+const UTTERANCE_SECONDS = 0.4;
+const TURN_TIMEOUT_MS = 15000;
+
+const sleep = (ms) => new Promise((r) => setTimeout(r, ms));
+
+function microphone(seconds) {
+  const samples = new Float32Array(Math.round(OUTPUT_RATE * seconds));
+  for (let i = 0; i < samples.length; i++) samples[i] = 0.3 * Math.sin((2 * Math.PI * 220 * i) / OUTPUT_RATE);
+  return samples;
+}
+
+async function main() {
+  const [url, turnsArg] = process.argv.slice(2);
+  const turns = Number(turnsArg || 2);
+  const client = new VoiceClient(url, { inputRate: INPUT_RATE });
+  const buffer = new JitterBuffer({ sampleRate: OUTPUT_RATE });
+  let resampler = null;
+  let rate = null;
+  let current = null;
+  const events = [];
+
+  client.onAudio = (pcm, outputRate) => {
+    if (outputRate !== rate) {
+      rate = outputRate;
+      resampler = new Resampler(outputRate, OUTPUT_RATE);
+    }
+    buffer.push(resampler.process(int16ToFloat(pcm)));
+    if (current) current.bytes += pcm.byteLength;
+  };
+  client.onEvent = (msg) => {
+    events.push(msg.type);
+    if (!current) return;
+    if (msg.type === 'transcript') current.transcript = msg.text;
+    if (msg.type === 'reply') current.reply = msg.text;
+    if (msg.type === 'error') current.error = msg.message;
+    if (msg.type === 'audio_end') {
+      current.timings = msg.timings;
+      buffer.end();
+    }
+  };
+  const ready = await client.connect();
+
+  // Playback clock: pull due render quanta every couple of milliseconds
+  const out = new Float32Array(QUANTUM);
+  const clockStart = performance.now();
+  let pulled = 0;
+  const clock = setInterval(() => {
+    const due = Math.floor(((performance.now() - clockStart) * OUTPUT_RATE) / 1000 / QUANTUM);
+    for (; pulled < due; pulled++) {
+      const played = buffer.pull(out);
+      if (played && current && current.firstAudioAt === null) current.firstAudioAt = performance.now();
+    }
+  }, 2);
+
+  const results = [];
+  const mic = microphone(UTTERANCE_SECONDS);
+  for (let t = 0; t < turns; t++) {
+    buffer.reset();
+    current = { transcript: null, reply: null, bytes: 0, firstAudioAt: null, timings: null, error: null };
+    const capture = new Resampler(OUTPUT_RATE, INPUT_RATE);
+    const framer = new Framer((INPUT_RATE * FRAME_MS) / 1000);
+    const hop = (OUTPUT_RATE * FRAME_MS) / 1000;
+    for (let i = 0; i < mic.length; i += hop) {
+      framer.push(floatToInt16(capture.process(mic.subarray(i, i + hop))), (f) => client.sendAudio(f));
+      await sleep(FRAME_MS); // the microphone delivers audio in real time
+    }
+    framer.flush((f) => client.sendAudio(f));
+    client.endUtterance();
+
+    const deadline = performance.now() + TURN_TIMEOUT_MS;
+    // The next turn starts once this reply is audible, as a user talking over it would
+    while (!(current.error || (current.timings && current.firstAudioAt))) {
+      if (performance.now() > deadline) throw new Error(`turn ${t + 1} timed out (${events.join(',')})`);
+      await sleep(5);
+    }
+    const turn = client.turn;
+    results.push({
+      transcript: current.transcript,
+      reply: current.reply,
+      error: current.error,
+      audio_bytes: current.bytes,
+      first_byte_ms: turn.firstByteAt === null ? null : turn.firstByteAt - turn.endedAt,
+      ttfa_ms: current.firstAudioAt === null ? null : current.firstAudioAt - turn.endedAt,
+      server_timings: current.timings,
+    });
+  }
+  clearInterval(clock);
+  client.close();
+
+  const ttfas = results.map((r) => r.ttfa_ms).filter((v) => v !== null);
+  console.log(
+    JSON.stringify({
+      ready,
+      turns: results,
+      ttfa_median_ms: median(ttfas),
+      jitter: buffer.stats(),
+    }),
+  );
+}
+
+main().catch((err) => {
+  console.error(err.stack || String(err));
+  process.exit(1);
+});
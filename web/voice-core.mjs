@@ -0,0 +1,232 @@
+// Shared logic of the browser voice client: PCM conversion, resampling, the
+// playback jitter buffer and the WebSocket protocol (see app/voice_stream.py).
+// Nothing here touches the DOM or Web Audio, so the AudioWorklet, the page
+// and the headless test driver (tests/web/voice_client_driver.mjs) all use it.
+
+export const INPUT_RATE = 16000;
+export const FRAME_MS = 20;
+
+export function floatToInt16(samples) {
+  const out = new Int16Array(samples.length);
+  for (let i = 0; i < samples.length; i++) {
+    const s = Math.max(-1, Math.min(1, samples[i]));
+    out[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+  }
+  return out;
+}
+
+export function int16ToFloat(samples) {
+  const out = new Float32Array(samples.length);
+  for (let i = 0; i < samples.length; i++) out[i] = samples[i] / 0x8000;
+  return out;
+}
+
+// Streaming linear-interpolation resampler; state carries across chunks so
+// chunk boundaries do not click.
+export class Resampler {
+  constructor(fromRate, toRate) {
+    this.step = fromRate / toRate;
+    this.pos = 0; // position of the next output sample, relative to `last`
+    this.last = 0; // final input sample of the previous chunk (index -1)
+  }
+
+  process(input) {
+    if (this.step === 1) return Float32Array.from(input);
+    const out = [];
+    let pos = this.pos;
+    while (pos < input.length - 1) {
+      const i = Math.floor(pos);
+      const frac = pos - i;
+      const a = i < 0 ? this.last : input[i];
+      const b = input[i + 1];
+      out.push(a + (b - a) * frac);
+      pos += this.step;
+    }
+    if (input.length) {
+      this.last = input[input.length - 1];
+      this.pos = pos - input.length;
+    }
+    return Float32Array.from(out);
+  }
+}
+
+// Collects fixed-size frames (e.g. 20 ms) out of arbitrarily sized chunks.
+export class Framer {
+  constructor(frameSamples) {
+    this.frame = new Int16Array(frameSamples);
+    this.filled = 0;
+  }
+
+  push(samples, emit) {
+    for (let i = 0; i < samples.length; i++) {
+      this.frame[this.filled++] = samples[i];
+      if (this.filled === this.frame.length) {
+        emit(this.frame.slice());
+        this.filled = 0;
+      }
+    }
+  }
+
+  flush(emit) {
+    if (this.filled) emit(this.frame.slice(0, this.filled));
+    this.filled = 0;
+  }
+}
+
+// Playback jitter buffer. Audio starts once `target` samples are queued (or
+// the stream has ended); an underrun plays silence, counts, and raises the
+// target one step up to `max`, so a jittery network settles on a deeper
+// buffer while a clean one keeps the smallest.
+export class JitterBuffer {
+  constructor({ sampleRate, targetMs = 40, stepMs = 20, maxMs = 200 }) {
+    this.sampleRate = sampleRate;
+    this.initialTarget = Math.round((sampleRate * targetMs) / 1000);
+    this.target = this.initialTarget;
+    this.step = Math.round((sampleRate * stepMs) / 1000);
+    this.max = Math.round((sampleRate * maxMs) / 1000);
+    this.chunks = [];
+    this.offset = 0; // read position in chunks[0]
+    this.buffered = 0;
+    this.playing = false;
+    this.ended = false;
+    this.underruns = 0;
+    this.played = 0;
+  }
+
+  push(samples) {
+    if (!samples.length) return;
+    this.chunks.push(samples);
+    this.buffered += samples.length;
+    this.ended = false;
+  }
+
+  end() {
+    this.ended = true;
+  }
+
+  reset() {
+    this.chunks = [];
+    this.offset = 0;
+    this.buffered = 0;
+    this.playing = false;
+    this.ended = false;
+  }
+
+  // Fill `out` and return how many samples came from the stream (the rest is silence).
+  pull(out) {
+    if (!this.playing) {
+      if (this.buffered === 0 || (this.buffered < this.target && !this.ended)) {
+        out.fill(0);
+        return 0;
+      }
+      this.playing = true;
+    }
+    let written = 0;
+    while (written < out.length && this.chunks.length) {
+      const chunk = this.chunks[0];
+      const n = Math.min(out.length - written, chunk.length - this.offset);
+      out.set(chunk.subarray(this.offset, this.offset + n), written);
+      written += n;
+      this.offset += n;
+      if (this.offset === chunk.length) {
+        this.chunks.shift();
+        this.offset = 0;
+      }
+    }
+    this.buffered -= written;
+    this.played += written;
+    if (written < out.length) {
+      out.fill(0, written);
+      this.playing = false;
+      if (!this.ended) {
+        this.underruns++;
+        this.target = Math.min(this.max, this.target + this.step);
+      }
+    }
+    return written;
+  }
+
+  stats() {
+    return {
+      bufferedMs: (1000 * this.buffered) / this.sampleRate,
+      targetMs: (1000 * this.target) / this.sampleRate,
+      underruns: this.underruns,
+      playedMs: (1000 * this.played) / this.sampleRate,
+    };
+  }
+}
+
+const now = () => globalThis.performance.now();
+
+// WebSocket protocol client. Callbacks:
+//   onEvent(message)            every JSON event from the server
+//   onAudio(int16, sampleRate)  each binary reply chunk
+// Per turn, `turn` records when the utterance ended and when the first reply
+// byte arrived; time-to-first-audio itself is measured where audio is played.
+export class VoiceClient {
+  constructor(url, { WebSocketImpl = globalThis.WebSocket, inputRate = INPUT_RATE } = {}) {
+    this.url = url;
+    this.WebSocketImpl = WebSocketImpl;
+    this.inputRate = inputRate;
+    this.outputRate = null;
+    this.onEvent = () => {};
+    this.onAudio = () => {};
+    this.turn = null;
+    this.ws = null;
+  }
+
+  connect() {
+    return new Promise((resolve, reject) => {
+      const ws = new this.WebSocketImpl(this.url);
+      ws.binaryType = 'arraybuffer';
+      this.ws = ws;
+      ws.onerror = () => reject(new Error(`WebSocket error on ${this.url}`));
+      ws.onclose = () => this.onEvent({ type: 'closed' });
+      ws.onmessage = (e) => {
+        if (typeof e.data === 'string') {
+          const message = JSON.parse(e.data);
+          if (message.type === 'ready') {
+            this.outputRate = message.output_rate;
+            ws.send(JSON.stringify({ type: 'start', sample_rate: this.inputRate }));
+            resolve(message);
+          }
+          if (message.type === 'audio_start' && this.turn) this.outputRate = message.sample_rate;
+          if (message.type === 'audio_end' && this.turn) this.turn.endAt = now();
+          this.onEvent(message);
+        } else {
+          if (this.turn && this.turn.firstByteAt === null) this.turn.firstByteAt = now();
+          this.onAudio(new Int16Array(e.data), this.outputRate);
+        }
+      };
+    });
+  }
+
+  sendAudio(int16) {
+    if (this.ws && this.ws.readyState === 1) this.ws.send(int16.buffer);
+  }
+
+  // `endedAt` is when the user stopped speaking (default: now)
+  endUtterance(endedAt = now()) {
+    this.turn = { endedAt, firstByteAt: null, endAt: null };
+    this.ws.send(JSON.stringify({ type: 'end' }));
+  }
+
+  cancel() {
+    this.ws.send(JSON.stringify({ type: 'cancel' }));
+  }
+
+  reset() {
+    this.ws.send(JSON.stringify({ type: 'reset' }));
+  }
+
+  close() {
+    if (this.ws) this.ws.close();
+  }
+}
+
+export function median(values) {
+  if (!values.length) return null;
+  const sorted = [...values].sort((a, b) => a - b);
+  const mid = sorted.length >> 1;
+  return sorted.length % 2 ? sorted[mid] : (sorted[mid - 1] + sorted[mid]) / 2;
+}
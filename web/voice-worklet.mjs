@@ -0,0 +1,86 @@
+// AudioWorklet processors: microphone capture and reply playback, both off
+// the main thread so UI work never glitches the audio.
+
+import { FRAME_MS, Framer, JitterBuffer, Resampler, floatToInt16, int16ToFloat } from './voice-core.mjs';
+
+// Resamples the microphone to the agent's input rate and posts 20 ms frames
+// of 16-bit PCM (transferred, not copied) while recording is on.
+class CaptureProcessor extends AudioWorkletProcessor {
+  constructor(options) {
+    super();
+    const rate = options.processorOptions.inputRate;
+    this.resampler = new Resampler(sampleRate, rate);
+    this.framer = new Framer((rate * FRAME_MS) / 1000);
+    this.recording = false;
+    this.port.onmessage = (e) => {
+      if (e.data === 'start') {
+        this.resampler = new Resampler(sampleRate, rate);
+        this.recording = true;
+      } else if (e.data === 'stop') {
+        this.recording = false;
+        this.framer.flush((frame) => this.post(frame));
+        this.port.postMessage({ type: 'flushed' });
+      }
+    };
+  }
+
+  post(frame) {
+    this.port.postMessage({ type: 'frame', pcm: frame.buffer }, [frame.buffer]);
+  }
+
+  process(inputs) {
+    const channel = inputs[0] && inputs[0][0];
+    if (this.recording && channel) {
+      this.framer.push(floatToInt16(this.resampler.process(channel)), (frame) => this.post(frame));
+    }
+    return true;
+  }
+}
+
+// Plays reply chunks through a JitterBuffer. Reports the moment the first
+// sample of each reply reaches the output, and buffer stats a few times a second.
+class PlaybackProcessor extends AudioWorkletProcessor {
+  constructor(options) {
+    super();
+    this.buffer = new JitterBuffer({ sampleRate, ...(options.processorOptions || {}) });
+    this.resampler = null;
+    this.rate = null;
+    this.waitingForFirst = false;
+    this.framesSinceStats = 0;
+    this.port.onmessage = (e) => {
+      const msg = e.data;
+      if (msg.type === 'audio') {
+        if (msg.rate !== this.rate) {
+          this.rate = msg.rate;
+          this.resampler = new Resampler(msg.rate, sampleRate);
+        }
+        this.buffer.push(this.resampler.process(int16ToFloat(new Int16Array(msg.pcm))));
+      } else if (msg.type === 'turn') {
+        // A new reply is coming: drop anything left of the old one
+        this.buffer.reset();
+        this.waitingForFirst = true;
+      } else if (msg.type === 'end') {
+        this.buffer.end();
+      }
+    };
+  }
+
+  process(inputs, outputs) {
+    const out = outputs[0][0];
+    const played = this.buffer.pull(out);
+    for (let c = 1; c < outputs[0].length; c++) outputs[0][c].set(out);
+    if (played && this.waitingForFirst) {
+      this.waitingForFirst = false;
+      this.port.postMessage({ type: 'first-audio', time: currentTime });
+    }
+    this.framesSinceStats += out.length;
+    if (this.framesSinceStats >= sampleRate / 4) {
+      this.framesSinceStats = 0;
+      this.port.postMessage({ type: 'stats', stats: this.buffer.stats() });
+    }
+    return true;
+  }
+}
+
+registerProcessor('voice-capture', CaptureProcessor);
+registerProcessor('voice-playback', PlaybackProcessor);
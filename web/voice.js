@@ -0,0 +1,143 @@
+// Browser voice client: hold to talk, stream the mic to the agent over one
+// WebSocket, play the reply through the playback worklet's jitter buffer and
+// show time-to-first-audio (end of speech to the first reply sample heard).
+
+import { INPUT_RATE, VoiceClient, median } from './voice-core.mjs';
+
+const params = new URLSearchParams(location.search);
+const sessionId = params.get('session') || crypto.randomUUID();
+const wsUrl =
+  params.get('ws') ||
+  `${location.protocol === 'https:' ? 'wss' : 'ws'}://${location.host}/sessions/${sessionId}/ws`;
+
+const talkBtn = document.getElementById('talk-btn');
+const log = document.getElementById('log');
+const status = document.getElementById('voice-status');
+const show = (id, text) => (document.getElementById(id).textContent = text);
+const ms = (v) => (v === null ? '–' : `${Math.round(v)} ms`);
+
+const client = new VoiceClient(wsUrl, { inputRate: INPUT_RATE });
+const ttfas = [];
+let audio = null; // { ctx, capture, playback }
+let recording = false;
+let releasedAt = 0;
+let muted = false; // drops what is left of a reply the user talked over
+
+function addLine(text, className) {
+  const li = document.createElement('li');
+  li.textContent = text;
+  if (className) li.className = className;
+  log.appendChild(li);
+  log.scrollTop = log.scrollHeight;
+}
+
+// Web Audio needs a user gesture, so the graph is built on the first press
+async function setupAudio() {
+  const ctx = new AudioContext({ latencyHint: 'interactive' });
+  await ctx.audioWorklet.addModule('/web/voice-worklet.mjs');
+  const mic = await navigator.mediaDevices.getUserMedia({
+    audio: { channelCount: 1, echoCancellation: true, noiseSuppression: true, autoGainControl: true },
+  });
+  const capture = new AudioWorkletNode(ctx, 'voice-capture', {
+    numberOfOutputs: 0,
+    processorOptions: { inputRate: INPUT_RATE },
+  });
+  const playback = new AudioWorkletNode(ctx, 'voice-playback', {
+    numberOfInputs: 0,
+    outputChannelCount: [1],
+  });
+  ctx.createMediaStreamSource(mic).connect(capture);
+  playback.connect(ctx.destination);
+
+  capture.port.onmessage = (e) => {
+    if (e.data.type === 'frame') client.sendAudio(new Int16Array(e.data.pcm));
+    else if (e.data.type === 'flushed') client.endUtterance(releasedAt);
+  };
+  playback.port.onmessage = (e) => {
+    if (e.data.type === 'first-audio' && client.turn) {
+      // Convert the worklet's context time to the page clock, at the speaker
+      const stamp = ctx.getOutputTimestamp();
+      const heardAt = stamp.performanceTime + (e.data.time - stamp.contextTime) * 1000;
+      const ttfa = heardAt - client.turn.endedAt;
+      ttfas.push(ttfa);
+      show('ttfa', ms(ttfa));
+      show('ttfa-median', ms(median(ttfas)));
+    } else if (e.data.type === 'stats') {
+      const s = e.data.stats;
+      show('buffer', `${Math.round(s.bufferedMs)} / ${Math.round(s.targetMs)} ms`);
+      show('underruns', String(s.underruns));
+    }
+  };
+  return { ctx, capture, playback };
+}
+
+async function startTalking() {
+  if (recording) return;
+  try {
+    audio = audio || (await setupAudio());
+  } catch (err) {
+    status.textContent = `Microphone unavailable: ${err.message}`;
+    return;
+  }
+  await audio.ctx.resume();
+  recording = true;
+  talkBtn.classList.add('recording');
+  talkBtn.textContent = 'Listening…';
+  muted = true;
+  audio.playback.port.postMessage({ type: 'turn' }); // barge-in: stop the old reply
+  audio.capture.port.postMessage('start');
+}
+
+function stopTalking() {
+  if (!recording) return;
+  recording = false;
+  releasedAt = performance.now();
+  talkBtn.classList.remove('recording');
+  talkBtn.textContent = 'Hold to talk';
+  audio.capture.port.postMessage('stop'); // 'flushed' then ends the utterance
+}
+
+client.onAudio = (pcm, rate) => {
+  if (audio && !muted) audio.playback.port.postMessage({ type: 'audio', pcm: pcm.buffer, rate }, [pcm.buffer]);
+};
+
+client.onEvent = (msg) => {
+  if (msg.type === 'transcript') addLine(msg.text, 'user');
+  else if (msg.type === 'reply') addLine(msg.text);
+  else if (msg.type === 'audio_start') muted = false;
+  else if (msg.type === 'audio_end') {
+    if (audio) audio.playback.port.postMessage({ type: 'end' });
+    const t = client.turn;
+    if (t && t.firstByteAt !== null) show('first-byte', ms(t.firstByteAt - t.endedAt));
+    status.textContent = `Server: ${JSON.stringify(msg.timings)}`;
+  } else if (msg.type === 'error') status.textContent = `Agent: ${msg.message}`;
+  else if (msg.type === 'closed') {
+    talkBtn.disabled = true;
+    talkBtn.textContent = 'Disconnected';
+  }
+};
+
+talkBtn.addEventListener('pointerdown', startTalking);
+talkBtn.addEventListener('pointerup', stopTalking);
+talkBtn.addEventListener('pointerleave', stopTalking);
+document.addEventListener('keydown', (e) => {
+  if (e.code === 'Space' && !e.repeat && !talkBtn.disabled) {
+    e.preventDefault();
+    startTalking();
+  }
+});
+document.addEventListener('keyup', (e) => {
+  if (e.code === 'Space') stopTalking();
+});
+
+show('ws-url', wsUrl);
+client
+  .connect()
+  .then(() => {
+    talkBtn.disabled = false;
+    talkBtn.textContent = 'Hold to talk';
+  })
+  .catch((err) => {
+    talkBtn.textContent = 'Offline';
+    status.textContent = err.message;
+  });